@@ -0,0 +1,210 @@
+"""
+API JSON de clientes, mascotas, medicamentos, proveedores, productos y veterinarios.
+
+- Lectura: `?fields=name,phone` elige las columnas, que se piden a la base con
+  `.values()` sin instanciar modelos. Los listados se paginan por keyset con
+  `?after=` y `?page_size=` (app/pagination.py) y se guardan en la cache
+  versionada de los repositorios.
+- Escritura: las altas se validan con las reglas de `save_*` (incluido el
+  control de clientes duplicados) y se insertan con un unico bulk_create,
+  como las importaciones (app/imports.py); las modificaciones aplican los
+  datos recibidos sobre los actuales y llaman a `update_*`. Un lote con altas y modificaciones se guarda en una sola
+  transaccion y devuelve el resultado de cada elemento, para que la aplicacion
+  de recepcion sincronice sus cambios en un solo viaje.
+- Las respuestas se comprimen con gzip si Accept-Encoding lo admite (gzip_page).
+"""
+import json
+
+from django.db import connection, transaction
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
+
+from .caching import bump_version, conditional_on
+from .exports import EXPORT_FIELDS
+from .imports import IMPORTERS, check_rows, create_instances, import_fields
+from .models import Client, Medicine, Pet, Product, Provider, Vet
+
+API_RESOURCES = {
+    "clients": Client,
+    "pets": Pet,
+    "medicines": Medicine,
+    "providers": Provider,
+    "products": Product,
+    "vets": Vet,
+}
+
+# Campos que se pueden leer: los que se exportan y, de los productos, el stock.
+API_FIELDS = {**EXPORT_FIELDS, Product: (*EXPORT_FIELDS[Product], "stock")}
+
+UPDATE_METHODS = {
+    Client: "update_client",
+    Pet: "update_pet",
+    Medicine: "update_medicine",
+    Provider: "update_provider",
+    Product: "update_product",
+    Vet: "update_vet",
+}
+
+def parse_fields(model, value):
+    """
+    Devuelve los campos pedidos en `?fields=`, siempre con el id, o todos si no se pidio ninguno.
+
+    Returns:
+        Una tupla (campos, errores); los campos son None si se pidio uno desconocido.
+    """
+    allowed = API_FIELDS[model]
+    requested = [name.strip() for name in (value or "").split(",") if name.strip()]
+    if not requested:
+        return allowed, {}
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        return None, {"fields": f"Campos desconocidos: {', '.join(unknown)}"}
+    return tuple(dict.fromkeys(("id", *requested))), {}
+
+
+def parse_body(request):
+    """
+    Lee el cuerpo JSON de una peticion.
+
+    Solo se acepta `Content-Type: application/json`, que un formulario de otro
+    sitio no puede enviar; por eso las vistas de la API no usan el token CSRF.
+
+    Returns:
+        Una tupla (datos, errores).
+    """
+    if request.content_type != "application/json":
+        return None, {"body": "El contenido debe ser JSON (Content-Type: application/json)"}
+    try:
+        return json.loads(request.body), {}
+    except ValueError:
+        return None, {"body": "El cuerpo no es un JSON valido"}
+
+
+def parse_id(value):
+    """
+    Convierte un id recibido a entero; devuelve None si no es un id posible.
+    """
+    try:
+        pk = int(value)
+    except (TypeError, ValueError):
+        return None
+    # Un id fuera del rango de los enteros de la base no existe, y consultarlo
+    # da OverflowError en SQLite.
+    low, high = connection.ops.integer_field_range("BigAutoField")
+    return pk if low <= pk <= high else None
+
+
+def _current_values(instance, fields):
+    return {name: getattr(instance, instance._meta.get_field(name).attname) for name in fields}
+
+
+def create_records(model, rows):
+    """
+    Crea registros a partir de una lista de diccionarios, con un unico bulk_create.
+
+    Las filas se validan como en `save_*`: con el validador del modelo y, en
+    los clientes, con el control de duplicados de save_client
+    (Client.duplicate_errors). Debe llamarse dentro de una transaccion.
+
+    Returns:
+        Una lista con, por cada fila y en el mismo orden, {"id": id} o {"errors": errores}.
+    """
+    _, validator = IMPORTERS[model._meta.model_name]
+    checked, rejected = check_rows(model, validator, import_fields(model), list(enumerate(rows)))
+    if model is Client and checked:
+        duplicates = Client.duplicate_errors([row for _, row, _ in checked])
+        rejected.extend(
+            (number, row, errors) for (number, row, _), errors in zip(checked, duplicates) if errors
+        )
+        checked = [entry for entry, errors in zip(checked, duplicates) if not errors]
+    if checked:
+        create_instances(model, [instance for _, _, instance in checked])
+
+    results = [None] * len(rows)
+    for number, _, instance in checked:
+        results[number] = {"id": instance.pk}
+    for number, _, errors in rejected:
+        results[number] = {"errors": errors}
+    return results
+
+
+def update_records(model, rows):
+    """
+    Modifica registros a partir de una lista de diccionarios con su "id".
+
+    Los registros se leen con una sola consulta. Los datos recibidos se aplican
+    sobre los actuales, se validan como en las altas y se guardan con el
+    `update_*` del modelo. Debe llamarse dentro de una transaccion.
+
+    Returns:
+        Una lista con, por cada fila y en el mismo orden, {"id": id} o {"errors": errores}.
+    """
+    _, validator = IMPORTERS[model._meta.model_name]
+    fields = import_fields(model)
+    ids = [parse_id(row.get("id")) for row in rows]
+    instances = model.objects.in_bulk([pk for pk in ids if pk is not None])
+
+    results = [None] * len(rows)
+    pending = []
+    for number, (pk, row) in enumerate(zip(ids, rows)):
+        instance = instances.get(pk)
+        if instance is None:
+            results[number] = {"errors": {"id": f"No existe el registro {row.get('id')}"}}
+            continue
+        data = _current_values(instance, fields)
+        data.update((name, value) for name, value in row.items() if name in fields)
+        pending.append((number, data))
+
+    checked, rejected = check_rows(model, validator, fields, pending)
+    for number, _, errors in rejected:
+        results[number] = {"errors": errors}
+    for number, data, _ in checked:
+        outcome = getattr(instances[ids[number]], UPDATE_METHODS[model])(data)
+        saved, errors = outcome or (True, None)
+        results[number] = {"id": ids[number]} if saved else {"errors": errors}
+    return results
+
+
+def save_batch(model, create=(), update=()):
+    """
+    Guarda un lote de altas y modificaciones de un modelo en una sola transaccion.
+
+    Cada elemento se valida por separado: los invalidos se informan y no impiden
+    guardar el resto.
+
+    Returns:
+        Un diccionario {"created": resultados, "updated": resultados}.
+    """
+    with transaction.atomic():
+        # La primera escritura toma el lock de escritura de SQLite para todo el lote.
+        bump_version(model)
+        return {
+            "created": create_records(model, list(create)),
+            "updated": update_records(model, list(update)),
+        }
+
+
+def batch_rows(data, key, limit):
+    """
+    Devuelve la lista de filas `data[key]` de un lote, o los errores si no es una lista de objetos.
+
+    Returns:
+        Una tupla (filas, errores).
+    """
+    rows = data.get(key, [])
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return None, {key: "Debe ser una lista de objetos"}
+    if len(rows) > limit:
+        return None, {key: f"Se pueden enviar hasta {limit} elementos por lote"}
+    return rows, {}
+
+
+def api_view(view, *models):
+    """
+    Prepara una vista de la API para uno o varios modelos.
+
+    Agrega los GET condicionales segun la version de los modelos, la
+    compresion gzip de la respuesta (GZipMiddleware, que ademas vuelve debil el
+    ETag) y la exencion del token CSRF (ver parse_body).
+    """
+    return csrf_exempt(gzip_page(conditional_on(*models)(view)))
@@ -1,4 +1,17 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_fts(sender, using, **kwargs):
+    """
+    Vuelve a crear los indices de texto completo despues de cada migracion.
+    """
+    from django.db import connections
+
+    from . import fts
+
+    fts.install(connections[using])
 
 
 class AppConfig(AppConfig):
@@ -7,3 +20,15 @@ class AppConfig(AppConfig):
     """
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        """
+        Conecta las señales de la aplicacion.
+        """
+        from . import signals  # noqa: F401
+        from .database import configure_sqlite
+        from .instrumentation import install_query_recorder
+
+        connection_created.connect(configure_sqlite)
+        connection_created.connect(install_query_recorder)
+        post_migrate.connect(install_fts, sender=self)
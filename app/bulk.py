@@ -0,0 +1,170 @@
+"""
+Acciones masivas de los repositorios: borrar o modificar muchos registros a la vez.
+
+Cada accion es una sola sentencia sobre los registros seleccionados
+(QuerySet.delete() o QuerySet.update()) dentro de una transaccion, en lugar de
+un POST y una recarga de pagina por registro. Los clientes seleccionados
+tambien se pueden fusionar en uno (ver app/dedup.py). Como update() no envia señales y
+delete() las envia por instancia, las versiones de cache y las estadisticas se
+actualizan una vez por accion (ver stats.add_queryset y
+signals.deferred_writes).
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Round
+
+from . import stats
+from .caching import bump_version
+from .dedup import merge_clients
+from .models import City, Client, Medicine, Pet, Product, Provider, Vet
+from .signals import deferred_writes
+
+# Nombre en plural de los registros de cada modelo, para los mensajes.
+RECORD_NAMES = {
+    Client: "clientes",
+    Pet: "mascotas",
+    Medicine: "medicamentos",
+    Provider: "proveedores",
+    Product: "productos",
+    Vet: "veterinarios",
+}
+
+BulkUpdate = namedtuple("BulkUpdate", ["name", "label", "choices", "prepare", "describe"])
+
+
+def _set_choice(field, choices):
+    allowed = frozenset(choices.values)
+
+    def prepare(value):
+        if value not in allowed:
+            return None, "Por favor seleccione una opción válida"
+        return {field: value}, None
+
+    return prepare
+
+
+def _scale_price(value):
+    try:
+        percent = float(value)
+    except (TypeError, ValueError):
+        return None, "Por favor ingrese un porcentaje"
+    if percent <= -100:
+        return None, "El porcentaje debe ser mayor que -100"
+    return {"price": Round(F("price") * (1 + percent / 100), 2)}, None
+
+
+BULK_UPDATES = {
+    Client: (
+        BulkUpdate(
+            "city", "Cambiar ciudad", City.choices, _set_choice("city", City),
+            "se cambiará la ciudad a {value}",
+        ),
+    ),
+    Vet: (
+        BulkUpdate(
+            "speciality", "Cambiar especialidad", Vet.SPECIALITY_CHOICES.choices,
+            _set_choice("speciality", Vet.SPECIALITY_CHOICES),
+            "se cambiará la especialidad a {value}",
+        ),
+    ),
+    Product: (
+        BulkUpdate(
+            "price_percent", "Ajustar precio (%)", None, _scale_price,
+            "se ajustará el precio un {value}%",
+        ),
+    ),
+}
+
+
+# Modelos cuyos registros seleccionados se pueden fusionar en el mas antiguo.
+MERGES = {
+    Client: merge_clients,
+}
+
+
+def parse_ids(values):
+    """
+    Devuelve los ids enteros de una lista de valores, sin repetidos, ignorando los invalidos.
+    """
+    ids = []
+    for value in values:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return list(dict.fromkeys(ids))
+
+
+def find_update(model, name):
+    """
+    Devuelve la modificacion masiva `name` de un modelo, o None si no existe.
+    """
+    return next((update for update in BULK_UPDATES.get(model, ()) if update.name == name), None)
+
+
+def delete_records(model, ids):
+    """
+    Elimina los registros indicados con un unico QuerySet.delete().
+
+    Returns:
+        La cantidad de registros del modelo eliminados (sin contar las cascadas).
+    """
+    with transaction.atomic(), deferred_writes():
+        # Los modelos relacionados pueden quedar con la clave foranea en NULL,
+        # lo que no envia señales: se versionan junto con el modelo. Escribir
+        # primero toma el lock de escritura de SQLite.
+        bump_version(model, *{relation.related_model for relation in model._meta.related_objects})
+        _, deleted = model.objects.filter(pk__in=ids).delete()
+    return deleted.get(model._meta.label, 0)
+
+
+def update_records(model, ids, name, value):
+    """
+    Aplica la modificacion masiva `name` a los registros indicados con un unico QuerySet.update().
+
+    Returns:
+        Una tupla (cantidad de registros modificados, errores).
+    """
+    update = find_update(model, name)
+    if update is None:
+        return 0, {"action": "Acción no válida"}
+    changes, error = update.prepare(value)
+    if error:
+        return 0, {name: error}
+
+    with transaction.atomic():
+        bump_version(model)
+        queryset = model.objects.filter(pk__in=ids)
+        stats.add_queryset(queryset, -1)
+        count = queryset.update(**changes)
+        stats.add_queryset(queryset, 1)
+    return count, {}
+
+
+def merge_records(model, ids):
+    """
+    Fusiona los registros indicados en el de menor id, que es el mas antiguo.
+
+    Returns:
+        La cantidad de registros fusionados (y eliminados).
+    """
+    target = model.objects.filter(pk__in=ids).order_by("pk").values_list("pk", flat=True).first()
+    if target is None:
+        return 0
+    return MERGES[model](target, ids)
+
+
+def describe(model, name, value, count):
+    """
+    Describe una accion masiva para pedir su confirmacion, por ejemplo "Se eliminarán 3 clientes".
+    """
+    records = f"{count} {RECORD_NAMES[model]}"
+    if name == "delete":
+        return f"Se eliminarán {records}."
+    if name == "merge":
+        return f"Se fusionarán {records} en el más antiguo, que recibirá sus registros relacionados."
+    update = find_update(model, name)
+    labels = dict(update.choices or ())
+    return f"En {records} {update.describe.format(value=labels.get(value, value))}."
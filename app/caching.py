@@ -0,0 +1,236 @@
+import hashlib
+from functools import wraps
+from uuid import uuid4
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import ModelVersion
+
+STATS_KEY = "repository:stats:{kind}:{model}"
+
+
+def model_label(model):
+    """
+    Devuelve el nombre con el que se versiona un modelo, por ejemplo "client".
+    """
+    return model._meta.model_name
+
+
+def bump_version(*models):
+    """
+    Asigna una version nueva a los modelos indicados.
+
+    Se ejecuta en la transaccion de la escritura, con un unico INSERT ... ON
+    CONFLICT, de modo que la version y los datos se confirman o deshacen juntos.
+    """
+    now = timezone.now()
+    ModelVersion.objects.bulk_create(
+        [
+            ModelVersion(model=model_label(model), version=uuid4().hex, changed_at=now)
+            for model in models
+        ],
+        update_conflicts=True,
+        unique_fields=["model"],
+        update_fields=["version", "changed_at"],
+    )
+
+
+def _versions_query(labels):
+    return ModelVersion.objects.filter(model__in=labels).values_list(
+        "model", "version", "changed_at",
+    )
+
+
+def _versions_result(labels, rows):
+    versions = {label: (version, changed_at) for label, version, changed_at in rows}
+    return {label: versions.get(label, ("0", None)) for label in labels}
+
+
+def get_versions(*models):
+    """
+    Devuelve un diccionario {modelo: (version, fecha del cambio)} con una unica consulta.
+
+    Los modelos que nunca se modificaron tienen version "0" y fecha None.
+    """
+    labels = [model_label(model) for model in models]
+    return _versions_result(labels, list(_versions_query(labels)))
+
+
+async def aget_versions(*models):
+    """
+    Version asincronica de get_versions.
+    """
+    labels = [model_label(model) for model in models]
+    return _versions_result(labels, [row async for row in _versions_query(labels)])
+
+
+def _versions_memo(request, models):
+    memo = request.__dict__.setdefault("_model_versions", {})
+    missing = [model for model in models if model_label(model) not in memo]
+    return memo, missing
+
+
+def request_versions(request, models):
+    """
+    Devuelve las versiones de los modelos, consultandolas una sola vez por peticion.
+    """
+    memo, missing = _versions_memo(request, models)
+    if missing:
+        memo.update(get_versions(*missing))
+    return {model_label(model): memo[model_label(model)] for model in models}
+
+
+async def arequest_versions(request, models):
+    """
+    Version asincronica de request_versions.
+    """
+    memo, missing = _versions_memo(request, models)
+    if missing:
+        memo.update(await aget_versions(*missing))
+    return {model_label(model): memo[model_label(model)] for model in models}
+
+
+def _fingerprint(request, models):
+    versions = request_versions(request, models)
+    parts = [request.get_full_path(), *(f"{label}={v}" for label, (v, _) in versions.items())]
+    return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+
+def _stats_key(kind, model):
+    return STATS_KEY.format(kind=kind, model=model_label(model))
+
+
+def _record(kind, model):
+    key, counters = _stats_key(kind, model), caches["stats"]
+    try:
+        counters.incr(key)
+    except ValueError:
+        counters.set(key, 1, timeout=None)
+
+
+async def _arecord(kind, model):
+    key, counters = _stats_key(kind, model), caches["stats"]
+    try:
+        await counters.aincr(key)
+    except ValueError:
+        await counters.aset(key, 1, timeout=None)
+
+
+def cached_page(request, models, build):
+    """
+    Devuelve la pagina de un repositorio desde la cache o la construye.
+
+    La clave incluye la URL completa y la version de cada modelo del que dependen
+    los datos, por lo que cualquier escritura invalida las paginas anteriores sin
+    tener que borrarlas. Se guardan los objetos y no el HTML, que contiene el
+    token CSRF de cada usuario.
+
+    Args:
+        request: la peticion, cuya URL identifica la pagina.
+        models: los modelos de los que depende la pagina; el primero es el que
+            se usa para los contadores de aciertos.
+        build: funcion sin argumentos que construye la pagina.
+    """
+    key = f"repository:page:{_fingerprint(request, models)}"
+
+    page = cache.get(key)
+    if page is not None:
+        _record("hits", models[0])
+        return page
+
+    _record("misses", models[0])
+    page = build()
+    cache.set(key, page, settings.REPOSITORY_CACHE_TIMEOUT)
+    return page
+
+
+async def acached_page(request, models, build):
+    """
+    Version asincronica de cached_page; build debe ser una corrutina.
+    """
+    await arequest_versions(request, models)
+    key = f"repository:page:{_fingerprint(request, models)}"
+
+    page = await cache.aget(key)
+    if page is not None:
+        await _arecord("hits", models[0])
+        return page
+
+    await _arecord("misses", models[0])
+    page = await build()
+    await cache.aset(key, page, settings.REPOSITORY_CACHE_TIMEOUT)
+    return page
+
+
+def cache_stats(models):
+    """
+    Devuelve los aciertos, fallos y tasa de aciertos de la cache por modelo.
+
+    Los contadores estan en la cache "stats", compartida por todos los workers,
+    asi que suman las peticiones de todos los procesos.
+    """
+    keys = {
+        (kind, model_label(model)): _stats_key(kind, model)
+        for model in models
+        for kind in ("hits", "misses")
+    }
+    values = caches["stats"].get_many(keys.values())
+    stats = {}
+    for model in models:
+        label = model_label(model)
+        hits = values.get(keys["hits", label], 0)
+        misses = values.get(keys["misses", label], 0)
+        total = hits + misses
+        stats[label] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+def conditional_on(*models):
+    """
+    Decorador que responde GET condicionales (304) segun la version de los modelos.
+
+    El ETag combina la URL, la version de cada modelo y settings.RELEASE; el
+    Last-Modified es la fecha del ultimo cambio. Si la copia del cliente esta al
+    dia la vista no se ejecuta, de modo que no consulta ni renderiza nada.
+    Acepta vistas sincronicas y asincronicas.
+    """
+
+    def etag(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        return f"{settings.RELEASE}-{_fingerprint(request, models)}"
+
+    def last_modified(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        changes = [
+            changed_at
+            for _, changed_at in request_versions(request, models).values()
+            if changed_at is not None
+        ]
+        return max(changes, default=None)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+        if not iscoroutinefunction(view):
+            return conditional_view
+
+        @wraps(view)
+        async def async_view(request, *args, **kwargs):
+            # condition() llama a etag y last_modified de forma sincronica; las
+            # versiones se consultan antes con el ORM asincronico.
+            if request.method in ("GET", "HEAD"):
+                await arequest_versions(request, models)
+            return await conditional_view(request, *args, **kwargs)
+
+        return async_view
+
+    return decorator
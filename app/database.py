@@ -0,0 +1,40 @@
+"""
+Ajustes de rendimiento de SQLite aplicados a cada conexion nueva.
+
+Los PRAGMAs se toman de settings.SQLITE_PRAGMAS y se ejecutan al recibir la
+señal `connection_created`, de modo que valen para cualquier conexion que abra
+Django: la de cada peticion, la de los comandos y la de los tests.
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+_NAME_RE = re.compile(r"^[a-z_]+$")
+_VALUE_RE = re.compile(r"^-?\w+$")
+
+
+def pragma_statements(pragmas):
+    """
+    Convierte un diccionario {pragma: valor} en las sentencias `PRAGMA` a ejecutar.
+
+    Los PRAGMAs no admiten parametros, por lo que nombres y valores se validan
+    antes de interpolarlos.
+    """
+    statements = []
+    for name, value in pragmas.items():
+        if not _NAME_RE.match(name) or not _VALUE_RE.match(str(value)):
+            raise ImproperlyConfigured(f"PRAGMA de SQLite invalido: {name}={value!r}")
+        statements.append(f"PRAGMA {name} = {value}")
+    return statements
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Aplica settings.SQLITE_PRAGMAS a una conexion de SQLite recien creada.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(getattr(settings, "SQLITE_PRAGMAS", {})):
+            cursor.execute(statement)
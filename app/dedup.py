@@ -0,0 +1,121 @@
+"""
+Deteccion y fusion de clientes duplicados.
+
+Comparar cada cliente con todos los demas crece con el cuadrado de la tabla.
+En cambio se arman bloques con los clientes que comparten una clave de
+duplicados (telefono, parte local del email o codigo fonetico del nombre, ver
+app/matching.py) y solo se comparan los pares de un mismo bloque. Los bloques
+se leen con una consulta agrupada por clave, que usa el indice de cada
+columna, y los bloques mas grandes que MAX_BLOCK_SIZE (un codigo fonetico
+muy comun, por ejemplo) se descartan: asi el costo es casi lineal en la
+cantidad de clientes.
+"""
+from collections import namedtuple
+from itertools import combinations, groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import Count
+
+from .caching import bump_version
+from .matching import DUPLICATE_THRESHOLD, MATCH_KEY_FIELDS, score
+from .models import Client
+from .signals import deferred_writes
+
+MAX_BLOCK_SIZE = 50
+
+DuplicateGroup = namedtuple("DuplicateGroup", ["score", "clients"])
+
+_ROW_FIELDS = ("id", "name", "phone", "email", *MATCH_KEY_FIELDS)
+
+
+def blocks(max_block_size=MAX_BLOCK_SIZE):
+    """
+    Devuelve los bloques de clientes que comparten alguna clave de duplicados.
+
+    Hace una consulta por clave. Cada bloque es una lista de diccionarios con
+    los campos de _ROW_FIELDS, ordenada por id.
+    """
+    for field in MATCH_KEY_FIELDS:
+        shared = (
+            Client.objects.exclude(**{field: ""})
+            .values(field)
+            .annotate(size=Count("id"))
+            .filter(size__gt=1, size__lte=max_block_size)
+            .values(field)
+        )
+        rows = Client.objects.filter(**{f"{field}__in": shared}).order_by(field, "id").values(*_ROW_FIELDS)
+        for _, block in groupby(rows, key=itemgetter(field)):
+            yield list(block)
+
+
+def _find(parents, pk):
+    while parents[pk] != pk:
+        parents[pk] = parents[parents[pk]]
+        pk = parents[pk]
+    return pk
+
+
+def find_duplicates(threshold=DUPLICATE_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Busca grupos de clientes duplicados en toda la tabla.
+
+    Los pares con puntaje mayor o igual a `threshold` se unen en grupos: si A
+    se parece a B y B a C, los tres quedan en el mismo grupo.
+
+    Returns:
+        Una lista de DuplicateGroup (el mayor puntaje entre sus pares y los
+        clientes ordenados por id), ordenada por el id del primer cliente.
+    """
+    clients = {}
+    compared = set()
+    parents = {}
+    best = {}
+    for block in blocks(max_block_size):
+        for a, b in combinations(block, 2):
+            pair = (a["id"], b["id"])
+            if pair in compared:
+                continue
+            compared.add(pair)
+            points = score(a, b)
+            if points < threshold:
+                continue
+            for client in (a, b):
+                clients[client["id"]] = client
+                parents.setdefault(client["id"], client["id"])
+            root_a, root_b = _find(parents, a["id"]), _find(parents, b["id"])
+            root = min(root_a, root_b)
+            parents[root_a] = parents[root_b] = root
+            best[root] = max(points, best.get(root_a, 0), best.get(root_b, 0))
+
+    groups = {}
+    for pk in sorted(clients):
+        groups.setdefault(_find(parents, pk), []).append(clients[pk])
+    return [DuplicateGroup(best[root], members) for root, members in sorted(groups.items())]
+
+
+def merge_clients(target_id, ids):
+    """
+    Fusiona los clientes `ids` en el cliente `target_id`.
+
+    Los registros que apuntan a los duplicados (mascotas, facturas) pasan al
+    cliente que se conserva, con un UPDATE por relacion, y los duplicados se
+    eliminan con un unico QuerySet.delete().
+
+    Returns:
+        La cantidad de clientes eliminados.
+    """
+    duplicates = [pk for pk in ids if pk != target_id]
+    relations = [relation for relation in Client._meta.related_objects if not relation.many_to_many]
+    with transaction.atomic(), deferred_writes():
+        # UPDATE no envia señales: se versionan los modelos relacionados. Escribir
+        # primero toma el lock de escritura de SQLite.
+        bump_version(Client, *{relation.related_model for relation in relations})
+        if not Client.objects.filter(pk=target_id).exists():
+            raise Client.DoesNotExist(f"No existe el cliente {target_id}")
+        for relation in relations:
+            field = relation.field
+            related = relation.related_model._base_manager.filter(**{f"{field.name}__in": duplicates})
+            related.update(**{field.attname: target_id})
+        _, deleted = Client.objects.filter(pk__in=duplicates).delete()
+    return deleted.get(Client._meta.label, 0)
@@ -0,0 +1,248 @@
+"""
+Calculo de dosis de medicamentos segun el peso de las mascotas.
+
+Cada medicamento puede tener una DosingRule: mg por kg, un minimo y un maximo
+opcionales y el redondeo (la dosis se redondea al multiplo de step_mg mas
+cercano, por ejemplo media tableta). El peso se lleva a franjas de
+1 / WEIGHT_BUCKETS_PER_KG kg y la dosis se calcula para la franja, de modo que
+mascotas de pesos parecidos comparten el resultado.
+
+`doses` calcula las dosis de muchos pesos en una sola llamada (por ejemplo,
+todos los internados): solo calcula las franjas distintas que no esten en la
+cache, y lo hace con operaciones vectorizadas si NumPy esta instalado o con un
+recorrido en Python que da los mismos resultados. Las dosis de cada
+(medicamento, franja) se guardan en una cache LRU en memoria de
+DOSE_CACHE_SIZE entradas; la clave incluye los valores de la regla, asi que al
+modificarla las dosis anteriores dejan de usarse y se descartan solas.
+"""
+import math
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .caching import bump_version
+from .models import DosingRule, Pet
+from .validators import Field, Validator, convert, greater_than
+
+try:
+    import numpy
+except ImportError:  # NumPy es opcional: sin el se usa la version en Python.
+    numpy = None
+
+# Franjas de 100 g.
+WEIGHT_BUCKETS_PER_KG = 10
+
+RULE_VALIDATOR = Validator(
+    Field("mg_per_kg", "Por favor ingrese la dosis por kg",
+          convert(float, "Por favor ingrese una dosis por kg valida"),
+          greater_than(0, "La dosis por kg debe ser mayor que 0")),
+    Field("step_mg", "Por favor ingrese el redondeo de la dosis",
+          convert(float, "Por favor ingrese un redondeo valido"),
+          greater_than(0, "El redondeo debe ser mayor que 0")),
+)
+
+_LIMIT_FIELDS = ("min_mg", "max_mg")
+
+
+class LRUCache:
+    """
+    Cache en memoria que al llenarse descarta las entradas usadas hace mas tiempo.
+    """
+
+    def __init__(self, maxsize):
+        """
+        Inicializa la cache vacia con lugar para `maxsize` entradas.
+        """
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de entradas guardadas.
+        """
+        return len(self._entries)
+
+    def get_many(self, keys):
+        """
+        Devuelve un diccionario {clave: valor} con las `keys` que estan en la cache.
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, values):
+        """
+        Guarda los pares {clave: valor} y descarta las entradas mas viejas que no entran.
+        """
+        with self._lock:
+            self._entries.update(values)
+            for key in values:
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Vacia la cache y sus contadores.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+dose_cache = LRUCache(settings.DOSE_CACHE_SIZE)
+
+
+def _limit(value):
+    try:
+        return Decimal(str(value))
+    except ArithmeticError:
+        return None
+
+
+def validate_rule(data):
+    """
+    Valida los datos de una regla de dosificacion.
+
+    Returns:
+        Una tupla (valores, errores); los valores son None si hubo errores.
+    """
+    errors = RULE_VALIDATOR(data)
+    limits = {}
+    for name in _LIMIT_FIELDS:
+        value = data.get(name)
+        limits[name] = _limit(value) if value not in (None, "") else None
+        if value not in (None, "") and (limits[name] is None or not limits[name].is_finite() or limits[name] < 0):
+            errors[name] = "Por favor ingrese una cantidad de mg mayor o igual a 0"
+    if not errors and None not in limits.values() and limits["min_mg"] > limits["max_mg"]:
+        errors["max_mg"] = "El maximo no puede ser menor que el minimo"
+    if errors:
+        return None, errors
+    return {
+        "mg_per_kg": Decimal(str(data["mg_per_kg"])),
+        "step_mg": Decimal(str(data["step_mg"])),
+        **limits,
+    }, {}
+
+
+def save_rule(medicine, data):
+    """
+    Crea o reemplaza la regla de dosificacion de un medicamento.
+
+    Returns:
+        Una tupla (regla, errores); la regla es None si hubo errores.
+    """
+    values, errors = validate_rule(data)
+    if errors:
+        return None, errors
+    with transaction.atomic():
+        # La version se escribe antes de buscar la regla: SQLite toma el lock de
+        # escritura en esa primera escritura, y dos guardados simultaneos se
+        # hacen uno despues del otro en lugar de fallar con "database is locked".
+        bump_version(DosingRule)
+        rule, _ = DosingRule.objects.update_or_create(medicine=medicine, defaults=values)
+    return rule, {}
+
+
+def _rule_key(rule):
+    return (rule.medicine_id, rule.mg_per_kg, rule.min_mg, rule.max_mg, rule.step_mg)
+
+
+def _bucket(weight):
+    return math.floor(float(weight) * WEIGHT_BUCKETS_PER_KG + 0.5)
+
+
+def _limits(rule):
+    low = float(rule.min_mg) if rule.min_mg is not None else 0.0
+    high = float(rule.max_mg) if rule.max_mg is not None else math.inf
+    return low, high
+
+
+def _compute_python(rule, buckets):
+    rate, step = float(rule.mg_per_kg), float(rule.step_mg)
+    low, high = _limits(rule)
+    return [
+        min(max(math.floor(bucket / WEIGHT_BUCKETS_PER_KG * rate / step + 0.5) * step, low), high)
+        for bucket in buckets
+    ]
+
+
+def _compute_numpy(rule, buckets):
+    rate, step = float(rule.mg_per_kg), float(rule.step_mg)
+    kg = numpy.asarray(buckets, dtype=float) / WEIGHT_BUCKETS_PER_KG
+    return numpy.clip(numpy.floor(kg * rate / step + 0.5) * step, *_limits(rule)).tolist()
+
+
+def _bucket_doses(rule, buckets, use_numpy):
+    """
+    Devuelve {franja: dosis} para las franjas indicadas, calculando solo las que no estan en la cache.
+    """
+    key = _rule_key(rule)
+    cached = dose_cache.get_many([(key, bucket) for bucket in buckets])
+    by_bucket = {bucket: mg for (_, bucket), mg in cached.items()}
+    missing = [bucket for bucket in buckets if bucket not in by_bucket]
+    if missing:
+        compute = _compute_numpy if use_numpy else _compute_python
+        computed = {bucket: round(mg, 3) for bucket, mg in zip(missing, compute(rule, missing))}
+        dose_cache.set_many({(key, bucket): mg for bucket, mg in computed.items()})
+        by_bucket.update(computed)
+    return by_bucket
+
+
+def doses(rule, weights, use_numpy=None):
+    """
+    Calcula en una sola llamada la dosis en mg para cada peso en kg de `weights`.
+
+    Args:
+        use_numpy: None usa NumPy si esta instalado; False fuerza la version en Python.
+
+    Returns:
+        Una lista con la dosis de cada peso, en el mismo orden.
+    """
+    if numpy is not None and use_numpy is not False:
+        kg = numpy.asarray([float(weight) for weight in weights], dtype=float)
+        buckets, inverse = numpy.unique(
+            numpy.floor(kg * WEIGHT_BUCKETS_PER_KG + 0.5).astype(numpy.int64), return_inverse=True,
+        )
+        by_bucket = _bucket_doses(rule, buckets.tolist(), use_numpy=True)
+        return numpy.asarray([by_bucket[bucket] for bucket in buckets.tolist()])[inverse].tolist()
+
+    buckets = [_bucket(weight) for weight in weights]
+    by_bucket = _bucket_doses(rule, list(dict.fromkeys(buckets)), use_numpy=False)
+    return [by_bucket[bucket] for bucket in buckets]
+
+
+def dose_for_pet(rule, pet):
+    """
+    Devuelve la dosis en mg de una mascota segun su peso actual.
+    """
+    return doses(rule, [pet.weight])[0]
+
+
+def pet_doses(rule, pet_ids):
+    """
+    Calcula la dosis de muchas mascotas, leyendo sus pesos con una sola consulta.
+
+    Returns:
+        Una lista de diccionarios con "id", "name", "weight" y "dose", ordenada
+        por nombre; los ids inexistentes se omiten.
+    """
+    # Los ids fuera del rango de los enteros de la base no existen, y SQLite
+    # no los acepta como parametro.
+    low, high = connection.ops.integer_field_range("BigAutoField")
+    pet_ids = [pk for pk in pet_ids if low <= pk <= high]
+    pets = list(Pet.objects.filter(pk__in=pet_ids).order_by("name", "id").values("id", "name", "weight"))
+    for pet, dose in zip(pets, doses(rule, [pet["weight"] for pet in pets])):
+        pet["weight"], pet["dose"] = float(pet["weight"]), dose
+    return pets
@@ -0,0 +1,135 @@
+import csv
+import zlib
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Client, Medicine, Pet, Product, Provider, ProviderOffer, Vet
+
+EXPORT_FIELDS = {
+    Client: ("id", "name", "phone", "email", "city"),
+    Pet: ("id", "name", "breed", "birthday", "weight", "owner"),
+    Medicine: ("id", "name", "descripcion", "dosis"),
+    Provider: ("id", "name", "email", "address"),
+    Product: ("id", "name", "type", "price"),
+    Vet: ("id", "name", "email", "phone", "speciality"),
+    ProviderOffer: ("id", "provider", "product", "unit_price", "lead_time_days", "valid_from"),
+}
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """
+    Buffer de solo escritura que devuelve lo escrito, para usar csv.writer en streaming.
+    """
+
+    def write(self, value):
+        """
+        Devuelve el valor en lugar de almacenarlo.
+        """
+        return value
+
+
+class _ExportEncoder:
+    """
+    Convierte filas en fragmentos de texto CSV o NDJSON, comprimidos si se pide.
+    """
+
+    def __init__(self, fields, fmt, compress):
+        """
+        Prepara el codificador para los campos y el formato indicados.
+        """
+        self.fields = fields
+        self.fmt = fmt
+        self.csv = csv.writer(_Echo())
+        self.json = DjangoJSONEncoder(ensure_ascii=False)
+        self.compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+    def _out(self, text):
+        if self.compressor is None:
+            return text
+        return self.compressor.compress(text.encode())
+
+    def header(self):
+        """
+        Devuelve el encabezado del archivo.
+        """
+        return self._out(self.csv.writerow(self.fields) if self.fmt == "csv" else "")
+
+    def row(self, row):
+        """
+        Devuelve el fragmento correspondiente a una fila.
+        """
+        if self.fmt == "csv":
+            return self._out(self.csv.writerow(row))
+        return self._out(self.json.encode(dict(zip(self.fields, row))) + "\n")
+
+    def close(self):
+        """
+        Devuelve lo que queda pendiente del compresor.
+        """
+        return self.compressor.flush() if self.compressor is not None else ""
+
+
+def _export_setup(model, fmt, compress):
+    fields = EXPORT_FIELDS[model]
+    query = model.objects.order_by("id").values_list(*fields)
+    return query, _ExportEncoder(fields, fmt, compress)
+
+
+def export_rows(model, fmt="csv", compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Genera el contenido de la exportacion de un modelo, fila por fila.
+
+    Las filas se leen con un cursor del lado del servidor (`.iterator()`) como
+    tuplas de valores, sin instanciar modelos ni cargar la tabla en memoria.
+
+    Args:
+        model: el modelo a exportar, una de las claves de EXPORT_FIELDS.
+        fmt: "csv" o "ndjson".
+        compress: si es True el contenido se comprime en gzip.
+        chunk_size: cantidad de filas que se leen de la base de datos por vez.
+
+    Returns:
+        Un generador de cadenas (o de bytes si compress es True).
+    """
+    query, encoder = _export_setup(model, fmt, compress)
+    yield encoder.header()
+    for row in query.iterator(chunk_size=chunk_size):
+        chunk = encoder.row(row)
+        if chunk:
+            yield chunk
+    yield encoder.close()
+
+
+async def aexport_rows(model, fmt="csv", compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Version asincronica de export_rows, para servir la exportacion desde ASGI.
+
+    Django consume los iteradores sincronicos de una respuesta en streaming
+    cargandolos completos en memoria cuando corre bajo ASGI, por eso en ese modo
+    se leen los lotes del cursor en un hilo con `sync_to_async`. No se usa
+    `.aiterator()` porque en Django 5.0 ejecuta las consultas `values_list()`
+    dentro del event loop.
+    """
+    query, encoder = _export_setup(model, fmt, compress)
+    rows = query.iterator(chunk_size=chunk_size)
+    next_rows = sync_to_async(lambda: list(islice(rows, chunk_size)))
+
+    yield encoder.header()
+    while True:
+        batch = await next_rows()
+        for row in batch:
+            chunk = encoder.row(row)
+            if chunk:
+                yield chunk
+        if len(batch) < chunk_size:
+            break
+    yield encoder.close()
@@ -9,7 +9,7 @@ class PetForm(forms.ModelForm):
     """
     class Meta:
         model = Pet
-        fields = ['name', 'breed', 'weight', 'birthday']
+        fields = ['name', 'breed', 'weight', 'birthday', 'owner']
         error_messages = {
             'name': {
                 'required': 'Por favor ingrese un nombre',
@@ -22,6 +22,9 @@ class PetForm(forms.ModelForm):
                 'required': 'Por favor ingrese una fecha',
                 'invalid': 'Por favor ingrese una fecha válida',
             },
+            'owner': {
+                'invalid_choice': 'Por favor seleccione un cliente válido',
+            },
         }
         widgets = {
             'birthday': forms.DateInput(attrs={'type': 'date'}),
@@ -0,0 +1,150 @@
+"""
+Indices de texto completo (SQLite FTS5) para clientes, mascotas y medicamentos.
+
+Cada modelo indexado tiene una tabla virtual `<tabla>_fts` con contenido externo
+(`content=<tabla>`), es decir que solo guarda el indice y no duplica los datos.
+Los triggers sobre la tabla original la mantienen sincronizada, incluso ante
+`bulk_create`, `QuerySet.update()` y `QuerySet.delete()`.
+"""
+import re
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+from .models import Client, Medicine, Pet
+
+FTS_COLUMNS = {
+    Client: ("name", "email", "phone"),
+    Pet: ("name", "breed"),
+    Medicine: ("name", "descripcion"),
+}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fts_table(model):
+    """
+    Devuelve el nombre de la tabla virtual FTS5 de un modelo.
+    """
+    return f"{model._meta.db_table}_fts"
+
+
+def is_indexed(model, using=connection):
+    """
+    Indica si un modelo tiene indice de texto completo en la base de datos actual.
+    """
+    return model in FTS_COLUMNS and using.vendor == "sqlite"
+
+
+def _schema_sql(model):
+    table = model._meta.db_table
+    fts = fts_table(model)
+    pk = model._meta.pk.column
+    columns = ", ".join(FTS_COLUMNS[model])
+    new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS[model])
+    old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS[model])
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{table}', content_rowid='{pk}', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.{pk}, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.{pk}, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.{pk}, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.{pk}, {new_values}); END",
+    ]
+
+
+def install(using=connection):
+    """
+    Crea las tablas FTS5 y sus triggers si no existen.
+
+    Es idempotente: se ejecuta desde la migracion y despues de cada `migrate`,
+    porque SQLite descarta los triggers cuando Django reconstruye una tabla al
+    alterar sus columnas. Las tablas que se crean por primera vez se completan
+    con el contenido actual.
+    """
+    if using.vendor != "sqlite":
+        return
+    with using.cursor() as cursor:
+        existing = set(using.introspection.table_names(cursor))
+        for model in FTS_COLUMNS:
+            if model._meta.db_table not in existing:
+                continue
+            for statement in _schema_sql(model):
+                cursor.execute(statement)
+            if fts_table(model) not in existing:
+                rebuild(model, using)
+
+
+def uninstall(using=connection):
+    """
+    Elimina las tablas FTS5 y sus triggers.
+    """
+    if using.vendor != "sqlite":
+        return
+    with using.cursor() as cursor:
+        for model in FTS_COLUMNS:
+            fts = fts_table(model)
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def rebuild(model, using=connection):
+    """
+    Reconstruye el indice de un modelo a partir del contenido de su tabla.
+    """
+    fts = fts_table(model)
+    with using.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def match_expression(term):
+    """
+    Convierte el texto buscado en una expresion MATCH de FTS5.
+
+    Cada palabra se busca como prefijo (`"pal"*`) y todas deben aparecer, por lo
+    que "jua ver" encuentra "Juan Sebastian Veron". Devuelve None si el texto no
+    tiene palabras.
+    """
+    tokens = _TOKEN_RE.findall(term or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def ranked_ids(model, term, limit, offset=0, using=connection):
+    """
+    Busca en el indice de texto completo de un modelo.
+
+    Args:
+        model: un modelo de FTS_COLUMNS.
+        term: el texto buscado.
+        limit: cantidad maxima de resultados.
+        offset: cantidad de resultados a saltear.
+
+    Returns:
+        La lista de claves primarias ordenadas por relevancia (bm25).
+    """
+    expression = match_expression(term)
+    if expression is None:
+        return []
+    fts = fts_table(model)
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s ORDER BY rank LIMIT %s OFFSET %s",
+            [expression, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+async def aranked_ids(model, term, limit, offset=0):
+    """
+    Version asincronica de ranked_ids.
+    """
+    return await sync_to_async(ranked_ids)(model, term, limit, offset)
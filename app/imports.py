@@ -0,0 +1,250 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import stats, weights
+from .caching import bump_version
+from .exports import EXPORT_FIELDS
+from .models import (
+    CLIENT_VALIDATOR,
+    MEDICINE_VALIDATOR,
+    OFFER_VALIDATOR,
+    PET_VALIDATOR,
+    PRODUCT_VALIDATOR,
+    PROVIDER_VALIDATOR,
+    VET_VALIDATOR,
+    Client,
+    Medicine,
+    Pet,
+    PetWeight,
+    Product,
+    Provider,
+    ProviderOffer,
+    Vet,
+)
+
+IMPORTERS = {
+    "client": (Client, CLIENT_VALIDATOR),
+    "pet": (Pet, PET_VALIDATOR),
+    "medicine": (Medicine, MEDICINE_VALIDATOR),
+    "provider": (Provider, PROVIDER_VALIDATOR),
+    "product": (Product, PRODUCT_VALIDATOR),
+    "vet": (Vet, VET_VALIDATOR),
+    "offer": (ProviderOffer, OFFER_VALIDATOR),
+}
+
+IMPORT_CHUNK_SIZE = 1000
+
+
+class ImportResult:
+    """
+    Resultado de una importacion: cantidad de filas creadas y rechazadas.
+    """
+
+    def __init__(self):
+        """
+        Inicializa los contadores en cero.
+        """
+        self.created = 0
+        self.rejected = 0
+
+
+def import_fields(model):
+    """
+    Devuelve los campos que se importan de un modelo (los exportados, sin el id).
+    """
+    return tuple(field for field in EXPORT_FIELDS[model] if field != "id")
+
+
+def _build_instance(model, fields, row):
+    instance = model()
+    errors = {}
+    for name in fields:
+        field = model._meta.get_field(name)
+        value = row.get(name) or ""
+        # Las claves foraneas se asignan por id (owner -> owner_id).
+        if value == "" and field.blank:
+            setattr(instance, field.attname, None if field.null else value)
+            continue
+        try:
+            value = _to_python(field, value)
+        except ValidationError as error:
+            errors[name] = " ".join(error.messages)
+        else:
+            setattr(instance, field.attname, value)
+    return instance, errors
+
+
+def _to_python(field, value):
+    """
+    Convierte el valor de una fila al tipo del campo y aplica sus validadores.
+
+    Los validadores rechazan antes de guardar lo que la base no admite (mas
+    digitos de los definidos, enteros fuera de rango); en las claves foraneas
+    son los del campo al que apuntan. Un valor de un tipo que el campo no sabe
+    convertir (por ejemplo, un numero recibido en JSON como fecha) es invalido.
+    """
+    try:
+        value = field.to_python(value)
+    except (TypeError, AttributeError):
+        raise ValidationError(
+            field.error_messages.get("invalid", "Valor invalido: “%(value)s”"), params={"value": value},
+        ) from None
+    (field.target_field if field.many_to_one else field).run_validators(value)
+    return value
+
+
+def _missing_references(model, fields, checked):
+    """
+    Rechaza las filas cuyas claves foraneas apuntan a registros inexistentes.
+
+    Hace una consulta por clave foranea y por lote, en lugar de una por fila.
+    """
+    for name in fields:
+        field = model._meta.get_field(name)
+        if not field.many_to_one:
+            continue
+        ids = {getattr(instance, field.attname) for _, _, instance in checked} - {None}
+        existing = set(
+            field.related_model._default_manager.filter(pk__in=ids).values_list("pk", flat=True),
+        ) if ids else set()
+        for number, row, instance in checked:
+            value = getattr(instance, field.attname)
+            if value is not None and value not in existing:
+                yield number, row, {name: f"No existe el registro {value}"}
+
+
+def check_rows(model, validator, fields, rows):
+    """
+    Valida un lote de filas y construye las instancias de las validas.
+
+    Args:
+        model: el modelo de las filas.
+        validator: el Validator del modelo.
+        fields: los campos que se toman de cada fila.
+        rows: una lista de tuplas (numero, fila).
+
+    Returns:
+        Una tupla (validas, rechazadas): listas de (numero, fila, instancia) y
+        de (numero, fila, errores), ambas en el orden de los numeros.
+    """
+    checked = []
+    rejected = []
+    validated = validator.validate_many(row for _, row in rows)
+    for (number, row), errors in zip(rows, validated):
+        if not errors:
+            instance, errors = _build_instance(model, fields, row)
+        if errors:
+            rejected.append((number, row, errors))
+        else:
+            checked.append((number, row, instance))
+
+    missing = list(_missing_references(model, fields, checked))
+    if missing:
+        missing_numbers = {number for number, _, _ in missing}
+        checked = [entry for entry in checked if entry[0] not in missing_numbers]
+        rejected.extend(missing)
+        rejected.sort(key=lambda rejection: rejection[0])
+    return checked, rejected
+
+
+def create_instances(model, instances):
+    """
+    Inserta instancias ya validadas con un unico bulk_create.
+
+    Como bulk_create no envia post_save, invalida la version del modelo, suma
+    las instancias a las estadisticas y, de las mascotas, agrega el pesaje
+    inicial. Debe llamarse dentro de una transaccion.
+    """
+    if model is Client:
+        # bulk_create no llama a save(), que es donde se calculan estas claves.
+        for instance in instances:
+            instance.set_match_keys()
+    model.objects.bulk_create(instances)
+    versioned = [model]
+    if model is Pet:
+        weights.record_initial(instances)
+        versioned.append(PetWeight)
+    bump_version(*versioned)
+    stats.add_instances(model, instances)
+
+
+def import_rows(model_name, rows, chunk_size=IMPORT_CHUNK_SIZE, on_reject=None):
+    """
+    Importa filas (diccionarios) validandolas por lotes.
+
+    Cada lote se valida con las mismas reglas que `save_*` (con una sola llamada
+    a validate_many del validador del modelo) y las filas validas
+    se insertan con un unico `bulk_create` dentro de una transaccion por lote.
+
+    Args:
+        model_name: nombre del modelo, una de las claves de IMPORTERS.
+        rows: un iterable de diccionarios con los datos de cada fila.
+        chunk_size: cantidad de filas por lote.
+        on_reject: funcion que recibe (numero de fila, fila, errores) por cada
+            fila rechazada.
+
+    Returns:
+        Un ImportResult con la cantidad de filas creadas y rechazadas.
+    """
+    model, validator = IMPORTERS[model_name]
+    fields = import_fields(model)
+    result = ImportResult()
+    rows = iter(enumerate(rows, start=1))
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        checked, rejected = check_rows(model, validator, fields, chunk)
+        instances = [instance for _, _, instance in checked]
+
+        for number, row, errors in rejected:
+            result.rejected += 1
+            if on_reject is not None:
+                on_reject(number, row, errors)
+
+        if instances:
+            with transaction.atomic():
+                create_instances(model, instances)
+        result.created += len(instances)
+
+    return result
+
+
+def import_csv(model_name, lines, rejects=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Importa un archivo CSV leyendolo en streaming.
+
+    Args:
+        model_name: nombre del modelo, una de las claves de IMPORTERS.
+        lines: el archivo CSV abierto en modo texto (o cualquier iterable de lineas).
+        rejects: archivo de texto opcional donde se escriben las filas rechazadas
+            junto con sus errores en formato JSON.
+        chunk_size: cantidad de filas por lote.
+
+    Returns:
+        Un ImportResult con la cantidad de filas creadas y rechazadas.
+    """
+    model, _ = IMPORTERS[model_name]
+    reader = csv.DictReader(lines)
+
+    on_reject = None
+    if rejects is not None:
+        writer = csv.writer(rejects)
+        writer.writerow(("row", *import_fields(model), "errors"))
+
+        def on_reject(number, row, errors):
+            writer.writerow(
+                (
+                    number,
+                    *(row.get(field, "") for field in import_fields(model)),
+                    json.dumps(errors, ensure_ascii=False),
+                ),
+            )
+
+    return import_rows(model_name, reader, chunk_size=chunk_size, on_reject=on_reject)
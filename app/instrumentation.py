@@ -0,0 +1,221 @@
+"""
+Medicion por peticion de consultas SQL, plantillas y tiempo de la vista.
+
+`InstrumentationMiddleware` crea un RequestMetrics por peticion y lo publica en
+una variable de contexto. Las consultas se miden con un execute_wrapper que se
+instala en cada conexion nueva y las plantillas con el backend
+TimedDjangoTemplates; ambos suman en las metricas de la peticion actual. Como
+asgiref copia el contexto al pasar entre hilos, las consultas que las vistas
+asincronicas hacen con sync_to_async tambien se cuentan.
+
+Los resultados se envian en el header `Server-Timing` y como una linea de log
+del logger "app.instrumentation" (nivel WARNING si la peticion excede
+REQUEST_QUERY_BUDGET o REQUEST_TIME_BUDGET_MS).
+"""
+import contextvars
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+_current_metrics = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Acumula las consultas, el tiempo de SQL, de plantillas y de la vista de una peticion.
+    """
+
+    def __init__(self):
+        """
+        Inicializa los contadores en cero.
+        """
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.view_time = 0.0
+
+    def as_dict(self):
+        """
+        Devuelve las metricas con los tiempos en milisegundos.
+        """
+        return {
+            "queries": self.queries,
+            "sql_ms": round(self.sql_time * 1000, 2),
+            "template_ms": round(self.template_time * 1000, 2),
+            "view_ms": round(self.view_time * 1000, 2),
+        }
+
+    def server_timing(self):
+        """
+        Devuelve el valor del header Server-Timing.
+        """
+        metrics = self.as_dict()
+        return ", ".join(
+            [
+                f'db;dur={metrics["sql_ms"]};desc="{self.queries} queries"',
+                f"tpl;dur={metrics['template_ms']}",
+                f"view;dur={metrics['view_ms']}",
+            ],
+        )
+
+    def over_budget(self):
+        """
+        Devuelve los presupuestos excedidos por la peticion ("queries" y/o "time").
+        """
+        exceeded = []
+        if self.queries > settings.REQUEST_QUERY_BUDGET:
+            exceeded.append("queries")
+        if self.view_time * 1000 > settings.REQUEST_TIME_BUDGET_MS:
+            exceeded.append("time")
+        return exceeded
+
+
+def current_metrics():
+    """
+    Devuelve las metricas de la peticion en curso, o None fuera de una peticion.
+    """
+    return _current_metrics.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    execute_wrapper que cuenta y mide las consultas de la peticion en curso.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_time += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Instala record_query en cada conexion nueva (receptor de connection_created).
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate:
+    """
+    Envuelve una plantilla del backend de Django y mide el tiempo de render.
+    """
+
+    def __init__(self, template):
+        """
+        Guarda la plantilla original.
+        """
+        self.template = template
+
+    def __getattr__(self, name):
+        """
+        Delega el resto de los atributos en la plantilla original.
+        """
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        """
+        Renderiza la plantilla sumando el tiempo a las metricas de la peticion.
+        """
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Backend de plantillas de Django que mide el tiempo de render de cada plantilla.
+    """
+
+    def from_string(self, template_code):
+        """
+        Compila una plantilla desde un string.
+        """
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        """
+        Obtiene una plantilla por nombre.
+        """
+        return TimedTemplate(super().get_template(template_name))
+
+
+class InstrumentationMiddleware:
+    """
+    Mide cada peticion y agrega el header Server-Timing a la respuesta.
+
+    Admite vistas sincronicas y asincronicas.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Recibe el siguiente eslabon de la cadena de middlewares.
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Atiende la peticion midiendo el tiempo de la vista y sus consultas.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.view_time = time.perf_counter() - start
+            _current_metrics.reset(token)
+        return self._report(request, response, metrics)
+
+    async def __acall__(self, request):
+        """
+        Version asincronica de __call__.
+        """
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.view_time = time.perf_counter() - start
+            _current_metrics.reset(token)
+        return self._report(request, response, metrics)
+
+    def _report(self, request, response, metrics):
+        response["Server-Timing"] = metrics.server_timing()
+        exceeded = metrics.over_budget()
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **metrics.as_dict(),
+        }
+        if exceeded:
+            fields["over_budget"] = ",".join(exceeded)
+        logger.log(
+            logging.WARNING if exceeded else logging.INFO,
+            " ".join(f"{name}={value}" for name, value in fields.items()),
+            extra={"request_metrics": fields},
+        )
+        return response
@@ -0,0 +1,181 @@
+"""
+Libro de movimientos de stock y contadores de existencias de los productos.
+
+Cada movimiento se agrega a StockMovement y, en la misma transaccion, suma su
+cantidad a Product.stock con una expresion F(), de modo que el repositorio de
+productos muestra las existencias sin sumar el libro en cada peticion. Las
+salidas solo se registran si el UPDATE encuentra stock suficiente, por lo que
+dos ventas simultaneas no pueden dejar el contador en negativo.
+
+Si el contador y el libro llegaran a diferir (por ejemplo, por cambios hechos
+directamente en la base), reconcile_stock los recalcula desde el libro.
+"""
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .caching import bump_version
+from .models import Product, Provider, StockMovement
+
+RECONCILE_CHUNK_SIZE = 500
+
+
+def _parse_quantity(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def validate_movement(data):
+    """
+    Valida los datos de un movimiento de stock.
+
+    Returns:
+        Una tupla (cantidad con signo, errores); la cantidad es None si hubo errores.
+    """
+    errors = {}
+    kind = data.get("kind", "")
+    quantity = _parse_quantity(data.get("quantity"))
+
+    if kind not in StockMovement.KIND_CHOICES.values:
+        errors["kind"] = "Por favor seleccione un tipo de movimiento"
+    if quantity is None or quantity == 0:
+        errors["quantity"] = "Por favor ingrese una cantidad entera distinta de cero"
+    elif kind != StockMovement.KIND_CHOICES.ADJUSTMENT and quantity < 0:
+        errors["quantity"] = "La cantidad debe ser mayor que cero"
+    if kind == StockMovement.KIND_CHOICES.PURCHASE and not data.get("provider"):
+        errors["provider"] = "Por favor seleccione el proveedor de la compra"
+
+    if errors:
+        return None, errors
+    if kind == StockMovement.KIND_CHOICES.SALE:
+        quantity = -quantity
+    return quantity, {}
+
+
+def record_movement(product_id, data):
+    """
+    Registra un movimiento de stock y actualiza las existencias del producto.
+
+    Args:
+        product_id: id del producto.
+        data: diccionario con kind, quantity, provider (id, solo compras) y note.
+
+    Returns:
+        Una tupla (movimiento, errores); el movimiento es None si hubo errores.
+    """
+    quantity, errors = validate_movement(data)
+    if errors:
+        return None, errors
+
+    provider_id = None
+    if data.get("kind") == StockMovement.KIND_CHOICES.PURCHASE:
+        provider_id = _parse_quantity(data.get("provider"))
+        if provider_id is None or not Provider.objects.filter(pk=provider_id).exists():
+            return None, {"provider": "Por favor seleccione el proveedor de la compra"}
+
+    with transaction.atomic():
+        products = Product.objects.filter(pk=product_id)
+        if quantity < 0:
+            products = products.filter(stock__gte=-quantity)
+        if not products.update(stock=F("stock") + quantity):
+            if not Product.objects.filter(pk=product_id).exists():
+                return None, {"product": "El producto no existe"}
+            return None, {"quantity": "No hay stock suficiente"}
+        movement = StockMovement.objects.create(
+            product_id=product_id,
+            kind=data.get("kind"),
+            quantity=quantity,
+            provider_id=provider_id,
+            note=data.get("note", ""),
+        )
+        # update() no emite post_save y los movimientos solo se crean aca: se
+        # invalidan las dos caches con una sola escritura.
+        bump_version(Product, StockMovement)
+    return movement, {}
+
+
+def sell_products(quantities, note=""):
+    """
+    Registra la venta de varios productos, por ejemplo los de una factura.
+
+    Descuenta el stock de cada producto con un UPDATE condicional y crea todos
+    los movimientos con un unico bulk_create. Debe llamarse dentro de una
+    transaccion, que quien llama deshace si hubo errores, y no invalida las
+    caches: quien llama debe hacer bump_version(Product, StockMovement).
+
+    Args:
+        quantities: diccionario {id de producto: cantidad vendida}.
+        note: nota que se guarda en cada movimiento.
+
+    Returns:
+        Un diccionario {id de producto: error}, vacio si se registraron todas.
+    """
+    errors = {}
+    for product_id, quantity in quantities.items():
+        updated = Product.objects.filter(pk=product_id, stock__gte=quantity).update(
+            stock=F("stock") - quantity,
+        )
+        if not updated:
+            errors[product_id] = "No hay stock suficiente"
+    if errors:
+        return errors
+
+    StockMovement.objects.bulk_create(
+        StockMovement(product_id=product_id, kind=StockMovement.KIND_CHOICES.SALE, quantity=-quantity, note=note)
+        for product_id, quantity in quantities.items()
+    )
+    return {}
+
+
+def _stock_differences(chunk_size):
+    """
+    Devuelve los productos cuyo stock no coincide con la suma de sus movimientos.
+
+    Una sola consulta agrupada suma los movimientos por producto, recorriendo
+    solo el indice (product, quantity), y se lee con .iterator() de a
+    `chunk_size` filas junto con el stock guardado de los productos, ambos en
+    orden de id: cada producto se compara con su suma a medida que se leen (un
+    producto sin movimientos debe tener stock 0).
+    """
+    ledger = (
+        StockMovement.objects.values("product")
+        .annotate(total=Sum("quantity"))
+        .order_by("product")
+        .values_list("product", "total")
+    )
+    totals = ledger.iterator(chunk_size)
+    ledger_pk, total = next(totals, (None, 0))
+    products = []
+    for pk, stock in Product.objects.order_by("pk").values_list("pk", "stock").iterator(chunk_size):
+        movements = 0
+        if ledger_pk == pk:
+            movements = total
+            ledger_pk, total = next(totals, (None, 0))
+        if stock != movements:
+            products.append(Product(pk=pk, stock=movements))
+    return products
+
+
+def reconcile_stock(chunk_size=RECONCILE_CHUNK_SIZE):
+    """
+    Recalcula las existencias de todos los productos a partir del libro.
+
+    Primero solo se compara (ver _stock_differences): si todo coincide no se
+    escribe nada, ni siquiera una nueva version de Product. Si hay diferencias,
+    se vuelven a calcular dentro de una transaccion que toma el lock de
+    escritura al empezar, de modo que ningun movimiento se registra entre la
+    lectura y la correccion, y se corrigen con bulk_update por lotes. SQLite no
+    aisla las lecturas de las escrituras de una misma conexion, por eso no se
+    escribe mientras los cursores estan abiertos.
+
+    Returns:
+        La cantidad de productos corregidos.
+    """
+    if not _stock_differences(chunk_size):
+        return 0
+    with transaction.atomic():
+        bump_version(Product)
+        products = _stock_differences(chunk_size)
+        Product.objects.bulk_update(products, ["stock"], batch_size=chunk_size)
+    return len(products)
@@ -0,0 +1,194 @@
+"""
+Facturacion de productos y medicamentos a clientes.
+
+Una factura se crea en una sola transaccion: la factura con su total ya
+calculado, todas sus lineas con un unico bulk_create, la venta de los
+productos en el libro de stock y el incremento del resumen diario de ventas.
+Las facturas no se modifican, y al eliminar un cliente sus facturas se
+conservan con una copia de su nombre, por lo que DailySales siempre coincide
+con la suma de las facturas de cada dia sin tener que recorrerlas.
+"""
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import inventory
+from .caching import bump_version
+from .models import (
+    Client,
+    DailySales,
+    Invoice,
+    InvoiceLine,
+    Medicine,
+    Product,
+    StockMovement,
+)
+
+CENTS = Decimal("0.01")
+ITEM_MODELS = {"product": Product, "medicine": Medicine}
+
+
+def _parse_price(value):
+    try:
+        price = Decimal(value).quantize(CENTS)
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+    return price if price.is_finite() and price >= 0 else None
+
+
+def _parse_row(row):
+    """
+    Interpreta una linea del formulario: item "product:ID" o "medicine:ID",
+    cantidad y precio unitario (obligatorio solo para medicamentos).
+
+    Returns:
+        Una tupla (tipo, id, cantidad, precio o None, error o None).
+    """
+    kind, _, pk = (row.get("item") or "").partition(":")
+    if kind not in ITEM_MODELS or not pk.isdigit():
+        return None, None, None, None, "Seleccione un producto o medicamento"
+    try:
+        quantity = int(row.get("quantity"))
+    except (TypeError, ValueError):
+        quantity = 0
+    if quantity <= 0:
+        return None, None, None, None, "La cantidad debe ser mayor que cero"
+    price = None
+    if row.get("unit_price"):
+        price = _parse_price(row.get("unit_price"))
+        if price is None:
+            return None, None, None, None, "Ingrese un precio unitario valido"
+    elif kind == "medicine":
+        return None, None, None, None, "Ingrese el precio unitario del medicamento"
+    return kind, int(pk), quantity, price, None
+
+
+def _build_lines(rows):
+    """
+    Arma las lineas de la factura, sin guardarlas.
+
+    Lee los productos y medicamentos de todas las lineas con una consulta por
+    tipo. Las filas sin item se ignoran.
+
+    Returns:
+        Una tupla (lineas, errores).
+    """
+    parsed = []
+    errors = []
+    for number, row in enumerate(rows, start=1):
+        if not row.get("item"):
+            continue
+        kind, pk, quantity, price, error = _parse_row(row)
+        if error:
+            errors.append(f"Linea {number}: {error}")
+        else:
+            parsed.append((number, kind, pk, quantity, price))
+
+    wanted = {kind: set() for kind in ITEM_MODELS}
+    for _, kind, pk, _, _ in parsed:
+        wanted[kind].add(pk)
+    items = {kind: ITEM_MODELS[kind].objects.in_bulk(pks) if pks else {} for kind, pks in wanted.items()}
+
+    lines = []
+    for number, kind, pk, quantity, price in parsed:
+        item = items[kind].get(pk)
+        if item is None:
+            errors.append(f"Linea {number}: El producto o medicamento no existe")
+            continue
+        if price is None:
+            price = Decimal(str(item.price)).quantize(CENTS)
+        lines.append(InvoiceLine(
+            **{kind: item},
+            description=item.name,
+            quantity=quantity,
+            unit_price=price,
+            total=price * quantity,
+        ))
+    return lines, errors
+
+
+def _add_daily_sales(day, lines, total):
+    """
+    Suma una factura al resumen de ventas del dia.
+
+    Se ejecuta en la transaccion de la factura, que ya tiene el lock de
+    escritura de SQLite, por lo que el UPDATE y el INSERT no compiten con otra
+    factura del mismo dia.
+    """
+    updated = DailySales.objects.filter(date=day).update(
+        invoices=F("invoices") + 1, lines=F("lines") + lines, total=F("total") + total,
+    )
+    if not updated:
+        DailySales.objects.create(date=day, invoices=1, lines=lines, total=total)
+
+
+def create_invoice(client_id, rows):
+    """
+    Crea una factura con sus lineas y registra la venta de los productos.
+
+    Args:
+        client_id: id del cliente.
+        rows: lineas del formulario, diccionarios con item, quantity y unit_price.
+
+    Returns:
+        Una tupla (factura, errores); la factura es None si hubo errores.
+    """
+    errors = {}
+    client_name = Client.objects.filter(pk=client_id).values_list("name", flat=True).first() if client_id else None
+    if client_name is None:
+        errors["client"] = "Por favor seleccione un cliente"
+    lines, line_errors = _build_lines(rows)
+    if line_errors:
+        errors["lines"] = line_errors
+    elif not lines:
+        errors["lines"] = ["Agregue al menos una linea"]
+    if errors:
+        return None, errors
+
+    total = sum((line.total for line in lines), Decimal(0))
+    sold = Counter()
+    for line in lines:
+        if line.product_id is not None:
+            sold[line.product_id] += line.quantity
+
+    with transaction.atomic():
+        invoice = Invoice.objects.create(
+            client_id=client_id, client_name=client_name, date=timezone.localdate(), total=total,
+            line_count=len(lines),
+        )
+        for line in lines:
+            line.invoice = invoice
+        InvoiceLine.objects.bulk_create(lines)
+
+        stock_errors = inventory.sell_products(sold, note=str(invoice))
+        if stock_errors:
+            transaction.set_rollback(True)
+            names = {line.product_id: line.description for line in lines}
+            return None, {
+                "lines": [f"{names[pk]}: {message}" for pk, message in stock_errors.items()],
+            }
+
+        _add_daily_sales(invoice.date, len(lines), total)
+        bump_version(Invoice, DailySales, *((Product, StockMovement) if sold else ()))
+    return invoice, {}
+
+
+def client_invoices(client_id, limit=50):
+    """
+    Devuelve las ultimas facturas de un cliente con una unica consulta.
+
+    Usa el total y la cantidad de lineas guardados, sin leer las lineas.
+    """
+    return Invoice.objects.filter(client_id=client_id).order_by("-id")[:limit]
+
+
+def sales_summary(days=30):
+    """
+    Devuelve el resumen de ventas de los ultimos `days` dias, del mas reciente al mas antiguo.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return DailySales.objects.filter(date__gte=since).order_by("-date")
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from app.dedup import MAX_BLOCK_SIZE, find_duplicates, merge_clients
+from app.matching import DUPLICATE_THRESHOLD
+
+
+class Command(BaseCommand):
+    """
+    Lista los grupos de clientes que parecen ser la misma persona y, opcionalmente, los fusiona.
+    """
+
+    help = "Busca clientes duplicados comparando solo los que comparten telefono, email o nombre fonetico"
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DUPLICATE_THRESHOLD,
+            help=f"Puntaje minimo, de 0 a 1, para considerar duplicados dos clientes (por defecto {DUPLICATE_THRESHOLD})",
+        )
+        parser.add_argument(
+            "--max-block-size",
+            type=int,
+            default=MAX_BLOCK_SIZE,
+            help="Los grupos de clientes con una misma clave mas grandes que este tamaño no se comparan",
+        )
+        parser.add_argument(
+            "--merge",
+            action="store_true",
+            help="Fusiona cada grupo en su cliente mas antiguo (el de menor id)",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Imprime cada grupo de duplicados y, con --merge, lo fusiona.
+        """
+        groups = find_duplicates(options["threshold"], options["max_block_size"])
+        merged = 0
+        for group in groups:
+            self.stdout.write(f"Puntaje {group.score:.2f}:")
+            for client in group.clients:
+                self.stdout.write(f"  #{client['id']} {client['name']} - {client['phone']} - {client['email']}")
+            if options["merge"]:
+                ids = [client["id"] for client in group.clients]
+                merged += merge_clients(ids[0], ids)
+
+        if not groups:
+            self.stdout.write(self.style.SUCCESS("No se encontraron clientes duplicados"))
+        elif options["merge"]:
+            self.stdout.write(self.style.SUCCESS(f"{merged} clientes fusionados en {len(groups)} grupos"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(groups)} grupos de clientes duplicados"))
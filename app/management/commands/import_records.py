@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.imports import IMPORT_CHUNK_SIZE, IMPORTERS, import_csv
+
+
+class Command(BaseCommand):
+    """
+    Importa registros desde un archivo CSV en lotes.
+    """
+
+    help = "Importa registros de un modelo desde un archivo CSV en lotes"
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument("model", choices=sorted(IMPORTERS))
+        parser.add_argument("file", type=Path)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help="Cantidad de filas que se validan e insertan por transaccion",
+        )
+        parser.add_argument(
+            "--rejects",
+            type=Path,
+            help="Archivo donde se escriben las filas rechazadas (por defecto <file>.rejects.csv)",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Ejecuta la importacion y escribe las filas rechazadas en el archivo lateral.
+        """
+        source = options["file"]
+        if not source.exists():
+            raise CommandError(f"No existe el archivo {source}")
+        rejects_path = options["rejects"] or source.with_name(f"{source.name}.rejects.csv")
+
+        with source.open(newline="", encoding="utf-8-sig") as lines:
+            with rejects_path.open("w", newline="", encoding="utf-8") as rejects:
+                result = import_csv(
+                    options["model"], lines, rejects=rejects, chunk_size=options["chunk_size"],
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.created} registros importados, {result.rejected} rechazados",
+            ),
+        )
+        if result.rejected:
+            self.stdout.write(f"Filas rechazadas en {rejects_path}")
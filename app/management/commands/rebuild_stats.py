@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from app.stats import rebuild
+
+
+class Command(BaseCommand):
+    """
+    Recalcula desde cero las estadisticas de la pagina de inicio.
+    """
+
+    help = "Reconstruye la tabla StatCounter agrupando clientes, mascotas, veterinarios, productos y medicamentos"
+
+    def handle(self, *args, **options):
+        """
+        Recalcula los contadores e informa cuantos se guardaron.
+        """
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} contadores recalculados"))
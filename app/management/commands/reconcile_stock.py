@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from app.inventory import RECONCILE_CHUNK_SIZE, reconcile_stock
+
+
+class Command(BaseCommand):
+    """
+    Recalcula las existencias de los productos a partir de los movimientos de stock.
+    """
+
+    help = "Reconstruye Product.stock sumando el libro de movimientos de stock"
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=RECONCILE_CHUNK_SIZE,
+            help="Cantidad de productos que se leen y actualizan por lote",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Corrige los contadores que difieren del libro e informa cuantos fueron.
+        """
+        fixed = reconcile_stock(chunk_size=options["chunk_size"])
+        if fixed:
+            self.stdout.write(self.style.WARNING(f"{fixed} productos corregidos"))
+        else:
+            self.stdout.write(self.style.SUCCESS("El stock coincide con los movimientos"))
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+
+from app.imports import IMPORT_CHUNK_SIZE
+from app.seeding import seed
+
+OPTIONS = {
+    "client": ("--clients", 1000),
+    "pet": ("--pets", 2000),
+    "medicine": ("--medicines", 200),
+    "provider": ("--providers", 50),
+    "product": ("--products", 500),
+    "vet": ("--vets", 20),
+}
+
+
+class Command(BaseCommand):
+    """
+    Genera datos de prueba realistas para todos los modelos.
+    """
+
+    help = "Genera registros de prueba validos para todos los modelos usando bulk_create"
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        for model_name, (flag, default) in OPTIONS.items():
+            parser.add_argument(
+                flag,
+                dest=model_name,
+                type=int,
+                default=default,
+                help=f"Cantidad de registros de {model_name} a generar (por defecto {default})",
+            )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Semilla del generador aleatorio, para obtener siempre los mismos datos",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help="Cantidad de filas que se insertan por transaccion",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Genera los registros e informa cuantos se crearon de cada modelo.
+        """
+        counts = {model_name: options[model_name] for model_name in OPTIONS}
+        results = seed(counts, seed=options["seed"], chunk_size=options["chunk_size"])
+
+        for model_name, result in results.items():
+            message = f"{model_name}: {result.created} registros creados"
+            if result.rejected:
+                self.stdout.write(self.style.WARNING(f"{message}, {result.rejected} rechazados"))
+            else:
+                self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,129 @@
+"""
+Claves y puntaje para detectar clientes duplicados.
+
+Cada cliente guarda tres claves de bloqueo (Client.name_key, phone_key y
+email_key), calculadas con las funciones de este modulo al guardarlo:
+
+- el telefono normalizado, sin el 54 del pais ni el 9 de los celulares;
+- la parte local del email en minusculas, sin puntos ni sufijos "+...";
+- un codigo fonetico del nombre que iguala las grafias que en español suenan
+  igual (Gonzalez/Gonsales, Jimenez/Gimenez/Ximenez, Baca/Vaca, ...).
+
+Dos clientes solo se comparan si comparten alguna clave, y la comparacion
+(`score`) pondera el parecido de los nombres y la coincidencia de telefono y
+email. Las busquedas estan en app/dedup.py y en Client.find_similar.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+MATCH_KEY_FIELDS = ("name_key", "phone_key", "email_key")
+
+# Peso de cada señal en el puntaje. Con el umbral por defecto alcanza con que
+# coincida el nombre (foneticamente) y el telefono o el email, o el telefono y
+# el email con nombres medianamente parecidos.
+NAME_WEIGHT = 0.5
+PHONE_WEIGHT = 0.25
+EMAIL_WEIGHT = 0.25
+DUPLICATE_THRESHOLD = 0.75
+
+# Reemplazos del codigo fonetico, en orden. Las mayusculas marcan sonidos ya
+# resueltos para que las reglas siguientes no los vuelvan a cambiar.
+_PHONETIC_RULES = tuple(
+    (re.compile(pattern), replacement)
+    for pattern, replacement in (
+        (r"[^a-z]", ""),
+        (r"ch", "C"),
+        (r"ll", "Y"),
+        (r"qu", "K"),
+        (r"gu(?=[ei])", "G"),
+        (r"g(?=[ei])", "J"),
+        (r"^x", "J"),
+        (r"x", "KS"),
+        (r"c(?=[ei])", "S"),
+        (r"[cqk]", "K"),
+        (r"z", "S"),
+        (r"[vw]", "B"),
+        (r"h", ""),
+        (r"y(?![aeiou])", "I"),
+        (r"(.)\1+", r"\1"),
+    )
+)
+
+
+def fold(text):
+    """
+    Pasa un texto a minusculas sin acentos ni espacios repetidos.
+    """
+    ascii_text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return " ".join(ascii_text.lower().split())
+
+
+def _phonetic_word(word):
+    for pattern, replacement in _PHONETIC_RULES:
+        word = pattern.sub(replacement, word)
+    return word.lower()
+
+
+def phonetic_key(name):
+    """
+    Devuelve el codigo fonetico de un nombre, con sus palabras en orden alfabetico.
+
+    Ordenar las palabras hace que "Perez Juan" y "Juan Perez" tengan el mismo codigo.
+    """
+    words = (_phonetic_word(word) for word in fold(name).split())
+    return " ".join(sorted(word for word in words if word))
+
+
+def phone_key(phone):
+    """
+    Devuelve el telefono normalizado: solo digitos, sin el 54 del pais, el 9 de celular ni ceros iniciales.
+    """
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if digits.startswith("54"):
+        digits = digits[2:]
+    if digits.startswith("9"):
+        digits = digits[1:]
+    return digits.lstrip("0")
+
+
+def email_key(email):
+    """
+    Devuelve la parte local del email en minusculas, sin puntos ni sufijo "+...".
+    """
+    local = str(email or "").strip().lower().partition("@")[0]
+    return local.partition("+")[0].replace(".", "")
+
+
+def match_keys(name, phone, email):
+    """
+    Devuelve las claves de bloqueo de un cliente como diccionario {campo: clave}.
+    """
+    return {
+        "name_key": phonetic_key(name),
+        "phone_key": phone_key(phone),
+        "email_key": email_key(email),
+    }
+
+
+def name_similarity(a, b):
+    """
+    Devuelve el parecido entre dos nombres, de 0 a 1; 1 si suenan igual.
+    """
+    if a["name_key"] and a["name_key"] == b["name_key"]:
+        return 1.0
+    return SequenceMatcher(None, fold(a["name"]), fold(b["name"])).ratio()
+
+
+def score(a, b):
+    """
+    Devuelve el puntaje de duplicado, de 0 a 1, de dos clientes.
+
+    Los clientes son diccionarios con "name" y las claves de MATCH_KEY_FIELDS.
+    """
+    total = NAME_WEIGHT * name_similarity(a, b)
+    if a["phone_key"] and a["phone_key"] == b["phone_key"]:
+        total += PHONE_WEIGHT
+    if a["email_key"] and a["email_key"] == b["email_key"]:
+        total += EMAIL_WEIGHT
+    return round(total, 3)
@@ -0,0 +1,95 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='city',
+            field=models.CharField(choices=[('Ensenada', 'Ensenada'), ('La Plata', 'La Plata'), ('Berisso', 'Berisso')], default='La Plata', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='email',
+            field=models.EmailField(db_collation='NOCASE', db_index=True, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='name',
+            field=models.CharField(db_collation='NOCASE', db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='phone',
+            field=models.IntegerField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='medicine',
+            name='name',
+            field=models.CharField(db_collation='NOCASE', db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='pet',
+            name='breed',
+            field=models.CharField(blank=True, db_collation='NOCASE', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='pet',
+            name='name',
+            field=models.CharField(db_collation='NOCASE', db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='name',
+            field=models.CharField(db_collation='NOCASE', db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='type',
+            field=models.CharField(db_collation='NOCASE', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='provider',
+            name='email',
+            field=models.EmailField(db_collation='NOCASE', db_index=True, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='provider',
+            name='name',
+            field=models.CharField(db_collation='NOCASE', db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='vet',
+            name='email',
+            field=models.EmailField(db_collation='NOCASE', db_index=True, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='vet',
+            name='name',
+            field=models.CharField(db_collation='NOCASE', db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='vet',
+            name='phone',
+            field=models.CharField(db_collation='NOCASE', db_index=True, max_length=15),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['breed', 'name'], name='pet_breed_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['type', 'name'], name='product_type_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vet',
+            index=models.Index(fields=['speciality', 'name'], name='vet_speciality_name_idx'),
+        ),
+    ]
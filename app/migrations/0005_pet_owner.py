@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_model_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pets', to='app.client'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_pet_owner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='app.pet')),
+                ('vet', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='app.vet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['vet', 'start'], name='appointment_vet_start_idx'), models.Index(fields=['vet', 'end'], name='appointment_vet_end_idx'), models.Index(fields=['start'], name='appointment_start_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.CheckConstraint(check=models.Q(('end__gt', models.F('start'))), name='appointment_end_after_start'),
+        ),
+    ]
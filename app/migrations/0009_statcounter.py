@@ -0,0 +1,72 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:35
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, FloatField, Sum, Value
+
+
+def dosis_band(dosis):
+    dosis = int(dosis)
+    if dosis <= 3:
+        return "1-3"
+    if dosis <= 6:
+        return "4-6"
+    return "7-10" if dosis <= 10 else "Mas de 10"
+
+
+# Copia de app/stats.py al crear esta migracion: (modelo, metrica, campo,
+# rango, importe). Los cambios posteriores del modulo no deben alterar lo que hace.
+STATS = (
+    ("Client", "clients_by_city", "city", str, None),
+    ("Pet", "pets_by_breed", "breed", str, None),
+    ("Vet", "vets_by_speciality", "speciality", str, None),
+    ("Product", "products_by_type", "type", str, "price"),
+    ("Medicine", "medicines_by_dosis", "dosis", dosis_band, None),
+)
+
+
+def rebuild_stats(apps, schema_editor):
+    # Las bases con datos arrancan con los contadores calculados y no en cero.
+    StatCounter = apps.get_model("app", "StatCounter")
+    counts, totals = Counter(), Counter()
+    for model_name, metric, field, band, amount in STATS:
+        model = apps.get_model("app", model_name)
+        total = Sum(amount) if amount else Value(0.0, output_field=FloatField())
+        rows = model.objects.order_by().values(field).annotate(count=Count("pk"), total=total)
+        for row in rows:
+            if row[field] is None:
+                continue
+            key = (metric, band(row[field]))
+            counts[key] += row["count"]
+            totals[key] += row["total"] or 0.0
+    StatCounter.objects.all().delete()
+    StatCounter.objects.bulk_create(
+        StatCounter(metric=metric, key=key, count=count, total=totals[metric, key])
+        for (metric, key), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_invoice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('key', models.CharField(db_collation='NOCASE', max_length=100)),
+                ('count', models.IntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statcounter',
+            constraint=models.UniqueConstraint(fields=('metric', 'key'), name='stat_counter_metric_key'),
+        ),
+        migrations.RunPython(rebuild_stats, migrations.RunPython.noop),
+    ]
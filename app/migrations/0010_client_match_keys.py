@@ -0,0 +1,92 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:58
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Copia de las claves de app/matching.py al crear esta migracion: los cambios
+# posteriores del modulo no deben alterar lo que hace.
+MATCH_KEY_FIELDS = ("name_key", "phone_key", "email_key")
+
+_PHONETIC_RULES = tuple(
+    (re.compile(pattern), replacement)
+    for pattern, replacement in (
+        (r"[^a-z]", ""),
+        (r"ch", "C"),
+        (r"ll", "Y"),
+        (r"qu", "K"),
+        (r"gu(?=[ei])", "G"),
+        (r"g(?=[ei])", "J"),
+        (r"^x", "J"),
+        (r"x", "KS"),
+        (r"c(?=[ei])", "S"),
+        (r"[cqk]", "K"),
+        (r"z", "S"),
+        (r"[vw]", "B"),
+        (r"h", ""),
+        (r"y(?![aeiou])", "I"),
+        (r"(.)\1+", r"\1"),
+    )
+)
+
+
+def fold(text):
+    ascii_text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return " ".join(ascii_text.lower().split())
+
+
+def phonetic_word(word):
+    for pattern, replacement in _PHONETIC_RULES:
+        word = pattern.sub(replacement, word)
+    return word.lower()
+
+
+def match_keys(name, phone, email):
+    words = (phonetic_word(word) for word in fold(name).split())
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if digits.startswith("54"):
+        digits = digits[2:]
+    if digits.startswith("9"):
+        digits = digits[1:]
+    local = str(email or "").strip().lower().partition("@")[0]
+    return {
+        "name_key": " ".join(sorted(word for word in words if word)),
+        "phone_key": digits.lstrip("0"),
+        "email_key": local.partition("+")[0].replace(".", ""),
+    }
+
+
+def fill_match_keys(apps, schema_editor):
+    Client = apps.get_model("app", "Client")
+    clients = list(Client.objects.only("name", "phone", "email"))
+    for client in clients:
+        for field, key in match_keys(client.name, client.phone, client.email).items():
+            setattr(client, field, key)
+    Client.objects.bulk_update(clients, MATCH_KEY_FIELDS, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_statcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='email_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='name_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='phone_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_match_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def record_current_weights(apps, schema_editor):
+    Pet = apps.get_model("app", "Pet")
+    PetWeight = apps.get_model("app", "PetWeight")
+    PetWeight.objects.bulk_create(
+        (PetWeight(pet_id=pk, weight=weight) for pk, weight in Pet.objects.values_list("pk", "weight").iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_client_match_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PetWeight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('measured_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('weight', models.DecimalField(decimal_places=3, max_digits=8)),
+                ('pet', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='weighings', to='app.pet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pet', 'measured_at'], name='petweight_pet_measured_idx')],
+            },
+        ),
+        migrations.RunPython(record_current_weights, migrations.RunPython.noop),
+    ]
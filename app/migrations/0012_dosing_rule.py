@@ -0,0 +1,26 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:07
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_pet_weight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DosingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mg_per_kg', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('min_mg', models.DecimalField(blank=True, decimal_places=3, max_digits=10, null=True)),
+                ('max_mg', models.DecimalField(blank=True, decimal_places=3, max_digits=10, null=True)),
+                ('step_mg', models.DecimalField(decimal_places=3, default=Decimal('0.1'), max_digits=10)),
+                ('medicine', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='dosing_rule', to='app.medicine')),
+            ],
+        ),
+    ]
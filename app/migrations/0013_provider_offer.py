@@ -0,0 +1,29 @@
+# Generated by Django 5.0.4 on 2026-10-18 19:10
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_dosing_rule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('lead_time_days', models.PositiveIntegerField(default=0)),
+                ('valid_from', models.DateField(default=datetime.date.today)),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='app.product')),
+                ('provider', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='app.provider')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'provider', 'valid_from'], name='offer_product_provider_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-18 21:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_client_names(apps, schema_editor):
+    Client = apps.get_model("app", "Client")
+    Invoice = apps.get_model("app", "Invoice")
+    names = Client.objects.filter(pk=OuterRef("client_id")).values("name")[:1]
+    Invoice.objects.update(client_name=Subquery(names))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_stock_movement_ledger_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='client_name',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='client',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='app.client'),
+        ),
+        migrations.RunPython(copy_client_names, migrations.RunPython.noop),
+    ]
@@ -1,43 +1,25 @@
+from datetime import date
+from decimal import Decimal
+
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .matching import DUPLICATE_THRESHOLD, MATCH_KEY_FIELDS, match_keys, score
+from .validators import (
+    Field,
+    Validator,
+    at_most,
+    check,
+    contains,
+    convert,
+    ends_with,
+    greater_than,
+    letters_and_spaces,
+    one_of,
+    starts_with,
+)
 
-def validate_client(data):
-    """Valida que no se genere un cliente vacio en la veterinaria"""
-    errors = {}
-
-    name = data.get("name", "")
-    phone = str(data.get("phone", ""))  
-    email = data.get("email", "")
-    city = data.get("city", "")
-
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
-    elif not all(char.isalpha() or char.isspace() for char in name):
-        errors["name"] = "El nombre solo puede contener letras y espacios"
-
-    if phone == "":
-        errors["phone"] = "Por favor ingrese un teléfono"
-    elif not phone.isdigit():
-        errors["phone"] = "Por favor ingrese un telefono valido"
-    elif not phone.startswith('54'):
-        errors["phone"] = "El teléfono debe comenzar con 54"
-            
-    if email == "":
-        errors["email"] = "Por favor ingrese un email"
-    elif email.count("@") == 0:
-        errors["email"] = "Por favor ingrese un email válido"
-    elif not email.endswith("@vetsoft.com"):
-        errors["email"] = "El email debe terminar en @vetsoft.com"
-    elif email == "@vetsoft.com":
-        errors["email"] = "El email no puede ser solo '@vetsoft.com'"
-
-    if city == "" or city is None:
-        errors["city"] = "Por favor ingrese una ciudad"
-    elif city not in dict(City.choices):
-        errors["city"] = "Ciudad no válida"
-
-    return errors
 
 class City(models.TextChoices):
     """
@@ -48,118 +30,118 @@ class City(models.TextChoices):
     BERISSO = 'Berisso', 'Berisso'
 
 
+CLIENT_VALIDATOR = Validator(
+    Field("name", "Por favor ingrese un nombre",
+          check(letters_and_spaces, "El nombre solo puede contener letras y espacios")),
+    Field("phone", "Por favor ingrese un teléfono",
+          convert(str, "Por favor ingrese un telefono valido"),
+          check(str.isdigit, "Por favor ingrese un telefono valido"),
+          check(starts_with("54"), "El teléfono debe comenzar con 54")),
+    Field("email", "Por favor ingrese un email",
+          check(contains("@"), "Por favor ingrese un email válido"),
+          check(ends_with("@vetsoft.com"), "El email debe terminar en @vetsoft.com"),
+          check("@vetsoft.com".__ne__, "El email no puede ser solo '@vetsoft.com'")),
+    Field("city", "Por favor ingrese una ciudad",
+          check(one_of(City), "Ciudad no válida")),
+)
+
+
+def validate_client(data):
+    """Valida que no se genere un cliente vacio en la veterinaria"""
+    return CLIENT_VALIDATOR(data)
+
+
+MEDICINE_VALIDATOR = Validator(
+    Field("name", "Por favor ingrese un nombre para el medicamento"),
+    Field("descripcion", "Por favor ingrese una descripcion"),
+    Field("dosis", "Por favor ingrese una dosis",
+          convert(int, "La cantidad de dosis no es correcta,debe ser una cantidad entera"),
+          greater_than(0, "La dosis debe ser mayor a cero"),
+          at_most(10, "La dosis debe ser menor que 10")),
+)
+
+
 def validate_medicine(data):
     """Valida que no se genere una medicina vacia en la veterinaria y  que la dosis este entre 1 y 10"""
-    errors = {}
+    return MEDICINE_VALIDATOR(data)
 
-    name = data.get("name", "")
-    descripcion = data.get("descripcion", "")
-    dosis = data.get("dosis", "")
 
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre para el medicamento"
+PROVIDER_VALIDATOR = Validator(
+    Field("name", "Por favor ingrese un nombre"),
+    Field("email", "Por favor ingrese un email",
+          check(contains("@"), "Por favor ingrese un email valido")),
+    Field("address", "Por favor ingrese una dirección"),
+)
 
-    if descripcion == "":
-        errors["descripcion"] = "Por favor ingrese una descripcion"
-    
-    if dosis == "":
-        errors["dosis"] = "Por favor ingrese una dosis"
-    else: 
-        try:
-            dosis = int(dosis)
-            if dosis <= 0:
-                errors['dosis'] = "La dosis debe ser mayor a cero"
-            elif dosis  < 1:
-                errors["dosis"] = "La dosis debe ser mayor o igual que 1"
-            elif dosis > 10:
-                errors["dosis"] = "La dosis debe ser menor que 10"
-        except ValueError:
-            errors["dosis"] = "La cantidad de dosis no es correcta,debe ser una cantidad entera"
-    return errors
 
 def validate_provider(data):
     """Valida que no se genere un proveedor vacio en la veterinaria"""
-    errors = {}
-
-    name = data.get("name", "")
-    email = data.get("email", "")
-    address=data.get("address","")
-
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
-    
-    if email == "":
-        errors["email"] = "Por favor ingrese un email"
-    elif email.count("@") == 0:
-        errors["email"] = "Por favor ingrese un email valido"
-
-    if address == "":
-        errors["address"] = "Por favor ingrese una dirección"
-    return errors
+    return PROVIDER_VALIDATOR(data)
+
+
+PRODUCT_VALIDATOR = Validator(
+    Field("name", "Por favor ingrese un nombre para el producto"),
+    Field("type", "Por favor ingrese el tipo del producto"),
+    Field("price", "Por favor ingrese el precio del producto",
+          convert(float, "Por favor ingrese un precio valido para el producto"),
+          greater_than(0, "Por favor ingrese un precio del producto mayor que cero")),
+)
+
+
+OFFER_VALIDATOR = Validator(
+    Field("provider", "Por favor seleccione un proveedor",
+          convert(int, "Por favor seleccione un proveedor valido")),
+    Field("product", "Por favor seleccione un producto",
+          convert(int, "Por favor seleccione un producto valido")),
+    Field("unit_price", "Por favor ingrese el precio unitario",
+          convert(float, "Por favor ingrese un precio unitario valido"),
+          greater_than(0, "El precio unitario debe ser mayor que cero")),
+    Field("lead_time_days", "Por favor ingrese la demora de entrega",
+          convert(int, "La demora de entrega debe ser una cantidad entera de dias"),
+          greater_than(-1, "La demora de entrega no puede ser negativa")),
+    Field("valid_from", "Por favor ingrese la fecha desde la que vale la oferta",
+          convert(date.fromisoformat, "Por favor ingrese una fecha valida (AAAA-MM-DD)")),
+)
 
 
 def validate_product(data):
     """Valida que no se genere un producto vacio vacio en la veterinaria y que el precio de un producto sea mayor a 0"""
-    errors = {}
-    
-    name = data.get("name","")
-    type = data.get("type","")
-    price = data.get("price","")
-
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre para el producto"
-        
-    if type =="":
-        errors["type"] = "Por favor ingrese el tipo del producto"
-
-    if price == "" :
-        errors["price"] = "Por favor ingrese el precio del producto"
-    else:
-        try: 
-            if float(price) <= 0:
-                errors["price"] = "Por favor ingrese un precio del producto mayor que cero"
-        except ValueError:
-            errors["price"] = "Por favor ingrese un precio valido para el producto"
-  
-    return errors
+    return PRODUCT_VALIDATOR(data)
 
 
 def validate_Vet(data):
     """Valida que no se genere un veterinario vacio en la veterinaria"""
-    errors = {}
-
-    name = data.get("name", "")
-    email = data.get("email", "")
-    phone = data.get("phone", "")
-    speciality= data.get("speciality","")
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
-
-    if email == "":
-        errors["email"] = "Por favor ingrese un email"
-    elif email.count("@") == 0:
-        errors["email"] = "Por favor ingrese un email valido"
-
-    if phone == "":
-        errors["phone"] = "Por favor ingrese un teléfono"
-    
-    if speciality == "" or speciality is None:
-        errors["speciality"] = "Por favor seleccione una especialidad válida"
-    elif speciality not in [choice[0] for choice in Vet.SPECIALITY_CHOICES.choices]:
-        errors["speciality"] = "Especialidad no válida"
+    return VET_VALIDATOR(data)
+
 
-    return errors
+PET_VALIDATOR = Validator(
+    Field("name", "Por favor ingrese un nombre"),
+    Field("birthday", "Por favor ingrese una fecha"),
+    Field("weight", "Por favor ingrese un peso",
+          convert(float, "Por favor ingrese un peso valido"),
+          greater_than(0, "El peso debe ser mayor que 0")),
+)
 
 
+def duplicate_message(name, phone, email):
+    """
+    Devuelve el error que informa que ya existe un cliente parecido.
+    """
+    return f"Ya existe un cliente parecido: {name} (teléfono {phone}, email {email})"
+
 
 class Client(models.Model):
     """
     Definicion de clase cliente y sus metodos
     """
-    name = models.CharField(max_length=100)
-    phone = models.IntegerField()
-    email = models.EmailField()
+    name = models.CharField(max_length=100, db_collation="NOCASE", db_index=True)
+    phone = models.IntegerField(db_index=True)
+    email = models.EmailField(db_collation="NOCASE", db_index=True)
     city = models.CharField(max_length=50, choices=City, default=City.LA_PLATA)
+    # Claves de bloqueo para detectar duplicados (ver app/matching.py); se calculan al guardar.
+    name_key = models.CharField(max_length=200, default="", editable=False, db_index=True)
+    phone_key = models.CharField(max_length=20, default="", editable=False, db_index=True)
+    email_key = models.CharField(max_length=254, default="", editable=False, db_index=True)
 
     def __str__(self):
         """
@@ -170,11 +152,121 @@ class Client(models.Model):
         """
         return self.name
 
+    def set_match_keys(self):
+        """
+        Calcula las claves de duplicados a partir del nombre, el telefono y el email.
+
+        save() las calcula siempre; las altas con bulk_create deben llamarlo antes.
+        """
+        for field, key in match_keys(self.name, self.phone, self.email).items():
+            setattr(self, field, key)
+
+    def save(self, *args, **kwargs):
+        """
+        Guarda el cliente con sus claves de duplicados actualizadas.
+        """
+        self.set_match_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *MATCH_KEY_FIELDS}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def find_similar(cls, client_data, threshold=DUPLICATE_THRESHOLD, exclude=None):
+        """
+        Busca clientes que podrian ser el mismo que el de los datos recibidos.
+
+        Solo lee los clientes que comparten alguna clave de duplicados, con una
+        consulta que usa los indices de las tres claves.
+
+        Returns:
+            Una lista de tuplas (puntaje, cliente), de la mas parecida a la menos.
+        """
+        data = {"name": client_data.get("name", "")}
+        data.update(match_keys(data["name"], client_data.get("phone"), client_data.get("email")))
+        blocks = models.Q()
+        for field in MATCH_KEY_FIELDS:
+            if data[field]:
+                blocks |= models.Q(**{field: data[field]})
+        if not blocks:
+            return []
+
+        candidates = cls.objects.filter(blocks)
+        if exclude is not None:
+            candidates = candidates.exclude(pk=exclude)
+        matches = []
+        for candidate in candidates:
+            points = score(data, candidate.__dict__)
+            if points >= threshold:
+                matches.append((points, candidate))
+        matches.sort(key=lambda match: (-match[0], match[1].pk))
+        return matches
+
+    @classmethod
+    def duplicate_errors(cls, rows, threshold=DUPLICATE_THRESHOLD):
+        """
+        Aplica a un lote de altas el control de duplicados de save_client, con una sola consulta.
+
+        Cada fila se compara con los clientes que comparten alguna clave de
+        duplicados y con las filas anteriores del lote que no fueron
+        rechazadas, como si se guardaran de a una con save_client. Las filas con
+        `allow_duplicate` no se controlan.
+
+        Returns:
+            Una lista con, por cada fila, los errores {"duplicate": mensaje} o None.
+        """
+        keyed = [
+            {"name": row.get("name", ""), **match_keys(row.get("name", ""), row.get("phone"), row.get("email"))}
+            for row in rows
+        ]
+        blocks = models.Q()
+        for field in MATCH_KEY_FIELDS:
+            keys = {data[field] for data in keyed if data[field]}
+            if keys:
+                blocks |= models.Q(**{f"{field}__in": keys})
+        existing = cls.objects.filter(blocks).values("id", "name", "phone", "email", *MATCH_KEY_FIELDS) if blocks else []
+
+        # Candidatos por clave: los clientes existentes y, a medida que se aceptan, las filas del lote.
+        by_key = {}
+
+        def add_candidate(order, candidate):
+            for field in MATCH_KEY_FIELDS:
+                if candidate[field]:
+                    by_key.setdefault((field, candidate[field]), []).append((order, candidate))
+
+        for client in existing:
+            add_candidate((0, client["id"]), client)
+
+        results = []
+        for number, (row, data) in enumerate(zip(rows, keyed)):
+            if not row.get("allow_duplicate"):
+                candidates = {
+                    order: candidate
+                    for field in MATCH_KEY_FIELDS if data[field]
+                    for order, candidate in by_key.get((field, data[field]), ())
+                }
+                matches = sorted(
+                    (-points, order)
+                    for order, candidate in candidates.items()
+                    if (points := score(data, candidate)) >= threshold
+                )
+                if matches:
+                    client = candidates[matches[0][1]]
+                    results.append({"duplicate": duplicate_message(client["name"], client["phone"], client["email"])})
+                    continue
+            results.append(None)
+            add_candidate((1, number), {**data, "phone": row.get("phone"), "email": row.get("email")})
+        return results
+
     @classmethod
     def save_client(cls, client_data):
         """
         Guarda un cliente en la base de datos.
 
+        Si ya existe un cliente parecido (ver find_similar) no lo guarda y lo
+        informa en el error "duplicate", salvo que los datos incluyan
+        `allow_duplicate`.
+
         Args:
             client_data: un diccionario que contiene los datos del cliente.
 
@@ -187,6 +279,12 @@ class Client(models.Model):
         if len(errors.keys()) > 0:
             return False, errors
 
+        if not client_data.get("allow_duplicate"):
+            similar = cls.find_similar(client_data)
+            if similar:
+                client = similar[0][1]
+                return False, {"duplicate": duplicate_message(client.name, client.phone, client.email)}
+
         Client.objects.create(
             name=client_data.get("name"),
             phone=client_data.get("phone"),
@@ -223,34 +321,23 @@ class Pet(models.Model):
     """
     Definicion de clase mascota y sus metodos
     """
-    name = models.CharField(max_length=100)
-    breed = models.CharField(max_length=50, blank=True)
+    name = models.CharField(max_length=100, db_collation="NOCASE", db_index=True)
+    breed = models.CharField(max_length=50, blank=True, db_collation="NOCASE")
     birthday = models.DateField()
     weight = models.DecimalField(max_digits=8, decimal_places=3)
+    owner = models.ForeignKey(
+        Client, null=True, blank=True, on_delete=models.SET_NULL, related_name="pets",
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["breed", "name"], name="pet_breed_name_idx")]
 
     @classmethod
     def validate_pet(cls, data):
         """
         Valida los datos de la mascota. 
         """
-        errors = {}
-
-        name = data.get("name", "")
-        name = data.get("name", "") 
-        birthday = data.get("birthday", "")
-        weight = data.get("weight", "")
-        if birthday == "":
-                errors["birthday"] = "Por favor ingrese una fecha"
-
-        if name == "":
-            errors["name"] = "Por favor ingrese un nombre"
-
-        if weight == "":
-            errors["weight"] = "Por favor ingrese un peso"
-        else:
-            if (float(weight) <= 0):
-                errors["weight"] = "El peso debe ser mayor que 0"
-        return errors
+        return PET_VALIDATOR(data)
 
     @classmethod
     def save_pet(cls, pet_data):
@@ -273,6 +360,7 @@ class Pet(models.Model):
             breed=pet_data.get("breed"),
             birthday=pet_data.get("birthday"),
             weight=pet_data.get("weight"),
+            owner_id=pet_data.get("owner") or None,
         )
 
         return True, None
@@ -290,6 +378,8 @@ class Pet(models.Model):
         self.name = pet_data.get("name", "") or self.name
         self.breed = pet_data.get("breed", "") or self.breed
         self.birthday = pet_data.get("birthday", "") or self.birthday
+        self.weight = pet_data.get("weight", "") or self.weight
+        self.owner_id = pet_data.get("owner", "") or self.owner_id
 
         self.save()
         return True, None
@@ -303,11 +393,33 @@ class Pet(models.Model):
         """
         return self.name
 
+class PetWeight(models.Model):
+    """
+    Pesaje de una mascota. Pet.weight es el peso del ultimo pesaje.
+
+    Los pesajes se agregan al crear una mascota o cambiar su peso (ver
+    app/signals.py) y desde la API (ver app/weights.py); no se modifican.
+    """
+    # El indice (pet, measured_at) ya cubre las busquedas por mascota.
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="weighings", db_index=False)
+    measured_at = models.DateTimeField(default=timezone.now)
+    weight = models.DecimalField(max_digits=8, decimal_places=3)
+
+    class Meta:
+        indexes = [models.Index(fields=["pet", "measured_at"], name="petweight_pet_measured_idx")]
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.pet_id}: {self.weight} kg"
+
+
 class Medicine(models.Model):
     """
     Definicion de clase medicamento y sus metodos
     """
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, db_collation="NOCASE", db_index=True)
     descripcion = models.CharField(max_length=100, blank=True)
     dosis = models.IntegerField()
 
@@ -369,12 +481,32 @@ class Medicine(models.Model):
     
         return True, None
 
+class DosingRule(models.Model):
+    """
+    Regla de dosificacion de un medicamento segun el peso de la mascota.
+
+    La dosis es mg_per_kg por el peso, redondeada al multiplo de step_mg mas
+    cercano y acotada entre min_mg y max_mg si se indican. Los calculos estan en
+    app/dosing.py.
+    """
+    medicine = models.OneToOneField(Medicine, on_delete=models.CASCADE, related_name="dosing_rule")
+    mg_per_kg = models.DecimalField(max_digits=10, decimal_places=3)
+    min_mg = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True)
+    max_mg = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True)
+    step_mg = models.DecimalField(max_digits=10, decimal_places=3, default=Decimal("0.1"))
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.medicine_id}: {self.mg_per_kg} mg/kg"
+
 class Provider(models.Model):
     """
     Definicion de clase proveedor y sus metodos
     """
-    name = models.CharField(max_length=100)
-    email = models.EmailField()
+    name = models.CharField(max_length=100, db_collation="NOCASE", db_index=True)
+    email = models.EmailField(db_collation="NOCASE", db_index=True)
     address=models.CharField(max_length=100, blank=True)
 
     def __str__(self):
@@ -430,9 +562,18 @@ class Product(models.Model):
     """
     Definicion de clase producto y sus metodos
     """
-    name = models.CharField(max_length=100)
-    type = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, db_collation="NOCASE", db_index=True)
+    type = models.CharField(max_length=100, db_collation="NOCASE")
     price = models.FloatField()
+    # Existencias actuales: la suma de los movimientos de StockMovement, que se
+    # mantiene al registrar cada movimiento (ver app/inventory.py).
+    stock = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["type", "name"], name="product_type_name_idx")]
+        constraints = [
+            models.CheckConstraint(check=models.Q(stock__gte=0), name="product_stock_non_negative"),
+        ]
 
     def __str__(self):
         """
@@ -487,10 +628,75 @@ class Product(models.Model):
         self.type = product_data.get("type", "") or self.type
         self.price = product_data.get("price", "") or self.price
 
-        self.save()
+        # No se guarda el stock leido: un movimiento simultaneo lo pudo cambiar.
+        self.save(update_fields=["name", "type", "price"])
         
         return True, None
 
+class StockMovement(models.Model):
+    """
+    Movimiento de stock de un producto: compra a un proveedor, venta o ajuste.
+
+    Los movimientos no se modifican ni se eliminan; la cantidad es positiva si
+    ingresa mercaderia y negativa si sale.
+    """
+    class KIND_CHOICES(models.TextChoices):
+        PURCHASE = "purchase", _("Compra")
+        SALE = "sale", _("Venta")
+        ADJUSTMENT = "adjustment", _("Ajuste")
+
+    # El indice (product, quantity) ya cubre las busquedas por producto.
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="movements", db_index=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    quantity = models.IntegerField()
+    provider = models.ForeignKey(
+        Provider, null=True, blank=True, on_delete=models.SET_NULL, related_name="stock_movements",
+    )
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(check=~models.Q(quantity=0), name="stock_movement_quantity_not_zero"),
+        ]
+        indexes = [
+            # Cubre la suma del libro por producto (reconcile_stock) sin leer las filas.
+            models.Index(fields=["product", "quantity"], name="stock_movement_ledger_idx"),
+        ]
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.get_kind_display()} de {self.quantity} {self.product}"
+
+
+class ProviderOffer(models.Model):
+    """
+    Precio al que un proveedor vende un producto a partir de una fecha.
+
+    Una oferta reemplaza a las anteriores del mismo proveedor y producto desde
+    su valid_from; la comparacion de ofertas vigentes esta en app/purchasing.py.
+    """
+    # El indice (product, provider, valid_from) cubre las busquedas por producto.
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="offers", db_index=False)
+    provider = models.ForeignKey(Provider, on_delete=models.CASCADE, related_name="offers")
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    lead_time_days = models.PositiveIntegerField(default=0)
+    valid_from = models.DateField(default=date.today)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "provider", "valid_from"], name="offer_product_provider_idx"),
+        ]
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.provider_id} vende {self.product_id} a {self.unit_price}"
+
+
 class Vet(models.Model):
     """
     Definicion de clase veterinario y sus metodos
@@ -502,11 +708,14 @@ class Vet(models.Model):
         NUTRICION="Nutricion", _("Nutricion")
         CLINICA="Clinica", _("Clinica")
 
-    name = models.CharField(max_length=100)
-    email = models.EmailField()
-    phone = models.CharField(max_length=15)
+    name = models.CharField(max_length=100, db_collation="NOCASE", db_index=True)
+    email = models.EmailField(db_collation="NOCASE", db_index=True)
+    phone = models.CharField(max_length=15, db_collation="NOCASE", db_index=True)
     speciality = models.CharField(max_length=50, choices=SPECIALITY_CHOICES, default=SPECIALITY_CHOICES.CLINICA)
 
+    class Meta:
+        indexes = [models.Index(fields=["speciality", "name"], name="vet_speciality_name_idx")]
+
     def __str__(self):
         """
         Devuelve una representacion en cadena de objeto
@@ -545,4 +754,163 @@ class Vet(models.Model):
         self.speciality = data.get('speciality')
         self.save()
         return True, {}
-       
+
+
+VET_VALIDATOR = Validator(
+    Field("name", "Por favor ingrese un nombre"),
+    Field("email", "Por favor ingrese un email",
+          check(contains("@"), "Por favor ingrese un email valido")),
+    Field("phone", "Por favor ingrese un teléfono"),
+    Field("speciality", "Por favor seleccione una especialidad válida",
+          check(one_of(Vet.SPECIALITY_CHOICES), "Especialidad no válida")),
+)
+
+
+class Appointment(models.Model):
+    """
+    Turno de una mascota con un veterinario, entre start y end.
+
+    Los indices (vet, start) y (vet, end) permiten buscar los turnos de un
+    veterinario que se superponen con un intervalo recorriendo solo un rango
+    del indice (ver app/scheduling.py).
+    """
+    # El indice (vet, start) ya cubre las busquedas por veterinario.
+    vet = models.ForeignKey(Vet, on_delete=models.CASCADE, related_name="appointments", db_index=False)
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="appointments")
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    reason = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["vet", "start"], name="appointment_vet_start_idx"),
+            models.Index(fields=["vet", "end"], name="appointment_vet_end_idx"),
+            # Agenda del dia de todos los veterinarios.
+            models.Index(fields=["start"], name="appointment_start_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(check=models.Q(end__gt=models.F("start")), name="appointment_end_after_start"),
+        ]
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.pet} con {self.vet} ({self.start:%d-%m-%Y %H:%M})"
+
+
+class Invoice(models.Model):
+    """
+    Factura de un cliente.
+
+    El total y la cantidad de lineas se calculan una sola vez al crearla (ver
+    app/invoicing.py), por lo que listar facturas no necesita leer sus lineas.
+    El nombre del cliente se copia al facturar: si despues se elimina el cliente
+    la factura se conserva y DailySales sigue coincidiendo con las facturas.
+    """
+    # El indice (client, -id) ya cubre las busquedas por cliente.
+    client = models.ForeignKey(
+        Client, null=True, blank=True, on_delete=models.SET_NULL, related_name="invoices", db_index=False,
+    )
+    client_name = models.CharField(max_length=100)
+    date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    line_count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["client", "-id"], name="invoice_client_id_idx")]
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"Factura {self.pk:08d}"
+
+
+class InvoiceLine(models.Model):
+    """
+    Linea de una factura: un producto vendido o un medicamento dispensado.
+
+    La descripcion y el precio se copian al facturar, de modo que la factura no
+    cambia si despues se edita o elimina el producto.
+    """
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="lines")
+    product = models.ForeignKey(Product, null=True, blank=True, on_delete=models.SET_NULL, related_name="invoice_lines")
+    medicine = models.ForeignKey(Medicine, null=True, blank=True, on_delete=models.SET_NULL, related_name="invoice_lines")
+    description = models.CharField(max_length=200)
+    quantity = models.PositiveIntegerField()
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(check=models.Q(quantity__gt=0), name="invoice_line_quantity_positive"),
+        ]
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.quantity} x {self.description}"
+
+
+class DailySales(models.Model):
+    """
+    Resumen de ventas de un dia, que se incrementa al crear cada factura.
+    """
+    date = models.DateField(primary_key=True)
+    invoices = models.PositiveIntegerField(default=0)
+    lines = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.date}: {self.total}"
+
+
+class StatCounter(models.Model):
+    """
+    Contador de una estadistica del tablero de inicio, por ejemplo la cantidad
+    de clientes de una ciudad.
+
+    Se mantiene incrementalmente al crear, modificar y eliminar registros (ver
+    app/stats.py), por lo que la pagina de inicio lee esta tabla en lugar de
+    agrupar las tablas grandes.
+    """
+    metric = models.CharField(max_length=50)
+    # Igual que los campos que agrupa (raza, tipo), sin distinguir mayusculas.
+    key = models.CharField(max_length=100, db_collation="NOCASE")
+    count = models.IntegerField(default=0)
+    total = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["metric", "key"], name="stat_counter_metric_key"),
+        ]
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.metric}[{self.key}] = {self.count}"
+
+
+class ModelVersion(models.Model):
+    """
+    Version de los datos de cada modelo, usada para invalidar caches.
+
+    Cada escritura sobre un modelo le asigna una version nueva en la misma
+    transaccion; si la transaccion se deshace, la version vuelve a la anterior.
+    """
+    model = models.CharField(max_length=100, primary_key=True)
+    version = models.CharField(max_length=32)
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        """
+        Devuelve una representacion en cadena del objeto.
+        """
+        return f"{self.model}@{self.version}"
@@ -0,0 +1,98 @@
+"""
+Enlaces de la barra de navegacion.
+
+La barra depende solo de cual enlace esta activo, asi que se precalcula una
+variante por enlace; cada peticion resuelve la suya buscando los prefijos de la
+ruta en un diccionario y reutiliza el HTML ya renderizado. Se usa desde las
+plantillas con `{% load navigation %}{% navbar %}` (app/templatetags), por lo
+que no cuesta nada en las respuestas que no renderizan la barra.
+"""
+from functools import cache
+
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+# (etiqueta, nombre de la URL, icono)
+LINKS = (
+    ("Home", "home", "bi bi-house-door"),
+    ("Clientes", "clients_repo", "bi bi-people"),
+    ("Mascotas", "pets_repo", "bi bi-paw"),
+    ("Medicamentos", "medicines_repo", "bi bi-paw"),
+    ("Proveedores", "provider_repo", "bi bi-person-fill"),
+    ("Productos", "products_repo", "bi bi-shop"),
+    ("Veterinarios", "vet_repo", "bi bi-house-heart"),
+    ("Turnos", "appointments_repo", "bi bi-calendar-event"),
+    ("Ventas", "sales_summary", "bi bi-receipt"),
+)
+
+
+@cache
+def links():
+    """
+    Devuelve los enlaces de la barra, resolviendo sus URLs la primera vez.
+    """
+    return tuple(
+        {"label": label, "href": reverse(name), "icon": icon} for label, name, icon in LINKS
+    )
+
+
+@cache
+def _variants():
+    """
+    Precalcula los enlaces con cada uno de ellos activo.
+
+    Returns:
+        Un diccionario {href activo: enlaces}; la clave None tiene ningun enlace activo.
+    """
+    hrefs = [link["href"] for link in links()] + [None]
+    return {
+        active: tuple({**link, "active": link["href"] == active} for link in links())
+        for active in hrefs
+    }
+
+
+def active_href(path):
+    """
+    Devuelve el href del enlace activo para `path`, o None si no hay ninguno.
+
+    El inicio ("/") solo esta activo en la raiz; los demas enlaces, en cualquier
+    ruta que empiece con su href. Se busca cada prefijo de la ruta terminado en
+    "/", del mas largo al mas corto, por lo que el costo depende de la
+    profundidad de la ruta y no de la cantidad de enlaces.
+    """
+    variants = _variants()
+    if path == "/":
+        return "/" if "/" in variants else None
+    end = len(path)
+    while True:
+        end = path.rfind("/", 0, end) + 1
+        if end <= 1:
+            return None
+        if path[:end] in variants:
+            return path[:end]
+        end -= 1
+
+
+def active_links(path):
+    """
+    Devuelve los enlaces de la barra con el correspondiente a `path` marcado como activo.
+    """
+    return _variants()[active_href(path)]
+
+
+# HTML de la barra ya renderizada, por href activo.
+_rendered = {}
+
+
+def navbar_html(path):
+    """
+    Devuelve el HTML de la barra de navegacion para `path`.
+
+    Hay una sola barra por enlace activo (y una sin enlace activo), por lo que
+    cada una se renderiza la primera vez que se pide y despues se reutiliza.
+    """
+    active = active_href(path)
+    html = _rendered.get(active)
+    if html is None:
+        html = _rendered[active] = render_to_string("partials/navbar.html", {"links": _variants()[active]})
+    return html
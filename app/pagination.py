@@ -0,0 +1,225 @@
+from django.conf import settings
+
+
+def get_page_size(params, default=None):
+    """
+    Obtiene el tamaño de pagina pedido en `?page_size=`, acotado al maximo configurado.
+    """
+    default = default or settings.REPOSITORY_PAGE_SIZE
+    try:
+        size = int(params.get("page_size", default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, settings.REPOSITORY_MAX_PAGE_SIZE))
+
+
+def _parse_cursor(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Page:
+    """
+    Pagina de resultados con enlaces a la pagina siguiente y anterior.
+
+    Las subclases definen `next_query` y `previous_query`, las query strings de
+    esos enlaces, que conservan el resto de los parametros de la peticion.
+    """
+
+    cursor_params = ()
+
+    def __init__(self, object_list, params, has_next, has_previous):
+        """
+        Inicializa la pagina con los objetos ya obtenidos de la base de datos.
+        """
+        self.object_list = object_list
+        self.params = params
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        """
+        Itera sobre los objetos de la pagina.
+        """
+        return iter(self.object_list)
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de objetos de la pagina.
+        """
+        return len(self.object_list)
+
+    def _query(self, **cursor):
+        params = self.params.copy()
+        for name in self.cursor_params:
+            params.pop(name, None)
+        for name, value in cursor.items():
+            params[name] = value
+        return params.urlencode()
+
+
+class KeysetPage(Page):
+    """
+    Pagina de resultados obtenida por keyset (cursor) sobre una clave unica.
+
+    Los objetos pueden ser instancias o diccionarios (querysets con `.values()`).
+    """
+
+    cursor_params = ("after", "before")
+
+    def __init__(self, object_list, params, key, has_next, has_previous):
+        """
+        Inicializa la pagina indicando la clave usada como cursor.
+        """
+        super().__init__(object_list, params, has_next, has_previous)
+        self.key = key
+
+    def _key_of(self, row):
+        return row[self.key] if isinstance(row, dict) else getattr(row, self.key)
+
+    @property
+    def next_query(self):
+        """
+        Query string de la pagina siguiente, o None si es la ultima.
+        """
+        if not self.has_next or not self.object_list:
+            return None
+        return self._query(after=self._key_of(self.object_list[-1]))
+
+    @property
+    def previous_query(self):
+        """
+        Query string de la pagina anterior, o None si es la primera.
+        """
+        if not self.has_previous or not self.object_list:
+            return None
+        return self._query(before=self._key_of(self.object_list[0]))
+
+
+class RankedPage(Page):
+    """
+    Pagina de resultados ordenados por relevancia, paginados con `?offset=`.
+    """
+
+    cursor_params = ("offset",)
+
+    def __init__(self, object_list, params, offset, size, has_next):
+        """
+        Inicializa la pagina indicando su posicion dentro del ranking.
+        """
+        super().__init__(object_list, params, has_next, has_previous=offset > 0)
+        self.offset = offset
+        self.size = size
+
+    @property
+    def next_query(self):
+        """
+        Query string de la pagina siguiente, o None si es la ultima.
+        """
+        if not self.has_next:
+            return None
+        return self._query(offset=self.offset + self.size)
+
+    @property
+    def previous_query(self):
+        """
+        Query string de la pagina anterior, o None si es la primera.
+        """
+        if not self.has_previous:
+            return None
+        return self._query(offset=max(self.offset - self.size, 0))
+
+
+def _keyset_plan(queryset, params, key, page_size):
+    size = page_size or get_page_size(params)
+    after = _parse_cursor(params.get("after"))
+    before = _parse_cursor(params.get("before"))
+
+    if before is not None:
+        query = queryset.filter(**{f"{key}__lt": before}).order_by(f"-{key}")[: size + 1]
+
+        def finish(rows):
+            has_previous = len(rows) > size
+            rows = rows[:size]
+            rows.reverse()
+            return KeysetPage(rows, params, key, has_next=True, has_previous=has_previous)
+
+        return query, finish
+
+    if after is not None:
+        queryset = queryset.filter(**{f"{key}__gt": after})
+    query = queryset.order_by(key)[: size + 1]
+
+    def finish(rows):
+        return KeysetPage(
+            rows[:size], params, key, has_next=len(rows) > size, has_previous=after is not None,
+        )
+
+    return query, finish
+
+
+def keyset_paginate(queryset, params, key="id", page_size=None):
+    """
+    Pagina un queryset por keyset usando los parametros `?after=` y `?before=`.
+
+    Args:
+        queryset: el queryset a paginar.
+        params: el QueryDict de la peticion (request.GET).
+        key: una columna unica e indexada por la que se ordena (por defecto "id").
+        page_size: tamaño de pagina; si no se indica se toma de `?page_size=`.
+
+    Returns:
+        Una KeysetPage. Cada pagina es una consulta `WHERE key > cursor ORDER BY key
+        LIMIT n`, por lo que el costo no depende de la profundidad de la pagina.
+    """
+    query, finish = _keyset_plan(queryset, params, key, page_size)
+    return finish(list(query))
+
+
+async def akeyset_paginate(queryset, params, key="id", page_size=None):
+    """
+    Version asincronica de keyset_paginate, que usa el ORM asincronico.
+    """
+    query, finish = _keyset_plan(queryset, params, key, page_size)
+    return finish([row async for row in query])
+
+
+def _ranked_plan(params, page_size):
+    size = page_size or get_page_size(params)
+    offset = max(_parse_cursor(params.get("offset")) or 0, 0)
+
+    def finish(ids, objects):
+        rows = [objects[pk] for pk in ids[:size] if pk in objects]
+        return RankedPage(rows, params, offset, size, has_next=len(ids) > size)
+
+    return size, offset, finish
+
+
+def ranked_paginate(queryset, ranked_ids, params, page_size=None):
+    """
+    Pagina resultados ordenados por relevancia.
+
+    Args:
+        queryset: el queryset con el que se obtienen los objetos.
+        ranked_ids: funcion que recibe (limit, offset) y devuelve los ids ordenados
+            por relevancia, por ejemplo una busqueda de texto completo.
+        params: el QueryDict de la peticion (request.GET).
+        page_size: tamaño de pagina; si no se indica se toma de `?page_size=`.
+
+    Returns:
+        Una RankedPage con los objetos en el orden del ranking.
+    """
+    size, offset, finish = _ranked_plan(params, page_size)
+    ids = ranked_ids(size + 1, offset)
+    return finish(ids, queryset.in_bulk(ids[:size]))
+
+
+async def aranked_paginate(queryset, ranked_ids, params, page_size=None):
+    """
+    Version asincronica de ranked_paginate; ranked_ids debe ser una corrutina.
+    """
+    size, offset, finish = _ranked_plan(params, page_size)
+    ids = await ranked_ids(size + 1, offset)
+    return finish(ids, await queryset.ain_bulk(ids[:size]))
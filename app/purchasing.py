@@ -0,0 +1,105 @@
+"""
+Comparacion de las ofertas de los proveedores.
+
+La oferta vigente de un proveedor para un producto es la de valid_from mas
+reciente que ya empezo. La mejor oferta de cada producto es, entre las
+vigentes, la de menor precio unitario (y a igual precio, la de menor demora).
+best_offers resuelve todo en una sola consulta con dos funciones de ventana:
+ROW_NUMBER por (producto, proveedor) descarta las ofertas reemplazadas y
+ROW_NUMBER por producto ordena las vigentes por precio. Ambas recorren el
+indice (product, provider, valid_from) de ProviderOffer, asi que el costo no
+depende de hacer una consulta por producto.
+"""
+from django.db.models import Count, F, Max, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .imports import check_rows
+from .models import OFFER_VALIDATOR, Product, ProviderOffer
+
+
+def current_offers(on=None):
+    """
+    Devuelve las ofertas vigentes en la fecha `on` (por defecto, hoy): una por proveedor y producto.
+    """
+    return (
+        ProviderOffer.objects.filter(valid_from__lte=on or timezone.localdate())
+        .annotate(
+            recency=Window(
+                RowNumber(),
+                partition_by=[F("product_id"), F("provider_id")],
+                order_by=[F("valid_from").desc(), F("id").desc()],
+            ),
+        )
+        .filter(recency=1)
+    )
+
+
+def best_offers(on=None, products=None):
+    """
+    Devuelve la mejor oferta vigente de cada producto con una sola consulta.
+
+    Cada oferta trae su proveedor y las anotaciones `offers` (cantidad de
+    ofertas vigentes del producto) y `highest_price` (el mayor precio vigente).
+
+    Args:
+        on: la fecha de la comparacion; por defecto, hoy.
+        products: ids de productos a comparar; por defecto, todos.
+
+    Returns:
+        Un diccionario {id de producto: oferta}.
+    """
+    offers = ProviderOffer.objects.filter(pk__in=current_offers(on).values("pk"))
+    if products is not None:
+        offers = offers.filter(product_id__in=products)
+    by_product = [F("product_id")]
+    offers = (
+        offers.annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=by_product,
+                order_by=[F("unit_price").asc(), F("lead_time_days").asc(), F("id").asc()],
+            ),
+            offers=Window(Count("id"), partition_by=by_product),
+            highest_price=Window(Max("unit_price"), partition_by=by_product),
+        )
+        .filter(rank=1)
+        .select_related("provider")
+    )
+    return {offer.product_id: offer for offer in offers}
+
+
+def comparison(on=None):
+    """
+    Arma la comparacion de ofertas de todos los productos con dos consultas.
+
+    Returns:
+        Una lista de diccionarios con "product", "offer" (la mejor oferta
+        vigente, o None si el producto no tiene ofertas) y "saving" (cuanto
+        mas barata es que la oferta vigente mas cara), ordenada por nombre.
+    """
+    best = best_offers(on)
+    products = Product.objects.order_by("name", "id").only("id", "name", "type", "price")
+    rows = []
+    for product in products:
+        offer = best.get(product.pk)
+        saving = offer.highest_price - offer.unit_price if offer is not None else None
+        rows.append({"product": product, "offer": offer, "saving": saving})
+    return rows
+
+
+def add_offer(data):
+    """
+    Registra una oferta con los datos de un formulario.
+
+    Returns:
+        Una tupla (oferta, errores); la oferta es None si hubo errores.
+    """
+    fields = ("provider", "product", "unit_price", "lead_time_days", "valid_from")
+    checked, rejected = check_rows(ProviderOffer, OFFER_VALIDATOR, fields, [(1, data)])
+    if rejected:
+        return None, rejected[0][2]
+    offer = checked[0][2]
+    offer.save()
+    return offer, {}
+
@@ -0,0 +1,212 @@
+"""
+Agenda de turnos: deteccion de superposiciones y busqueda de horarios libres.
+
+Un turno dura como maximo APPOINTMENT_MAX_MINUTES, por lo que los turnos que se
+superponen con un intervalo [start, end) empiezan entre start - maximo y end.
+Esa cota convierte la busqueda en un rango acotado del indice (vet, start) en
+lugar de recorrer todo el historial o toda la agenda futura del veterinario.
+
+Los horarios libres se calculan en memoria: se leen los turnos de una ventana
+de dias, se unen los intervalos ocupados de cada veterinario y se recorren los
+horarios de atencion salteando los ocupados.
+"""
+import heapq
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import bump_version
+from .models import Appointment, Vet
+
+Slot = namedtuple("Slot", ["vet_id", "start", "end"])
+
+# Dias que se leen por consulta al buscar horarios libres: la primera ventana es
+# de un dia y cada una duplica la anterior hasta este maximo.
+SEARCH_WINDOW_DAYS = 32
+
+
+def _max_duration():
+    return timedelta(minutes=settings.APPOINTMENT_MAX_MINUTES)
+
+
+def _step():
+    return timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+
+
+def overlapping(vet_ids, start, end):
+    """
+    Devuelve los turnos de los veterinarios que se superponen con [start, end).
+    """
+    return Appointment.objects.filter(
+        vet_id__in=vet_ids,
+        start__gt=start - _max_duration(),
+        start__lt=end,
+        end__gt=start,
+    )
+
+
+def _working_hours(day):
+    """
+    Devuelve el intervalo de atencion de un dia, o None si no se atiende.
+    """
+    if day.weekday() not in settings.APPOINTMENT_WORKING_DAYS:
+        return None
+    zone = timezone.get_current_timezone()
+    opening = datetime.combine(day, time(settings.APPOINTMENT_OPENING_HOUR), tzinfo=zone)
+    closing = datetime.combine(day, time(settings.APPOINTMENT_CLOSING_HOUR), tzinfo=zone)
+    return opening, closing
+
+
+def validate_appointment(vet_id, start, end, exclude=None):
+    """
+    Valida un turno: duracion, horario de atencion y superposicion con otros turnos.
+
+    Returns:
+        Un diccionario con los errores, vacio si el turno es valido.
+    """
+    errors = {}
+    if end <= start:
+        errors["end"] = "El turno debe terminar despues de empezar"
+    elif end - start > _max_duration():
+        errors["end"] = f"El turno no puede durar mas de {settings.APPOINTMENT_MAX_MINUTES} minutos"
+    else:
+        local_start = timezone.localtime(start)
+        hours = _working_hours(local_start.date())
+        if hours is None or start < hours[0] or end > hours[1]:
+            errors["start"] = "El turno esta fuera del horario de atencion"
+
+    if not errors:
+        conflicts = overlapping([vet_id], start, end)
+        if exclude is not None:
+            conflicts = conflicts.exclude(pk=exclude)
+        if conflicts.exists():
+            errors["start"] = "El veterinario ya tiene un turno en ese horario"
+    return errors
+
+
+def book_appointment(vet_id, pet_id, start, end, reason=""):
+    """
+    Reserva un turno si no se superpone con otro del mismo veterinario.
+
+    La version del modelo se escribe antes de buscar superposiciones: SQLite
+    toma el lock de escritura en esa primera escritura, de modo que dos reservas
+    simultaneas se validan una despues de la otra.
+
+    Returns:
+        Una tupla (turno, errores); el turno es None si hubo errores.
+    """
+    with transaction.atomic():
+        bump_version(Appointment)
+        errors = validate_appointment(vet_id, start, end)
+        if errors:
+            return None, errors
+        appointment = Appointment.objects.create(
+            vet_id=vet_id, pet_id=pet_id, start=start, end=end, reason=reason,
+        )
+    return appointment, {}
+
+
+def merge_intervals(intervals):
+    """
+    Une intervalos (start, end) ordenados por start que se superponen o se tocan.
+    """
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _free_slots_of_vet(vet_id, busy, windows, after, duration):
+    """
+    Genera en orden los horarios libres de un veterinario.
+
+    Args:
+        busy: intervalos ocupados, unidos y ordenados.
+        windows: intervalos de atencion ordenados.
+        after: no se ofrecen horarios que empiecen antes.
+        duration: duracion del turno buscado.
+    """
+    step = _step()
+    index = 0
+    for opening, closing in windows:
+        cursor = opening
+        if after > cursor:
+            # Se alinea a la grilla de turnos del dia.
+            cursor += -((opening - after) // step) * step
+        while cursor + duration <= closing:
+            while index < len(busy) and busy[index][1] <= cursor:
+                index += 1
+            if index < len(busy) and busy[index][0] < cursor + duration:
+                # Ocupado: se salta al primer horario de la grilla al terminar.
+                cursor += -((cursor - busy[index][1]) // step) * step
+                continue
+            yield Slot(vet_id, cursor, cursor + duration)
+            cursor += step
+
+
+def free_slots(vet_ids, count=5, duration=None, after=None, max_days=365):
+    """
+    Busca los proximos horarios libres de uno o varios veterinarios.
+
+    Lee los turnos por ventanas de dias, con una consulta por ventana para todos
+    los veterinarios, hasta encontrar `count` horarios o llegar a `max_days`. La
+    primera ventana es de un dia y las siguientes duplican su tamaño (hasta
+    SEARCH_WINDOW_DAYS), de modo que una agenda con lugar lee pocos turnos y una
+    completa no hace una consulta por dia.
+
+    Args:
+        vet_ids: ids de los veterinarios.
+        count: cantidad de horarios buscados.
+        duration: duracion del turno (por defecto APPOINTMENT_SLOT_MINUTES).
+        after: desde cuando se busca (por defecto, ahora).
+        max_days: cantidad maxima de dias a recorrer.
+
+    Returns:
+        Una lista de Slot ordenada por horario y veterinario.
+    """
+    vet_ids = list(vet_ids)
+    duration = duration or _step()
+    after = after or timezone.now()
+    first_day = timezone.localtime(after).date()
+    slots = []
+
+    offset, size = 0, 1
+    while offset < max_days and len(slots) < count:
+        days = [first_day + timedelta(days=day) for day in range(offset, min(offset + size, max_days))]
+        offset, size = offset + size, min(size * 2, SEARCH_WINDOW_DAYS)
+        windows = [hours for hours in map(_working_hours, days) if hours is not None]
+        if not windows:
+            continue
+
+        busy = {vet_id: [] for vet_id in vet_ids}
+        rows = (
+            overlapping(vet_ids, windows[0][0], windows[-1][1])
+            .order_by("vet_id", "start")
+            .values_list("vet_id", "start", "end")
+        )
+        for vet_id, start, end in rows:
+            busy[vet_id].append((start, end))
+
+        per_vet = [
+            _free_slots_of_vet(vet_id, merge_intervals(busy[vet_id]), windows, after, duration)
+            for vet_id in vet_ids
+        ]
+        needed = count - len(slots)
+        slots.extend(islice(heapq.merge(*per_vet, key=lambda slot: (slot.start, slot.vet_id)), needed))
+    return slots
+
+
+def free_slots_for_speciality(speciality, count=5, duration=None, after=None, max_days=365):
+    """
+    Busca los proximos horarios libres entre los veterinarios de una especialidad.
+    """
+    vet_ids = Vet.objects.filter(speciality=speciality).values_list("pk", flat=True)
+    return free_slots(vet_ids, count=count, duration=duration, after=after, max_days=max_days)
@@ -0,0 +1,56 @@
+from django.db import models
+from django.db.models import Q
+
+from .models import Client, Medicine, Pet, Product, Provider, Vet
+
+SEARCH_FIELDS = {
+    Client: ("name", "email", "phone"),
+    Pet: ("name", "breed"),
+    Medicine: ("name",),
+    Provider: ("name", "email"),
+    Product: ("name", "type"),
+    Vet: ("name", "email", "phone", "speciality"),
+}
+
+
+def _field_condition(field, term):
+    if field.choices:
+        values = [
+            value
+            for value, label in field.flatchoices
+            if str(label).lower().startswith(term.lower())
+        ]
+        return Q(**{f"{field.name}__in": values}) if values else None
+    if isinstance(field, models.IntegerField):
+        return Q(**{field.name: int(term)}) if term.isdigit() else None
+    return Q(**{f"{field.name}__istartswith": term})
+
+
+def search(queryset, term):
+    """
+    Filtra un queryset por los campos de busqueda de su modelo.
+
+    Cada campo se compara por prefijo (`istartswith`) contra una columna indexada
+    con collation NOCASE, lo que permite a SQLite recorrer el indice en lugar de
+    la tabla. Los campos enteros se comparan por igualdad y los campos con
+    opciones por las opciones cuya etiqueta empieza con el termino.
+
+    Args:
+        queryset: el queryset a filtrar.
+        term: el texto buscado; si esta vacio se devuelve el queryset sin filtrar.
+
+    Returns:
+        El queryset filtrado.
+    """
+    term = (term or "").strip()
+    if not term:
+        return queryset
+
+    condition = Q()
+    for name in SEARCH_FIELDS[queryset.model]:
+        field_condition = _field_condition(queryset.model._meta.get_field(name), term)
+        if field_condition is not None:
+            condition |= field_condition
+    if not condition:
+        return queryset.none()
+    return queryset.filter(condition)
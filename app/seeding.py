@@ -0,0 +1,189 @@
+"""
+Generador de datos de prueba realistas para los seis modelos.
+
+Cada generador produce filas (diccionarios de strings) como las de un CSV, que
+se cargan con import_rows: pasan por los mismos validadores que los formularios
+y se insertan con bulk_create por lotes.
+"""
+import random
+import unicodedata
+from datetime import date, timedelta
+
+from .imports import IMPORT_CHUNK_SIZE, import_rows
+from .models import City, Client, Vet
+
+FIRST_NAMES = (
+    "Juan", "Maria", "Carlos", "Lucia", "Martin", "Sofia", "Diego", "Valentina",
+    "Pablo", "Camila", "Facundo", "Florencia", "Matias", "Agustina", "Mauro",
+    "Julieta", "Rodrigo", "Paula", "Sebastian", "Carolina", "Tomas", "Milagros",
+)
+LAST_NAMES = (
+    "Gonzalez", "Rodriguez", "Fernandez", "Lopez", "Martinez", "Garcia", "Perez",
+    "Romero", "Sosa", "Alvarez", "Torres", "Ruiz", "Ramirez", "Flores", "Benitez",
+    "Acosta", "Medina", "Herrera", "Suarez", "Aguirre", "Gimenez", "Molina",
+)
+PET_NAMES = (
+    "Firulais", "Luna", "Rocky", "Toby", "Mora", "Simba", "Lola", "Coco", "Milo",
+    "Nina", "Max", "Kira", "Bobby", "Olivia", "Tango", "Pipa", "Rayo", "Chispa",
+)
+BREEDS = (
+    "Caniche", "Labrador", "Golden Retriever", "Ovejero Aleman", "Beagle",
+    "Bulldog Frances", "Mestizo", "Siames", "Persa", "Maine Coon", "Border Collie",
+)
+MEDICINES = (
+    ("Amoxicilina", "Antibiotico de amplio espectro"),
+    ("Meloxicam", "Antiinflamatorio no esteroideo"),
+    ("Ivermectina", "Antiparasitario interno y externo"),
+    ("Prednisolona", "Corticoide"),
+    ("Metronidazol", "Antibiotico y antiprotozoario"),
+    ("Tramadol", "Analgesico"),
+    ("Omeprazol", "Protector gastrico"),
+    ("Furosemida", "Diuretico"),
+)
+PRODUCTS = (
+    ("Alimento balanceado", "Alimento"),
+    ("Collar antipulgas", "Accesorio"),
+    ("Correa", "Accesorio"),
+    ("Shampoo", "Higiene"),
+    ("Piedras sanitarias", "Higiene"),
+    ("Pelota", "Juguete"),
+    ("Hueso de goma", "Juguete"),
+    ("Cucha", "Accesorio"),
+)
+PROVIDER_KINDS = ("Distribuidora", "Laboratorio", "Drogueria", "Mayorista")
+STREETS = ("Calle 7", "Calle 12", "Diagonal 74", "Avenida 13", "Calle 50", "Avenida 60")
+
+
+def _ascii(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+
+
+def _person(rng, number):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    email = _ascii(f"{first}.{last}{number}").lower()
+    return f"{first} {last}", email
+
+
+def _phone(rng):
+    return f"54221{rng.randrange(10**7):07d}"
+
+
+def generate_clients(count, rng):
+    """
+    Genera clientes con telefono que empieza con 54, email @vetsoft.com y ciudad valida.
+    """
+    for number in range(count):
+        name, email = _person(rng, number)
+        yield {
+            "name": name,
+            "phone": _phone(rng),
+            "email": f"{email}@vetsoft.com",
+            "city": rng.choice(City.values),
+        }
+
+
+def generate_pets(count, rng, owners=()):
+    """
+    Genera mascotas nacidas en los ultimos 15 años.
+
+    Si se indican los ids de los clientes, nueve de cada diez mascotas tienen
+    como dueño uno de ellos.
+    """
+    today = date.today()
+    for _ in range(count):
+        owner = rng.choice(owners) if owners and rng.random() < 0.9 else ""
+        yield {
+            "name": rng.choice(PET_NAMES),
+            "breed": rng.choice(BREEDS),
+            "birthday": (today - timedelta(days=rng.randrange(30, 15 * 365))).isoformat(),
+            "weight": f"{rng.uniform(0.5, 60):.3f}",
+            "owner": str(owner),
+        }
+
+
+def generate_medicines(count, rng):
+    """
+    Genera medicamentos con una dosis entera entre 1 y 10.
+    """
+    for number in range(count):
+        name, description = rng.choice(MEDICINES)
+        yield {
+            "name": f"{name} {rng.choice((50, 100, 250, 500))}mg {number}",
+            "descripcion": description,
+            "dosis": str(rng.randint(1, 10)),
+        }
+
+
+def generate_providers(count, rng):
+    """
+    Genera proveedores con email y direccion.
+    """
+    for number in range(count):
+        last = rng.choice(LAST_NAMES)
+        yield {
+            "name": f"{rng.choice(PROVIDER_KINDS)} {last}",
+            "email": f"ventas{number}@{_ascii(last).lower()}.com.ar",
+            "address": f"{rng.choice(STREETS)} {rng.randint(1, 2000)}",
+        }
+
+
+def generate_products(count, rng):
+    """
+    Genera productos con precio mayor que cero.
+    """
+    for number in range(count):
+        name, kind = rng.choice(PRODUCTS)
+        yield {
+            "name": f"{name} {number}",
+            "type": kind,
+            "price": f"{rng.uniform(500, 50000):.2f}",
+        }
+
+
+def generate_vets(count, rng):
+    """
+    Genera veterinarios con una especialidad de Vet.SPECIALITY_CHOICES.
+    """
+    for number in range(count):
+        name, email = _person(rng, number)
+        yield {
+            "name": name,
+            "email": f"{email}@vetsoft.com",
+            "phone": _phone(rng),
+            "speciality": rng.choice(Vet.SPECIALITY_CHOICES.values),
+        }
+
+
+GENERATORS = {
+    "client": generate_clients,
+    "pet": generate_pets,
+    "medicine": generate_medicines,
+    "provider": generate_providers,
+    "product": generate_products,
+    "vet": generate_vets,
+}
+
+
+def seed(counts, seed=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Genera e inserta registros de prueba.
+
+    Args:
+        counts: diccionario {modelo: cantidad}, con las claves de GENERATORS.
+        seed: semilla del generador aleatorio, para obtener siempre los mismos datos.
+        chunk_size: cantidad de filas por bulk_create.
+
+    Returns:
+        Un diccionario {modelo: ImportResult}.
+    """
+    rng = random.Random(seed)
+    results = {}
+    for model_name, count in counts.items():
+        if not count:
+            continue
+        kwargs = {}
+        if model_name == "pet":
+            kwargs["owners"] = list(Client.objects.values_list("pk", flat=True))
+        rows = GENERATORS[model_name](count, rng, **kwargs)
+        results[model_name] = import_rows(model_name, rows, chunk_size=chunk_size)
+    return results
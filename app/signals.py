@@ -0,0 +1,143 @@
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import stats, weights
+from .caching import bump_version
+from .models import (
+    Appointment,
+    Client,
+    DosingRule,
+    Medicine,
+    Pet,
+    PetWeight,
+    Product,
+    Provider,
+    ProviderOffer,
+    Vet,
+)
+
+VERSIONED_MODELS = (Client, Pet, Medicine, DosingRule, Provider, ProviderOffer, Product, Vet, Appointment)
+
+# Escritura masiva en curso (ver deferred_writes), o None.
+_deferred = contextvars.ContextVar("deferred_writes", default=None)
+
+
+class DeferredWrites:
+    """
+    Trabajo de los receptores acumulado durante una escritura masiva.
+    """
+
+    def __init__(self):
+        """
+        Inicializa los modelos a versionar y las instancias eliminadas por modelo.
+        """
+        self.models = set()
+        self.deleted = defaultdict(list)
+
+
+@contextmanager
+def deferred_writes():
+    """
+    Agrupa el trabajo de los receptores durante una escritura masiva.
+
+    QuerySet.delete() envia post_delete por cada instancia eliminada (tambien
+    las eliminadas en cascada). Dentro del bloque, en lugar de una nueva version
+    y una actualizacion de estadisticas por instancia, se acumulan y al salir se
+    aplican con un solo bump_version y un descuento por modelo. Debe usarse
+    dentro de la transaccion de la escritura; si el bloque falla no se aplica nada.
+    """
+    pending = DeferredWrites()
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
+    for model, instances in pending.deleted.items():
+        stats.add_instances(model, instances, -1)
+    if pending.models:
+        bump_version(*pending.models)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_model_version(sender, signal, **kwargs):
+    """
+    Invalida las paginas en cache de un modelo cuando se guarda o elimina una instancia.
+
+    Al eliminar tambien se versionan los modelos relacionados: su clave foranea
+    puede quedar en NULL con un UPDATE que no envia señales (como en
+    bulk.delete_records).
+    """
+    if sender in VERSIONED_MODELS:
+        models = {sender}
+        if signal is post_delete:
+            models.update(relation.related_model for relation in sender._meta.related_objects)
+        pending = _deferred.get()
+        if pending is None:
+            bump_version(*models)
+        else:
+            pending.models.update(models)
+
+
+def remember_stats(sender, instance, **kwargs):
+    """
+    Recuerda el aporte de una instancia a las estadisticas al cargarla.
+    """
+    stats.remember(instance)
+
+
+def prepare_stats(sender, instance, **kwargs):
+    """
+    Antes de guardar una instancia, obtiene su aporte si no se conocia.
+    """
+    stats.prepare(instance)
+
+
+def update_stats(sender, instance, created, **kwargs):
+    """
+    Actualiza las estadisticas con la diferencia de la instancia guardada.
+    """
+    stats.saved(instance, created)
+
+
+def discount_stats(sender, instance, **kwargs):
+    """
+    Descuenta de las estadisticas una instancia eliminada.
+    """
+    pending = _deferred.get()
+    if pending is None:
+        stats.deleted(instance)
+    else:
+        pending.deleted[sender].append(instance)
+
+
+for model in stats.STATS:
+    post_init.connect(remember_stats, sender=model)
+    pre_save.connect(prepare_stats, sender=model)
+    post_save.connect(update_stats, sender=model)
+    post_delete.connect(discount_stats, sender=model)
+
+
+@receiver(post_init, sender=Pet)
+def remember_weight(sender, instance, **kwargs):
+    """
+    Recuerda el peso con el que se cargo una mascota.
+    """
+    weights.remember(instance)
+
+
+@receiver(post_save, sender=Pet)
+def record_weighing(sender, instance, created, **kwargs):
+    """
+    Agrega un pesaje al historial cuando se crea una mascota o cambia su peso.
+    """
+    if weights.saved(instance, created):
+        pending = _deferred.get()
+        if pending is None:
+            bump_version(PetWeight)
+        else:
+            pending.models.add(PetWeight)
@@ -0,0 +1,230 @@
+"""
+Estadisticas del tablero de inicio, mantenidas incrementalmente en StatCounter.
+
+Cada modelo con estadisticas aporta a un contador: su metrica, la clave del
+grupo (la ciudad del cliente, la raza de la mascota, ...) y, opcionalmente, un
+importe que se suma en `total`. Los receptores de app/signals.py recuerdan el
+aporte de cada instancia al cargarla y, al guardarla o eliminarla, aplican solo
+la diferencia; si el grupo no cambio no se escribe nada. Las altas por lotes
+(bulk_create en las importaciones) llaman a add_instances.
+
+Las señales se envian fuera de la transaccion del guardado, por lo que ante un
+error entre las dos escrituras los contadores pueden diferir de los datos:
+`manage.py rebuild_stats` los recalcula desde cero.
+"""
+from collections import Counter, namedtuple
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Sum, Value
+
+from .models import Client, Medicine, Pet, Product, StatCounter, Vet
+
+Stat = namedtuple("Stat", ["metric", "title", "field", "band", "amount"])
+
+# Claves que se muestran por metrica en la pagina de inicio.
+DASHBOARD_TOP = 10
+
+
+def dosis_band(dosis):
+    """
+    Devuelve el rango de dosis de un medicamento, por ejemplo "1-3".
+    """
+    dosis = int(dosis)
+    if dosis <= 3:
+        return "1-3"
+    if dosis <= 6:
+        return "4-6"
+    return "7-10" if dosis <= 10 else "Mas de 10"
+
+
+STATS = {
+    Client: Stat("clients_by_city", "Clientes por ciudad", "city", str, None),
+    Pet: Stat("pets_by_breed", "Mascotas por raza", "breed", str, None),
+    Vet: Stat("vets_by_speciality", "Veterinarios por especialidad", "speciality", str, None),
+    Product: Stat("products_by_type", "Productos por tipo", "type", str, "price"),
+    Medicine: Stat("medicines_by_dosis", "Medicamentos por dosis", "dosis", dosis_band, None),
+}
+
+
+def _loaded(instance, stat):
+    return all(
+        field in instance.__dict__ for field in (stat.field, stat.amount) if field is not None
+    )
+
+
+def contribution(instance):
+    """
+    Devuelve el aporte (metrica, clave, importe) de una instancia a las estadisticas.
+
+    Devuelve None si los campos de la estadistica no se cargaron (only/defer),
+    para no consultarlos uno por uno, o si todavia no tienen valor.
+    """
+    stat = STATS[type(instance)]
+    if not _loaded(instance, stat) or getattr(instance, stat.field) is None:
+        return None
+    amount = float(getattr(instance, stat.amount) or 0) if stat.amount else 0.0
+    return stat.metric, stat.band(getattr(instance, stat.field)), amount
+
+
+def _stored_contribution(instance):
+    """
+    Lee de la base el aporte con el que esta guardada una instancia.
+    """
+    stat = STATS[type(instance)]
+    fields = [field for field in (stat.field, stat.amount) if field is not None]
+    row = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    if row is None:
+        return None
+    return contribution(type(instance)(pk=instance.pk, **row))
+
+
+def apply(deltas):
+    """
+    Suma a los contadores las diferencias {(metrica, clave): (cantidad, importe)}.
+
+    Actualiza cada contador con expresiones F(); si todavia no existe, lo crea
+    en cero (ignorando el conflicto si otra escritura lo creo antes) y vuelve a
+    actualizarlo.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    # Dentro de la transaccion de quien llama (por ejemplo, una importacion) no
+    # hace falta un savepoint propio.
+    with transaction.atomic(savepoint=False):
+        for (metric, key), (count, total) in deltas.items():
+            counters = StatCounter.objects.filter(metric=metric, key=key)
+            changes = {"count": F("count") + count, "total": F("total") + total}
+            if not counters.update(**changes):
+                StatCounter.objects.bulk_create([StatCounter(metric=metric, key=key)], ignore_conflicts=True)
+                counters.update(**changes)
+
+
+def _add(deltas, contributions, sign):
+    for metric, key, amount in contributions:
+        count, total = deltas.get((metric, key), (0, 0.0))
+        deltas[metric, key] = (count + sign, total + sign * amount)
+
+
+def remember(instance):
+    """
+    Guarda en la instancia su aporte actual, para calcular la diferencia al guardarla.
+    """
+    instance._stats_contribution = contribution(instance)
+
+
+def prepare(instance):
+    """
+    Antes de modificar una instancia cuyo aporte no se conoce, lo lee de la base.
+    """
+    if not instance._state.adding and getattr(instance, "_stats_contribution", None) is None:
+        instance._stats_contribution = _stored_contribution(instance)
+
+
+def saved(instance, created):
+    """
+    Aplica la diferencia entre el aporte anterior y el nuevo de una instancia guardada.
+    """
+    new = contribution(instance) or _stored_contribution(instance)
+    old = None if created else getattr(instance, "_stats_contribution", None)
+    if new != old:
+        deltas = {}
+        _add(deltas, filter(None, [new]), 1)
+        _add(deltas, filter(None, [old]), -1)
+        apply(deltas)
+    instance._stats_contribution = new
+
+
+def deleted(instance):
+    """
+    Descuenta el aporte de una instancia eliminada.
+    """
+    old = getattr(instance, "_stats_contribution", None) or contribution(instance)
+    deltas = {}
+    _add(deltas, filter(None, [old]), -1)
+    apply(deltas)
+
+
+def add_instances(model, instances, sign=1):
+    """
+    Suma (o con sign=-1, descuenta) el aporte de varias instancias, agrupado por clave.
+
+    La usan las escrituras por lotes, que no envian señales. No hace nada si
+    el modelo no tiene estadisticas.
+    """
+    if model not in STATS:
+        return
+    deltas = {}
+    _add(deltas, filter(None, map(contribution, instances)), sign)
+    apply(deltas)
+
+
+def _grouped(queryset, counts, totals):
+    """
+    Suma a `counts` y `totals` el aporte de las filas de un queryset, con un GROUP BY.
+    """
+    stat = STATS[queryset.model]
+    amount = Sum(stat.amount) if stat.amount else Value(0.0, output_field=FloatField())
+    rows = queryset.order_by().values(stat.field).annotate(count=Count("pk"), total=amount)
+    for row in rows:
+        if row[stat.field] is None:
+            continue
+        key = (stat.metric, stat.band(row[stat.field]))
+        counts[key] += row["count"]
+        totals[key] += row["total"] or 0.0
+
+
+def add_queryset(queryset, sign=1):
+    """
+    Suma (o con sign=-1, descuenta) el aporte de las filas de un queryset.
+
+    La usan las modificaciones con QuerySet.update(), que no envian señales:
+    se descuentan las filas antes del UPDATE y se vuelven a sumar despues, con
+    una consulta agrupada cada vez sin importar cuantas filas cambien. No hace
+    nada si el modelo no tiene estadisticas.
+    """
+    if queryset.model not in STATS:
+        return
+    counts, totals = Counter(), Counter()
+    _grouped(queryset, counts, totals)
+    apply({key: (sign * count, sign * totals[key]) for key, count in counts.items()})
+
+
+def rebuild():
+    """
+    Recalcula todos los contadores con un GROUP BY por modelo.
+
+    Returns:
+        La cantidad de contadores guardados.
+    """
+    totals = Counter()
+    counts = Counter()
+    with transaction.atomic():
+        # El DELETE toma el lock de escritura: nadie modifica los datos mientras se agrupan.
+        StatCounter.objects.all().delete()
+        for model in STATS:
+            _grouped(model.objects.all(), counts, totals)
+        StatCounter.objects.bulk_create(
+            StatCounter(metric=metric, key=key, count=count, total=totals[metric, key])
+            for (metric, key), count in counts.items()
+        )
+    return len(counts)
+
+
+def dashboard(counters):
+    """
+    Agrupa los contadores por metrica para la pagina de inicio.
+
+    Args:
+        counters: filas StatCounter con cantidad mayor que cero, ordenadas por
+            cantidad descendente.
+
+    Returns:
+        Una lista de (Stat, filas), con a lo sumo DASHBOARD_TOP filas por metrica.
+    """
+    by_metric = {stat.metric: [] for stat in STATS.values()}
+    for counter in counters:
+        rows = by_metric.get(counter.metric)
+        if rows is not None and len(rows) < DASHBOARD_TOP:
+            rows.append(counter)
+    return [(stat, by_metric[stat.metric]) for stat in STATS.values()]
@@ -0,0 +1,14 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..navigation import navbar_html
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def navbar(context):
+    """
+    Renderiza la barra de navegacion con el enlace de la pagina actual activo.
+    """
+    return mark_safe(navbar_html(context["request"].path))  # noqa: S308
@@ -0,0 +1,42 @@
+"""
+Precarga de plantillas en el loader con cache.
+
+El loader cached de Django compila cada plantilla la primera vez que se usa y
+la guarda por proceso. Sin precarga, esa compilacion (lectura del archivo,
+parseo y carga de las plantillas que extiende o incluye) la paga la primera
+peticion de cada pagina en cada worker.
+"""
+from pathlib import Path
+
+from django.apps import apps
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+
+def template_names(engine):
+    """
+    Devuelve los nombres de las plantillas HTML del proyecto: las de DIRS y las de esta app.
+    """
+    directories = [*engine.dirs, Path(apps.get_app_config("app").path) / "templates"]
+    names = set()
+    for directory in map(Path, directories):
+        names.update(path.relative_to(directory).as_posix() for path in directory.rglob("*.html"))
+    return sorted(names)
+
+
+def warm_up_templates():
+    """
+    Compila las plantillas del proyecto en cada motor de plantillas de Django,
+    para que queden en la cache del loader.
+
+    Returns:
+        La cantidad de plantillas compiladas.
+    """
+    compiled = 0
+    for backend in engines.all():
+        if isinstance(backend, DjangoTemplates):
+            names = template_names(backend.engine)
+            for name in names:
+                backend.get_template(name)
+            compiled += len(names)
+    return compiled
@@ -0,0 +1,153 @@
+"""
+Runner de las pruebas: corre en paralelo e informa las pruebas mas lentas.
+
+Lo usa vetsoft/settings_test.py. Es el DiscoverRunner de Django con dos cambios:
+
+- Sin `--parallel`, usa un proceso por nucleo (como `--parallel auto`). Con
+  `--parallel 1` corre en un solo proceso.
+- Mide cuanto tarda cada prueba (setUp y tearDown incluidos) y al terminar
+  imprime las `--slowest N` mas lentas. En paralelo cada proceso mide sus
+  pruebas y envia el tiempo junto con el resto de los eventos del resultado.
+"""
+import time
+import unittest
+from functools import partial
+
+from django.conf import settings
+from django.test.runner import (
+    DiscoverRunner,
+    ParallelTestSuite,
+    RemoteTestResult,
+    RemoteTestRunner,
+)
+
+
+class TimedTestResult(unittest.TextTestResult):
+    """
+    Resultado de unittest que guarda la duracion de cada prueba en `timings`.
+    """
+
+    def __init__(self, *args, measure=True, **kwargs):
+        """
+        Inicializa el resultado; con `measure` falso solo guarda los tiempos que recibe.
+        """
+        super().__init__(*args, **kwargs)
+        self.measure = measure
+        self.timings = []
+        self._started = None
+
+    def startTest(self, test):
+        """
+        Registra el inicio de la prueba.
+        """
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        """
+        Registra el fin de la prueba y su duracion.
+        """
+        super().stopTest(test)
+        if self.measure:
+            self.addTiming(test, time.perf_counter() - self._started)
+
+    def addTiming(self, test, elapsed):
+        """
+        Guarda la duracion en segundos de una prueba.
+        """
+        self.timings.append((elapsed, test.id()))
+
+
+class TimedRemoteTestResult(RemoteTestResult):
+    """
+    Resultado de un proceso de pruebas que agrega la duracion de cada prueba a sus eventos.
+    """
+
+    def startTest(self, test):
+        """
+        Registra el inicio de la prueba.
+        """
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        """
+        Envia la duracion de la prueba como un evento `addTiming`.
+        """
+        self.events.append(("addTiming", self.test_index, time.perf_counter() - self._started))
+        super().stopTest(test)
+
+
+class TimedRemoteTestRunner(RemoteTestRunner):
+    """
+    Runner de cada proceso de pruebas que mide la duracion de las pruebas.
+    """
+
+    resultclass = TimedRemoteTestResult
+
+
+class TimedParallelTestSuite(ParallelTestSuite):
+    """
+    Suite paralela cuyos procesos miden la duracion de las pruebas.
+    """
+
+    runner_class = TimedRemoteTestRunner
+
+
+def slowest(timings, count):
+    """
+    Devuelve las `count` pruebas mas lentas como lineas "segundos id", de la mas lenta a la mas rapida.
+    """
+    return [f"{elapsed:8.3f}s {test_id}" for elapsed, test_id in sorted(timings, reverse=True)[:count]]
+
+
+class TimedTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner en paralelo por defecto que informa las pruebas mas lentas.
+    """
+
+    parallel_test_suite = TimedParallelTestSuite
+
+    def __init__(self, *args, slowest=None, **kwargs):
+        """
+        Inicializa el runner con la cantidad de pruebas lentas a informar.
+        """
+        super().__init__(*args, **kwargs)
+        self.slowest = getattr(settings, "TEST_SLOWEST", 0) if slowest is None else slowest
+        self._parallel = False
+
+    @classmethod
+    def add_arguments(cls, parser):
+        """
+        Agrega la opcion --slowest y corre en paralelo si no se indica --parallel.
+        """
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--slowest",
+            type=int,
+            metavar="N",
+            help="Informa las N pruebas mas lentas (0 para ninguna).",
+        )
+        parser.set_defaults(parallel="auto")
+
+    def get_resultclass(self):
+        """
+        Devuelve el resultado que mide las pruebas, salvo con --debug-sql o --pdb.
+        """
+        resultclass = super().get_resultclass()
+        if resultclass is not None:
+            return resultclass
+        # En paralelo los tiempos llegan de los procesos; en este solo se reproducen los eventos.
+        return partial(TimedTestResult, measure=not self._parallel)
+
+    def run_suite(self, suite, **kwargs):
+        """
+        Corre las pruebas e informa las mas lentas.
+        """
+        self._parallel = isinstance(suite, ParallelTestSuite)
+        result = super().run_suite(suite, **kwargs)
+        timings = getattr(result, "timings", None)
+        if self.slowest and timings:
+            self.log(f"\nLas {min(self.slowest, len(timings))} pruebas mas lentas:")
+            self.log("\n".join(slowest(timings, self.slowest)))
+        return result
@@ -1,17 +1,34 @@
-from datetime import date
-
+import gzip
+import json
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.shortcuts import reverse
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from app.models import (
+    Appointment,
     Client,
+    DosingRule,
+    Invoice,
     Medicine,
     Pet,
+    PetWeight,
     Product,
     Provider,
+    ProviderOffer,
+    StatCounter,
+    StockMovement,
     Vet,
     City
 )
+from app import stats
+from app.imports import import_rows
 
 
 class HomePageTest(TestCase):
@@ -23,6 +40,33 @@ class HomePageTest(TestCase):
         response = self.client.get(reverse("home"))
         self.assertTemplateUsed(response, "home.html")
 
+    def test_shows_precomputed_stats(self):
+        """
+        Verifica que la pagina de inicio muestre los contadores de StatCounter.
+        """
+        Client.objects.create(name="Juan Sebastian Veron", phone="54221555232", email="brujita75@vetsoft.com", city="Berisso")
+        Product.objects.create(name="Collar", type="Accesorio", price=1500)
+        Product.objects.create(name="Correa", type="Accesorio", price=900.5)
+
+        response = self.client.get(reverse("home"))
+
+        sections = {stat.metric: counters for stat, counters in response.context["stats"]}
+        self.assertEqual([(c.key, c.count) for c in sections["clients_by_city"]], [("Berisso", 1)])
+        self.assertEqual([(c.key, c.count, c.total) for c in sections["products_by_type"]], [("Accesorio", 2, 2400.5)])
+        self.assertContains(response, "$2400.50")
+        self.assertContains(response, "Medicamentos por dosis")
+
+    def test_navbar_marks_active_link(self):
+        """
+        Verifica que la barra de navegacion marque el enlace de la seccion actual.
+        """
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, 'aria-current="page"', count=1)
+        self.assertContains(response, 'aria-current="page"\n                   href="/"')
+
+        response = self.client.get(reverse("clients_repo"))
+        self.assertContains(response, 'aria-current="page"\n                   href="/clientes/"')
+
 
 class ClientsTest(TestCase):
 
@@ -779,4 +823,1492 @@ class VetSpecialityIntegrationTest(TestCase):
 
 
     
-       
\ No newline at end of file
+       
+
+class RepositoryPaginationTest(TestCase):
+    def setUp(self):
+        """
+        Crea 25 productos para recorrer el repositorio en paginas de 10.
+        """
+        for i in range(25):
+            Product.objects.create(name=f"Producto {i}", type="Alimento", price=10 + i)
+        self.ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+
+    def test_first_page_is_limited_to_page_size(self):
+        """
+        Verifica que la primera pagina tenga page_size elementos y enlace a la siguiente.
+        """
+        response = self.client.get(reverse("products_repo"), {"page_size": 10})
+        page = response.context["page"]
+
+        self.assertEqual([p.id for p in page], self.ids[:10])
+        self.assertFalse(page.has_previous)
+        self.assertEqual(page.next_query, f"page_size=10&after={self.ids[9]}")
+        self.assertContains(response, f'href="?page_size=10&amp;after={self.ids[9]}"')
+
+    def test_after_cursor_returns_next_page(self):
+        """
+        Verifica que `?after=` devuelva los elementos posteriores al cursor.
+        """
+        response = self.client.get(
+            reverse("products_repo"), {"page_size": 10, "after": self.ids[19]},
+        )
+        page = response.context["page"]
+
+        self.assertEqual([p.id for p in page], self.ids[20:])
+        self.assertFalse(page.has_next)
+        self.assertEqual(page.previous_query, f"page_size=10&before={self.ids[20]}")
+
+    def test_before_cursor_returns_previous_page(self):
+        """
+        Verifica que `?before=` devuelva la pagina anterior en orden ascendente.
+        """
+        response = self.client.get(
+            reverse("products_repo"), {"page_size": 10, "before": self.ids[20]},
+        )
+        page = response.context["page"]
+
+        self.assertEqual([p.id for p in page], self.ids[10:20])
+        self.assertTrue(page.has_next)
+        self.assertTrue(page.has_previous)
+
+    def test_page_size_is_capped(self):
+        """
+        Verifica que el tamaño de pagina no supere REPOSITORY_MAX_PAGE_SIZE.
+        """
+        with self.settings(REPOSITORY_MAX_PAGE_SIZE=5):
+            response = self.client.get(reverse("products_repo"), {"page_size": 1000})
+
+        self.assertEqual(len(response.context["page"]), 5)
+
+    def test_invalid_cursor_shows_first_page(self):
+        """
+        Verifica que un cursor invalido se ignore y se muestre la primera pagina.
+        """
+        response = self.client.get(reverse("products_repo"), {"after": "abc"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["page"]), 25)
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        """
+        Crea registros para exportar.
+        """
+        Client.objects.create(
+            name="Juan Sebastian Veron",
+            phone=54221555232,
+            email="brujita75@vetsoft.com",
+            city="La Plata",
+        )
+        Pet.objects.create(name="Firulais", breed="Caniche", birthday=date(2020, 1, 2), weight="4.500")
+
+    def test_export_clients_as_csv(self):
+        """
+        Verifica que la exportacion CSV se transmita en streaming con encabezado y filas.
+        """
+        response = self.client.get(reverse("clients_export"))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="clientes.csv"', response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,name,phone,email,city")
+        self.assertTrue(lines[1].endswith(",Juan Sebastian Veron,54221555232,brujita75@vetsoft.com,La Plata"))
+
+    def test_export_pets_as_ndjson(self):
+        """
+        Verifica que la exportacion NDJSON devuelva un objeto JSON por linea.
+        """
+        response = self.client.get(reverse("pets_export"), {"format": "ndjson"})
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row["name"], "Firulais")
+        self.assertEqual(row["birthday"], "2020-01-02")
+        self.assertEqual(row["weight"], "4.500")
+
+    def test_export_with_gzip(self):
+        """
+        Verifica que con `?gzip=1` el contenido se comprima en gzip.
+        """
+        response = self.client.get(reverse("clients_export"), {"gzip": "1"})
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="clientes.csv.gz"', response["Content-Disposition"])
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertIn("brujita75@vetsoft.com", content)
+
+    def test_export_with_unknown_format_returns_404(self):
+        """
+        Verifica que un formato no soportado responda 404.
+        """
+        response = self.client.get(reverse("vet_export"), {"format": "xml"})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_export_under_asgi_streams_asynchronously(self):
+        """
+        Verifica que bajo ASGI la exportacion use un iterador asincronico, que Django
+        transmite sin cargar todo el contenido en memoria.
+        """
+        response = await self.async_client.get(reverse("clients_export"))
+
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b"brujita75@vetsoft.com", content)
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        """
+        Crea un cliente para consultar desde las vistas asincronicas.
+        """
+        self.client_record = Client.objects.create(
+            name="Juan Sebastian Veron",
+            phone=54221555232,
+            email="brujita75@vetsoft.com",
+            city="La Plata",
+        )
+
+    async def test_repository_under_asgi(self):
+        """
+        Verifica que el repositorio de clientes responda bajo ASGI con el ORM asincronico.
+        """
+        response = await self.async_client.get(reverse("clients_repo"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Juan Sebastian Veron")
+
+    async def test_edit_form_under_asgi(self):
+        """
+        Verifica que el GET del formulario de edicion responda bajo ASGI.
+        """
+        response = await self.async_client.get(
+            reverse("clients_edit", kwargs={"id": self.client_record.id}),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "brujita75@vetsoft.com")
+
+    async def test_edit_form_of_missing_record_returns_404(self):
+        """
+        Verifica que editar un registro inexistente responda 404 bajo ASGI.
+        """
+        response = await self.async_client.get(reverse("pets_edit", kwargs={"id": 999}))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_post_under_asgi_saves_record(self):
+        """
+        Verifica que el POST de un formulario asincronico guarde los datos.
+        """
+        response = await self.async_client.post(
+            reverse("provider_form"),
+            data={"name": "Pedro", "email": "pedro@vetsoft.com", "address": "Calle 7"},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(await Provider.objects.filter(name="Pedro").aexists())
+
+
+class ImportRecordsViewTest(TestCase):
+    def test_form_use_import_template(self):
+        """
+        Verifica que se use la plantilla de importacion con el modelo preseleccionado.
+        """
+        response = self.client.get(reverse("import_records"), {"model": "product"})
+        self.assertTemplateUsed(response, "imports/form.html")
+        self.assertEqual(response.context["model"], "product")
+
+    def test_can_import_products_from_upload(self):
+        """
+        Verifica que se importen los productos del archivo subido y se muestren los rechazados.
+        """
+        upload = SimpleUploadedFile(
+            "productos.csv",
+            "name,type,price\nAlimento balanceado,Alimento,1500\nCollar,Accesorio,0\n".encode(),
+            content_type="text/csv",
+        )
+        response = self.client.post(
+            reverse("import_records"), data={"model": "product", "file": upload},
+        )
+
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertContains(response, "1 registros importados, 1 rechazados")
+        self.assertContains(response, "Por favor ingrese un precio del producto mayor que cero")
+
+    def test_import_without_file_shows_error(self):
+        """
+        Verifica que se muestre un error si no se sube ningun archivo.
+        """
+        response = self.client.post(reverse("import_records"), data={"model": "client"})
+        self.assertContains(response, "Por favor seleccione un archivo")
+
+
+class RepositorySearchTest(TestCase):
+    def test_search_filters_repository(self):
+        """
+        Verifica que `?q=` filtre el repositorio de productos por nombre o tipo.
+        """
+        Product.objects.create(name="Collar", type="Accesorio", price=100)
+        Product.objects.create(name="Alimento balanceado", type="Alimento", price=1500)
+        Product.objects.create(name="Correa", type="Accesorio", price=200)
+
+        response = self.client.get(reverse("products_repo"), {"q": "acce"})
+
+        self.assertEqual([p.name for p in response.context["page"]], ["Collar", "Correa"])
+        self.assertContains(response, 'value="acce"')
+
+    def test_search_is_kept_in_pagination_links(self):
+        """
+        Verifica que los enlaces de paginacion conserven el termino buscado.
+        """
+        for i in range(3):
+            Pet.objects.create(name=f"Firulais {i}", breed="Caniche", birthday=date(2020, 1, 1), weight=4)
+
+        response = self.client.get(reverse("pets_repo"), {"q": "cani", "page_size": 2})
+
+        self.assertIn("q=cani", response.context["page"].next_query)
+
+
+class RepositoryFullTextSearchTest(TestCase):
+    def test_clients_search_is_ranked_and_paginated_by_offset(self):
+        """
+        Verifica que la busqueda de clientes use el indice de texto completo con paginacion por offset.
+        """
+        for i in range(3):
+            Client.objects.create(name=f"Juan Perez {i}", phone=54221555230 + i, email=f"juan{i}@vetsoft.com", city="La Plata")
+        Client.objects.create(name="Guido Carrillo", phone=54221555239, email="guido@vetsoft.com", city="Berisso")
+
+        response = self.client.get(reverse("clients_repo"), {"q": "perez", "page_size": 2})
+        page = response.context["page"]
+
+        self.assertEqual(len(page), 2)
+        self.assertEqual(page.next_query, "q=perez&page_size=2&offset=2")
+
+        response = self.client.get(reverse("clients_repo"), {"q": "perez", "page_size": 2, "offset": 2})
+        page = response.context["page"]
+
+        self.assertEqual(len(page), 1)
+        self.assertFalse(page.has_next)
+        self.assertEqual(page.previous_query, "q=perez&page_size=2&offset=0")
+
+
+class RepositoryCacheTest(TestCase):
+    def setUp(self):
+        """
+        Limpia la cache y sus contadores y crea un producto.
+        """
+        cache.clear()
+        caches["stats"].clear()
+        self.product = Product.objects.create(name="Collar", type="Accesorio", price=100)
+
+    def test_second_request_is_served_from_cache(self):
+        """
+        Verifica que la segunda peticion solo consulte las versiones de los modelos.
+        """
+        self.client.get(reverse("products_repo"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("products_repo"))
+
+        self.assertContains(response, "Collar")
+        stats = self.client.get(reverse("cache_stats")).json()
+        self.assertEqual(stats["product"], {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_writes_invalidate_cached_pages(self):
+        """
+        Verifica que crear, editar y eliminar desde las vistas invaliden la pagina en cache.
+        """
+        self.client.get(reverse("products_repo"))
+
+        self.client.post(reverse("products_form"), data={"name": "Correa", "type": "Accesorio", "price": 200})
+        self.assertContains(self.client.get(reverse("products_repo")), "Correa")
+
+        self.client.post(
+            reverse("products_form"),
+            data={"id": self.product.id, "name": "Collar antipulgas", "type": "Accesorio", "price": 150},
+        )
+        self.assertContains(self.client.get(reverse("products_repo")), "Collar antipulgas")
+
+        self.client.post(reverse("products_delete"), data={"product_id": self.product.id})
+        self.assertNotContains(self.client.get(reverse("products_repo")), "Collar antipulgas")
+
+    def test_import_invalidates_cached_pages(self):
+        """
+        Verifica que una importacion con bulk_create invalide la pagina en cache.
+        """
+        self.client.get(reverse("products_repo"))
+
+        import_rows("product", [{"name": "Correa", "type": "Accesorio", "price": "200"}])
+
+        self.assertContains(self.client.get(reverse("products_repo")), "Correa")
+
+    def test_pages_are_cached_per_url(self):
+        """
+        Verifica que cada combinacion de parametros tenga su propia entrada en cache.
+        """
+        Product.objects.create(name="Alimento", type="Alimento", price=1500)
+        self.client.get(reverse("products_repo"))
+
+        response = self.client.get(reverse("products_repo"), {"q": "alim"})
+
+        self.assertEqual([p.name for p in response.context["page"]], ["Alimento"])
+
+    def test_pages_and_counters_are_shared_between_processes(self):
+        """
+        Verifica que con la cache en archivos otro worker vea las paginas y los contadores.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            backends = {
+                alias: {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": f"{directory}/{alias}",
+                }
+                for alias in ("default", "stats")
+            }
+            with override_settings(CACHES=backends):
+                self.client.get(reverse("products_repo"))
+                self.client.get(reverse("products_repo"))
+
+                # Un backend nuevo hace las veces de otro proceso de gunicorn.
+                other_worker = caches.create_connection("stats")
+                self.assertEqual(other_worker.get("repository:stats:hits:product"), 1)
+                self.assertEqual(other_worker.get("repository:stats:misses:product"), 1)
+                pages = caches.create_connection("default")
+                self.assertEqual(len(pages._list_cache_files()), 1)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        """
+        Limpia la cache y crea un cliente.
+        """
+        cache.clear()
+        self.client_obj = Client.objects.create(
+            name="Juan Sebastian Veron", phone=54221555232, email="brujita75@vetsoft.com", city="La Plata",
+        )
+
+    def test_repository_sends_etag_and_last_modified(self):
+        """
+        Verifica que el repositorio envie ETag y Last-Modified.
+        """
+        response = self.client.get(reverse("clients_repo"))
+
+        self.assertTrue(response.has_header("ETag"))
+        self.assertTrue(response.has_header("Last-Modified"))
+
+    def test_current_etag_returns_304_without_running_the_view(self):
+        """
+        Verifica que con un ETag vigente se responda 304 consultando solo las versiones.
+        """
+        etag = self.client.get(reverse("clients_repo"))["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("clients_repo"), headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since_returns_304(self):
+        """
+        Verifica que If-Modified-Since con la fecha del ultimo cambio responda 304.
+        """
+        last_modified = self.client.get(reverse("clients_repo"))["Last-Modified"]
+
+        response = self.client.get(reverse("clients_repo"), headers={"if-modified-since": last_modified})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag(self):
+        """
+        Verifica que una escritura invalide el ETag anterior.
+        """
+        etag = self.client.get(reverse("clients_repo"))["ETag"]
+        self.client_obj.update_client(
+            {"name": "Guido Carrillo", "phone": "54221555232", "city": "La Plata", "email": "brujita75@vetsoft.com"},
+        )
+
+        response = self.client.get(reverse("clients_repo"), headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Guido Carrillo")
+
+    def test_edit_form_returns_304(self):
+        """
+        Verifica que el formulario de edicion tambien responda 304 con un ETag vigente.
+        """
+        url = reverse("clients_edit", kwargs={"id": self.client_obj.id})
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_depends_on_url(self):
+        """
+        Verifica que cada pagina tenga un ETag distinto.
+        """
+        first = self.client.get(reverse("clients_repo"))["ETag"]
+        second = self.client.get(reverse("clients_repo"), {"q": "juan"})["ETag"]
+
+        self.assertNotEqual(first, second)
+
+
+class ViewQueryCountTest(TestCase):
+    ROWS = 30
+
+    def setUp(self):
+        """
+        Crea varios registros de cada modelo y limpia la cache, de modo que cada
+        vista consulte la base.
+        """
+        cache.clear()
+        clients = Client.objects.bulk_create(
+            Client(name=f"Cliente {i}", phone=54221000000 + i, email=f"c{i}@vetsoft.com", city="La Plata")
+            for i in range(self.ROWS)
+        )
+        Pet.objects.bulk_create(
+            Pet(name=f"Mascota {i}", breed="Caniche", birthday=date(2020, 1, 1), weight=4, owner=clients[i % 10])
+            for i in range(self.ROWS)
+        )
+        Medicine.objects.bulk_create(
+            Medicine(name=f"Medicamento {i}", descripcion="Analgesico", dosis=2) for i in range(self.ROWS)
+        )
+        Provider.objects.bulk_create(
+            Provider(name=f"Proveedor {i}", email=f"p{i}@vetsoft.com", address="Calle 7") for i in range(self.ROWS)
+        )
+        Product.objects.bulk_create(
+            Product(name=f"Producto {i}", type="Accesorio", price=100) for i in range(self.ROWS)
+        )
+        Vet.objects.bulk_create(
+            Vet(name=f"Vet {i}", email=f"v{i}@vetsoft.com", phone=54221000000 + i, speciality="Cardiologia")
+            for i in range(self.ROWS)
+        )
+
+    def assertQueries(self, url, num):
+        """
+        Verifica que un GET a la url responda 200 con la cantidad de consultas indicada.
+        """
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_home(self):
+        """
+        Verifica que la pagina de inicio solo lea la tabla de estadisticas.
+        """
+        self.assertQueries(reverse("home"), 1)
+
+    def test_repositories_use_a_constant_number_of_queries(self):
+        """
+        Verifica que cada repositorio consulte las versiones y la pagina, sin importar
+        la cantidad de filas.
+        """
+        # Las mascotas traen a su dueño en la misma consulta (select_related).
+        for name in ("pets_repo", "medicines_repo", "provider_repo", "products_repo", "vet_repo"):
+            with self.subTest(name):
+                self.assertQueries(reverse(name), 2)
+        # Los clientes traen sus mascotas con una consulta mas (prefetch_related).
+        self.assertQueries(reverse("clients_repo"), 3)
+
+    def test_repository_search(self):
+        """
+        Verifica las consultas de las busquedas indexada y de texto completo.
+        """
+        self.assertQueries(reverse("provider_repo") + "?q=prov", 2)
+        # Texto completo: versiones, ranking en el indice FTS5, objetos por id y
+        # las mascotas de los clientes.
+        self.assertQueries(reverse("clients_repo") + "?q=cliente", 4)
+        self.assertQueries(reverse("pets_repo") + "?q=mascota", 3)
+
+    def test_forms(self):
+        """
+        Verifica que los formularios de alta solo consulten las versiones y los de
+        edicion ademas el registro. El de mascotas consulta tambien los dueños.
+        """
+        self.assertQueries(reverse("clients_form"), 1)
+        self.assertQueries(reverse("pets_form"), 2)
+        self.assertQueries(reverse("pets_edit", kwargs={"id": Pet.objects.first().id}), 3)
+        edits = {
+            "clients_edit": Client,
+            "medicines_edit": Medicine,
+            "provider_edit": Provider,
+            "products_edit": Product,
+            "vet_edit": Vet,
+        }
+        for name, model in edits.items():
+            with self.subTest(name):
+                self.assertQueries(reverse(name, kwargs={"id": model.objects.first().id}), 2)
+
+    def test_export_streams_with_one_query(self):
+        """
+        Verifica que la exportacion lea todas las filas con una unica consulta.
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("clients_export"))
+            lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), self.ROWS + 1)
+
+    def test_delete(self):
+        """
+        Verifica las consultas de eliminar un registro: la version de los modelos
+        (que toma el lock de escritura), el registro, sus movimientos de stock y
+        ofertas de proveedores (que se borran en cascada), las lineas de factura
+        que lo dejan de referenciar, su borrado, el contador de productos por tipo,
+        la version de los modelos de las señales y el savepoint que lo envuelve.
+        """
+        stats.rebuild()
+        product = Product.objects.first()
+        with self.assertNumQueries(10):
+            self.client.post(reverse("products_delete"), {"product_id": product.id})
+
+    def test_delete_unknown_record_is_not_found(self):
+        """
+        Verifica que eliminar un id inexistente o invalido responda 404 sin borrar nada.
+        """
+        for product_id in ("999999", "abc", str(10**30), ""):
+            with self.subTest(product_id):
+                response = self.client.post(reverse("products_delete"), {"product_id": product_id})
+                self.assertEqual(response.status_code, 404)
+        self.assertEqual(Product.objects.count(), self.ROWS)
+
+
+class InstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        """
+        Limpia la cache y crea un cliente.
+        """
+        cache.clear()
+        Client.objects.create(name="Juan Sebastian Veron", phone=54221555232, email="brujita75@vetsoft.com", city="La Plata")
+
+    def test_response_has_server_timing(self):
+        """
+        Verifica que la respuesta informe consultas, SQL, plantillas y vista en Server-Timing.
+        """
+        response = self.client.get(reverse("clients_repo"))
+
+        timing = response["Server-Timing"]
+        self.assertIn('desc="3 queries"', timing)
+        self.assertRegex(timing, r"^db;dur=[\d.]+;.*, tpl;dur=[\d.]+, view;dur=[\d.]+$")
+
+    async def test_async_views_count_queries(self):
+        """
+        Verifica que se cuenten las consultas que las vistas asincronicas hacen en otro hilo.
+        """
+        response = await self.async_client.get(reverse("clients_repo"))
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    def test_requests_are_logged(self):
+        """
+        Verifica que cada peticion se registre con sus metricas.
+        """
+        with self.assertLogs("app.instrumentation", level="INFO") as logs:
+            self.client.get(reverse("clients_repo"))
+
+        record = logs.records[0]
+        self.assertEqual(record.levelname, "INFO")
+        self.assertEqual(record.request_metrics["path"], reverse("clients_repo"))
+        self.assertEqual(record.request_metrics["queries"], 3)
+
+    @override_settings(REQUEST_QUERY_BUDGET=1)
+    def test_requests_over_budget_are_flagged(self):
+        """
+        Verifica que las peticiones que exceden el presupuesto de consultas se registren como WARNING.
+        """
+        with self.assertLogs("app.instrumentation", level="WARNING") as logs:
+            self.client.get(reverse("clients_repo"))
+
+        self.assertEqual(logs.records[0].request_metrics["over_budget"], "queries")
+
+
+class PetOwnerTest(TestCase):
+    def setUp(self):
+        """
+        Limpia la cache y crea un cliente con dos mascotas.
+        """
+        cache.clear()
+        self.owner = Client.objects.create(
+            name="Juan Sebastian Veron", phone=54221555232, email="brujita75@vetsoft.com", city="La Plata",
+        )
+        Pet.objects.create(name="Firulais", breed="Caniche", birthday=date(2020, 1, 2), weight=4, owner=self.owner)
+        Pet.objects.create(name="Bobby", breed="Beagle", birthday=date(2021, 3, 4), weight=9, owner=self.owner)
+
+    def test_repositories_show_owner_and_pets(self):
+        """
+        Verifica que las mascotas muestren a su dueño y los clientes a sus mascotas.
+        """
+        self.assertContains(self.client.get(reverse("pets_repo")), "Juan Sebastian Veron (La Plata)")
+        self.assertContains(self.client.get(reverse("clients_repo")), "Bobby, Firulais")
+
+    def test_page_of_100_rows_uses_constant_queries(self):
+        """
+        Verifica que una pagina de 100 mascotas con dueño no consulte un dueño por fila.
+        """
+        owners = Client.objects.bulk_create(
+            Client(name=f"Cliente {i}", phone=54221000000 + i, email=f"c{i}@vetsoft.com", city="Berisso")
+            for i in range(100)
+        )
+        Pet.objects.bulk_create(
+            Pet(name=f"Mascota {i}", breed="Mestizo", birthday=date(2020, 1, 1), weight=3, owner=owners[i])
+            for i in range(100)
+        )
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("pets_repo"), {"page_size": 100})
+        self.assertContains(response, "(Berisso)", count=98)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("clients_repo"), {"page_size": 100})
+        self.assertContains(response, "Mascota 50")
+
+    def test_renaming_owner_invalidates_cached_pets_page(self):
+        """
+        Verifica que editar un cliente invalide la pagina de mascotas en cache.
+        """
+        self.client.get(reverse("pets_repo"))
+
+        self.owner.name = "Martin Palermo"
+        self.owner.save()
+
+        self.assertContains(self.client.get(reverse("pets_repo")), "Martin Palermo (La Plata)")
+
+    def test_form_assigns_owner(self):
+        """
+        Verifica que el formulario de mascotas ofrezca los clientes y guarde el dueño.
+        """
+        response = self.client.get(reverse("pets_form"))
+        self.assertContains(response, f'<option value="{self.owner.id}" >Juan Sebastian Veron</option>', html=False)
+
+        self.client.post(
+            reverse("pets_form"),
+            data={"name": "Rocky", "breed": "Boxer", "weight": 20, "birthday": "2019-05-05", "owner": self.owner.id},
+        )
+        self.assertEqual(Pet.objects.get(name="Rocky").owner, self.owner)
+
+    @override_settings(PICKER_MAX_OPTIONS=2)
+    def test_form_offers_a_bounded_list_of_owners(self):
+        """
+        Verifica que el formulario ofrezca a lo sumo PICKER_MAX_OPTIONS dueños, mas el actual, y un buscador.
+        """
+        Client.objects.bulk_create(
+            Client(name=f"Cliente {i}", phone=54221000000 + i, email=f"c{i}@vetsoft.com", city="Berisso")
+            for i in range(5)
+        )
+        pet = Pet.objects.get(name="Bobby")
+
+        response = self.client.get(reverse("pets_edit", kwargs={"id": pet.id}))
+
+        self.assertEqual(
+            [owner.name for owner in response.context["owners"]], ["Cliente 0", "Cliente 1", "Juan Sebastian Veron"],
+        )
+        self.assertContains(response, f'data-url="{reverse("api_clients")}"')
+
+    def test_form_rejects_unknown_owner(self):
+        """
+        Verifica que no se pueda asignar un dueño inexistente.
+        """
+        response = self.client.post(
+            reverse("pets_form"),
+            data={"name": "Rocky", "breed": "Boxer", "weight": 20, "birthday": "2019-05-05", "owner": 999},
+        )
+
+        self.assertContains(response, "Por favor seleccione un cliente válido")
+        self.assertFalse(Pet.objects.filter(name="Rocky").exists())
+
+    def test_deleting_owner_keeps_pets(self):
+        """
+        Verifica que al eliminar un cliente sus mascotas queden sin dueño.
+        """
+        self.owner.delete()
+        self.assertEqual(Pet.objects.filter(owner__isnull=True).count(), 2)
+
+
+class AppointmentsTest(TestCase):
+    def setUp(self):
+        """
+        Crea un veterinario, una mascota con dueño y un turno el lunes 7 de enero de 2030.
+        """
+        cache.clear()
+        self.vet = Vet.objects.create(name="Ana", email="ana@vetsoft.com", phone="54221", speciality="Cardiologia")
+        owner = Client.objects.create(name="Juan Sebastian Veron", phone=54221555232, email="brujita75@vetsoft.com", city="La Plata")
+        self.pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday=date(2020, 1, 2), weight=4, owner=owner)
+        self.appointment = Appointment.objects.create(
+            vet=self.vet,
+            pet=self.pet,
+            start=datetime(2030, 1, 7, 10, tzinfo=dt_timezone.utc),
+            end=datetime(2030, 1, 7, 10, 30, tzinfo=dt_timezone.utc),
+            reason="Control",
+        )
+
+    def test_repository_shows_appointments_of_the_day(self):
+        """
+        Verifica que se muestren los turnos del dia pedido con una cantidad fija de consultas.
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("appointments_repo"), {"date": "2030-01-07"})
+
+        self.assertTemplateUsed(response, "appointments/repository.html")
+        self.assertContains(response, "10:00 - 10:30")
+        self.assertContains(response, "Firulais")
+        self.assertContains(response, "Control")
+        self.assertContains(self.client.get(reverse("appointments_repo"), {"date": "2030-01-08"}), "No existen turnos")
+
+    def test_form_suggests_free_slots_by_speciality(self):
+        """
+        Verifica que el formulario sugiera horarios libres de la especialidad.
+        """
+        response = self.client.get(reverse("appointments_form"), {"speciality": "Cardiologia"})
+
+        self.assertTemplateUsed(response, "appointments/form.html")
+        suggestions = response.context["suggestions"]
+        self.assertEqual(len(suggestions), 8)
+        self.assertTrue(all(vet == self.vet for vet, _ in suggestions))
+        self.assertContains(response, "Firulais (Juan Sebastian Veron)")
+
+    @override_settings(PICKER_MAX_OPTIONS=1)
+    def test_form_offers_bounded_lists_of_vets_and_pets(self):
+        """
+        Verifica que el formulario ofrezca a lo sumo PICKER_MAX_OPTIONS veterinarios y mascotas, mas los elegidos.
+        """
+        vet = Vet.objects.create(name="Bruno", email="bruno@vetsoft.com", phone="54221", speciality="Clinica")
+        pet = Pet.objects.create(name="Rocky", breed="Boxer", birthday=date(2020, 1, 2), weight=20)
+
+        response = self.client.get(reverse("appointments_form"))
+        self.assertEqual([vet.name for vet in response.context["vets"]], ["Ana"])
+        self.assertEqual([pet.name for pet in response.context["pets"]], ["Firulais"])
+
+        response = self.client.get(reverse("appointments_form"), {"vet": vet.id, "pet": pet.id})
+        self.assertEqual([vet.name for vet in response.context["vets"]], ["Ana", "Bruno"])
+        self.assertEqual([pet.name for pet in response.context["pets"]], ["Firulais", "Rocky"])
+        self.assertContains(response, f'data-url="{reverse("api_pets")}"')
+
+    def test_can_book_appointment(self):
+        """
+        Verifica que se reserve un turno libre y se redirija a la agenda de ese dia.
+        """
+        response = self.client.post(
+            reverse("appointments_form"),
+            data={"vet": self.vet.id, "pet": self.pet.id, "start": "2030-01-07T11:00", "duration": "60", "reason": "Vacuna"},
+        )
+
+        self.assertRedirects(response, f"{reverse('appointments_repo')}?date=2030-01-07")
+        appointment = Appointment.objects.get(reason="Vacuna")
+        self.assertEqual(appointment.end - appointment.start, timedelta(hours=1))
+
+    def test_overlapping_booking_shows_error_and_suggestions(self):
+        """
+        Verifica que un turno superpuesto no se reserve y se sugieran horarios del veterinario.
+        """
+        response = self.client.post(
+            reverse("appointments_form"),
+            data={"vet": self.vet.id, "pet": self.pet.id, "start": "2030-01-07T10:00", "duration": "30"},
+        )
+
+        self.assertContains(response, "El veterinario ya tiene un turno en ese horario")
+        self.assertTrue(response.context["suggestions"])
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_booking_with_missing_fields(self):
+        """
+        Verifica que se informen los campos faltantes.
+        """
+        response = self.client.post(reverse("appointments_form"), data={"start": "no-es-fecha"})
+
+        self.assertContains(response, "Por favor seleccione un veterinario")
+        self.assertContains(response, "Por favor seleccione una mascota")
+        self.assertContains(response, "Por favor ingrese una fecha y hora válidas")
+
+    def test_can_cancel_appointment(self):
+        """
+        Verifica que se pueda cancelar un turno.
+        """
+        response = self.client.post(reverse("appointments_cancel"), {"appointment_id": self.appointment.id})
+
+        self.assertRedirects(response, f"{reverse('appointments_repo')}?date=2030-01-07")
+        self.assertFalse(Appointment.objects.exists())
+
+
+class ProductStockTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name="Shampoo", type="Higiene", price=2500)
+        self.provider = Provider.objects.create(name="Drogueria Ruiz", email="ventas@ruiz.com.ar", address="Calle 50 20")
+
+    def test_repository_shows_stock(self):
+        """
+        Verifica que el repositorio de productos muestre el contador de stock.
+        """
+        Product.objects.filter(pk=self.product.id).update(stock=12)
+
+        response = self.client.get(reverse("products_repo"))
+
+        self.assertContains(response, "<td>12</td>", html=True)
+        self.assertContains(response, reverse("products_stock", kwargs={"id": self.product.id}))
+
+    def test_can_register_purchase_and_sale(self):
+        """
+        Verifica que se registren movimientos desde la pagina de stock.
+        """
+        url = reverse("products_stock", kwargs={"id": self.product.id})
+        response = self.client.post(url, {"kind": "purchase", "quantity": "8", "provider": self.provider.id})
+        self.assertRedirects(response, url)
+        self.client.post(url, {"kind": "sale", "quantity": "3"})
+
+        response = self.client.get(url)
+
+        self.assertContains(response, '<strong data-testid="product-stock">5</strong>', html=True)
+        self.assertContains(response, "Drogueria Ruiz")
+        self.assertEqual(StockMovement.objects.count(), 2)
+
+    def test_sale_without_stock_shows_error(self):
+        """
+        Verifica que una venta sin stock suficiente muestre el error.
+        """
+        response = self.client.post(
+            reverse("products_stock", kwargs={"id": self.product.id}), {"kind": "sale", "quantity": "1"},
+        )
+
+        self.assertContains(response, "No hay stock suficiente")
+        self.assertFalse(StockMovement.objects.exists())
+
+
+class InvoicesTest(TestCase):
+    def setUp(self):
+        self.client_record = Client.objects.create(
+            name="Juan Sebastian Veron", phone="54221555232", email="brujita75@vetsoft.com", city="La Plata",
+        )
+        self.product = Product.objects.create(name="Collar", type="Accesorio", price=1500, stock=5)
+
+    def post_invoice(self, quantity="2"):
+        return self.client.post(reverse("invoices_form"), {
+            "client": self.client_record.id,
+            "item": [f"product:{self.product.id}", ""],
+            "quantity": [quantity, ""],
+            "unit_price": ["", ""],
+        })
+
+    def test_form_lists_clients_and_items(self):
+        """
+        Verifica que el formulario ofrezca clientes, productos con su stock y filas vacias.
+        """
+        response = self.client.get(reverse("invoices_form"), {"client": self.client_record.id})
+
+        self.assertTemplateUsed(response, "invoices/form.html")
+        self.assertContains(response, "Collar ($1500.0, stock 5)")
+        self.assertContains(response, 'name="item"', count=5)
+
+    def test_can_create_invoice(self):
+        """
+        Verifica que se cree la factura y se redirija a su detalle con el total.
+        """
+        response = self.post_invoice()
+
+        invoice = Invoice.objects.get()
+        self.assertRedirects(response, reverse("invoice_detail", kwargs={"id": invoice.id}))
+        response = self.client.get(reverse("invoice_detail", kwargs={"id": invoice.id}))
+        self.assertContains(response, '<th data-testid="invoice-total">3000.00</th>', html=True)
+
+        self.client_record.delete()
+        response = self.client.get(reverse("invoice_detail", kwargs={"id": invoice.id}))
+        self.assertContains(response, "Cliente: Juan Sebastian Veron")
+
+    def test_insufficient_stock_shows_error(self):
+        """
+        Verifica que una venta sin stock muestre el error y mantenga las lineas cargadas.
+        """
+        response = self.post_invoice(quantity="6")
+
+        self.assertContains(response, "Collar: No hay stock suficiente")
+        self.assertEqual(response.context["rows"][0]["quantity"], "6")
+        self.assertFalse(Invoice.objects.exists())
+
+    def test_client_invoices_and_sales_summary(self):
+        """
+        Verifica el listado de facturas del cliente y el resumen de ventas.
+        """
+        self.post_invoice()
+        self.post_invoice(quantity="1")
+
+        # Versiones de los modelos, cliente y facturas, sin leer las lineas.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("client_invoices", kwargs={"id": self.client_record.id}))
+        self.assertEqual(len(response.context["invoices"]), 2)
+        self.assertContains(response, "3000.00")
+
+        response = self.client.get(reverse("sales_summary"))
+        self.assertContains(response, "4500.00")
+
+
+class ApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clients = [
+            Client.objects.create(name=name, phone="54221555232", email=f"{name.lower()}@vetsoft.com", city="La Plata")
+            for name in ("Ana", "Bruno", "Carla")
+        ]
+
+    def post_json(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type="application/json")
+
+    def test_list_with_sparse_fields_and_cursor(self):
+        """
+        Verifica que el listado devuelva solo los campos pedidos y se pagine por cursor.
+        """
+        url = reverse("api_clients")
+
+        # Version del modelo y la pagina.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"fields": "name", "page_size": 2})
+        data = response.json()
+        self.assertEqual(data["results"], [{"id": self.clients[0].id, "name": "Ana"}, {"id": self.clients[1].id, "name": "Bruno"}])
+        self.assertIsNone(data["previous"])
+
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(data["results"], [{"id": self.clients[2].id, "name": "Carla"}])
+        self.assertIsNone(data["next"])
+
+    def test_list_filtered_by_search(self):
+        """
+        Verifica que ?q= filtre el listado como la busqueda de los repositorios.
+        """
+        response = self.client.get(reverse("api_clients"), {"fields": "name", "q": "br"})
+
+        self.assertEqual(response.json()["results"], [{"id": self.clients[1].id, "name": "Bruno"}])
+
+    def test_unknown_field_is_rejected(self):
+        """
+        Verifica que pedir un campo inexistente devuelva un error 400.
+        """
+        response = self.client.get(reverse("api_clients"), {"fields": "name,password"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {"fields": "Campos desconocidos: password"}})
+
+    def test_detail(self):
+        """
+        Verifica la lectura de un registro y el 404 de uno inexistente.
+        """
+        product = Product.objects.create(name="Collar", type="Accesorio", price=1500)
+
+        response = self.client.get(reverse("api_products_detail", kwargs={"id": product.id}), {"fields": "name,stock"})
+        self.assertEqual(response.json(), {"id": product.id, "name": "Collar", "stock": 0})
+
+        response = self.client.get(reverse("api_products_detail", kwargs={"id": 999}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_deleting_the_owner_invalidates_cached_pets(self):
+        """
+        Verifica que eliminar al dueño invalide el listado de mascotas, cuyo owner queda en NULL sin señales.
+        """
+        pet = Pet.objects.create(name="Luna", breed="Beagle", birthday=date(2021, 5, 1), weight=4, owner=self.clients[0])
+        url = reverse("api_pets")
+        response = self.client.get(url, {"fields": "owner"})
+        self.assertEqual(response.json()["results"], [{"id": pet.id, "owner": self.clients[0].id}])
+
+        self.clients[0].delete()
+
+        response = self.client.get(url, {"fields": "owner"}, headers={"if-none-match": response["ETag"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [{"id": pet.id, "owner": None}])
+
+    def test_create(self):
+        """
+        Verifica que el alta devuelva el id creado o los errores de validate_client.
+        """
+        url = reverse("api_clients")
+
+        response = self.post_json(url, {"name": "Diego", "phone": 54221555000, "email": "diego@vetsoft.com", "city": "Berisso"})
+        self.assertEqual(response.status_code, 201)
+        client = Client.objects.get(pk=response.json()["id"])
+        self.assertEqual((client.name, client.phone), ("Diego", 54221555000))
+        self.assertEqual(StatCounter.objects.get(metric="clients_by_city", key="Berisso").count, 1)
+
+        response = self.post_json(url, {"name": "Diego", "phone": "221", "email": "diego@vetsoft.com", "city": "Berisso"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {"phone": "El teléfono debe comenzar con 54"}})
+
+        response = self.client.post(url, {"name": "Diego"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("body", response.json()["errors"])
+
+    def test_create_rejects_duplicate_clients(self):
+        """
+        Verifica que las altas de la API, sueltas o en lote, apliquen el control de duplicados de save_client.
+        """
+        ana = {"name": "Ana", "phone": "54221555232", "email": "ana@vetsoft.com", "city": "Berisso"}
+
+        response = self.post_json(reverse("api_clients"), ana)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("duplicate", response.json()["errors"])
+
+        diego = {"name": "Diego", "phone": "54221555000", "email": "diego@vetsoft.com", "city": "Berisso"}
+        response = self.post_json(reverse("api_clients_batch"), {"create": [diego, diego, {**ana, "allow_duplicate": True}]})
+        created = response.json()["created"]
+        self.assertIn("id", created[0])
+        self.assertIn("Diego", created[1]["errors"]["duplicate"])
+        self.assertIn("id", created[2])
+        self.assertEqual(Client.objects.count(), 5)
+
+    def test_wrongly_typed_values_are_rejected(self):
+        """
+        Verifica que los valores JSON de otro tipo den errores por campo con estado 400 y no un 500.
+        """
+        response = self.post_json(reverse("api_clients"), {"name": 5, "phone": "54221555000", "email": 3, "city": ["x"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], {
+            "name": "El nombre solo puede contener letras y espacios",
+            "email": "Por favor ingrese un email válido",
+            "city": "Ciudad no válida",
+        })
+
+        response = self.post_json(reverse("api_pets"), {"name": "Luna", "birthday": 20240101, "weight": "4", "owner": 10**30})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["errors"]), {"birthday", "owner"})
+
+        response = self.post_json(reverse("api_clients_batch"), {"update": [{"id": 10**30}, {"id": [1]}]})
+        updated = response.json()["updated"]
+        self.assertEqual([set(result["errors"]) for result in updated], [{"id"}, {"id"}])
+
+    def test_patch_merges_with_current_values(self):
+        """
+        Verifica que la modificacion parcial conserve los campos no enviados.
+        """
+        url = reverse("api_clients_detail", kwargs={"id": self.clients[0].id})
+
+        response = self.client.patch(url, json.dumps({"city": "Ensenada"}), content_type="application/json")
+
+        self.assertEqual(response.json(), {"id": self.clients[0].id})
+        client = Client.objects.get(pk=self.clients[0].id)
+        self.assertEqual((client.name, client.city), ("Ana", "Ensenada"))
+
+        response = self.client.patch(url, json.dumps({"email": "ana@gmail.com"}), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], {"email": "El email debe terminar en @vetsoft.com"})
+
+    def test_batch_creates_and_updates_in_one_request(self):
+        """
+        Verifica que un lote informe el resultado de cada elemento y guarde los validos.
+        """
+        owner = self.clients[0]
+        pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday=date(2020, 1, 2), weight=4, owner=owner)
+
+        response = self.post_json(reverse("api_pets_batch"), {
+            "create": [
+                {"name": "Luna", "breed": "Beagle", "birthday": "2021-05-01", "weight": "7.5", "owner": owner.id},
+                {"name": "Toby", "breed": "Beagle", "birthday": "2021-05-01", "weight": "7.5", "owner": 999},
+                {"name": "Rex", "breed": "Beagle", "birthday": "", "weight": "3"},
+            ],
+            "update": [
+                {"id": pet.id, "weight": "4.8"},
+                {"id": 999, "weight": "1"},
+            ],
+        })
+
+        data = response.json()
+        luna = Pet.objects.get(name="Luna")
+        self.assertEqual(data["created"], [
+            {"id": luna.id},
+            {"errors": {"owner": "No existe el registro 999"}},
+            {"errors": {"birthday": "Por favor ingrese una fecha"}},
+        ])
+        self.assertEqual(data["updated"], [{"id": pet.id}, {"errors": {"id": "No existe el registro 999"}}])
+        self.assertEqual(luna.owner, owner)
+        self.assertEqual(Pet.objects.get(pk=pet.id).weight, Decimal("4.8"))
+        self.assertEqual(StatCounter.objects.get(metric="pets_by_breed", key="Beagle").count, 1)
+
+    def test_batch_rejects_malformed_lists(self):
+        """
+        Verifica que un lote con listas mal formadas se rechace sin guardar nada.
+        """
+        response = self.post_json(reverse("api_clients_batch"), {"create": {"name": "Ana"}, "update": []})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {"create": "Debe ser una lista de objetos"}})
+
+    def test_gzip_compression(self):
+        """
+        Verifica que la respuesta se comprima con gzip solo si Accept-Encoding lo admite.
+        """
+        url = reverse("api_clients")
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="deflate")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, plain.content)
+
+    def test_conditional_get_with_compressed_etag(self):
+        """
+        Verifica que el ETag debil de la respuesta comprimida permita responder 304 hasta que cambien los datos.
+        """
+        url = reverse("api_clients")
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.post_json(url, {"name": "Diego", "phone": "54221555000", "email": "diego@vetsoft.com", "city": "Berisso"})
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class BulkActionsTest(TestCase):
+    def setUp(self):
+        self.clients = [
+            Client.objects.create(name=f"Cliente {name}", phone="54221555232", email=f"{name}@vetsoft.com", city="La Plata")
+            for name in ("uno", "dos", "tres")
+        ]
+
+    def counters(self):
+        return {(c.metric, c.key): (c.count, round(c.total, 2)) for c in StatCounter.objects.filter(count__gt=0)}
+
+    def assert_counters_match_rebuild(self):
+        counters = self.counters()
+        stats.rebuild()
+        self.assertEqual(counters, self.counters())
+
+    def test_repository_shows_bulk_actions(self):
+        """
+        Verifica que el repositorio de clientes tenga la seleccion multiple y sus acciones.
+        """
+        response = self.client.get(reverse("clients_repo"))
+
+        self.assertContains(response, 'action="%s"' % reverse("clients_bulk"))
+        self.assertContains(response, 'name="ids" value="%d" form="bulk-form"' % self.clients[0].id)
+        self.assertContains(response, "Cambiar ciudad")
+
+    def test_delete_asks_for_confirmation_with_count(self):
+        """
+        Verifica que el borrado masivo muestre la cantidad y solo borre al confirmar.
+        """
+        pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday=date(2020, 1, 2), weight=4, owner=self.clients[0])
+        ids = [self.clients[0].id, self.clients[1].id]
+
+        response = self.client.post(reverse("clients_bulk"), {"ids": ids, "action": "delete"})
+
+        self.assertContains(response, "Se eliminarán 2 clientes.")
+        self.assertEqual(Client.objects.count(), 3)
+
+        response = self.client.post(reverse("clients_bulk"), {"ids": ids, "action": "delete", "confirm": "1"})
+
+        self.assertRedirects(response, reverse("clients_repo"))
+        self.assertEqual(list(Client.objects.values_list("id", flat=True)), [self.clients[2].id])
+        self.assertIsNone(Pet.objects.get(pk=pet.id).owner)
+        self.assertEqual(StatCounter.objects.get(metric="clients_by_city", key="La Plata").count, 1)
+        self.assert_counters_match_rebuild()
+
+    def test_delete_cost_does_not_grow_with_selection(self):
+        """
+        Verifica que borrar muchos productos haga las mismas consultas que borrar pocos.
+        """
+        products = Product.objects.bulk_create(
+            Product(name=f"Producto {i}", type="Alimento", price=100) for i in range(60)
+        )
+        stats.rebuild()
+        queries = []
+        for chunk in (products[:5], products[5:]):
+            ids = [product.id for product in chunk]
+            with CaptureQueriesContext(connection) as context:
+                self.client.post(reverse("products_bulk"), {"ids": ids, "action": "delete", "confirm": "1"})
+            queries.append(len(context.captured_queries))
+
+        self.assertEqual(queries[0], queries[1])
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(StatCounter.objects.filter(metric="products_by_type", count__gt=0).exists())
+
+    def test_update_city_of_selected_clients(self):
+        """
+        Verifica que el cambio de ciudad masivo modifique solo los seleccionados y mueva las estadisticas.
+        """
+        ids = [self.clients[0].id, self.clients[1].id]
+
+        response = self.client.post(reverse("clients_bulk"), {"ids": ids, "action": "city", "city": "Berisso"})
+        self.assertContains(response, "En 2 clientes se cambiará la ciudad a Berisso.")
+
+        self.client.post(reverse("clients_bulk"), {"ids": ids, "action": "city", "city": "Berisso", "confirm": "1"})
+
+        self.assertEqual(
+            dict(Client.objects.values_list("id", "city")),
+            {self.clients[0].id: "Berisso", self.clients[1].id: "Berisso", self.clients[2].id: "La Plata"},
+        )
+        self.assertEqual(StatCounter.objects.get(metric="clients_by_city", key="Berisso").count, 2)
+        self.assert_counters_match_rebuild()
+
+    def test_adjust_product_prices_by_percentage(self):
+        """
+        Verifica que el ajuste de precio por porcentaje se aplique a los productos seleccionados.
+        """
+        products = [
+            Product.objects.create(name="Collar", type="Accesorio", price=100),
+            Product.objects.create(name="Correa", type="Accesorio", price=250.5),
+        ]
+        ids = [product.id for product in products]
+
+        self.client.post(reverse("products_bulk"), {"ids": ids, "action": "price_percent", "price_percent": "10", "confirm": "1"})
+
+        self.assertEqual(sorted(Product.objects.values_list("price", flat=True)), [110.0, 275.55])
+        self.assertEqual(StatCounter.objects.get(metric="products_by_type", key="Accesorio").total, 385.55)
+        self.assert_counters_match_rebuild()
+
+    def test_invalid_actions_show_errors(self):
+        """
+        Verifica que se informe la falta de seleccion o un valor invalido sin modificar nada.
+        """
+        response = self.client.post(reverse("clients_bulk"), {"action": "delete", "confirm": "1"})
+        self.assertContains(response, "Por favor seleccione al menos un registro")
+
+        response = self.client.post(
+            reverse("clients_bulk"), {"ids": [self.clients[0].id], "action": "city", "city": "Quilmes", "confirm": "1"},
+        )
+        self.assertContains(response, "Por favor seleccione una opción válida")
+
+        response = self.client.post(
+            reverse("products_bulk"), {"ids": [1], "action": "price_percent", "price_percent": "-100"},
+        )
+        self.assertContains(response, "El porcentaje debe ser mayor que -100")
+        self.assertEqual(Client.objects.filter(city="La Plata").count(), 3)
+
+    def test_merge_selected_clients_into_the_oldest(self):
+        """
+        Verifica que fusionar pida confirmacion, conserve el cliente mas antiguo y le pase las mascotas.
+        """
+        pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday=date(2020, 1, 2), weight=4, owner=self.clients[2])
+        ids = [self.clients[2].id, self.clients[0].id]
+
+        response = self.client.post(reverse("clients_bulk"), {"ids": ids, "action": "merge"})
+        self.assertContains(response, "Se fusionarán 2 clientes en el más antiguo")
+
+        response = self.client.post(reverse("clients_bulk"), {"ids": ids, "action": "merge", "confirm": "1"})
+
+        self.assertRedirects(response, reverse("clients_repo"))
+        self.assertEqual(sorted(Client.objects.values_list("id", flat=True)), [self.clients[0].id, self.clients[1].id])
+        pet.refresh_from_db()
+        self.assertEqual(pet.owner_id, self.clients[0].id)
+
+    def test_merge_needs_two_clients_and_is_only_for_clients(self):
+        """
+        Verifica que fusionar requiera dos registros y no este disponible en otros repositorios.
+        """
+        response = self.client.post(reverse("clients_bulk"), {"ids": [self.clients[0].id], "action": "merge", "confirm": "1"})
+        self.assertContains(response, "Por favor seleccione al menos dos registros para fusionar")
+
+        response = self.client.post(reverse("vet_bulk"), {"ids": [1, 2], "action": "merge", "confirm": "1"})
+        self.assertContains(response, "Acción no válida")
+        self.assertEqual(Client.objects.count(), 3)
+
+
+class DuplicateClientFormTest(TestCase):
+    def test_form_warns_about_similar_client_and_saves_when_confirmed(self):
+        """
+        Verifica que el alta avise de un cliente parecido y lo guarde al marcar "guardar igual".
+        """
+        Client.objects.create(name="Juan Gonzalez", phone="54221555232", email="juan@vetsoft.com", city="La Plata")
+        data = {"name": "Juan Gonsales", "phone": "54221555232", "email": "jgonsales@vetsoft.com", "city": "Ensenada"}
+
+        response = self.client.post(reverse("clients_form"), data)
+
+        self.assertContains(response, "Ya existe un cliente parecido: Juan Gonzalez")
+        self.assertContains(response, 'name="allow_duplicate"')
+        self.assertEqual(Client.objects.count(), 1)
+
+        response = self.client.post(reverse("clients_form"), {**data, "allow_duplicate": "1"})
+
+        self.assertRedirects(response, reverse("clients_repo"))
+        self.assertEqual(Client.objects.count(), 2)
+
+
+class PetWeightApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday=date(2020, 1, 2), weight=4)
+        start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        PetWeight.objects.bulk_create(
+            PetWeight(pet=self.pet, measured_at=start + timedelta(hours=hour), weight=4 + hour / 1000)
+            for hour in range(500)
+        )
+
+    def test_series_is_downsampled(self):
+        """
+        Verifica que el historial se reduzca a la cantidad de puntos pedida y se cachee.
+        """
+        url = reverse("api_pets_weights", args=[self.pet.id])
+
+        data = self.client.get(url, {"points": 50}).json()
+
+        self.assertEqual(data["count"], 501)
+        self.assertEqual(data["method"], "lttb")
+        self.assertEqual(len(data["points"]), 50)
+        self.assertEqual(data["points"][0], ["2024-01-01T00:00:00+00:00", 4.0])
+
+        # Version de los modelos: la serie sale de la cache.
+        with self.assertNumQueries(1):
+            self.client.get(url, {"points": 50})
+
+        data = self.client.get(url, {"points": 50, "method": "minmax", "from": "2024-01-02T00:00:00", "to": "2024-01-03T00:00:00"}).json()
+        self.assertEqual(data["count"], 25)
+        self.assertLessEqual(len(data["points"]), 50)
+
+    def test_series_errors(self):
+        """
+        Verifica los errores por opciones invalidas y por mascota inexistente.
+        """
+        response = self.client.get(reverse("api_pets_weights", args=[self.pet.id]), {"points": 1, "method": "mean", "from": "ayer"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["errors"]), {"points", "method", "from"})
+
+        response = self.client.get(reverse("api_pets_weights", args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_weighings_invalidates_series(self):
+        """
+        Verifica que cargar pesajes por la API actualice el peso y la serie cacheada.
+        """
+        url = reverse("api_pets_weights", args=[self.pet.id])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.post(url, json.dumps([{"weight": "9.5", "measured_at": "2030-01-01T00:00:00"}]), content_type="application/json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"created": 1})
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.weight, Decimal("9.5"))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["points"][-1][1], 9.5)
+
+        response = self.client.post(url, json.dumps({"weight": "0"}), content_type="application/json")
+        self.assertEqual(response.json()["errors"], {"0": {"weight": "El peso debe ser mayor que 0"}})
+
+    def test_growth_summary(self):
+        """
+        Verifica el resumen del aumento de peso mensual.
+        """
+        data = self.client.get(reverse("api_pets_growth")).json()
+
+        self.assertEqual(data["pets"], 1)
+        self.assertIn(data["engine"], ("numpy", "python"))
+        self.assertGreater(data["kg_per_month"]["mean"], 0)
+
+    def test_edit_form_shows_weight_chart(self):
+        """
+        Verifica que el formulario de edicion incluya el grafico del historial de peso.
+        """
+        response = self.client.get(reverse("pets_edit", kwargs={"id": self.pet.id}))
+
+        self.assertContains(response, 'data-testid="weight-chart"')
+        self.assertContains(response, reverse("api_pets_weights", args=[self.pet.id]))
+
+
+class MedicineDosingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.medicine = Medicine.objects.create(name="Meloxicam", descripcion="Antiinflamatorio", dosis=1)
+        self.pets = [
+            Pet.objects.create(name=name, breed="Beagle", birthday=date(2021, 5, 1), weight=weight)
+            for name, weight in (("Luna", 4), ("Toby", 12))
+        ]
+
+    def save_rule(self, **data):
+        return self.client.post(reverse("medicines_dosing", kwargs={"id": self.medicine.id}), {"step_mg": "0.5", **data})
+
+    def test_rule_form_and_pet_doses(self):
+        """
+        Verifica que se guarde la regla y la pagina calcule las dosis de las mascotas elegidas.
+        """
+        url = reverse("medicines_dosing", kwargs={"id": self.medicine.id})
+        self.assertContains(self.client.get(url), "no tiene regla de dosificacion")
+
+        response = self.save_rule(mg_per_kg="1.5", max_mg="15")
+        self.assertRedirects(response, url)
+
+        response = self.client.get(url, {"pets": [pet.id for pet in self.pets], "weight": "7.3"})
+        self.assertContains(response, "1.500 mg/kg")
+        self.assertContains(response, '<td data-testid="pet-dose">6.0 mg</td>', html=True)
+        self.assertContains(response, '<td data-testid="pet-dose">15.0 mg</td>', html=True)
+        self.assertContains(response, "11.0 mg")
+
+    @override_settings(PICKER_MAX_OPTIONS=1)
+    def test_page_offers_a_bounded_list_of_pets(self):
+        """
+        Verifica que la pagina ofrezca a lo sumo PICKER_MAX_OPTIONS mascotas, mas las elegidas.
+        """
+        url = reverse("medicines_dosing", kwargs={"id": self.medicine.id})
+
+        self.assertEqual([pet.name for pet in self.client.get(url).context["pets"]], ["Luna"])
+        response = self.client.get(url, {"pets": [self.pets[1].id, 10**30]})
+        self.assertEqual([pet.name for pet in response.context["pets"]], ["Luna", "Toby"])
+
+    def test_invalid_rule_shows_errors(self):
+        """
+        Verifica que una regla invalida muestre los errores sin guardarse.
+        """
+        response = self.save_rule(mg_per_kg="-1")
+
+        self.assertContains(response, "La dosis por kg debe ser mayor que 0")
+        self.assertFalse(DosingRule.objects.exists())
+
+    def test_api_doses_for_pets_and_weights(self):
+        """
+        Verifica que la API calcule en una sola peticion las dosis de mascotas y de pesos sueltos.
+        """
+        url = reverse("api_medicines_doses", kwargs={"id": self.medicine.id})
+        body = json.dumps({"pets": [self.pets[1].id], "weights": [2, 3.3]})
+        response = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 404)
+
+        self.save_rule(mg_per_kg="2")
+        response = self.client.post(url, body, content_type="application/json")
+
+        self.assertEqual(response.json(), {
+            "medicine": self.medicine.id,
+            "pets": [{"id": self.pets[1].id, "name": "Toby", "weight": 12.0, "dose": 24.0}],
+            "weights": [4.0, 6.5],
+        })
+
+        response = self.client.post(url, json.dumps({"weights": [0, "3"]}), content_type="application/json")
+        self.assertEqual(response.json(), {"errors": {"weights": "Debe ser una lista de pesos mayores que 0"}})
+
+
+class PurchasingPageTest(TestCase):
+    def setUp(self):
+        self.provider = Provider.objects.create(name="Distribuidora", email="distribuidora@vetsoft.com")
+
+    def test_page_compares_offers_with_constant_queries(self):
+        """
+        Verifica que la pagina de compras haga las mismas consultas con pocos o muchos productos.
+        """
+        url = reverse("products_purchasing")
+        for count in (2, 40):
+            for index in range(count - Product.objects.count()):
+                product = Product.objects.create(name=f"Producto {count}-{index}", type="Comida", price=10)
+                ProviderOffer.objects.create(provider=self.provider, product=product, unit_price=4, valid_from=date(2024, 1, 1))
+            # Mejores ofertas, productos y proveedores.
+            with self.assertNumQueries(3):
+                response = self.client.get(url)
+            self.assertContains(response, '<td data-testid="best-provider">Distribuidora</td>', count=count, html=True)
+
+    def test_offer_form(self):
+        """
+        Verifica que el formulario registre una oferta y muestre los errores de una invalida.
+        """
+        product = Product.objects.create(name="Alimento", type="Comida", price=10)
+        data = {"provider": self.provider.id, "product": product.id, "unit_price": "7.5", "lead_time_days": "2", "valid_from": "2024-01-01"}
+
+        response = self.client.post(reverse("products_purchasing"), {**data, "lead_time_days": "-1"})
+        self.assertContains(response, "La demora de entrega no puede ser negativa")
+
+        response = self.client.post(reverse("products_purchasing"), data)
+        self.assertRedirects(response, reverse("products_purchasing"))
+        self.assertEqual(ProviderOffer.objects.get().unit_price, Decimal("7.5"))
+
+        response = self.client.get(reverse("products_purchasing"), {"on": "2023-12-31"})
+        self.assertContains(response, "Sin ofertas vigentes")
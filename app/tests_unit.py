@@ -1,17 +1,54 @@
-from django.test import TestCase
-from django.core.exceptions import ValidationError
+import argparse
+import csv
+import io
+import json
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.exceptions import ImproperlyConfigured, ValidationError
 from app.models import (
+    Appointment,
     Client,
+    DailySales,
+    DosingRule,
+    Invoice,
+    InvoiceLine,
     Medicine,
     Pet,
+    PetWeight,
     Product,
     Provider,
+    ProviderOffer,
+    StatCounter,
+    StockMovement,
     Vet,
     City,
+    CLIENT_VALIDATOR,
+    MEDICINE_VALIDATOR,
+    validate_client,
     validate_medicine,
     validate_product,
     validate_Vet,
 )
+from app.imports import import_csv, import_rows
+from app.search import search
+from app import api, inventory, invoicing, navigation, scheduling, stats
+from app.templating import template_names, warm_up_templates
+from app.caching import get_versions
+from app.database import pragma_statements
+from app.imports import IMPORTERS
+from app.seeding import GENERATORS
+from app import dedup, dosing, fts, matching, purchasing, weights
+from app.testing import TimedTestResult, TimedTestRunner, slowest
 
 
 class ClientModelTest(TestCase):
@@ -625,6 +662,1450 @@ class VetModelTest(TestCase):
                 "speciality": "Clinica",  
             } )
         vet_updated = Vet.objects.get(pk=1)
-        self.assertEqual(vet_updated.speciality, 'Clinica')        
+        self.assertEqual(vet_updated.speciality, 'Clinica')
 
-      
\ No newline at end of file
+
+class ValidatorsTest(TestCase):
+    def test_validate_many_returns_errors_per_row(self):
+        """
+        Verifica que validate_many devuelva los errores de cada fila, en orden, con los mensajes de validate_client.
+        """
+        valid = {"name": "Juan Perez", "phone": "54221555232", "email": "juan@vetsoft.com", "city": "La Plata"}
+        rows = [
+            valid,
+            {**valid, "name": "Juan 2"},
+            {**valid, "phone": "22a"},
+            {**valid, "phone": 221555232},
+            {**valid, "email": "juan@gmail.com"},
+            {**valid, "email": "@vetsoft.com"},
+            {**valid, "city": "Quilmes"},
+            {},
+        ]
+
+        results = CLIENT_VALIDATOR.validate_many(rows)
+
+        self.assertEqual(results, [validate_client(row) for row in rows])
+        self.assertEqual(results[0], {})
+        self.assertEqual(results[1], {"name": "El nombre solo puede contener letras y espacios"})
+        self.assertEqual(results[2], {"phone": "Por favor ingrese un telefono valido"})
+        self.assertEqual(results[3], {"phone": "El teléfono debe comenzar con 54"})
+        self.assertEqual(results[4], {"email": "El email debe terminar en @vetsoft.com"})
+        self.assertEqual(results[5], {"email": "El email no puede ser solo '@vetsoft.com'"})
+        self.assertEqual(results[6], {"city": "Ciudad no válida"})
+        self.assertEqual(set(results[7]), {"name", "phone", "email", "city"})
+
+    def test_checks_after_conversion_use_converted_value(self):
+        """
+        Verifica que las comprobaciones posteriores a una conversion usen el valor convertido.
+        """
+        rows = [{"name": "Amoxicilina", "descripcion": "Antibiotico", "dosis": dosis} for dosis in ("5", "abc", "0", "11", 10)]
+
+        errors = [result.get("dosis") for result in MEDICINE_VALIDATOR.validate_many(rows)]
+
+        self.assertEqual(errors, [
+            None,
+            "La cantidad de dosis no es correcta,debe ser una cantidad entera",
+            "La dosis debe ser mayor a cero",
+            "La dosis debe ser menor que 10",
+            None,
+        ])
+
+    def test_none_and_invalid_numbers_are_reported(self):
+        """
+        Verifica que None se informe como campo vacio y que un peso no numerico sea un error y no una excepcion.
+        """
+        self.assertEqual(validate_product({"name": None, "type": "Alimento", "price": "10"}), {"name": "Por favor ingrese un nombre para el producto"})
+        self.assertEqual(
+            Pet.validate_pet({"name": "Firulais", "birthday": "2020-01-01", "weight": "mucho"}),
+            {"weight": "Por favor ingrese un peso valido"},
+        )
+
+
+class ApiFieldsTest(TestCase):
+    def test_parse_fields(self):
+        """
+        Verifica que ?fields= agregue el id, quite repetidos y rechace campos desconocidos.
+        """
+        self.assertEqual(api.parse_fields(Client, ""), (("id", "name", "phone", "email", "city"), {}))
+        self.assertEqual(api.parse_fields(Client, "name, phone,name"), (("id", "name", "phone"), {}))
+        self.assertEqual(api.parse_fields(Product, "stock"), (("id", "stock"), {}))
+        self.assertEqual(api.parse_fields(Client, "name,stock"), (None, {"fields": "Campos desconocidos: stock"}))
+
+    def test_update_records_reads_instances_in_one_query(self):
+        """
+        Verifica que las modificaciones lean todos los registros con una sola consulta.
+        """
+        products = [Product.objects.create(name=f"Producto {i}", type="Alimento", price=100) for i in range(3)]
+        rows = [{"id": product.id, "price": 200} for product in products]
+
+        with CaptureQueriesContext(connection) as queries:
+            results = api.update_records(Product, rows)
+
+        self.assertEqual(results, [{"id": product.id} for product in products])
+        self.assertEqual(sum('FROM "app_product"' in query["sql"] for query in queries.captured_queries), 1)
+        self.assertEqual(set(Product.objects.values_list("price", flat=True)), {200})
+
+
+class ImportRecordsTest(TestCase):
+    CLIENTS_CSV = (
+        "name,phone,email,city\n"
+        "Juan Sebastian Veron,54221555232,brujita75@vetsoft.com,La Plata\n"
+        "Ju4n,54221555232,juan@vetsoft.com,La Plata\n"
+        "Guido Carrillo,54221555233,guido@vetsoft.com,Berisso\n"
+        "Pepe,12345,pepe@vetsoft.com,Ensenada\n"
+    )
+
+    def test_import_csv_creates_valid_rows_and_rejects_invalid(self):
+        """
+        Verifica que se creen las filas validas y se informen las invalidas con sus errores.
+        """
+        rejects = io.StringIO()
+        result = import_csv("client", io.StringIO(self.CLIENTS_CSV), rejects=rejects, chunk_size=2)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.rejected, 2)
+        self.assertEqual(
+            list(Client.objects.order_by("id").values_list("name", "phone", "city")),
+            [("Juan Sebastian Veron", 54221555232, "La Plata"), ("Guido Carrillo", 54221555233, "Berisso")],
+        )
+
+        lines = rejects.getvalue().splitlines()
+        self.assertEqual(lines[0], "row,name,phone,email,city,errors")
+        self.assertTrue(lines[1].startswith("2,Ju4n,"))
+        self.assertIn("El nombre solo puede contener letras y espacios", lines[1])
+        self.assertIn("El teléfono debe comenzar con 54", lines[2])
+
+    def test_import_rows_uses_one_insert_per_chunk(self):
+        """
+        Verifica que cada lote se inserte con un unico bulk_create.
+        """
+        rows = [
+            {"name": f"Producto {i}", "type": "Alimento", "price": str(i + 1)}
+            for i in range(10)
+        ]
+        # Por lote: SAVEPOINT, INSERT, version del modelo, UPDATE del contador de
+        # productos por tipo y RELEASE SAVEPOINT; el primer lote ademas crea el
+        # contador (INSERT OR IGNORE y otro UPDATE).
+        with self.assertNumQueries(12):
+            result = import_rows("product", rows, chunk_size=5)
+
+        self.assertEqual(result.created, 10)
+        self.assertEqual(Product.objects.count(), 10)
+
+    def test_import_rejects_values_that_cannot_be_converted(self):
+        """
+        Verifica que un valor con tipo invalido se rechace en lugar de interrumpir la importacion.
+        """
+        errors = []
+        result = import_rows(
+            "pet",
+            [
+                {"name": "Firulais", "breed": "", "birthday": "2020-01-02", "weight": "4.5"},
+                {"name": "Michi", "breed": "", "birthday": "no-es-fecha", "weight": "3"},
+                {"name": "Rex", "breed": "", "birthday": "2020-01-02", "weight": "pesado"},
+            ],
+            on_reject=lambda number, row, row_errors: errors.append((number, sorted(row_errors))),
+        )
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(errors, [(2, ["birthday"]), (3, ["weight"])])
+
+    def test_import_pets_with_owner(self):
+        """
+        Verifica que las mascotas se importen con su dueño y se rechacen las de dueños inexistentes
+        con una sola consulta por lote.
+        """
+        owner = Client.objects.create(name="Juan Sebastian Veron", phone=54221555232, email="brujita75@vetsoft.com", city="La Plata")
+        errors = []
+        rows = [
+            {"name": "Firulais", "birthday": "2020-01-02", "weight": "4.5", "owner": str(owner.id)},
+            {"name": "Michi", "birthday": "2020-01-02", "weight": "3", "owner": "999"},
+            {"name": "Rex", "birthday": "2020-01-02", "weight": "8", "owner": ""},
+        ]
+        # Dueños existentes, SAVEPOINT, INSERT, pesajes iniciales, versiones de
+        # los modelos, contador de mascotas por raza (que se crea: UPDATE,
+        # INSERT OR IGNORE y UPDATE) y RELEASE SAVEPOINT.
+        with self.assertNumQueries(9):
+            result = import_rows("pet", rows, on_reject=lambda number, row, row_errors: errors.append((number, row_errors)))
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(errors, [(2, {"owner": "No existe el registro 999"})])
+        self.assertEqual(Pet.objects.get(name="Firulais").owner, owner)
+        self.assertIsNone(Pet.objects.get(name="Rex").owner)
+
+    def test_import_records_command(self):
+        """
+        Verifica que el comando importe el archivo y escriba las filas rechazadas al lado.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory) / "clientes.csv"
+            source.write_text(self.CLIENTS_CSV, encoding="utf-8")
+            out = io.StringIO()
+
+            call_command("import_records", "client", str(source), stdout=out)
+
+            self.assertIn("2 registros importados, 2 rechazados", out.getvalue())
+            rejects = (Path(directory) / "clientes.csv.rejects.csv").read_text(encoding="utf-8")
+            rejected_row = list(csv.reader(io.StringIO(rejects)))[2]
+            errors = json.loads(rejected_row[-1])
+            self.assertEqual(errors, {"phone": "El teléfono debe comenzar con 54"})
+
+        self.assertEqual(Client.objects.count(), 2)
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        """
+        Crea clientes y veterinarios para buscar.
+        """
+        Client.objects.create(name="Juan Sebastian Veron", phone=54221555232, email="brujita75@vetsoft.com", city="La Plata")
+        Client.objects.create(name="Guido Carrillo", phone=54221555233, email="juan.guido@vetsoft.com", city="Berisso")
+        Vet.objects.create(name="Ana Perez", email="ana@vetsoft.com", phone="221555", speciality="Cardiologia")
+
+    def test_search_matches_prefix_ignoring_case(self):
+        """
+        Verifica que la busqueda compare por prefijo sin distinguir mayusculas.
+        """
+        names = search(Client.objects.order_by("id"), "JUAN").values_list("name", flat=True)
+        self.assertEqual(list(names), ["Juan Sebastian Veron", "Guido Carrillo"])
+
+    def test_search_matches_phone_exactly(self):
+        """
+        Verifica que el telefono de un cliente se busque por igualdad.
+        """
+        names = search(Client.objects.all(), "54221555233").values_list("name", flat=True)
+        self.assertEqual(list(names), ["Guido Carrillo"])
+
+    def test_search_matches_choice_labels(self):
+        """
+        Verifica que la especialidad se busque por la etiqueta de la opcion.
+        """
+        self.assertEqual(search(Vet.objects.all(), "cardio").count(), 1)
+        self.assertEqual(search(Vet.objects.all(), "neuro").count(), 0)
+
+    def test_empty_search_returns_everything(self):
+        """
+        Verifica que una busqueda vacia no filtre.
+        """
+        self.assertEqual(search(Client.objects.all(), "  ").count(), 2)
+
+    def test_search_uses_indexes(self):
+        """
+        Verifica con EXPLAIN QUERY PLAN que la busqueda use indices y no recorra la tabla.
+        """
+        for model in (Client, Pet, Medicine, Provider, Product, Vet):
+            with self.subTest(model=model.__name__):
+                plan = search(model.objects.all(), "ju").order_by("id")[:50].explain()
+                self.assertIn("USING INDEX", plan)
+                self.assertNotIn(f"SCAN {model._meta.db_table}", plan)
+
+
+class FullTextSearchTest(TestCase):
+    def setUp(self):
+        """
+        Crea clientes y medicamentos indexados por los triggers de FTS5.
+        """
+        self.veron = Client.objects.create(name="Juan Sebastián Verón", phone=54221555232, email="brujita75@vetsoft.com", city="La Plata")
+        self.carrillo = Client.objects.create(name="Guido Carrillo", phone=54221555233, email="guido@vetsoft.com", city="Berisso")
+        Medicine.objects.create(name="Amoxicilina", descripcion="Antibiotico de amplio espectro", dosis=2)
+        Medicine.objects.create(name="Meloxicam", descripcion="Antiinflamatorio", dosis=1)
+
+    def test_match_expression_uses_prefix_tokens(self):
+        """
+        Verifica que cada palabra se busque como prefijo y se ignoren los simbolos.
+        """
+        self.assertEqual(fts.match_expression('jua "ver'), '"jua"* "ver"*')
+        self.assertIsNone(fts.match_expression("  ?! "))
+
+    def test_ranked_ids_matches_every_prefix_ignoring_accents(self):
+        """
+        Verifica que se encuentren palabras por prefijo sin importar tildes ni orden.
+        """
+        self.assertEqual(fts.ranked_ids(Client, "veron jua", limit=10), [self.veron.id])
+        self.assertEqual(fts.ranked_ids(Client, "guido", limit=10), [self.carrillo.id])
+
+    def test_ranked_ids_searches_description(self):
+        """
+        Verifica que se busque en la descripcion de los medicamentos.
+        """
+        ids = fts.ranked_ids(Medicine, "antib", limit=10)
+        self.assertEqual(list(Medicine.objects.filter(id__in=ids).values_list("name", flat=True)), ["Amoxicilina"])
+
+    def test_triggers_follow_updates_and_deletes(self):
+        """
+        Verifica que el indice se actualice ante update, delete y bulk_create.
+        """
+        Client.objects.filter(pk=self.carrillo.pk).update(name="Martin Palermo")
+        self.assertEqual(fts.ranked_ids(Client, "carrillo", limit=10), [])
+        self.assertEqual(fts.ranked_ids(Client, "palermo", limit=10), [self.carrillo.id])
+
+        self.veron.delete()
+        self.assertEqual(fts.ranked_ids(Client, "veron", limit=10), [])
+
+        Pet.objects.bulk_create([Pet(name="Firulais", breed="Caniche", birthday="2020-01-01", weight=4)])
+        self.assertEqual(len(fts.ranked_ids(Pet, "cani", limit=10)), 1)
+
+
+class FullTextSearchInstallTest(TransactionTestCase):
+    def test_install_restores_triggers_after_table_rebuild(self):
+        """
+        Verifica que install vuelva a crear los triggers que SQLite descarta al reconstruir una tabla.
+        """
+        connection.disable_constraint_checking()
+        try:
+            with connection.schema_editor() as editor:
+                editor._remake_table(Client)
+        finally:
+            connection.enable_constraint_checking()
+        fts.install()
+
+        Client.objects.create(name="Martin Palermo", phone=54221555234, email="titan@vetsoft.com", city="Ensenada")
+        self.assertEqual(len(fts.ranked_ids(Client, "palermo", limit=10)), 1)
+
+
+
+class SQLitePragmasTest(TestCase):
+    def _pragma(self, db, name):
+        with db.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_new_connections_apply_configured_pragmas(self):
+        """
+        Verifica que cada conexion nueva aplique los PRAGMAs de settings.SQLITE_PRAGMAS.
+        """
+        pragmas = {"synchronous": "normal", "busy_timeout": 1234, "cache_size": -2048, "temp_store": "memory"}
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            db = connections.create_connection("default")
+            try:
+                self.assertEqual(self._pragma(db, "synchronous"), 1)
+                self.assertEqual(self._pragma(db, "busy_timeout"), 1234)
+                self.assertEqual(self._pragma(db, "cache_size"), -2048)
+                self.assertEqual(self._pragma(db, "temp_store"), 2)
+            finally:
+                db.close()
+
+    def test_invalid_pragma_is_rejected(self):
+        """
+        Verifica que no se interpolen nombres o valores de PRAGMA invalidos.
+        """
+        self.assertEqual(pragma_statements({"journal_mode": "wal"}), ["PRAGMA journal_mode = wal"])
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_statements({"journal_mode": "wal; DROP TABLE app_client"})
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_statements({"user_version = 1; --": 1})
+
+
+class SeedDataTest(TestCase):
+    def test_generated_rows_pass_validators(self):
+        """
+        Verifica que las filas generadas cumplan las reglas de los validate_* de cada modelo.
+        """
+        rng = random.Random(1)
+        for model_name, generate in GENERATORS.items():
+            _, validate = IMPORTERS[model_name]
+            for row in generate(200, rng):
+                with self.subTest(model=model_name, row=row):
+                    self.assertEqual(validate(row), {})
+
+    def test_seed_data_command(self):
+        """
+        Verifica que el comando cree la cantidad pedida de cada modelo.
+        """
+        out = io.StringIO()
+        call_command(
+            "seed_data", "--clients=30", "--pets=40", "--medicines=5", "--providers=4",
+            "--products=6", "--vets=3", "--seed=7", stdout=out,
+        )
+
+        self.assertEqual(Client.objects.count(), 30)
+        self.assertEqual(Pet.objects.count(), 40)
+        self.assertEqual(Medicine.objects.count(), 5)
+        self.assertEqual(Provider.objects.count(), 4)
+        self.assertEqual(Product.objects.count(), 6)
+        self.assertEqual(Vet.objects.count(), 3)
+        self.assertIn("client: 30 registros creados", out.getvalue())
+        self.assertTrue(all(str(phone).startswith("54") for phone in Client.objects.values_list("phone", flat=True)))
+
+    def test_seed_is_reproducible(self):
+        """
+        Verifica que la misma semilla genere los mismos datos.
+        """
+        first = list(GENERATORS["client"](5, random.Random(3)))
+        second = list(GENERATORS["client"](5, random.Random(3)))
+        self.assertEqual(first, second)
+
+
+class InventoryTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name="Collar antipulgas", type="Accesorio", price=1500)
+        self.provider = Provider.objects.create(name="Distribuidora Sosa", email="ventas@sosa.com.ar", address="Calle 7 100")
+
+    def purchase(self, quantity):
+        return inventory.record_movement(
+            self.product.id, {"kind": "purchase", "quantity": str(quantity), "provider": str(self.provider.id)},
+        )
+
+    def test_movements_update_stock(self):
+        """
+        Verifica que compras, ventas y ajustes actualicen el contador de stock.
+        """
+        self.purchase(10)
+        inventory.record_movement(self.product.id, {"kind": "sale", "quantity": "3"})
+        inventory.record_movement(self.product.id, {"kind": "adjustment", "quantity": "-2", "note": "Rotura"})
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 5)
+        self.assertEqual(
+            list(StockMovement.objects.order_by("id").values_list("kind", "quantity")),
+            [("purchase", 10), ("sale", -3), ("adjustment", -2)],
+        )
+
+    def test_sale_without_stock_is_rejected(self):
+        """
+        Verifica que no se pueda vender mas de lo que hay en stock.
+        """
+        self.purchase(2)
+        movement, errors = inventory.record_movement(self.product.id, {"kind": "sale", "quantity": "3"})
+
+        self.assertIsNone(movement)
+        self.assertEqual(errors, {"quantity": "No hay stock suficiente"})
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 2)
+        self.assertEqual(StockMovement.objects.count(), 1)
+
+    def test_invalid_movements(self):
+        """
+        Verifica los errores de validacion de un movimiento.
+        """
+        _, errors = inventory.record_movement(self.product.id, {"kind": "purchase", "quantity": "0"})
+        self.assertEqual(errors["quantity"], "Por favor ingrese una cantidad entera distinta de cero")
+        self.assertEqual(errors["provider"], "Por favor seleccione el proveedor de la compra")
+
+        _, errors = inventory.record_movement(self.product.id, {"kind": "sale", "quantity": "-1"})
+        self.assertEqual(errors, {"quantity": "La cantidad debe ser mayor que cero"})
+
+        _, errors = inventory.record_movement(self.product.id, {"kind": "regalo", "quantity": "1"})
+        self.assertEqual(errors, {"kind": "Por favor seleccione un tipo de movimiento"})
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_record_movement_queries(self):
+        """
+        Verifica que una venta actualice el contador sin leer ni sumar el libro.
+        """
+        self.purchase(5)
+        # Savepoint, UPDATE condicional, INSERT del movimiento, versiones y fin del savepoint.
+        with self.assertNumQueries(5):
+            inventory.record_movement(self.product.id, {"kind": "sale", "quantity": "1"})
+
+    def test_update_product_keeps_stock(self):
+        """
+        Verifica que editar un producto no pise el stock con un valor leido antes.
+        """
+        product = Product.objects.get(pk=self.product.id)
+        self.purchase(4)
+
+        product.update_product({"name": "Collar", "type": "Accesorio", "price": "1800"})
+
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 4)
+        self.assertEqual(product.name, "Collar")
+
+    def test_reconcile_stock_command(self):
+        """
+        Verifica que el comando reconstruya los contadores desde el libro.
+        """
+        other = Product.objects.create(name="Correa", type="Accesorio", price=900)
+        self.purchase(7)
+        Product.objects.filter(pk=self.product.id).update(stock=1)
+        Product.objects.filter(pk=other.id).update(stock=3)
+
+        out = io.StringIO()
+        call_command("reconcile_stock", "--chunk-size=1", stdout=out)
+
+        self.assertIn("2 productos corregidos", out.getvalue())
+        self.assertEqual(dict(Product.objects.values_list("name", "stock")), {"Collar antipulgas": 7, "Correa": 0})
+
+        out = io.StringIO()
+        call_command("reconcile_stock", stdout=out)
+        self.assertIn("El stock coincide con los movimientos", out.getvalue())
+
+    def test_reconcile_stock_queries_do_not_grow_with_products(self):
+        """
+        Verifica que la reconciliacion lea el libro con una consulta agrupada sin importar cuantos productos haya.
+        """
+        products = Product.objects.bulk_create(
+            Product(name=f"Producto {number}", type="Accesorio", price=100) for number in range(20)
+        )
+        StockMovement.objects.bulk_create(
+            StockMovement(product=product, kind=StockMovement.KIND_CHOICES.ADJUSTMENT, quantity=5) for product in products
+        )
+        Product.objects.filter(pk__in=[product.pk for product in products[:10]]).update(stock=5)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(inventory.reconcile_stock(), 10)
+
+        # Una lectura agrupada para comparar y otra, con el lock tomado, para corregir.
+        ledger_reads = [query for query in queries if "app_stockmovement" in query["sql"] and "SUM(" in query["sql"]]
+        self.assertEqual(len(ledger_reads), 2)
+        self.assertLessEqual(len(queries), 10)
+        self.assertEqual(set(Product.objects.filter(pk__in=[p.pk for p in products]).values_list("stock", flat=True)), {5})
+
+    def test_reconcile_stock_without_differences_writes_nothing(self):
+        """
+        Verifica que si el stock coincide con el libro no se escriba nada ni cambie la version de Product.
+        """
+        self.purchase(7)
+        version = get_versions(Product)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(inventory.reconcile_stock(), 0)
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(get_versions(Product), version)
+
+
+class NavigationTest(TestCase):
+    def test_active_link_by_prefix(self):
+        """
+        Verifica que el enlace activo sea el del prefijo mas largo de la ruta.
+        """
+        self.assertEqual(navigation.active_href("/"), "/")
+        self.assertEqual(navigation.active_href("/clientes/"), "/clientes/")
+        self.assertEqual(navigation.active_href("/clientes/5/facturas/"), "/clientes/")
+        self.assertEqual(navigation.active_href("/pets/nuevo/"), "/pets/")
+        self.assertIsNone(navigation.active_href("/clientes"))
+        self.assertIsNone(navigation.active_href("/importar/"))
+
+        active = [link["label"] for link in navigation.active_links("/turnos/nuevo/") if link["active"]]
+        self.assertEqual(active, ["Turnos"])
+
+    def test_navbar_html_is_rendered_once_per_variant(self):
+        """
+        Verifica que el HTML de la barra se reutilice entre rutas con el mismo enlace activo.
+        """
+        html = navigation.navbar_html("/products/")
+
+        self.assertIs(navigation.navbar_html("/products/stock/3/"), html)
+        self.assertIn('aria-current="page"\n                   href="/products/"', html)
+
+
+class TemplateWarmUpTest(TestCase):
+    def test_warm_up_fills_cached_loader(self):
+        """
+        Verifica que la precarga compile todas las plantillas del proyecto en el loader cached.
+        """
+        from django.template import engines
+
+        engine = engines.all()[0].engine
+        loader = engine.template_loaders[0]
+        loader.reset()
+
+        count = warm_up_templates()
+
+        names = template_names(engine)
+        self.assertEqual(count, len(names))
+        self.assertIn("base.html", names)
+        self.assertIn("partials/navbar.html", names)
+        self.assertTrue(set(names) <= {key.split("-")[0] for key in loader.get_template_cache})
+
+
+class StatsTest(TestCase):
+    def counters(self, metric):
+        return dict(
+            StatCounter.objects.filter(metric=metric, count__gt=0).values_list("key", "count"),
+        )
+
+    def test_save_paths_update_counters(self):
+        """
+        Verifica que los save_*, update_* y eliminaciones mantengan los contadores.
+        """
+        Client.save_client({"name": "Juan Sebastian Veron", "phone": "54221555232", "email": "brujita75@vetsoft.com", "city": "Berisso"})
+        Client.save_client({"name": "Maria Lopez", "phone": "54221555233", "email": "maria@vetsoft.com", "city": "Berisso"})
+        client = Client.objects.get(name="Maria Lopez")
+        self.assertEqual(self.counters("clients_by_city"), {"Berisso": 2})
+
+        client.update_client({"name": "Maria Lopez", "phone": "54221555233", "email": "maria@vetsoft.com", "city": "Ensenada"})
+        self.assertEqual(self.counters("clients_by_city"), {"Berisso": 1, "Ensenada": 1})
+
+        client.delete()
+        self.assertEqual(self.counters("clients_by_city"), {"Berisso": 1})
+
+    def test_unchanged_group_does_not_write(self):
+        """
+        Verifica que modificar un registro sin cambiar su grupo no escriba contadores.
+        """
+        medicine = Medicine.objects.create(name="Amoxicilina", descripcion="Antibiotico", dosis=5)
+        medicine = Medicine.objects.get(pk=medicine.pk)
+
+        # Solo el UPDATE y la version del modelo.
+        with self.assertNumQueries(2):
+            medicine.update_medicine({"name": "Amoxicilina 500", "descripcion": "Antibiotico", "dosis": "6"})
+        self.assertEqual(self.counters("medicines_by_dosis"), {"4-6": 1})
+
+    def test_product_value_and_deferred_fields(self):
+        """
+        Verifica el importe por tipo de producto, tambien al guardar una instancia cargada con only().
+        """
+        Product.objects.create(name="Collar", type="Accesorio", price=1500)
+        product = Product.objects.only("id", "name").get(name="Collar")
+        product.type = "Juguete"
+        product.price = 200
+        product.save()
+
+        counters = StatCounter.objects.filter(metric="products_by_type", count__gt=0)
+        self.assertEqual(list(counters.values_list("key", "count", "total")), [("Juguete", 1, 200.0)])
+
+    def test_imports_update_counters_by_batch(self):
+        """
+        Verifica que las importaciones, que usan bulk_create, actualicen los contadores.
+        """
+        import_rows("vet", [
+            {"name": f"Vet {i}", "email": f"vet{i}@vetsoft.com", "phone": "54221555232", "speciality": speciality}
+            for i, speciality in enumerate(["Clinica", "Clinica", "Cardiologia"])
+        ])
+
+        self.assertEqual(self.counters("vets_by_speciality"), {"Clinica": 2, "Cardiologia": 1})
+
+    def test_rebuild_stats_command(self):
+        """
+        Verifica que el comando recalcule los contadores desde las tablas.
+        """
+        Pet.objects.bulk_create([
+            Pet(name="Firulais", breed="Caniche", birthday="2020-01-01", weight=4),
+            Pet(name="Luna", breed="caniche", birthday="2020-01-01", weight=4),
+            Pet(name="Rocky", breed="Beagle", birthday="2020-01-01", weight=9),
+        ])
+        StatCounter.objects.create(metric="pets_by_breed", key="Persa", count=7)
+
+        out = io.StringIO()
+        call_command("rebuild_stats", stdout=out)
+
+        self.assertIn("2 contadores recalculados", out.getvalue())
+        self.assertEqual(self.counters("pets_by_breed"), {"Caniche": 2, "Beagle": 1})
+
+    @override_settings(MIGRATION_MODULES={})
+    def test_statcounter_migration_rebuilds_with_historical_models(self):
+        """
+        Verifica que la migracion que crea StatCounter calcule los contadores con los modelos de ese momento.
+        """
+        Pet.objects.bulk_create([
+            Pet(name="Firulais", breed="Caniche", birthday="2020-01-01", weight=4),
+            Pet(name="Rocky", breed="Beagle", birthday="2020-01-01", weight=9),
+        ])
+        Product.objects.bulk_create([Product(name="Collar", type="Accesorio", price=100)])
+        loader = MigrationLoader(connection)
+        migration = loader.get_migration("app", "0009_statcounter")
+        apps = loader.project_state(("app", "0009_statcounter")).apps
+
+        migration.operations[-1].code(apps, None)
+
+        self.assertEqual(StatCounter.objects.count(), 3)
+
+        self.assertEqual(self.counters("pets_by_breed"), {"Caniche": 1, "Beagle": 1})
+        self.assertEqual(StatCounter.objects.get(metric="products_by_type", key="Accesorio").total, 100)
+
+    def test_dosis_band(self):
+        """
+        Verifica los rangos de dosis de los medicamentos.
+        """
+        self.assertEqual([stats.dosis_band(d) for d in (1, 3, 4, 6, 7, 10, 11)], ["1-3", "1-3", "4-6", "4-6", "7-10", "7-10", "Mas de 10"])
+
+
+class InvoicingTest(TestCase):
+    def setUp(self):
+        self.client_record = Client.objects.create(
+            name="Juan Sebastian Veron", phone="54221555232", email="brujita75@vetsoft.com", city="La Plata",
+        )
+        self.collar = Product.objects.create(name="Collar", type="Accesorio", price=1500.5, stock=10)
+        self.shampoo = Product.objects.create(name="Shampoo", type="Higiene", price=2000, stock=1)
+        self.medicine = Medicine.objects.create(name="Meloxicam", descripcion="Antiinflamatorio", dosis=2)
+
+    def rows(self):
+        return [
+            {"item": f"product:{self.collar.id}", "quantity": "2", "unit_price": ""},
+            {"item": f"medicine:{self.medicine.id}", "quantity": "1", "unit_price": "830.25"},
+            {"item": "", "quantity": "", "unit_price": ""},
+            {"item": f"product:{self.shampoo.id}", "quantity": "1", "unit_price": "1900"},
+        ]
+
+    def test_create_invoice_stores_totals_and_sells_stock(self):
+        """
+        Verifica que la factura guarde su total y lineas y descuente el stock de los productos.
+        """
+        invoice, errors = invoicing.create_invoice(self.client_record.id, self.rows())
+
+        self.assertEqual(errors, {})
+        self.assertEqual(invoice.total, Decimal("5731.25"))
+        self.assertEqual(invoice.line_count, 3)
+        self.assertEqual(
+            list(invoice.lines.order_by("id").values_list("description", "quantity", "total")),
+            [("Collar", 2, Decimal("3001.00")), ("Meloxicam", 1, Decimal("830.25")), ("Shampoo", 1, Decimal("1900.00"))],
+        )
+        self.assertEqual(dict(Product.objects.values_list("name", "stock")), {"Collar": 8, "Shampoo": 0})
+        self.assertEqual(StockMovement.objects.filter(note=str(invoice)).count(), 2)
+
+    def test_lines_are_written_in_one_insert(self):
+        """
+        Verifica que todas las lineas se inserten con una sola consulta.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            invoicing.create_invoice(self.client_record.id, self.rows())
+
+        inserts = [query["sql"] for query in queries if query["sql"].startswith('INSERT INTO "app_invoiceline"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_insufficient_stock_rolls_back_invoice(self):
+        """
+        Verifica que si falta stock no se guarde la factura ni se descuente nada.
+        """
+        rows = self.rows()
+        rows[3]["quantity"] = "2"
+
+        invoice, errors = invoicing.create_invoice(self.client_record.id, rows)
+
+        self.assertIsNone(invoice)
+        self.assertEqual(errors, {"lines": ["Shampoo: No hay stock suficiente"]})
+        self.assertFalse(Invoice.objects.exists())
+        self.assertFalse(InvoiceLine.objects.exists())
+        self.assertFalse(DailySales.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.collar.id).stock, 10)
+
+    def test_invalid_lines(self):
+        """
+        Verifica los errores de cliente y de cada linea.
+        """
+        invoice, errors = invoicing.create_invoice(None, [
+            {"item": "product:999", "quantity": "1", "unit_price": ""},
+            {"item": f"medicine:{self.medicine.id}", "quantity": "1", "unit_price": ""},
+            {"item": f"product:{self.collar.id}", "quantity": "0", "unit_price": ""},
+        ])
+
+        self.assertIsNone(invoice)
+        self.assertEqual(errors["client"], "Por favor seleccione un cliente")
+        self.assertEqual(errors["lines"], [
+            "Linea 2: Ingrese el precio unitario del medicamento",
+            "Linea 3: La cantidad debe ser mayor que cero",
+            "Linea 1: El producto o medicamento no existe",
+        ])
+        _, errors = invoicing.create_invoice(self.client_record.id, [])
+        self.assertEqual(errors, {"lines": ["Agregue al menos una linea"]})
+
+    def test_daily_sales_are_incremented(self):
+        """
+        Verifica que el resumen del dia acumule las facturas sin recalcularlas.
+        """
+        invoicing.create_invoice(self.client_record.id, self.rows()[:2])
+        invoicing.create_invoice(self.client_record.id, self.rows()[:1])
+
+        summary = DailySales.objects.get()
+        self.assertEqual(summary.invoices, 2)
+        self.assertEqual(summary.lines, 3)
+        self.assertEqual(summary.total, Decimal("6832.25"))
+        self.assertEqual(list(invoicing.sales_summary()), [summary])
+
+    def test_deleting_the_client_keeps_its_invoices(self):
+        """
+        Verifica que al eliminar un cliente sus facturas se conserven y sigan sumando lo mismo que DailySales.
+        """
+        invoice, _ = invoicing.create_invoice(self.client_record.id, self.rows()[:2])
+        invoicing.create_invoice(self.client_record.id, self.rows()[:1])
+
+        self.client_record.delete()
+
+        invoice.refresh_from_db()
+        self.assertIsNone(invoice.client_id)
+        self.assertEqual(invoice.client_name, "Juan Sebastian Veron")
+        summary = DailySales.objects.get()
+        self.assertEqual(Invoice.objects.count(), summary.invoices)
+        self.assertEqual(InvoiceLine.objects.count(), summary.lines)
+        self.assertEqual(sum(Invoice.objects.values_list("total", flat=True)), summary.total)
+
+    def test_client_invoices_is_one_query(self):
+        """
+        Verifica que las ultimas facturas de un cliente se lean con una consulta sin importar sus lineas.
+        """
+        for _ in range(3):
+            invoicing.create_invoice(self.client_record.id, self.rows()[:2])
+
+        with self.assertNumQueries(1):
+            invoices = list(invoicing.client_invoices(self.client_record.id))
+            totals = [(invoice.line_count, invoice.total) for invoice in invoices]
+        self.assertEqual(totals, [(2, Decimal("3831.25"))] * 3)
+
+
+class SchedulingTest(TestCase):
+    # Lunes 7 de enero de 2030, en UTC (TIME_ZONE).
+    MONDAY = datetime(2030, 1, 7, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        """
+        Crea dos cardiologos, un clinico y una mascota.
+        """
+        self.vet = Vet.objects.create(name="Ana", email="ana@vetsoft.com", phone="54221", speciality="Cardiologia")
+        self.other = Vet.objects.create(name="Beto", email="beto@vetsoft.com", phone="54222", speciality="Cardiologia")
+        self.clinic = Vet.objects.create(name="Carla", email="carla@vetsoft.com", phone="54223", speciality="Clinica")
+        self.pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday="2020-01-01", weight=4)
+
+    def at(self, hour, minute=0, days=0):
+        """
+        Devuelve el horario indicado del lunes de prueba (o de `days` dias despues).
+        """
+        return self.MONDAY + timedelta(days=days, hours=hour, minutes=minute)
+
+    def book(self, vet, start, end):
+        """
+        Reserva un turno y verifica que no haya errores.
+        """
+        appointment, errors = scheduling.book_appointment(vet.id, self.pet.id, start, end)
+        self.assertEqual(errors, {})
+        return appointment
+
+    def test_overlapping_bookings_are_rejected(self):
+        """
+        Verifica que no se reserven turnos superpuestos y si contiguos o de otro veterinario.
+        """
+        self.book(self.vet, self.at(10), self.at(10, 30))
+
+        appointment, errors = scheduling.book_appointment(self.vet.id, self.pet.id, self.at(10, 15), self.at(10, 45))
+        self.assertIsNone(appointment)
+        self.assertEqual(errors, {"start": "El veterinario ya tiene un turno en ese horario"})
+
+        self.book(self.vet, self.at(10, 30), self.at(11))
+        self.book(self.other, self.at(10, 15), self.at(10, 45))
+        self.assertEqual(Appointment.objects.count(), 3)
+
+    def test_long_appointments_are_found_as_overlapping(self):
+        """
+        Verifica que se detecte la superposicion con un turno que empezo hasta la duracion maxima antes.
+        """
+        self.book(self.vet, self.at(9), self.at(13))
+        self.assertEqual(
+            scheduling.validate_appointment(self.vet.id, self.at(12, 30), self.at(13)),
+            {"start": "El veterinario ya tiene un turno en ese horario"},
+        )
+
+    def test_invalid_appointments(self):
+        """
+        Verifica que se rechacen turnos invertidos, demasiado largos o fuera del horario de atencion.
+        """
+        self.assertIn("end", scheduling.validate_appointment(self.vet.id, self.at(11), self.at(10)))
+        self.assertIn("end", scheduling.validate_appointment(self.vet.id, self.at(9), self.at(14)))
+        self.assertIn("start", scheduling.validate_appointment(self.vet.id, self.at(8), self.at(9)))
+        self.assertIn("start", scheduling.validate_appointment(self.vet.id, self.at(17, 30), self.at(18, 30)))
+        # Domingo.
+        self.assertIn("start", scheduling.validate_appointment(self.vet.id, self.at(10, days=6), self.at(11, days=6)))
+
+    def test_merge_intervals(self):
+        """
+        Verifica que se unan los intervalos que se superponen o se tocan.
+        """
+        self.assertEqual(
+            scheduling.merge_intervals([(1, 3), (2, 4), (4, 5), (7, 8), (7, 7)]),
+            [[1, 5], [7, 8]],
+        )
+
+    def test_free_slots_skip_busy_intervals(self):
+        """
+        Verifica que los horarios libres salteen los ocupados respetando la grilla y la duracion.
+        """
+        self.book(self.vet, self.at(9), self.at(10))
+        self.book(self.vet, self.at(10, 30), self.at(11, 15))
+
+        slots = scheduling.free_slots([self.vet.id], count=3, after=self.at(8))
+        self.assertEqual([slot.start for slot in slots], [self.at(10), self.at(11, 30), self.at(12)])
+
+        slots = scheduling.free_slots([self.vet.id], count=2, duration=timedelta(hours=1), after=self.at(8))
+        self.assertEqual([slot.start for slot in slots], [self.at(11, 30), self.at(12)])
+
+    def test_free_slots_start_after_given_time_and_skip_closed_days(self):
+        """
+        Verifica que la busqueda empiece en el proximo horario de la grilla y saltee el domingo.
+        """
+        slots = scheduling.free_slots([self.vet.id], count=1, after=self.at(9, 10))
+        self.assertEqual(slots[0].start, self.at(9, 30))
+
+        slots = scheduling.free_slots([self.vet.id], count=1, after=self.at(18, days=5))
+        self.assertEqual(slots[0].start, self.at(9, days=7))
+
+    def test_free_slots_for_speciality_merge_vets(self):
+        """
+        Verifica que por especialidad se combinen los horarios de sus veterinarios en orden.
+        """
+        self.book(self.vet, self.at(9), self.at(9, 30))
+
+        slots = scheduling.free_slots_for_speciality("Cardiologia", count=3, after=self.at(8))
+
+        self.assertEqual(
+            [(slot.vet_id, slot.start) for slot in slots],
+            [(self.other.id, self.at(9)), (self.vet.id, self.at(9, 30)), (self.other.id, self.at(9, 30))],
+        )
+
+    def test_free_slots_read_one_window_per_query(self):
+        """
+        Verifica que se haga una consulta por ventana de dias, sin importar la cantidad de turnos.
+        """
+        Appointment.objects.bulk_create(
+            Appointment(vet=self.vet, pet=self.pet, start=self.at(9, days=day), end=self.at(18, days=day))
+            for day in range(14)
+        )
+
+        with self.assertNumQueries(1):
+            scheduling.free_slots([self.vet.id, self.other.id], count=5, after=self.at(8))
+        # Las primeras dos semanas estan ocupadas: se leen ventanas de 1, 2, 4 y 8 dias.
+        with self.assertNumQueries(4):
+            slots = scheduling.free_slots([self.vet.id], count=1, after=self.at(8))
+        self.assertEqual(slots[0].start, self.at(9, days=14))
+
+
+class TimedTestRunnerTest(TestCase):
+    class Sample(unittest.TestCase):
+        def test_fast(self):
+            pass
+
+        def test_slow(self):
+            pass
+
+    def run_sample(self, **kwargs):
+        suite = unittest.TestLoader().loadTestsFromTestCase(self.Sample)
+        runner = unittest.TextTestRunner(stream=io.StringIO(), resultclass=TimedTestResult)
+        return runner.run(suite)
+
+    def test_result_records_each_test_duration(self):
+        """
+        Verifica que el resultado guarde la duracion de cada prueba con su id.
+        """
+        result = self.run_sample()
+
+        self.assertEqual(
+            sorted(test_id.rsplit(".", 1)[1] for _, test_id in result.timings),
+            ["test_fast", "test_slow"],
+        )
+        self.assertTrue(all(elapsed >= 0 for elapsed, _ in result.timings))
+
+    def test_slowest_lists_the_slowest_tests_first(self):
+        """
+        Verifica que el informe liste las pruebas de la mas lenta a la mas rapida, hasta la cantidad pedida.
+        """
+        timings = [(0.5, "a"), (2.0, "b"), (0.01, "c")]
+
+        self.assertEqual(slowest(timings, 2), ["   2.000s b", "   0.500s a"])
+        self.assertEqual(slowest(timings, 0), [])
+
+    def test_runner_is_parallel_by_default(self):
+        """
+        Verifica que sin --parallel el runner use un proceso por nucleo.
+        """
+        parser = argparse.ArgumentParser()
+        TimedTestRunner.add_arguments(parser)
+
+        self.assertEqual(parser.parse_args([]).parallel, "auto")
+        self.assertEqual(parser.parse_args(["--parallel", "1"]).parallel, 1)
+        self.assertEqual(parser.parse_args(["--slowest", "5"]).slowest, 5)
+
+
+class ClientMatchingTest(TestCase):
+    def make_client(self, name, phone="54221555232", email=None):
+        return Client.objects.create(
+            name=name, phone=phone, email=email or f"{name.split()[0].lower()}@vetsoft.com", city="La Plata",
+        )
+
+    def test_phonetic_key_matches_spanish_spellings(self):
+        """
+        Verifica que el codigo fonetico iguale las grafias que suenan igual en español.
+        """
+        for names in (
+            ("Gonzalez", "Gonsales", "González"),
+            ("Jimenez", "Gimenez", "Ximenez"),
+            ("Vaca", "Baca"),
+            ("Guillermo", "Guiyermo"),
+            ("Hernandez", "Ernandez"),
+            ("Juan Perez", "Perez Juan"),
+        ):
+            self.assertEqual(len({matching.phonetic_key(name) for name in names}), 1, names)
+        self.assertNotEqual(matching.phonetic_key("Gomez"), matching.phonetic_key("Gonzalez"))
+
+    def test_phone_and_email_keys_are_normalized(self):
+        """
+        Verifica que el telefono pierda el 54 y el 9 de celular, y el email sus puntos y sufijo.
+        """
+        self.assertEqual(matching.phone_key(54221555232), "221555232")
+        self.assertEqual(matching.phone_key("549221555232"), "221555232")
+        self.assertEqual(matching.email_key("Juan.Perez+turnos@vetsoft.com"), "juanperez")
+
+    def test_keys_are_stored_on_save_and_import(self):
+        """
+        Verifica que las claves se guarden al crear un cliente, al modificarlo y al importarlo.
+        """
+        client = self.make_client("Juan Gonzalez")
+        self.assertEqual(
+            Client.objects.values_list(*matching.MATCH_KEY_FIELDS).get(pk=client.pk),
+            ("gonsales juan", "221555232", "juan"),
+        )
+
+        client.name = "Juan Gimenez"
+        client.save(update_fields=["name"])
+        self.assertEqual(Client.objects.get(pk=client.pk).name_key, "jimenes juan")
+
+        import_rows("client", [{"name": "Ana Vaca", "phone": "54221000111", "email": "ana@vetsoft.com", "city": "Berisso"}])
+        self.assertEqual(Client.objects.get(name="Ana Vaca").name_key, "ana baka")
+
+    def test_score_weighs_name_phone_and_email(self):
+        """
+        Verifica que el nombre solo no alcance y que el nombre con el telefono si.
+        """
+        def row(name, phone, email):
+            return {"name": name, **matching.match_keys(name, phone, email)}
+
+        juan = row("Juan Gonzalez", "54221555232", "juan@vetsoft.com")
+
+        self.assertEqual(matching.score(juan, row("Juan Gonsales", "54221555232", "jg@vetsoft.com")), 0.75)
+        self.assertEqual(matching.score(juan, row("Juan Gonsales", "54221999999", "jg@vetsoft.com")), 0.5)
+        self.assertEqual(matching.score(juan, row("Juan Gonsales", "549221555232", "juan@vetsoft.com")), 1.0)
+
+    def test_find_duplicates_groups_only_similar_clients(self):
+        """
+        Verifica que se agrupen los duplicados, incluso transitivos, y no los que solo comparten telefono.
+        """
+        first = self.make_client("Juan Gonzalez", email="juan@vetsoft.com")
+        second = self.make_client("Juan Gonsales", email="jgonzalez@vetsoft.com")
+        third = self.make_client("Juan Gonzales", phone="54221999999", email="jgonzalez@vetsoft.com")
+        self.make_client("Maria Lopez", email="maria@vetsoft.com")
+        self.make_client("Pedro Ruiz", phone="54221777777")
+
+        groups = dedup.find_duplicates()
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual([client["id"] for client in groups[0].clients], [first.id, second.id, third.id])
+        self.assertEqual(groups[0].score, 0.75)
+
+    def test_find_duplicates_skips_oversized_blocks(self):
+        """
+        Verifica que los bloques mas grandes que el maximo no se comparen.
+        """
+        self.make_client("Juan Gonzalez")
+        self.make_client("Juan Gonsales")
+
+        self.assertEqual(len(dedup.find_duplicates()), 1)
+        with self.assertNumQueries(3):
+            self.assertEqual(dedup.find_duplicates(max_block_size=1), [])
+
+    def test_merge_moves_pets_and_invoices(self):
+        """
+        Verifica que al fusionar, las mascotas y facturas pasen al cliente que se conserva.
+        """
+        kept = self.make_client("Juan Gonzalez")
+        duplicate = self.make_client("Juan Gonsales")
+        pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday=datetime(2020, 1, 2).date(), weight=4, owner=duplicate)
+        invoice = Invoice.objects.create(client=duplicate, date=pet.birthday, total=0, line_count=0)
+
+        self.assertEqual(dedup.merge_clients(kept.id, [kept.id, duplicate.id]), 1)
+
+        self.assertEqual(list(Client.objects.values_list("id", flat=True)), [kept.id])
+        pet.refresh_from_db()
+        invoice.refresh_from_db()
+        self.assertEqual((pet.owner_id, invoice.client_id), (kept.id, kept.id))
+        self.assertEqual(StatCounter.objects.get(metric="clients_by_city", key="La Plata").count, 1)
+
+    def test_save_client_rejects_similar_client_unless_allowed(self):
+        """
+        Verifica que save_client avise de un cliente parecido y lo guarde si se confirma.
+        """
+        self.make_client("Juan Gonzalez", email="juan@vetsoft.com")
+        data = {"name": "Juan Gonsales", "phone": "54221555232", "email": "juan.g@vetsoft.com", "city": "Ensenada"}
+
+        with self.assertNumQueries(1):
+            saved, errors = Client.save_client(data)
+
+        self.assertFalse(saved)
+        self.assertIn("Juan Gonzalez", errors["duplicate"])
+        self.assertEqual(Client.save_client({**data, "allow_duplicate": "1"}), (True, None))
+        self.assertEqual(Client.objects.count(), 2)
+
+    def test_duplicate_errors_checks_a_batch_like_save_client(self):
+        """
+        Verifica que el control de un lote compare con la base y con las filas anteriores, en una consulta.
+        """
+        self.make_client("Juan Gonzalez", email="juan@vetsoft.com")
+        rows = [
+            {"name": "Juan Gonsales", "phone": "54221555232", "email": "juan.g@vetsoft.com"},
+            {"name": "Juan Gonsales", "phone": "54221555232", "email": "juan.g@vetsoft.com", "allow_duplicate": "1"},
+            {"name": "Maria Lopez", "phone": "54221999999", "email": "maria@vetsoft.com"},
+            {"name": "Maria Lopes", "phone": "54221999999", "email": "mlopez@vetsoft.com"},
+        ]
+
+        with self.assertNumQueries(1):
+            errors = Client.duplicate_errors(rows)
+
+        self.assertIn("Juan Gonzalez", errors[0]["duplicate"])
+        self.assertIsNone(errors[1])
+        self.assertIsNone(errors[2])
+        self.assertIn("Maria Lopez", errors[3]["duplicate"])
+        saved, save_errors = Client.save_client({**rows[0], "city": "Ensenada"})
+        self.assertEqual(errors[0], save_errors)
+
+    def test_find_duplicates_command_lists_and_merges(self):
+        """
+        Verifica que el comando liste los grupos y con --merge los fusione.
+        """
+        self.make_client("Juan Gonzalez")
+        self.make_client("Juan Gonsales")
+        out = io.StringIO()
+
+        call_command("find_duplicates", stdout=out)
+
+        self.assertIn("Juan Gonsales", out.getvalue())
+        self.assertIn("1 grupos de clientes duplicados", out.getvalue())
+
+        call_command("find_duplicates", "--merge", stdout=io.StringIO())
+        self.assertEqual(list(Client.objects.values_list("name", flat=True)), ["Juan Gonzalez"])
+
+
+class PetWeightTest(TestCase):
+    def setUp(self):
+        self.pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday=datetime(2020, 1, 2).date(), weight=4)
+
+    def weigh(self, pet, day, kg):
+        return PetWeight.objects.create(pet=pet, measured_at=datetime(2024, 1, 1, tzinfo=dt_timezone.utc) + timedelta(days=day), weight=kg)
+
+    def test_weighing_is_recorded_on_create_and_weight_change(self):
+        """
+        Verifica que se agregue un pesaje al crear la mascota y al cambiar su peso, pero no en otros cambios.
+        """
+        self.assertEqual(list(self.pet.weighings.values_list("weight", flat=True)), [Decimal("4")])
+
+        pet = Pet.objects.get(pk=self.pet.pk)
+        pet.name = "Firu"
+        pet.save()
+        self.assertEqual(pet.weighings.count(), 1)
+
+        pet.weight = Decimal("4.5")
+        pet.save()
+        pet.save()
+        self.assertEqual(sorted(pet.weighings.values_list("weight", flat=True)), [Decimal("4"), Decimal("4.5")])
+
+    def test_add_weighings_updates_current_weight(self):
+        """
+        Verifica que agregar pesajes deje en la mascota el peso del mas reciente, aunque lleguen desordenados.
+        """
+        created, errors = weights.add_weighings(self.pet.id, [
+            {"weight": "6.2", "measured_at": "2030-03-01T10:00:00"},
+            {"weight": "5.9", "measured_at": "2030-02-01T10:00:00"},
+        ])
+
+        self.assertEqual((created, errors), (2, {}))
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.weight, Decimal("6.2"))
+
+    def test_add_weighings_rejects_invalid_rows(self):
+        """
+        Verifica que si un pesaje es invalido no se guarde ninguno.
+        """
+        created, errors = weights.add_weighings(self.pet.id, [
+            {"weight": "6.2"},
+            {"weight": "-1"},
+            {"weight": "3", "measured_at": "ayer"},
+        ])
+
+        self.assertEqual(created, 0)
+        self.assertEqual(errors, {
+            1: {"weight": "El peso debe ser mayor que 0"},
+            2: {"measured_at": "Por favor ingrese una fecha y hora ISO 8601"},
+        })
+        self.assertEqual(self.pet.weighings.count(), 1)
+        self.assertEqual(weights.add_weighings(999, [{"weight": "1"}]), (0, {"pet": "No existe la mascota 999"}))
+
+    def test_add_weighings_rejects_values_that_cannot_be_stored(self):
+        """
+        Verifica que true, nan y los pesos que no entran en PetWeight.weight sean errores de la fila.
+        """
+        created, errors = weights.add_weighings(self.pet.id, [
+            {"weight": True},
+            {"weight": "nan"},
+            {"weight": 10**30},
+            {"weight": [5]},
+        ])
+
+        self.assertEqual(created, 0)
+        self.assertEqual(errors, {
+            0: {"weight": "Por favor ingrese un peso valido"},
+            1: {"weight": "Por favor ingrese un peso valido"},
+            2: {"weight": "El peso no puede superar los 99999 kg"},
+            3: {"weight": "Por favor ingrese un peso valido"},
+        })
+        self.assertEqual(self.pet.weighings.count(), 1)
+
+    def test_series_in_chronological_order(self):
+        """
+        Verifica que la serie devuelva segundos Unix y kilos ordenados por fecha.
+        """
+        PetWeight.objects.all().delete()
+        self.weigh(self.pet, 2, "5.5")
+        self.weigh(self.pet, 0, "5")
+
+        start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+        points = weights.series(self.pet.id)
+
+        self.assertEqual([round(x) for x, _ in points], [round(start), round(start + 2 * 86400)])
+        self.assertEqual([kg for _, kg in points], [5.0, 5.5])
+
+    def test_lttb_keeps_ends_and_peaks(self):
+        """
+        Verifica que LTTB devuelva la cantidad pedida conservando los extremos y un pico aislado.
+        """
+        points = [(x, 1.0) for x in range(1000)]
+        points[500] = (500, 50.0)
+
+        sampled = weights.lttb(points, 20)
+
+        self.assertEqual(len(sampled), 20)
+        self.assertEqual((sampled[0], sampled[-1]), (points[0], points[-1]))
+        self.assertIn((500, 50.0), sampled)
+        self.assertEqual(weights.lttb(points[:10], 20), points[:10])
+
+    def test_min_max_keeps_extremes_of_each_bucket(self):
+        """
+        Verifica que min_max conserve el minimo y el maximo de cada tramo en orden.
+        """
+        points = [(x, float(x % 7)) for x in range(100)]
+
+        sampled = weights.min_max(points, 10)
+
+        self.assertLessEqual(len(sampled), 10)
+        self.assertEqual(sampled, sorted(sampled))
+        self.assertEqual({y for _, y in sampled}, {0.0, 6.0})
+
+    def test_growth_rates_and_summary(self):
+        """
+        Verifica la pendiente mensual de cada mascota y que se omitan las que tienen un solo pesaje.
+        """
+        PetWeight.objects.all().delete()
+        other = Pet.objects.create(name="Luna", breed="Beagle", birthday=datetime(2021, 5, 1).date(), weight=7)
+        PetWeight.objects.all().delete()
+        for day in range(0, 90, 15):
+            self.weigh(self.pet, day, 4 + day / 30)
+            self.weigh(other, day, 7 - day / 60)
+        single = Pet.objects.create(name="Rex", breed="Beagle", birthday=datetime(2021, 5, 1).date(), weight=3)
+
+        rates = weights.growth_rates(use_numpy=False)
+
+        self.assertEqual(set(rates), {self.pet.id, other.id})
+        self.assertNotIn(single.id, rates)
+        self.assertAlmostEqual(rates[self.pet.id], 1.0, places=3)
+        self.assertAlmostEqual(rates[other.id], -0.5, places=3)
+
+        summary = weights.growth_summary(rates)
+        self.assertEqual(summary["pets"], 2)
+        self.assertEqual(summary["kg_per_month"]["mean"], 0.25)
+        self.assertEqual(summary["kg_per_month"]["p90"], 0.85)
+        self.assertEqual(weights.growth_summary({}), {"pets": 0, "kg_per_month": None})
+
+    @unittest.skipIf(weights.numpy is None, "NumPy no esta instalado")
+    def test_growth_rates_numpy_matches_python(self):
+        """
+        Verifica que la version vectorizada con NumPy calcule las mismas tasas que la version en Python.
+        """
+        rng = random.Random(7)
+        for index in range(20):
+            pet = Pet.objects.create(name=f"Mascota {index}", breed="Beagle", birthday=datetime(2021, 5, 1).date(), weight=5)
+            for day in rng.sample(range(365), rng.randint(1, 8)):
+                self.weigh(pet, day, round(rng.uniform(1, 40), 3))
+
+        python_rates = weights.growth_rates(use_numpy=False)
+        numpy_rates = weights.growth_rates()
+
+        self.assertEqual(python_rates.keys(), numpy_rates.keys())
+        for pet_id, rate in python_rates.items():
+            self.assertAlmostEqual(numpy_rates[pet_id], rate, places=6)
+
+
+class DosingTest(TestCase):
+    def setUp(self):
+        dosing.dose_cache.clear()
+        self.medicine = Medicine.objects.create(name="Meloxicam", descripcion="Antiinflamatorio", dosis=1)
+        self.rule = DosingRule.objects.create(
+            medicine=self.medicine, mg_per_kg=Decimal("2"), min_mg=Decimal("1"), max_mg=Decimal("40"), step_mg=Decimal("0.5"),
+        )
+
+    def test_dose_rounds_and_clamps(self):
+        """
+        Verifica que la dosis se redondee al paso indicado y quede entre el minimo y el maximo.
+        """
+        self.assertEqual(dosing.doses(self.rule, [4.13, 0.2, 30, 12.26], use_numpy=False), [8.0, 1.0, 40.0, 24.5])
+
+    def test_dose_for_pet(self):
+        """
+        Verifica la dosis de una mascota segun su peso actual.
+        """
+        pet = Pet.objects.create(name="Firulais", breed="Caniche", birthday=datetime(2020, 1, 2).date(), weight=Decimal("5.3"))
+
+        self.assertEqual(dosing.dose_for_pet(self.rule, pet), 10.5)
+
+    def test_batch_reuses_cached_buckets(self):
+        """
+        Verifica que un lote calcule una vez cada franja de peso y reutilice la cache en las llamadas siguientes.
+        """
+        dosing.doses(self.rule, [4.01, 4.02, 4.04, 7.5])
+        self.assertEqual(len(dosing.dose_cache), 2)
+        self.assertEqual(dosing.dose_cache.misses, 2)
+
+        dosing.doses(self.rule, [7.5, 4.0])
+        self.assertEqual(dosing.dose_cache.hits, 2)
+
+        self.rule.mg_per_kg = Decimal("3")
+        self.assertEqual(dosing.doses(self.rule, [4.0]), [12.0])
+        self.assertEqual(len(dosing.dose_cache), 3)
+
+    def test_lru_cache_evicts_least_recently_used(self):
+        """
+        Verifica que al llenarse la cache se descarte la entrada usada hace mas tiempo.
+        """
+        cache = dosing.LRUCache(2)
+        cache.set_many({"a": 1, "b": 2})
+        cache.get_many(["a"])
+        cache.set_many({"c": 3})
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+
+    @unittest.skipIf(dosing.numpy is None, "NumPy no esta instalado")
+    def test_numpy_matches_python(self):
+        """
+        Verifica que el calculo vectorizado con NumPy devuelva las mismas dosis que la version en Python.
+        """
+        rng = random.Random(3)
+        kilos = [round(rng.uniform(0.1, 60), 3) for _ in range(2000)]
+
+        python_doses = dosing.doses(self.rule, kilos, use_numpy=False)
+        dosing.dose_cache.clear()
+
+        self.assertEqual(dosing.doses(self.rule, kilos), python_doses)
+
+    def test_pet_doses_with_one_query(self):
+        """
+        Verifica que las dosis de un grupo de mascotas se calculen leyendo los pesos con una sola consulta.
+        """
+        pets = [
+            Pet.objects.create(name=f"Mascota {index}", breed="Beagle", birthday=datetime(2021, 5, 1).date(), weight=index + 1)
+            for index in range(3)
+        ]
+
+        with self.assertNumQueries(1):
+            result = dosing.pet_doses(self.rule, [pet.id for pet in pets] + [999, 10**30])
+
+        self.assertEqual([(pet["id"], pet["dose"]) for pet in result], [(pets[0].id, 2.0), (pets[1].id, 4.0), (pets[2].id, 6.0)])
+
+    def test_save_rule_validates_limits(self):
+        """
+        Verifica la validacion de la regla y que guardarla reemplace la anterior.
+        """
+        rule, errors = dosing.save_rule(self.medicine, {"mg_per_kg": "0", "step_mg": "", "min_mg": "5", "max_mg": "2"})
+        self.assertIsNone(rule)
+        self.assertEqual(errors, {"mg_per_kg": "La dosis por kg debe ser mayor que 0", "step_mg": "Por favor ingrese el redondeo de la dosis"})
+
+        rule, errors = dosing.save_rule(self.medicine, {"mg_per_kg": "1", "step_mg": "1", "min_mg": "5", "max_mg": "2"})
+        self.assertEqual(errors, {"max_mg": "El maximo no puede ser menor que el minimo"})
+
+        rule, errors = dosing.save_rule(self.medicine, {"mg_per_kg": "1.5", "step_mg": "0.25", "min_mg": "", "max_mg": "10"})
+        self.assertEqual(errors, {})
+        self.assertEqual(DosingRule.objects.get(), rule)
+        self.assertEqual((rule.mg_per_kg, rule.min_mg, rule.max_mg), (Decimal("1.5"), None, Decimal("10")))
+
+    def test_save_rule_writes_the_version_first(self):
+        """
+        Verifica que guardar una regla escriba la version antes de leerla, para tomar el lock de escritura.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            dosing.save_rule(self.medicine, {"mg_per_kg": "2", "step_mg": "0.5"})
+
+        statements = [query["sql"] for query in queries if "SAVEPOINT" not in query["sql"]]
+        self.assertTrue(statements[0].startswith('INSERT INTO "app_modelversion"'))
+        self.assertEqual(DosingRule.objects.get().mg_per_kg, Decimal("2"))
+
+
+class PurchasingTest(TestCase):
+    def setUp(self):
+        self.cheap = Provider.objects.create(name="Barato", email="barato@vetsoft.com")
+        self.fast = Provider.objects.create(name="Rapido", email="rapido@vetsoft.com")
+        self.product = Product.objects.create(name="Alimento", type="Comida", price=100)
+
+    def offer(self, provider, price, valid_from, lead_time=0, product=None):
+        return ProviderOffer.objects.create(
+            provider=provider, product=product or self.product, unit_price=price,
+            lead_time_days=lead_time, valid_from=valid_from,
+        )
+
+    def test_newer_offer_replaces_older_one_of_same_provider(self):
+        """
+        Verifica que solo cuente la oferta mas reciente ya vigente de cada proveedor.
+        """
+        self.offer(self.cheap, 50, datetime(2024, 1, 1).date())
+        self.offer(self.cheap, 90, datetime(2024, 6, 1).date())
+        self.offer(self.fast, 70, datetime(2024, 3, 1).date())
+        self.offer(self.fast, 10, datetime(2099, 1, 1).date())
+
+        best = purchasing.best_offers(on=datetime(2024, 7, 1).date())[self.product.id]
+        self.assertEqual((best.provider, best.unit_price, best.offers, best.highest_price), (self.fast, 70, 2, 90))
+
+        best = purchasing.best_offers(on=datetime(2024, 2, 1).date())[self.product.id]
+        self.assertEqual((best.provider, best.unit_price, best.offers), (self.cheap, 50, 1))
+
+    def test_same_price_prefers_shorter_lead_time(self):
+        """
+        Verifica que a igual precio gane la oferta con menor demora de entrega.
+        """
+        self.offer(self.cheap, 60, datetime(2024, 1, 1).date(), lead_time=10)
+        self.offer(self.fast, 60, datetime(2024, 1, 1).date(), lead_time=2)
+
+        self.assertEqual(purchasing.best_offers()[self.product.id].provider, self.fast)
+
+    def test_comparison_queries_do_not_grow_with_products(self):
+        """
+        Verifica que la comparacion de todos los productos haga dos consultas, sin importar cuantos haya.
+        """
+        for index in range(30):
+            product = Product.objects.create(name=f"Producto {index}", type="Comida", price=10)
+            self.offer(self.cheap, 5 + index, datetime(2024, 1, 1).date(), product=product)
+            self.offer(self.fast, 20, datetime(2024, 1, 1).date(), product=product)
+
+        with self.assertNumQueries(2):
+            rows = purchasing.comparison()
+            providers = [row["offer"].provider.name for row in rows if row["offer"]]
+
+        self.assertEqual(len(rows), 31)
+        self.assertIsNone(rows[0]["offer"])
+        # Hasta el precio 20 empatan y gana la oferta mas antigua.
+        self.assertEqual(providers.count("Barato"), 16)
+        self.assertEqual(rows[1]["saving"], 15)
+
+    def test_add_offer_validates_and_checks_references(self):
+        """
+        Verifica la validacion de una oferta y que el proveedor exista.
+        """
+        data = {"provider": self.cheap.id, "product": self.product.id, "unit_price": "12.5", "lead_time_days": "3", "valid_from": "2024-05-01"}
+
+        offer, errors = purchasing.add_offer({**data, "unit_price": "0", "valid_from": "mayo"})
+        self.assertIsNone(offer)
+        self.assertEqual(errors, {
+            "unit_price": "El precio unitario debe ser mayor que cero",
+            "valid_from": "Por favor ingrese una fecha valida (AAAA-MM-DD)",
+        })
+
+        self.assertEqual(purchasing.add_offer({**data, "provider": 999}), (None, {"provider": "No existe el registro 999"}))
+
+        offer, errors = purchasing.add_offer(data)
+        self.assertEqual(errors, {})
+        self.assertEqual(ProviderOffer.objects.get(), offer)
+
+    def test_import_offers(self):
+        """
+        Verifica que las ofertas se puedan importar por lotes.
+        """
+        rows = [
+            {"provider": str(self.cheap.id), "product": str(self.product.id), "unit_price": "8", "lead_time_days": "1", "valid_from": "2024-01-01"},
+            {"provider": str(self.fast.id), "product": "999", "unit_price": "8", "lead_time_days": "1", "valid_from": "2024-01-01"},
+        ]
+
+        result = import_rows("offer", rows)
+
+        self.assertEqual((result.created, result.rejected), (1, 1))
+        self.assertEqual(purchasing.best_offers()[self.product.id].provider, self.cheap)
@@ -1,6 +1,8 @@
 from django.urls import path
 
 from . import views
+from .api import API_RESOURCES, api_view
+from .models import Client, DosingRule, Medicine, Pet, PetWeight, Product, Provider, Vet
 
 urlpatterns = [
     path("", view=views.home, name="home"),
@@ -8,24 +10,61 @@ urlpatterns = [
     path("clientes/nuevo/", view=views.clients_form, name="clients_form"),
     path("clientes/editar/<int:id>/", view=views.clients_form, name="clients_edit"),
     path("clientes/eliminar/", view=views.clients_delete, name="clients_delete"),
+    path("clientes/acciones/", view=views.bulk_action, kwargs={"model": Client, "repository": "clients_repo"}, name="clients_bulk"),
+    path("clientes/exportar/", view=views.export_records, kwargs={"model": Client, "filename": "clientes"}, name="clients_export"),
     path("pets/", view=views.pets_repository, name="pets_repo"),
     path("pets/nuevo/", view=views.pets_form, name="pets_form"),
     path("pets/editar/<int:id>/", view=views.pets_form, name="pets_edit"),
     path("pets/eliminar/", view=views.pets_delete, name="pets_delete"),
+    path("pets/acciones/", view=views.bulk_action, kwargs={"model": Pet, "repository": "pets_repo"}, name="pets_bulk"),
+    path("pets/exportar/", view=views.export_records, kwargs={"model": Pet, "filename": "mascotas"}, name="pets_export"),
     path("medicines/", view=views.medicines_repository, name="medicines_repo"),
     path("medicines/nuevo/", view=views.medicines_form, name="medicines_form"),
     path("medicines/editar/<int:id>/", view=views.medicines_form, name="medicines_edit"),
     path("medicines/eliminar/", view=views.medicines_delete, name="medicines_delete"),
+    path("medicines/acciones/", view=views.bulk_action, kwargs={"model": Medicine, "repository": "medicines_repo"}, name="medicines_bulk"),
+    path("medicines/dosis/<int:id>/", view=views.medicines_dosing, name="medicines_dosing"),
+    path("medicines/exportar/", view=views.export_records, kwargs={"model": Medicine, "filename": "medicamentos"}, name="medicines_export"),
     path("proveedores/", view=views.provider_repository, name="provider_repo"), 
     path("proveedores/nuevo/", view=views.provider_form, name="provider_form"), 
     path("proveedores/editar/<int:id>/", view=views.provider_form, name="provider_edit"),
     path("proveedores/eliminar/", view=views.provider_delete, name="provider_delete"), 
+    path("proveedores/acciones/", view=views.bulk_action, kwargs={"model": Provider, "repository": "provider_repo"}, name="provider_bulk"),
+    path("proveedores/exportar/", view=views.export_records, kwargs={"model": Provider, "filename": "proveedores"}, name="provider_export"),
     path("products/", view=views.products_repository, name="products_repo"), 
     path("products/nuevo/", view=views.products_form, name="products_form"), 
     path("products/editar/<int:id>/", view=views.products_form, name="products_edit"),
     path("products/eliminar/", view=views.products_delete, name="products_delete"), 
+    path("products/acciones/", view=views.bulk_action, kwargs={"model": Product, "repository": "products_repo"}, name="products_bulk"),
+    path("products/stock/<int:id>/", view=views.products_stock, name="products_stock"),
+    path("products/compras/", view=views.products_purchasing, name="products_purchasing"),
+    path("products/exportar/", view=views.export_records, kwargs={"model": Product, "filename": "productos"}, name="products_export"),
     path("vet/", view=views.vet_repository, name="vet_repo"),
     path("vet/nuevo/", view=views.vet_form, name="vet_form"),
     path("vet/editar/<int:id>/", view=views.vet_form, name="vet_edit"),
     path("vet/eliminar/", view=views.vet_delete, name="vet_delete"), 
+    path("vet/acciones/", view=views.bulk_action, kwargs={"model": Vet, "repository": "vet_repo"}, name="vet_bulk"),
+    path("vet/exportar/", view=views.export_records, kwargs={"model": Vet, "filename": "veterinarios"}, name="vet_export"),
+    path("turnos/", view=views.appointments_repository, name="appointments_repo"),
+    path("turnos/nuevo/", view=views.appointments_form, name="appointments_form"),
+    path("turnos/cancelar/", view=views.appointments_cancel, name="appointments_cancel"),
+    path("ventas/", view=views.sales_summary, name="sales_summary"),
+    path("facturas/nueva/", view=views.invoices_form, name="invoices_form"),
+    path("facturas/<int:id>/", view=views.invoice_detail, name="invoice_detail"),
+    path("clientes/<int:id>/facturas/", view=views.client_invoices, name="client_invoices"),
+    path("importar/", view=views.import_records, name="import_records"),
+    path("estadisticas/cache/", view=views.repository_cache_stats, name="cache_stats"),
 ]
+
+urlpatterns += [
+    path("api/pets/<int:id>/weights/", view=api_view(views.api_pet_weights, PetWeight, Pet), name="api_pets_weights"),
+    path("api/pets/growth/", view=api_view(views.api_pet_growth, PetWeight, Pet), name="api_pets_growth"),
+    path("api/medicines/<int:id>/doses/", view=api_view(views.api_medicine_doses, DosingRule, Pet), name="api_medicines_doses"),
+]
+
+for resource, model in API_RESOURCES.items():
+    urlpatterns += [
+        path(f"api/{resource}/", view=api_view(views.api_records, model), kwargs={"model": model}, name=f"api_{resource}"),
+        path(f"api/{resource}/<int:id>/", view=api_view(views.api_record, model), kwargs={"model": model}, name=f"api_{resource}_detail"),
+        path(f"api/{resource}/batch/", view=api_view(views.api_batch, model), kwargs={"model": model}, name=f"api_{resource}_batch"),
+    ]
@@ -0,0 +1,162 @@
+"""
+Validadores compilados de los datos de cada modelo.
+
+Las reglas de cada campo se arman una sola vez, al importar el modulo: las
+opciones validas quedan en frozensets y cada comprobacion es una funcion ya
+resuelta (metodos de str, comparaciones con el limite guardado en una
+clausura), en lugar de reconstruir listas y diccionarios de opciones en cada
+llamada. Un Validator aplica las reglas a una fila (`validator(data)`) o a
+muchas (`validator.validate_many(rows)`), que es lo que usan las importaciones
+por lotes.
+
+Los mensajes son los mismos que usaban los validate_* de app/models.py.
+"""
+from operator import methodcaller
+
+
+def check(test, message):
+    """
+    Paso que falla con `message` si `test(valor)` es falso.
+    """
+    return (False, test, message)
+
+
+def convert(function, message):
+    """
+    Paso que reemplaza el valor por `function(valor)` y falla con `message` si no se puede convertir.
+    """
+    return (True, function, message)
+
+
+def letters_and_spaces(value):
+    """
+    Indica si el texto solo tiene letras y espacios.
+    """
+    letters = "".join(value.split())
+    return not letters or letters.isalpha()
+
+
+def one_of(choices):
+    """
+    Devuelve la comprobacion de pertenencia a las opciones de un TextChoices.
+    """
+    return frozenset(choices.values).__contains__
+
+
+def contains(text):
+    """
+    Devuelve la comprobacion de que el valor contenga `text`.
+    """
+    return methodcaller("__contains__", text)
+
+
+def starts_with(prefix):
+    """
+    Devuelve la comprobacion de que el valor empiece con `prefix`.
+    """
+    return methodcaller("startswith", prefix)
+
+
+def ends_with(suffix):
+    """
+    Devuelve la comprobacion de que el valor termine con `suffix`.
+    """
+    return methodcaller("endswith", suffix)
+
+
+def greater_than(limit, message):
+    """
+    Paso que falla con `message` si el valor no es mayor que `limit`.
+    """
+    def test(value):
+        return value > limit
+    return check(test, message)
+
+
+def at_most(limit, message):
+    """
+    Paso que falla con `message` si el valor es mayor que `limit`.
+    """
+    def test(value):
+        return value <= limit
+    return check(test, message)
+
+
+class Field:
+    """
+    Reglas de un campo: obligatorio y, si tiene valor, una serie de pasos.
+
+    Los pasos se aplican en orden y el primero que falla da el error del campo;
+    tambien falla el paso que no admite el tipo del valor (AttributeError,
+    TypeError o ValueError). Un valor vacio ("") o None se informa con `required`.
+    """
+
+    __slots__ = ("name", "required", "steps")
+
+    def __init__(self, name, required, *steps):
+        """
+        Inicializa el campo con su mensaje de obligatorio y sus pasos.
+        """
+        self.name = name
+        self.required = required
+        self.steps = steps
+
+
+class Validator:
+    """
+    Aplica las reglas de varios campos a diccionarios de datos.
+
+    Al construirse guarda las reglas como una tupla de (campo, mensaje de
+    obligatorio, pasos), y cada paso como (convierte, funcion, mensaje), de
+    modo que validar una fila solo recorre tuplas y llama funciones ya resueltas.
+    """
+
+    def __init__(self, *fields):
+        """
+        Inicializa el validador y compila sus reglas.
+        """
+        self.fields = fields
+        self._rules = tuple((field.name, field.required, tuple(field.steps)) for field in fields)
+
+    def __call__(self, data):
+        """
+        Valida una fila.
+
+        Returns:
+            Un diccionario {campo: mensaje} con los errores; vacio si la fila es valida.
+        """
+        return self.validate_many((data,))[0]
+
+    def validate_many(self, rows):
+        """
+        Valida muchas filas en una sola llamada.
+
+        Returns:
+            Una lista con el diccionario de errores de cada fila, en el mismo orden.
+        """
+        rules = self._rules
+        results = []
+        append = results.append
+        for row in rows:
+            errors = {}
+            get = row.get
+            for name, required, steps in rules:
+                value = get(name, "")
+                if value is None or value == "":
+                    errors[name] = required
+                    continue
+                for converts, function, message in steps:
+                    try:
+                        result = function(value)
+                    except (AttributeError, TypeError, ValueError):
+                        # Un valor de otro tipo (por ejemplo, un numero o una lista
+                        # recibidos en JSON donde se espera texto) no cumple el paso.
+                        errors[name] = message
+                        break
+                    if converts:
+                        value = result
+                    elif not result:
+                        errors[name] = message
+                        break
+            append(errors)
+        return results
@@ -1,267 +1,1067 @@
-from django.shortcuts import get_object_or_404, redirect, render
+import csv
+import io
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+from django.forms.models import model_to_dict
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods, require_POST
 
+from . import (
+    api,
+    bulk,
+    dosing,
+    fts,
+    inventory,
+    invoicing,
+    purchasing,
+    scheduling,
+    stats,
+    weights,
+)
+from .caching import acached_page, cache_stats, conditional_on
+from .exports import EXPORT_FORMATS, aexport_rows, export_rows
 from .forms import PetForm
-from .models import City, Client, Medicine, Pet, Product, Provider, Vet
+from .imports import IMPORTERS, import_rows
+from .models import (
+    Appointment,
+    City,
+    Client,
+    DailySales,
+    DosingRule,
+    Invoice,
+    Medicine,
+    Pet,
+    PetWeight,
+    Product,
+    Provider,
+    StatCounter,
+    StockMovement,
+    Vet,
+)
+from .pagination import akeyset_paginate, aranked_paginate
+from .search import search
 
 
-def home(request):
+async def _repository_page(request, queryset, models=None):
     """
-    Renderiza la página de inicio.
+    Devuelve el termino buscado y la pagina de resultados de un repositorio.
+
+    Si el modelo tiene indice de texto completo la busqueda se resuelve con FTS5
+    y los resultados se ordenan por relevancia; si no, se filtra por prefijo y se
+    pagina por keyset. La pagina se guarda en cache versionada por los modelos de
+    los que depende (por defecto, solo el del queryset).
     """
-    return render(request, "home.html")
+    query = request.GET.get("q", "")
+    model = queryset.model
+
+    async def build():
+        if query.strip() and fts.is_indexed(model):
+            return await aranked_paginate(
+                queryset,
+                lambda limit, offset: fts.aranked_ids(model, query, limit, offset),
+                request.GET,
+            )
+        return await akeyset_paginate(search(queryset, query), request.GET)
 
-def clients_repository(request):
+    return query, await acached_page(request, models or (model,), build)
+
+async def home(request):
     """
-    Muestra el repositorio de clientes.
+    Renderiza la página de inicio con las estadisticas precalculadas en StatCounter.
     """
-    clients = Client.objects.all()
-    return render(request, "clients/repository.html", {"clients": clients})
+    counters = [
+        counter
+        async for counter in StatCounter.objects.filter(count__gt=0).order_by("-count", "key")
+    ]
+    return render(request, "home.html", {"stats": stats.dashboard(counters)})
+
+@conditional_on(Client, Pet)
+async def clients_repository(request):
+    """
+    Muestra el repositorio de clientes con sus mascotas.
+    """
+    pets = Prefetch("pets", queryset=Pet.objects.only("id", "name", "owner_id").order_by("name"))
+    query, page = await _repository_page(
+        request, Client.objects.prefetch_related(pets), models=(Client, Pet),
+    )
+    return render(
+        request, "clients/repository.html",
+        {
+            "clients": page,
+            "page": page,
+            "query": query,
+            "bulk_updates": bulk.BULK_UPDATES[Client],
+            "bulk_merge": True,
+        },
+    )
 
-def clients_form(request, id=None):
+@conditional_on(Client)
+async def clients_form(request, id=None):
     """
     Maneja el formulario para crear o actualizar un cliente.
     """
     cities = City.choices
     if request.method == "POST":
-        client_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
-
-        if client_id == "":
-            saved, errors = Client.save_client(request.POST)
-        else:
-            client = get_object_or_404(Client, pk=client_id)
-            saved,errors=client.update_client(request.POST)
-        if saved:
-            return redirect(reverse("clients_repo"))
-        return render(
-            request, "clients/form.html", {"errors": errors, "client": request.POST, "cities": cities },
-        )
+        return await sync_to_async(_clients_form_post)(request, cities)
 
     client = None
     if id is not None:
-        client = get_object_or_404(Client, pk=id)
+        client = await aget_object_or_404(Client, pk=id)
 
     return render(request, "clients/form.html", {"client": client, "cities": cities})
 
+def _clients_form_post(request, cities):
+    """
+    Crea o actualiza un cliente con los datos enviados en el formulario.
+    """
+    client_id = request.POST.get("id", "")
+    errors = {}
+    saved = True
+
+    if client_id == "":
+        saved, errors = Client.save_client(request.POST)
+    else:
+        client = get_object_or_404(Client, pk=client_id)
+        saved,errors=client.update_client(request.POST)
+    if saved:
+        return redirect(reverse("clients_repo"))
+    return render(
+        request, "clients/form.html", {"errors": errors, "client": request.POST, "cities": cities },
+    )
+
+def _delete_record(model, pk):
+    """
+    Elimina un registro con bulk.delete_records, que escribe la version del
+    modelo antes de leer las cascadas para tomar el lock de escritura de SQLite.
+    """
+    if not bulk.delete_records(model, [api.parse_id(pk)]):
+        raise Http404
+
 def clients_delete(request):
     """
     Elimina un cliente.
     """
-    client_id = request.POST.get("client_id")
-    client = get_object_or_404(Client, pk=int(client_id))
-    client.delete()
+    _delete_record(Client, request.POST.get("client_id"))
 
     return redirect(reverse("clients_repo"))
 
-def pets_repository(request):
+@conditional_on(Pet, Client)
+async def pets_repository(request):
     """
-    Muestra el repositorio de mascotas.
+    Muestra el repositorio de mascotas con el nombre y la ciudad de su dueño.
     """
-    pets = Pet.objects.all()
-    return render(request, "pets/repository.html", {"pets": pets})
+    query, page = await _repository_page(
+        request, Pet.objects.select_related("owner"), models=(Pet, Client),
+    )
+    return render(request, "pets/repository.html", {"pets": page, "page": page, "query": query})
 
-def pets_form(request, id=None):
+def _picker_options(queryset, *selected):
+    """
+    Devuelve las opciones de un selector de registros: las primeras
+    PICKER_MAX_OPTIONS del queryset y, si quedaron afuera, las elegidas.
+
+    Las demas se buscan desde la pagina con la API JSON (?q=).
+    """
+    options = list(queryset[:settings.PICKER_MAX_OPTIONS])
+    missing = {api.parse_id(pk) for pk in selected} - {option.pk for option in options} - {None}
+    if missing:
+        options += queryset.filter(pk__in=missing)
+    return options
+
+def _owner_choices(*selected):
+    """
+    Devuelve los clientes que se ofrecen como dueños (o clientes de una factura), con los elegidos.
+    """
+    return _picker_options(Client.objects.only("id", "name").order_by("name"), *selected)
+
+@conditional_on(Pet, Client)
+async def pets_form(request, id=None):
     """
     Maneja el formulario para crear o actualizar una mascota.
     """
-    errors = {}
+    if request.method == "POST":
+        return await sync_to_async(_pets_form_post)(request, id)
+
     pet = None
-    form_title = "Agregar Mascota"
-    form_action = "pets_form"
+    if id is not None:
+        pet = await aget_object_or_404(Pet, pk=id)
+
+    # Los dueños se consultan aca porque la plantilla se renderiza en el event loop.
+    owners = await sync_to_async(_owner_choices)(pet.owner_id if pet else None)
+    return _render_pet_form(request, pet, PetForm(instance=pet), {}, owners)
 
+def _pets_form_post(request, id):
+    """
+    Crea o actualiza una mascota con los datos enviados en el formulario.
+    """
+    pet = None
     if id is not None:
         pet = get_object_or_404(Pet, pk=id)
+
+    form = PetForm(request.POST, instance=pet)
+    if form.is_valid():
+        form.save()
+        return redirect(reverse("pets_repo"))
+    return _render_pet_form(request, pet, form, form.errors, _owner_choices(request.POST.get("owner")))
+
+def _render_pet_form(request, pet, form, errors, owners):
+    """
+    Renderiza el formulario de mascotas para crear o editar segun corresponda.
+    """
+    form_title = "Agregar Mascota"
+    form_action = "pets_form"
+    if pet is not None:
         form_title = "Editar Mascota"
         form_action = "pets_edit"
 
-    if request.method == "POST":
-        form = PetForm(request.POST, instance=pet)
-        if form.is_valid():
-            form.save()
-            return redirect(reverse("pets_repo"))
-        else:
-            errors = form.errors
-    else:
-        form = PetForm(instance=pet)
-
     return render(
-        request, "pets/form.html", {"form": form, "form_title": form_title, "form_action": form_action, "errors": errors},
+        request,
+        "pets/form.html",
+        {"form": form, "form_title": form_title, "form_action": form_action, "errors": errors, "owners": owners},
     )
 
 def pets_delete(request):
     """
     Elimina una mascota.
     """
-    pet_id = request.POST.get("pet_id")
-    pet = get_object_or_404(Pet, pk=int(pet_id))
-    pet.delete()
+    _delete_record(Pet, request.POST.get("pet_id"))
     return redirect(reverse("pets_repo"))
 
-def medicines_repository(request):
+@conditional_on(Medicine)
+async def medicines_repository(request):
     """
     Muestra el repositorio de medicamentos.
     """
-    medicine = Medicine.objects.all()
-    return render(request, "medicines/repository.html", {"medicines": medicine})
+    query, page = await _repository_page(request, Medicine.objects.all())
+    return render(request, "medicines/repository.html", {"medicines": page, "page": page, "query": query})
 
-def medicines_form(request, id=None):
+@conditional_on(Medicine)
+async def medicines_form(request, id=None):
     """
     Maneja el formulario para crear o actualizar un medicamento.
     """
     if request.method == "POST":
-        medicine_id = request.POST.get("id", "") 
-        errors = {}
-        saved = True
-        
-        if medicine_id == "":
-            saved, errors = Medicine.save_medicine(request.POST)
-        else:
-            medicine = get_object_or_404(Medicine, pk=medicine_id)
-            saved, errors = medicine.update_medicine(request.POST)
-        if saved:
-            return redirect(reverse("medicines_repo"))
-        return render (request, "medicines/form.html", {"errors": errors, "medicines": request.POST})
+        return await sync_to_async(_medicines_form_post)(request)
     
     medicine = None
     if id is not None: 
-        medicine=get_object_or_404(Medicine, pk=id) 
+        medicine = await aget_object_or_404(Medicine, pk=id)
     return render (request, "medicines/form.html", { "medicines": medicine})
 
+def _medicines_form_post(request):
+    """
+    Crea o actualiza un medicamento con los datos enviados en el formulario.
+    """
+    medicine_id = request.POST.get("id", "") 
+    errors = {}
+    saved = True
+    
+    if medicine_id == "":
+        saved, errors = Medicine.save_medicine(request.POST)
+    else:
+        medicine = get_object_or_404(Medicine, pk=medicine_id)
+        saved, errors = medicine.update_medicine(request.POST)
+    if saved:
+        return redirect(reverse("medicines_repo"))
+    return render (request, "medicines/form.html", {"errors": errors, "medicines": request.POST})
+
 def medicines_delete(request):
     """
     Elimina un medicamento.
     """
-    medicine_id = request.POST.get("medicine_id")
-    medicine = get_object_or_404(Medicine, pk=int(medicine_id))
-    medicine.delete()
+    _delete_record(Medicine, request.POST.get("medicine_id"))
     return redirect(reverse("medicines_repo"))
 
-def provider_repository(request):
+def _dosing_context(medicine, query, data=None, errors=None):
     """
-    Muestra el repositorio de proveedores.
+    Arma el contexto de la pagina de dosis: la regla del medicamento y las dosis de las mascotas elegidas.
     """
-    providers = Provider.objects.all()
-    return render(request, "provider/repository.html", {"providers": providers})
+    rule = DosingRule.objects.filter(medicine=medicine).first()
+    selected = [int(pk) for pk in query.getlist("pets") if pk.isdigit()]
+    weight = query.get("weight", "")
+    context = {
+        "medicine": medicine,
+        "rule": rule,
+        "data": data or (model_to_dict(rule) if rule is not None else {}),
+        "errors": errors or {},
+        "pets": _picker_options(Pet.objects.order_by("name", "id").only("id", "name", "weight"), *selected),
+        "selected": selected,
+        "weight": weight,
+        "doses": dosing.pet_doses(rule, selected) if rule is not None and selected else [],
+        "weight_dose": None,
+    }
+    if rule is not None and weight:
+        try:
+            kg = float(weight)
+        except ValueError:
+            kg = 0
+        if kg > 0:
+            context["weight_dose"] = dosing.doses(rule, [kg])[0]
+        else:
+            context["errors"] = {**context["errors"], "weight": "Por favor ingrese un peso mayor que 0"}
+    return context
 
-def provider_form(request, id=None):
+@conditional_on(Medicine, DosingRule, Pet)
+async def medicines_dosing(request, id):
     """
-    Maneja el formulario para crear o actualizar un proveedor.
+    Muestra la regla de dosificacion de un medicamento y calcula dosis por peso.
     """
     if request.method == "POST":
-        provider_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
+        return await sync_to_async(_medicines_dosing_post)(request, id)
 
-        if provider_id == "":
-            saved, errors = Provider.save_provider(request.POST)
-        else:
-            provider = get_object_or_404(Provider, pk=provider_id)
-            provider.update_provider(request.POST)
+    medicine = await aget_object_or_404(Medicine, pk=id)
+    context = await sync_to_async(_dosing_context)(medicine, request.GET)
+    return render(request, "medicines/dosing.html", context)
 
-        if saved:
-            return redirect(reverse("provider_repo"))
+def _medicines_dosing_post(request, id):
+    """
+    Guarda la regla de dosificacion enviada en el formulario.
+    """
+    medicine = get_object_or_404(Medicine, pk=id)
+    rule, errors = dosing.save_rule(medicine, request.POST)
+    if rule is not None:
+        return redirect(reverse("medicines_dosing", kwargs={"id": medicine.pk}))
+    return render(request, "medicines/dosing.html", _dosing_context(medicine, request.GET, request.POST, errors))
 
-        return render(
-            request, "provider/form.html", {"errors": errors, "provider": request.POST},
-        )
+@conditional_on(Provider)
+async def provider_repository(request):
+    """
+    Muestra el repositorio de proveedores.
+    """
+    query, page = await _repository_page(request, Provider.objects.all())
+    return render(request, "provider/repository.html", {"providers": page, "page": page, "query": query})
+
+@conditional_on(Provider)
+async def provider_form(request, id=None):
+    """
+    Maneja el formulario para crear o actualizar un proveedor.
+    """
+    if request.method == "POST":
+        return await sync_to_async(_provider_form_post)(request)
     provider = None
     if id is not None:
-        provider = get_object_or_404(Provider, pk=id)
+        provider = await aget_object_or_404(Provider, pk=id)
 
     return render(request, "provider/form.html", {"provider": provider})
 
+def _provider_form_post(request):
+    """
+    Crea o actualiza un proveedor con los datos enviados en el formulario.
+    """
+    provider_id = request.POST.get("id", "")
+    errors = {}
+    saved = True
+
+    if provider_id == "":
+        saved, errors = Provider.save_provider(request.POST)
+    else:
+        provider = get_object_or_404(Provider, pk=provider_id)
+        provider.update_provider(request.POST)
+
+    if saved:
+        return redirect(reverse("provider_repo"))
+
+    return render(
+        request, "provider/form.html", {"errors": errors, "provider": request.POST},
+    )
+
 def provider_delete(request):
     """
     Elimina un proveedor.
     """
-    provider_id = request.POST.get("provider_id")
-    provider = get_object_or_404(Provider, pk=int(provider_id))
-    provider.delete()
+    _delete_record(Provider, request.POST.get("provider_id"))
     return redirect(reverse("provider_repo"))
 
-def products_repository(request):
+@conditional_on(Product)
+async def products_repository(request):
     """
     Muestra el repositorio de productos.
     """
-    products = Product.objects.all()
-    return render(request, "products/repository.html", {"products": products})
+    query, page = await _repository_page(request, Product.objects.all())
+    return render(
+        request, "products/repository.html",
+        {"products": page, "page": page, "query": query, "bulk_updates": bulk.BULK_UPDATES[Product]},
+    )
 
-def products_form(request, id=None):
+@conditional_on(Product)
+async def products_form(request, id=None):
     """
     Maneja el formulario para crear o actualizar un producto.
     """
     if request.method == "POST":
-        product_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
-
-        if product_id == "":
-            saved, errors = Product.save_product(request.POST)
-        else:
-            product = get_object_or_404(Product, pk=product_id)
-            saved, errors = product.update_product(request.POST)
-        if saved:
-            return redirect(reverse("products_repo"))
-        return render(
-            request, "products/form.html", {"errors": errors, "product": request.POST},
-        )
+        return await sync_to_async(_products_form_post)(request)
     
     product = None
     if id is not None:
-        product = get_object_or_404(Product, pk=id)
+        product = await aget_object_or_404(Product, pk=id)
     return render(request, "products/form.html", {"product": product})
 
+def _products_form_post(request):
+    """
+    Crea o actualiza un producto con los datos enviados en el formulario.
+    """
+    product_id = request.POST.get("id", "")
+    errors = {}
+    saved = True
+
+    if product_id == "":
+        saved, errors = Product.save_product(request.POST)
+    else:
+        product = get_object_or_404(Product, pk=product_id)
+        saved, errors = product.update_product(request.POST)
+    if saved:
+        return redirect(reverse("products_repo"))
+    return render(
+        request, "products/form.html", {"errors": errors, "product": request.POST},
+    )
+
 def products_delete(request):
     """
     Elimina un producto.
     """
-    product_id = request.POST.get("product_id")
-    product = get_object_or_404(Product, pk=int(product_id))
-    product.delete()
+    _delete_record(Product, request.POST.get("product_id"))
     return redirect(reverse("products_repo"))
 
-def vet_repository(request):
+STOCK_MOVEMENTS_SHOWN = 20
+
+def _stock_context(product, data=None, errors=None):
     """
-    Muestra el repositorio de veterinarios.
+    Arma el contexto de la pagina de stock con los ultimos movimientos del producto.
     """
-    vets = Vet.objects.all()
-    return render(request, "vet/repository.html", {"vets": vets})
+    return {
+        "product": product,
+        "movement": data or {},
+        "errors": errors or {},
+        "kinds": StockMovement.KIND_CHOICES.choices,
+        "providers": list(Provider.objects.order_by("name").only("id", "name")),
+        "movements": list(
+            product.movements.select_related("provider").order_by("-id")[:STOCK_MOVEMENTS_SHOWN],
+        ),
+    }
 
-def vet_form(request, id=None):
+@conditional_on(Product, StockMovement, Provider)
+async def products_stock(request, id):
     """
-    Maneja el formulario para crear o actualizar un veterinario.
+    Muestra el stock de un producto y registra compras, ventas y ajustes.
     """
-    specialities = Vet.SPECIALITY_CHOICES.choices
     if request.method == "POST":
-        vet_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
+        return await sync_to_async(_products_stock_post)(request, id)
 
-        if vet_id == "":
-            saved, errors = Vet.save_vet(request.POST)
-        else:
-            vet = get_object_or_404(Vet, pk=vet_id)
-            saved, errors= vet.update_vet(request.POST)
+    product = await aget_object_or_404(Product, pk=id)
+    context = await sync_to_async(_stock_context)(product)
+    return render(request, "products/stock.html", context)
 
-        if saved:
-            return redirect(reverse("vet_repo"))
+def _products_stock_post(request, id):
+    """
+    Registra un movimiento de stock con los datos enviados en el formulario.
+    """
+    product = get_object_or_404(Product, pk=id)
+    movement, errors = inventory.record_movement(product.pk, request.POST)
+    if movement is not None:
+        return redirect(reverse("products_stock", kwargs={"id": product.pk}))
+    product.refresh_from_db(fields=["stock"])
+    return render(request, "products/stock.html", _stock_context(product, request.POST, errors))
 
-        return render(
-            request, "vet/form.html", {"errors": errors, "vet": request.POST, "specialities" : specialities},
-        )
+def _purchasing_context(on, data=None, errors=None):
+    """
+    Arma el contexto de la pagina de compras: la mejor oferta vigente de cada producto.
+    """
+    return {
+        "on": on,
+        "rows": purchasing.comparison(on),
+        "providers": list(Provider.objects.order_by("name").only("id", "name")),
+        "offer": data or {},
+        "errors": errors or {},
+    }
+
+# Sin conditional_on: que oferta esta vigente depende tambien de la fecha.
+async def products_purchasing(request):
+    """
+    Compara las ofertas vigentes de los proveedores para todos los productos y registra ofertas nuevas.
+    """
+    if request.method == "POST":
+        return await sync_to_async(_products_purchasing_post)(request)
+
+    on = _parse_date(request.GET.get("on")) or timezone.localdate()
+    context = await sync_to_async(_purchasing_context)(on)
+    return render(request, "products/purchasing.html", context)
+
+def _products_purchasing_post(request):
+    """
+    Registra una oferta con los datos enviados en el formulario.
+    """
+    offer, errors = purchasing.add_offer(request.POST)
+    if offer is not None:
+        return redirect(reverse("products_purchasing"))
+    return render(
+        request, "products/purchasing.html", _purchasing_context(timezone.localdate(), request.POST, errors),
+    )
+
+@conditional_on(Vet)
+async def vet_repository(request):
+    """
+    Muestra el repositorio de veterinarios.
+    """
+    query, page = await _repository_page(request, Vet.objects.all())
+    return render(
+        request, "vet/repository.html",
+        {"vets": page, "page": page, "query": query, "bulk_updates": bulk.BULK_UPDATES[Vet]},
+    )
+
+@conditional_on(Vet)
+async def vet_form(request, id=None):
+    """
+    Maneja el formulario para crear o actualizar un veterinario.
+    """
+    specialities = Vet.SPECIALITY_CHOICES.choices
+    if request.method == "POST":
+        return await sync_to_async(_vet_form_post)(request, specialities)
 
     vet = None
     if id is not None:
-        vet = get_object_or_404(Vet, pk=id)
+        vet = await aget_object_or_404(Vet, pk=id)
     return render(request, "vet/form.html", {"vet": vet, "specialities" : specialities})
 
+def _vet_form_post(request, specialities):
+    """
+    Crea o actualiza un veterinario con los datos enviados en el formulario.
+    """
+    vet_id = request.POST.get("id", "")
+    errors = {}
+    saved = True
+
+    if vet_id == "":
+        saved, errors = Vet.save_vet(request.POST)
+    else:
+        vet = get_object_or_404(Vet, pk=vet_id)
+        saved, errors= vet.update_vet(request.POST)
+
+    if saved:
+        return redirect(reverse("vet_repo"))
+
+    return render(
+        request, "vet/form.html", {"errors": errors, "vet": request.POST, "specialities" : specialities},
+    )
+
 def vet_delete(request):
     """
     Elimina un veterinario.
     """
-    vet_id = request.POST.get("vet_id")
-    vet = get_object_or_404(Vet, pk=int(vet_id))
-    vet.delete()
-    return redirect(reverse("vet_repo"))
\ No newline at end of file
+    _delete_record(Vet, request.POST.get("vet_id"))
+    return redirect(reverse("vet_repo"))
+
+@require_POST
+def bulk_action(request, model, repository):
+    """
+    Elimina o modifica los registros seleccionados en un repositorio.
+
+    El primer envio muestra cuantos registros se van a afectar y pide
+    confirmacion; el segundo (con `confirm=1`) aplica la accion con una sola
+    sentencia y vuelve al repositorio.
+    """
+    ids = bulk.parse_ids(request.POST.getlist("ids"))
+    action = request.POST.get("action", "")
+    value = "" if action in ("delete", "merge") else request.POST.get(action, "")
+
+    errors = {}
+    if not ids:
+        errors["ids"] = "Por favor seleccione al menos un registro"
+    if action == "merge":
+        if model not in bulk.MERGES:
+            errors["action"] = "Acción no válida"
+        elif len(ids) < 2:
+            errors["ids"] = "Por favor seleccione al menos dos registros para fusionar"
+    elif action != "delete":
+        update = bulk.find_update(model, action)
+        if update is None:
+            errors["action"] = "Acción no válida"
+        else:
+            _, error = update.prepare(value)
+            if error:
+                errors[action] = error
+
+    if not errors and request.POST.get("confirm") == "1":
+        if action == "delete":
+            bulk.delete_records(model, ids)
+        elif action == "merge":
+            bulk.merge_records(model, ids)
+        else:
+            bulk.update_records(model, ids, action, value)
+        return redirect(reverse(repository))
+
+    context = {"errors": errors, "repository": repository, "ids": ids, "action": action, "value": value}
+    if not errors:
+        count = model.objects.filter(pk__in=ids).count()
+        context["message"] = bulk.describe(model, action, value, count)
+    return render(request, "bulk/confirm.html", context)
+
+def export_records(request, model, filename):
+    """
+    Exporta todos los registros de un modelo en CSV o NDJSON, opcionalmente en gzip.
+    """
+    fmt = request.GET.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        raise Http404("Formato de exportación no soportado")
+    compress = request.GET.get("gzip") in ("1", "true")
+
+    filename = f"{filename}.{fmt}"
+    content_type = EXPORT_FORMATS[fmt]
+    if compress:
+        filename += ".gz"
+        content_type = "application/gzip"
+
+    # Bajo ASGI Django solo transmite sin cargar todo en memoria los iteradores
+    # asincronicos, y bajo WSGI los sincronicos.
+    stream = aexport_rows if isinstance(request, ASGIRequest) else export_rows
+    response = StreamingHttpResponse(
+        stream(model, fmt, compress), content_type=content_type,
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+IMPORT_MODEL_CHOICES = [
+    ("client", "Clientes"),
+    ("pet", "Mascotas"),
+    ("medicine", "Medicamentos"),
+    ("provider", "Proveedores"),
+    ("product", "Productos"),
+    ("vet", "Veterinarios"),
+    ("offer", "Ofertas de proveedores"),
+]
+
+IMPORT_REJECTS_SHOWN = 100
+
+def import_records(request):
+    """
+    Importa registros desde un archivo CSV subido por el usuario.
+    """
+    model = request.POST.get("model") or request.GET.get("model", "client")
+    context = {"models": IMPORT_MODEL_CHOICES, "model": model}
+
+    if request.method == "POST":
+        errors = {}
+        upload = request.FILES.get("file")
+        if model not in IMPORTERS:
+            errors["model"] = "Por favor seleccione un tipo de registro válido"
+        if upload is None:
+            errors["file"] = "Por favor seleccione un archivo"
+        if errors:
+            context["errors"] = errors
+            return render(request, "imports/form.html", context)
+
+        rejected = []
+
+        def on_reject(number, row, row_errors):
+            if len(rejected) < IMPORT_REJECTS_SHOWN:
+                rejected.append((number, row_errors))
+
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        result = import_rows(model, csv.DictReader(lines), on_reject=on_reject)
+        context.update({"result": result, "rejected": rejected})
+
+    return render(request, "imports/form.html", context)
+
+def repository_cache_stats(request):
+    """
+    Devuelve en JSON los aciertos y fallos de la cache de los repositorios.
+    """
+    return JsonResponse(cache_stats([Client, Pet, Medicine, Provider, Product, Vet]))
+
+APPOINTMENT_SUGGESTIONS = 8
+
+def _parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _parse_duration(value):
+    minutes = _parse_int(value)
+    return timedelta(minutes=minutes) if minutes else None
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+@conditional_on(Appointment, Vet, Pet)
+async def appointments_repository(request):
+    """
+    Muestra los turnos de un dia (`?date=AAAA-MM-DD`, por defecto hoy).
+    """
+    day = _parse_date(request.GET.get("date")) or timezone.localdate()
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    appointments = [
+        appointment
+        async for appointment in Appointment.objects.select_related("vet", "pet")
+        .filter(start__gte=start, start__lt=start + timedelta(days=1))
+        .order_by("start", "vet__name")
+    ]
+    return render(
+        request,
+        "appointments/repository.html",
+        {
+            "appointments": appointments,
+            "day": day,
+            "previous_day": day - timedelta(days=1),
+            "next_day": day + timedelta(days=1),
+        },
+    )
+
+def _appointment_suggestions(vet_id=None, speciality=None, duration=None):
+    """
+    Devuelve los proximos horarios libres de un veterinario o de una especialidad.
+    """
+    if vet_id:
+        slots = scheduling.free_slots([vet_id], count=APPOINTMENT_SUGGESTIONS, duration=duration)
+    elif speciality:
+        slots = scheduling.free_slots_for_speciality(speciality, count=APPOINTMENT_SUGGESTIONS, duration=duration)
+    else:
+        return []
+    vets = Vet.objects.in_bulk({slot.vet_id for slot in slots})
+    return [(vets[slot.vet_id], slot) for slot in slots]
+
+def _appointment_context(data, errors=None):
+    """
+    Arma el contexto del formulario de turnos con las opciones y sugerencias.
+
+    Las opciones se evaluan aca porque la plantilla puede renderizarse en el
+    event loop, donde no se puede consultar la base.
+    """
+    duration = _parse_duration(data.get("duration"))
+    return {
+        "appointment": data,
+        "errors": errors or {},
+        "vets": _picker_options(Vet.objects.order_by("name"), data.get("vet")),
+        "pets": _picker_options(Pet.objects.select_related("owner").order_by("name"), data.get("pet")),
+        "specialities": Vet.SPECIALITY_CHOICES.choices,
+        "durations": range(
+            settings.APPOINTMENT_SLOT_MINUTES,
+            settings.APPOINTMENT_MAX_MINUTES + 1,
+            settings.APPOINTMENT_SLOT_MINUTES,
+        ),
+        "suggestions": _appointment_suggestions(
+            _parse_int(data.get("vet")), data.get("speciality"), duration,
+        ),
+    }
+
+async def appointments_form(request):
+    """
+    Maneja el formulario para reservar un turno y sugiere horarios libres.
+    """
+    if request.method == "POST":
+        return await sync_to_async(_appointments_form_post)(request)
+
+    context = await sync_to_async(_appointment_context)(request.GET)
+    return render(request, "appointments/form.html", context)
+
+def _appointments_form_post(request):
+    """
+    Reserva un turno con los datos enviados en el formulario.
+    """
+    data = request.POST
+    errors = {}
+    vet_id = _parse_int(data.get("vet"))
+    pet_id = _parse_int(data.get("pet"))
+    duration = _parse_duration(data.get("duration"))
+    try:
+        start = timezone.make_aware(datetime.fromisoformat(data.get("start", "")))
+    except ValueError:
+        start = None
+
+    if vet_id is None or not Vet.objects.filter(pk=vet_id).exists():
+        errors["vet"] = "Por favor seleccione un veterinario"
+    if pet_id is None or not Pet.objects.filter(pk=pet_id).exists():
+        errors["pet"] = "Por favor seleccione una mascota"
+    if start is None:
+        errors["start"] = "Por favor ingrese una fecha y hora válidas"
+    if duration is None:
+        errors["duration"] = "Por favor seleccione una duración"
+
+    if not errors:
+        appointment, errors = scheduling.book_appointment(
+            vet_id, pet_id, start, start + duration, data.get("reason", ""),
+        )
+        if appointment is not None:
+            day = timezone.localdate(appointment.start).isoformat()
+            return redirect(f"{reverse('appointments_repo')}?date={day}")
+
+    return render(request, "appointments/form.html", _appointment_context(data, errors))
+
+def appointments_cancel(request):
+    """
+    Cancela (elimina) un turno.
+    """
+    appointment = get_object_or_404(Appointment, pk=_parse_int(request.POST.get("appointment_id")))
+    day = timezone.localdate(appointment.start).isoformat()
+    appointment.delete()
+    return redirect(f"{reverse('appointments_repo')}?date={day}")
+
+INVOICE_FORM_ROWS = 5
+SALES_SUMMARY_DAYS = 30
+
+def _invoice_rows(data):
+    """
+    Devuelve las lineas enviadas en el formulario de facturas como diccionarios.
+    """
+    return [
+        {"item": item, "quantity": quantity, "unit_price": unit_price}
+        for item, quantity, unit_price in zip(
+            data.getlist("item"), data.getlist("quantity"), data.getlist("unit_price"),
+        )
+    ]
+
+def _invoice_context(client_id, rows, errors=None):
+    """
+    Arma el contexto del formulario de facturas con los clientes, productos y medicamentos.
+    """
+    rows = rows + [{}] * (INVOICE_FORM_ROWS - len(rows))
+    return {
+        "client_id": client_id,
+        "rows": rows,
+        "errors": errors or {},
+        "clients": _owner_choices(client_id),
+        "items": [
+            ("Productos", [
+                (f"product:{product.id}", f"{product.name} (${product.price}, stock {product.stock})")
+                for product in Product.objects.only("id", "name", "price", "stock").order_by("name")
+            ]),
+            ("Medicamentos", [
+                (f"medicine:{medicine.id}", medicine.name)
+                for medicine in Medicine.objects.only("id", "name").order_by("name")
+            ]),
+        ],
+    }
+
+async def invoices_form(request):
+    """
+    Maneja el formulario para crear una factura (`?client=` preselecciona el cliente).
+    """
+    if request.method == "POST":
+        return await sync_to_async(_invoices_form_post)(request)
+
+    context = await sync_to_async(_invoice_context)(request.GET.get("client", ""), [])
+    return render(request, "invoices/form.html", context)
+
+def _invoices_form_post(request):
+    """
+    Crea una factura con los datos enviados en el formulario.
+    """
+    client_id = _parse_int(request.POST.get("client"))
+    rows = _invoice_rows(request.POST)
+    invoice, errors = invoicing.create_invoice(client_id, rows)
+    if invoice is not None:
+        return redirect(reverse("invoice_detail", kwargs={"id": invoice.id}))
+    return render(
+        request, "invoices/form.html", _invoice_context(request.POST.get("client", ""), rows, errors),
+    )
+
+@conditional_on(Invoice)
+async def invoice_detail(request, id):
+    """
+    Muestra una factura con sus lineas.
+    """
+    invoice = await aget_object_or_404(Invoice, pk=id)
+    lines = [line async for line in invoice.lines.order_by("id")]
+    return render(request, "invoices/detail.html", {"invoice": invoice, "lines": lines})
+
+@conditional_on(Invoice, Client)
+async def client_invoices(request, id):
+    """
+    Muestra las ultimas facturas de un cliente.
+    """
+    client = await aget_object_or_404(Client, pk=id)
+    invoices = [invoice async for invoice in invoicing.client_invoices(client.id)]
+    return render(request, "invoices/client.html", {"client": client, "invoices": invoices})
+
+@conditional_on(DailySales)
+async def sales_summary(request):
+    """
+    Muestra el resumen de ventas de los ultimos dias.
+    """
+    days = [day async for day in invoicing.sales_summary(SALES_SUMMARY_DAYS)]
+    return render(request, "invoices/summary.html", {"days": days, "period": SALES_SUMMARY_DAYS})
+
+
+def _json_errors(errors, status=400):
+    return JsonResponse({"errors": errors}, status=status, json_dumps_params={"ensure_ascii": False})
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={"ensure_ascii": False})
+
+@require_http_methods(["GET", "HEAD", "POST"])
+async def api_records(request, model):
+    """
+    API: lista los registros de un modelo (GET), opcionalmente filtrados con ?q=, o crea uno (POST).
+    """
+    if request.method == "POST":
+        return await sync_to_async(_api_create)(request, model)
+
+    fields, errors = api.parse_fields(model, request.GET.get("fields"))
+    if errors:
+        return _json_errors(errors)
+    queryset = search(model.objects.values(*fields), request.GET.get("q"))
+    page = await acached_page(request, (model,), lambda: akeyset_paginate(queryset, request.GET))
+    links = {
+        name: f"{request.path}?{query}" if query else None
+        for name, query in (("next", page.next_query), ("previous", page.previous_query))
+    }
+    return _json({"results": list(page), **links})
+
+def _api_create(request, model):
+    """
+    Crea un registro con los datos JSON de la peticion.
+    """
+    data, errors = api.parse_body(request)
+    if not errors and not isinstance(data, dict):
+        errors = {"body": "Debe ser un objeto"}
+    if errors:
+        return _json_errors(errors)
+    result = api.save_batch(model, create=[data])["created"][0]
+    return _json(result, status=400 if "errors" in result else 201)
+
+@require_http_methods(["GET", "HEAD", "PATCH"])
+async def api_record(request, model, id):
+    """
+    API: muestra (GET) o modifica (PATCH) un registro.
+    """
+    if request.method == "PATCH":
+        return await sync_to_async(_api_update)(request, model, id)
+
+    fields, errors = api.parse_fields(model, request.GET.get("fields"))
+    if errors:
+        return _json_errors(errors)
+    record = await model.objects.values(*fields).filter(pk=id).afirst()
+    if record is None:
+        return _json_errors({"id": f"No existe el registro {id}"}, status=404)
+    return _json(record)
+
+def _api_update(request, model, id):
+    """
+    Modifica un registro con los datos JSON de la peticion.
+    """
+    data, errors = api.parse_body(request)
+    if not errors and not isinstance(data, dict):
+        errors = {"body": "Debe ser un objeto"}
+    if errors:
+        return _json_errors(errors)
+    result = api.save_batch(model, update=[{**data, "id": id}])["updated"][0]
+    if "errors" in result:
+        return _json(result, status=404 if "id" in result["errors"] else 400)
+    return _json(result)
+
+@require_http_methods(["POST"])
+def api_batch(request, model):
+    """
+    API: crea y modifica varios registros en una sola peticion y transaccion.
+
+    El cuerpo es {"create": [...], "update": [{"id": ..., ...}, ...]} y la
+    respuesta tiene el resultado de cada elemento, en el mismo orden.
+    """
+    data, errors = api.parse_body(request)
+    if not errors and not isinstance(data, dict):
+        errors = {"body": "Debe ser un objeto con las listas create y update"}
+    if errors:
+        return _json_errors(errors)
+
+    create, create_errors = api.batch_rows(data, "create", settings.API_BATCH_MAX_SIZE)
+    update, update_errors = api.batch_rows(data, "update", settings.API_BATCH_MAX_SIZE)
+    if create_errors or update_errors:
+        return _json_errors({**create_errors, **update_errors})
+    return _json(api.save_batch(model, create, update))
+
+@require_http_methods(["GET", "HEAD", "POST"])
+async def api_pet_weights(request, id):
+    """
+    API: historial de peso de una mascota reducido a `?points=` puntos (GET) o alta de pesajes (POST).
+    """
+    if request.method == "POST":
+        return await sync_to_async(_api_add_weighings)(request, id)
+
+    options, errors = weights.series_options(request.GET)
+    if errors:
+        return _json_errors(errors)
+
+    async def build():
+        if not await Pet.objects.filter(pk=id).aexists():
+            return None
+        return await sync_to_async(weights.downsampled)(id, options)
+
+    data = await acached_page(request, (PetWeight, Pet), build)
+    if data is None:
+        return _json_errors({"id": f"No existe la mascota {id}"}, status=404)
+    return _json(data)
+
+def _api_add_weighings(request, id):
+    """
+    Agrega los pesajes JSON de la peticion: un objeto o una lista de objetos con weight y measured_at.
+    """
+    data, errors = api.parse_body(request)
+    rows = [data] if isinstance(data, dict) else data
+    if not errors and not (isinstance(rows, list) and all(isinstance(row, dict) for row in rows)):
+        errors = {"body": "Debe ser un objeto o una lista de objetos"}
+    elif not errors and len(rows) > settings.API_BATCH_MAX_SIZE:
+        errors = {"body": f"Se pueden enviar hasta {settings.API_BATCH_MAX_SIZE} pesajes por lote"}
+    if errors:
+        return _json_errors(errors)
+    created, errors = weights.add_weighings(id, rows)
+    if errors:
+        return _json_errors(errors, status=404 if "pet" in errors else 400)
+    return _json({"created": created}, status=201)
+
+@require_http_methods(["GET", "HEAD"])
+async def api_pet_growth(request):
+    """
+    API: resumen del aumento de peso mensual de todas las mascotas.
+    """
+    async def build():
+        summary = await sync_to_async(lambda: weights.growth_summary(weights.growth_rates()))()
+        return {**summary, "engine": "numpy" if weights.numpy is not None else "python"}
+
+    return _json(await acached_page(request, (PetWeight, Pet), build))
+
+@require_POST
+async def api_medicine_doses(request, id):
+    """
+    API: dosis de un medicamento para una lista de mascotas y/o de pesos.
+    """
+    return await sync_to_async(_api_medicine_doses)(request, id)
+
+def _api_medicine_doses(request, id):
+    """
+    Calcula las dosis pedidas como {"pets": [ids], "weights": [kg]} en una sola llamada por lista.
+    """
+    data, errors = api.parse_body(request)
+    if not errors and not isinstance(data, dict):
+        errors = {"body": "Debe ser un objeto"}
+    if errors:
+        return _json_errors(errors)
+    rule = DosingRule.objects.filter(medicine_id=id).first()
+    if rule is None:
+        return _json_errors({"id": f"El medicamento {id} no tiene regla de dosificacion"}, status=404)
+
+    pet_ids, kilos = data.get("pets", []), data.get("weights", [])
+    if not isinstance(pet_ids, list) or not all(isinstance(pk, int) for pk in pet_ids):
+        errors["pets"] = "Debe ser una lista de ids"
+    if not isinstance(kilos, list) or not all(
+        isinstance(kg, (int, float)) and not isinstance(kg, bool) and kg > 0 for kg in kilos
+    ):
+        errors["weights"] = "Debe ser una lista de pesos mayores que 0"
+    for name, values in (("pets", pet_ids), ("weights", kilos)):
+        if name not in errors and len(values) > settings.API_BATCH_MAX_SIZE:
+            errors[name] = f"Se pueden enviar hasta {settings.API_BATCH_MAX_SIZE} elementos por lista"
+    if errors:
+        return _json_errors(errors)
+    return _json({
+        "medicine": id,
+        "pets": dosing.pet_doses(rule, pet_ids) if pet_ids else [],
+        "weights": dosing.doses(rule, kilos),
+    })
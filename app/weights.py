@@ -0,0 +1,360 @@
+"""
+Historial de peso de las mascotas.
+
+Cada pesaje es una fila de PetWeight, indexada por (mascota, fecha), y
+Pet.weight guarda el ultimo. Para graficar un historial largo sin enviar
+todos los pesajes, la serie se reduce a la cantidad de puntos pedida:
+
+- "lttb" (Largest-Triangle-Three-Buckets) elige en cada tramo el punto que
+  forma el triangulo de mayor area con sus vecinos, conservando la forma de
+  la curva;
+- "minmax" conserva el minimo y el maximo de cada tramo, de modo que no se
+  pierden picos ni caidas.
+
+growth_rates calcula el aumento de peso mensual de todas las mascotas (la
+pendiente de una recta de minimos cuadrados por mascota). Si NumPy esta
+instalado lo hace con operaciones vectorizadas sobre todas las filas a la vez;
+si no, con un recorrido en Python que da los mismos resultados.
+"""
+import statistics
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F, FloatField, Func, OuterRef, Subquery
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .caching import bump_version
+from .models import Pet, PetWeight
+from .validators import Field, Validator, at_most, convert, greater_than
+
+try:
+    import numpy
+except ImportError:  # NumPy es opcional: sin el se usa la version en Python.
+    numpy = None
+
+SERIES_DEFAULT_POINTS = 200
+SERIES_MAX_POINTS = 2000
+
+# Dias del calendario juliano en el 1/1/1970, para pasar julianday() a segundos Unix.
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+_SECONDS_PER_DAY = 86400
+_DAYS_PER_MONTH = 30
+
+def _weight(value):
+    # A diferencia de float(), no acepta true/false ni nan/inf: Decimal(str(...))
+    # da lo mismo que se guarda en PetWeight.weight.
+    weight = _as_decimal(value)
+    if weight is None or not weight.is_finite():
+        raise ValueError(value)
+    return weight
+
+
+WEIGHING_VALIDATOR = Validator(
+    Field("weight", "Por favor ingrese un peso",
+          convert(_weight, "Por favor ingrese un peso valido"),
+          greater_than(0, "El peso debe ser mayor que 0"),
+          # PetWeight.weight tiene 8 digitos, 3 de ellos decimales.
+          at_most(99999, "El peso no puede superar los 99999 kg")),
+)
+
+
+def _julian_day(field):
+    # SQLite convierte la fecha a dias en la consulta: se leen floats y no se
+    # construye un datetime por pesaje.
+    return Func(F(field), function="julianday", output_field=FloatField())
+
+
+def _weighings():
+    return PetWeight.objects.annotate(day=_julian_day("measured_at"), kg=Cast("weight", FloatField()))
+
+
+def _as_decimal(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def remember(pet):
+    """
+    Recuerda el peso con el que se cargo una mascota, si se cargo ese campo.
+    """
+    pet._stored_weight = _as_decimal(pet.__dict__.get("weight"))
+
+
+def saved(pet, created):
+    """
+    Agrega un pesaje si una mascota se creo o cambio de peso.
+
+    Returns:
+        True si se agrego un pesaje.
+    """
+    weight = _as_decimal(pet.__dict__.get("weight"))
+    if weight is None or (not created and weight == getattr(pet, "_stored_weight", None)):
+        return False
+    PetWeight.objects.create(pet=pet, weight=weight)
+    pet._stored_weight = weight
+    return True
+
+
+def record_initial(pets):
+    """
+    Agrega el pesaje inicial de mascotas creadas con bulk_create, con otro unico bulk_create.
+
+    Debe llamarse dentro de la transaccion del alta y no invalida la cache:
+    quien llama debe hacer bump_version(PetWeight).
+    """
+    PetWeight.objects.bulk_create(PetWeight(pet_id=pet.pk, weight=pet.weight) for pet in pets)
+
+
+def add_weighings(pet_id, rows):
+    """
+    Agrega pesajes a una mascota, por ejemplo cargados desde una balanza.
+
+    Cada fila tiene "weight" y opcionalmente "measured_at" (ISO 8601; por
+    defecto, ahora). Si alguna fila es invalida no se guarda ninguna. Despues
+    Pet.weight pasa a ser el peso del pesaje mas reciente.
+
+    Returns:
+        Una tupla (cantidad de pesajes agregados, errores por numero de fila).
+    """
+    errors = {}
+    weighings = []
+    for number, (row, row_errors) in enumerate(zip(rows, WEIGHING_VALIDATOR.validate_many(rows))):
+        measured_at = timezone.now()
+        if row.get("measured_at"):
+            measured_at = parse_datetime(str(row["measured_at"]))
+            if measured_at is None:
+                row_errors["measured_at"] = "Por favor ingrese una fecha y hora ISO 8601"
+            elif timezone.is_naive(measured_at):
+                measured_at = timezone.make_aware(measured_at)
+        if row_errors:
+            errors[number] = row_errors
+        else:
+            weighings.append(PetWeight(pet_id=pet_id, measured_at=measured_at, weight=_as_decimal(row["weight"])))
+    if errors:
+        return 0, errors
+
+    if not Pet.objects.filter(pk=pet_id).exists():
+        return 0, {"pet": f"No existe la mascota {pet_id}"}
+    with transaction.atomic():
+        # La primera escritura toma el lock de escritura de SQLite.
+        bump_version(Pet, PetWeight)
+        PetWeight.objects.bulk_create(weighings)
+        latest = PetWeight.objects.filter(pet_id=OuterRef("pk")).order_by("-measured_at", "-id")
+        Pet.objects.filter(pk=pet_id).update(weight=Subquery(latest.values("weight")[:1]))
+    return len(weighings), {}
+
+
+def series(pet_id, start=None, end=None):
+    """
+    Devuelve los pesajes de una mascota como tuplas (segundos Unix, kg), en orden cronologico.
+    """
+    weighings = _weighings().filter(pet_id=pet_id)
+    if start is not None:
+        weighings = weighings.filter(measured_at__gte=start)
+    if end is not None:
+        weighings = weighings.filter(measured_at__lte=end)
+    return [
+        ((day - _UNIX_EPOCH_JULIAN_DAY) * _SECONDS_PER_DAY, kg)
+        for day, kg in weighings.order_by("measured_at", "id").values_list("day", "kg")
+    ]
+
+
+def lttb(points, threshold):
+    """
+    Reduce una serie a `threshold` puntos con Largest-Triangle-Three-Buckets.
+
+    Conserva el primer y el ultimo punto; los demas tramos aportan un punto cada uno.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    every = (count - 2) / (threshold - 2)
+    selected = 0
+    for bucket in range(threshold - 2):
+        # Promedio del tramo siguiente, el tercer vertice del triangulo.
+        next_start = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, count)
+        next_points = points[next_start:next_end]
+        avg_x = sum(x for x, _ in next_points) / len(next_points)
+        avg_y = sum(y for _, y in next_points) / len(next_points)
+
+        ax, ay = points[selected]
+        largest = -1.0
+        for index in range(int(bucket * every) + 1, next_start):
+            x, y = points[index]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > largest:
+                largest, selected_in_bucket = area, index
+        selected = selected_in_bucket
+        sampled.append(points[selected])
+    sampled.append(points[-1])
+    return sampled
+
+
+def min_max(points, threshold):
+    """
+    Reduce una serie a lo sumo `threshold` puntos conservando el minimo y el maximo de cada tramo.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 2:
+        return list(points)
+
+    buckets = threshold // 2
+    sampled = []
+    for bucket in range(buckets):
+        chunk = points[bucket * count // buckets:(bucket + 1) * count // buckets]
+        low = min(chunk, key=lambda point: point[1])
+        high = max(chunk, key=lambda point: point[1])
+        sampled.extend(sorted({low, high}))
+    return sampled
+
+
+DOWNSAMPLERS = {
+    "lttb": lttb,
+    "minmax": min_max,
+}
+
+
+def series_options(query):
+    """
+    Lee de la query string las opciones de una serie: points, method, from y to.
+
+    Returns:
+        Una tupla (opciones, errores); las opciones son un diccionario con
+        "points", "method", "start" y "end".
+    """
+    errors = {}
+    try:
+        points = int(query.get("points") or SERIES_DEFAULT_POINTS)
+    except ValueError:
+        points = 0
+    if not 3 <= points <= SERIES_MAX_POINTS:
+        errors["points"] = f"Debe ser un numero entre 3 y {SERIES_MAX_POINTS}"
+
+    method = query.get("method") or "lttb"
+    if method not in DOWNSAMPLERS:
+        errors["method"] = f"Debe ser uno de: {', '.join(DOWNSAMPLERS)}"
+
+    bounds = {}
+    for name, key in (("from", "start"), ("to", "end")):
+        value = query.get(name)
+        bounds[key] = parse_datetime(value) if value else None
+        if value and bounds[key] is None:
+            errors[name] = "Por favor ingrese una fecha y hora ISO 8601"
+        elif bounds[key] is not None and timezone.is_naive(bounds[key]):
+            bounds[key] = timezone.make_aware(bounds[key])
+    return {"points": points, "method": method, **bounds}, errors
+
+
+def downsampled(pet_id, options):
+    """
+    Devuelve la serie de una mascota reducida segun las opciones de series_options, lista para la API.
+    """
+    points = series(pet_id, options["start"], options["end"])
+    return {
+        "pet": pet_id,
+        "count": len(points),
+        "method": options["method"],
+        "points": to_json(DOWNSAMPLERS[options["method"]](points, options["points"])),
+    }
+
+
+def to_json(points):
+    """
+    Convierte los puntos de una serie en pares [fecha ISO 8601, kg] para la API.
+    """
+    return [
+        [datetime.fromtimestamp(round(x), tz=dt_timezone.utc).isoformat(), round(y, 3)]
+        for x, y in points
+    ]
+
+
+def _growth_python(rows):
+    rates = {}
+    current, first_day, sums = None, 0.0, None
+    for pet_id, day, kg in rows:
+        if pet_id != current:
+            if sums is not None:
+                _add_rate(rates, current, *sums)
+            current, first_day, sums = pet_id, day, [0, 0.0, 0.0, 0.0, 0.0]
+        # Los dias se cuentan desde el primer pesaje para no perder precision.
+        day -= first_day
+        sums[0] += 1
+        sums[1] += day
+        sums[2] += kg
+        sums[3] += day * day
+        sums[4] += day * kg
+    if sums is not None:
+        _add_rate(rates, current, *sums)
+    return rates
+
+
+def _add_rate(rates, pet_id, n, sum_t, sum_w, sum_tt, sum_tw):
+    denominator = n * sum_tt - sum_t * sum_t
+    if n > 1 and denominator > 0:
+        rates[pet_id] = (n * sum_tw - sum_t * sum_w) / denominator * _DAYS_PER_MONTH
+
+
+def _growth_numpy(rows):
+    data = numpy.array(rows, dtype=float).reshape(-1, 3)
+    if not len(data):
+        return {}
+    pet_ids, days, kg = data[:, 0].astype(numpy.int64), data[:, 1], data[:, 2]
+    starts = numpy.flatnonzero(numpy.r_[True, pet_ids[1:] != pet_ids[:-1]])
+    groups = numpy.repeat(numpy.arange(len(starts)), numpy.diff(numpy.r_[starts, len(pet_ids)]))
+    days = days - days[starts][groups]
+
+    n = numpy.bincount(groups).astype(float)
+    sum_t = numpy.bincount(groups, weights=days)
+    sum_w = numpy.bincount(groups, weights=kg)
+    sum_tt = numpy.bincount(groups, weights=days * days)
+    sum_tw = numpy.bincount(groups, weights=days * kg)
+    denominator = n * sum_tt - sum_t * sum_t
+    valid = (n > 1) & (denominator > 0)
+    slopes = (n * sum_tw - sum_t * sum_w)[valid] / denominator[valid] * _DAYS_PER_MONTH
+    return dict(zip(pet_ids[starts][valid].tolist(), slopes.tolist()))
+
+
+def growth_rates(use_numpy=None):
+    """
+    Calcula el aumento de peso en kg por mes de cada mascota con al menos dos pesajes en fechas distintas.
+
+    Lee todos los pesajes con una sola consulta ordenada por el indice (mascota, fecha).
+
+    Args:
+        use_numpy: None usa NumPy si esta instalado; False fuerza la version en Python.
+
+    Returns:
+        Un diccionario {id de mascota: kg por mes}.
+    """
+    rows = list(_weighings().order_by("pet_id", "measured_at").values_list("pet_id", "day", "kg"))
+    if numpy is not None and use_numpy is not False:
+        return _growth_numpy(rows)
+    return _growth_python(rows)
+
+
+def growth_summary(rates):
+    """
+    Resume las tasas de aumento de peso: cantidad de mascotas, promedio, mediana y percentiles 10 y 90.
+    """
+    values = sorted(rates.values())
+    if not values:
+        return {"pets": 0, "kg_per_month": None}
+    if numpy is not None:
+        p10, median, p90 = numpy.percentile(values, [10, 50, 90]).tolist()
+    elif len(values) == 1:
+        p10 = median = p90 = values[0]
+    else:
+        # method="inclusive" interpola igual que numpy.percentile.
+        deciles = statistics.quantiles(values, n=10, method="inclusive")
+        p10, median, p90 = deciles[0], statistics.median(values), deciles[-1]
+    summary = {"mean": statistics.fmean(values), "median": median, "p10": p10, "p90": p90}
+    return {"pets": len(values), "kg_per_month": {key: round(value, 4) for key, value in summary.items()}}
@@ -0,0 +1,395 @@
+"""
+Carga cada URL de app/urls.py y reporta latencias y peticiones por segundo.
+
+Crea una base temporal con `manage.py seed_data` (mas una regla de dosis,
+facturas y turnos, que seed_data no genera), levanta el servidor elegido y
+carga cada URL por separado durante `--duration` segundos con `--concurrency`
+hilos. Las URLs con un `<int:id>` se completan con el primer registro del
+modelo indicado en `_id_records`.
+
+Primero se miden los GET que responden 200. Despues, las escrituras con los
+cuerpos de `_writes`: altas por formulario y por la API JSON, movimientos de
+stock, ofertas de proveedores, reglas de dosis, pesajes, facturas y turnos. Al
+final, las que eliminan registros, cada una sobre los registros mas nuevos que
+quedan, para no tocar los que usan las demas URLs. Cada peticion de escritura usa datos distintos,
+de modo que se mide el camino que guarda y no el de un error de validacion.
+Las URLs que no se pueden medir se informan como omitidas, con el motivo.
+
+El resultado es un JSON que se puede guardar con `--output` para comparar
+corridas. Las escrituras aparecen como "<nombre> <METODO>".
+
+Uso:
+    python -m benchmarks.load --server gunicorn-asgi --concurrency 16 --duration 5
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks.serving import SERVERS, load, seed, start_server, stop_server
+
+SEED_OPTIONS = ("clients", "pets", "medicines", "providers", "products", "vets")
+
+# Facturas que se agregan a la base para medir sus paginas.
+SEED_INVOICES = 20
+
+# Turnos que se agregan a la base, para medir su listado y tener que cancelar.
+SEED_APPOINTMENTS = 1000
+
+# Turnos de media hora por dia habil (de 9 a 18) y lunes desde el que se reservan.
+_SLOTS_PER_DAY = 18
+_FIRST_MONDAY = datetime(2031, 1, 6, 9)
+
+
+def _id_records():
+    """
+    Devuelve {nombre de la url: queryset} del que se toma el id de cada URL con `<int:id>`.
+    """
+    from app.api import API_RESOURCES
+    from app.models import Client, Invoice, Medicine, Pet, Product, Provider, Vet
+
+    records = {
+        "clients_edit": Client.objects.all(),
+        "pets_edit": Pet.objects.all(),
+        "medicines_edit": Medicine.objects.all(),
+        "medicines_dosing": Medicine.objects.filter(dosing_rule__isnull=False),
+        "provider_edit": Provider.objects.all(),
+        "products_edit": Product.objects.all(),
+        "products_stock": Product.objects.all(),
+        "vet_edit": Vet.objects.all(),
+        "invoice_detail": Invoice.objects.all(),
+        "client_invoices": Client.objects.filter(invoices__isnull=False),
+        "api_pets_weights": Pet.objects.all(),
+        "api_medicines_doses": Medicine.objects.filter(dosing_rule__isnull=False),
+    }
+    records.update(
+        (f"api_{resource}_detail", model.objects.all()) for resource, model in API_RESOURCES.items()
+    )
+    return records
+
+
+def discover_paths():
+    """
+    Devuelve {nombre de la url: path} para cada URL de app/urls.py.
+
+    Los parametros `id` se completan con el primer registro del queryset que
+    `_id_records` indica para la URL. Devuelve None como path si la URL no
+    figura ahi o si no hay registros.
+    """
+    from django.urls import reverse
+
+    from app.urls import urlpatterns
+
+    records = _id_records()
+    paths = {}
+    for pattern in urlpatterns:
+        kwargs = {}
+        if "id" in pattern.pattern.converters:
+            queryset = records.get(pattern.name)
+            pk = queryset.order_by("pk").values_list("pk", flat=True).first() if queryset is not None else None
+            if pk is None:
+                paths[pattern.name] = None
+                continue
+            kwargs["id"] = pk
+        paths[pattern.name] = reverse(pattern.name, kwargs=kwargs)
+    return paths
+
+
+def seed_extras():
+    """
+    Agrega lo que seed_data no genera: una regla de dosis, facturas y turnos.
+    """
+    from django.utils import timezone
+
+    from app import dosing, invoicing, scheduling
+    from app.models import Client, Medicine, Pet, Vet
+
+    medicine = Medicine.objects.order_by("pk").first()
+    dosing.save_rule(medicine, {"mg_per_kg": "1.5", "step_mg": "0.5"})
+    clients = list(Client.objects.order_by("pk").values_list("pk", flat=True)[:SEED_INVOICES // 2])
+    for number in range(SEED_INVOICES):
+        line = {"item": f"medicine:{medicine.pk}", "quantity": "1", "unit_price": "100"}
+        invoicing.create_invoice(clients[number % len(clients)], [line])
+    vet = Vet.objects.order_by("pk").values_list("pk", flat=True).first()
+    pet = Pet.objects.order_by("pk").values_list("pk", flat=True).first()
+    # Los turnos del formulario usan los numeros desde 0: estos, las semanas anteriores.
+    for number in range(-SEED_APPOINTMENTS, 0):
+        start = timezone.make_aware(datetime.fromisoformat(_slot(number)))
+        scheduling.book_appointment(vet, pet, start, start + timedelta(minutes=30))
+
+
+def _letters(number):
+    """
+    Escribe un numero con letras (0 -> "a", 26 -> "ba"), para los campos que no admiten digitos.
+    """
+    letters = ""
+    while True:
+        number, digit = divmod(number, 26)
+        letters = chr(ord("a") + digit) + letters
+        if not number:
+            return letters
+
+
+def _slot(number):
+    """
+    Devuelve el inicio ISO del turno numero `number`, de lunes a sabado de 9 a 18.
+    """
+    day, slot = divmod(number, _SLOTS_PER_DAY)
+    week, weekday = divmod(day, 6)
+    return (_FIRST_MONDAY + timedelta(weeks=week, days=weekday, minutes=30 * slot)).isoformat()
+
+
+def _records(prefix, first):
+    """
+    Devuelve {modelo: n -> datos validos y distintos para el alta numero n}.
+
+    `first` tiene el id del primer registro de cada modelo, para las relaciones.
+    """
+    def name(number):
+        return f"{prefix} {_letters(number).capitalize()}"
+
+    def email(number):
+        return f"{prefix.lower()}{number}@vetsoft.com"
+
+    return {
+        "clients": lambda n: {"name": name(n), "phone": f"54221{n:07d}", "email": email(n), "city": "La Plata"},
+        "pets": lambda n: {"name": name(n), "breed": "Mestizo", "weight": "4.5", "birthday": "2020-01-01", "owner": first["client"]},
+        "medicines": lambda n: {"name": name(n), "descripcion": "Carga", "dosis": str(n % 10 + 1)},
+        "providers": lambda n: {"name": name(n), "email": email(n), "address": "Calle 7"},
+        "products": lambda n: {"name": name(n), "type": "Accesorio", "price": "100"},
+        "vets": lambda n: {"name": name(n), "email": email(n), "phone": "54221", "speciality": "Clinica"},
+    }
+
+
+def _form(path, data, csrf):
+    headers = {"Content-Type": "application/x-www-form-urlencoded", **csrf}
+    return "POST", path, urlencode(data, doseq=True).encode(), headers
+
+
+def _json(method, path, data):
+    return method, path, json.dumps(data).encode(), {"Content-Type": "application/json"}
+
+
+def _first_ids():
+    from app.models import Client, Medicine, Pet, Product, Provider, Vet
+
+    models = {"client": Client, "pet": Pet, "medicine": Medicine, "product": Product, "provider": Provider, "vet": Vet}
+    return {name: model.objects.order_by("pk").values_list("pk", flat=True).first() for name, model in models.items()}
+
+
+def _writes(csrf):
+    """
+    Devuelve {nombre de la url: (metodo, funcion (path, n) -> peticion numero n)}.
+    """
+    from app.api import API_RESOURCES
+
+    first = _first_ids()
+    forms = _records("Formulario", first)
+    api = _records("Api", first)
+    batch = _records("Lote", first)
+    form_names = {
+        "clients": "clients_form", "pets": "pets_form", "medicines": "medicines_form",
+        "providers": "provider_form", "products": "products_form", "vets": "vet_form",
+    }
+
+    writes = {
+        form_names[resource]: ("POST", lambda path, n, data=data: _form(path, data(n), csrf))
+        for resource, data in forms.items()
+    }
+    for resource in API_RESOURCES:
+        writes[f"api_{resource}"] = ("POST", lambda path, n, data=api[resource]: _json("POST", path, data(n)))
+        writes[f"api_{resource}_batch"] = (
+            "POST",
+            lambda path, n, data=batch[resource]: _json("POST", path, {"create": [data(n * 10 + i) for i in range(10)]}),
+        )
+        writes[f"api_{resource}_detail"] = ("PATCH", lambda path, n: _json("PATCH", path, {}))
+    writes.update({
+        "products_stock": (
+            "POST", lambda path, n: _form(path, {"kind": "purchase", "quantity": "1", "provider": first["provider"]}, csrf),
+        ),
+        "products_purchasing": (
+            "POST",
+            lambda path, n: _form(
+                path,
+                {
+                    "provider": first["provider"], "product": first["product"], "unit_price": "90",
+                    "lead_time_days": "3", "valid_from": (date(2031, 1, 1) + timedelta(days=n)).isoformat(),
+                },
+                csrf,
+            ),
+        ),
+        "medicines_dosing": (
+            "POST", lambda path, n: _form(path, {"mg_per_kg": f"1.{n % 10}", "step_mg": "0.5"}, csrf),
+        ),
+        "appointments_form": (
+            "POST",
+            lambda path, n: _form(
+                path, {"vet": first["vet"], "pet": first["pet"], "start": _slot(n), "duration": "30"}, csrf,
+            ),
+        ),
+        "invoices_form": (
+            "POST",
+            lambda path, n: _form(
+                path,
+                {"client": first["client"], "item": [f"medicine:{first['medicine']}"], "quantity": ["1"], "unit_price": ["100"]},
+                csrf,
+            ),
+        ),
+        "api_pets_weights": ("POST", lambda path, n: _json("POST", path, {"weight": 4 + n % 10 / 10})),
+        "api_medicines_doses": ("POST", lambda path, n: _json("POST", path, {"pets": [first["pet"]], "weights": [2, 5, 10]})),
+    })
+    return writes
+
+
+def _deletes(csrf):
+    """
+    Devuelve {nombre de la url: funcion (path) -> (n -> peticion numero n)} de las URLs que eliminan.
+
+    Cada funcion se llama al empezar a medir su URL y elimina, de a uno (o de
+    a cinco en las acciones masivas), los registros mas nuevos que quedan en
+    ese momento. Si se acaban, las eliminaciones individuales responden 404 y
+    se cuentan como errores; las masivas repiten un id ya eliminado.
+    """
+    from app.models import Appointment, Client, Medicine, Pet, Product, Provider, Vet
+
+    def newest(model):
+        return list(model.objects.order_by("-pk").values_list("pk", flat=True)[:100000])
+
+    def delete(model, field):
+        def build(path):
+            pks = newest(model)
+            return lambda n: _form(path, {field: pks[min(n, len(pks) - 1)]}, csrf)
+        return build
+
+    def bulk_delete(model):
+        def build(path):
+            pks = newest(model)
+            return lambda n: _form(path, {"ids": pks[n * 5:n * 5 + 5] or pks[-1:], "action": "delete", "confirm": "1"}, csrf)
+        return build
+
+    return {
+        "clients_delete": delete(Client, "client_id"),
+        "pets_delete": delete(Pet, "pet_id"),
+        "medicines_delete": delete(Medicine, "medicine_id"),
+        "provider_delete": delete(Provider, "provider_id"),
+        "products_delete": delete(Product, "product_id"),
+        "vet_delete": delete(Vet, "vet_id"),
+        "appointments_cancel": delete(Appointment, "appointment_id"),
+        "clients_bulk": bulk_delete(Client),
+        "pets_bulk": bulk_delete(Pet),
+        "medicines_bulk": bulk_delete(Medicine),
+        "provider_bulk": bulk_delete(Provider),
+        "products_bulk": bulk_delete(Product),
+        "vet_bulk": bulk_delete(Vet),
+    }
+
+
+def _request(port, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        response.read()
+        return response
+    finally:
+        connection.close()
+
+
+def _csrf_headers(port, path):
+    """
+    Obtiene un token CSRF del formulario `path`, como cookie y encabezado para los POST.
+    """
+    cookie = SimpleCookie(_request(port, "GET", path).getheader("Set-Cookie", ""))
+    token = cookie["csrftoken"].value
+    return {"Cookie": f"csrftoken={token}", "X-CSRFToken": token}
+
+
+def _measure(port, args, path, build_request=None):
+    if build_request is not None:
+        # El calentamiento y la medicion comparten la numeracion, para no repetir datos.
+        numbers = itertools.count()
+        build = build_request
+
+        def build_request(_):
+            return build(next(numbers))
+
+    load(port, args.concurrency, 0.5, paths=[path], build_request=build_request)  # calentamiento
+    return {"path": path, **load(port, args.concurrency, args.duration, paths=[path], build_request=build_request)}
+
+
+def main(argv=None):
+    """
+    Ejecuta la carga sobre cada URL e imprime (o guarda) el resultado en JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", choices=SERVERS, default="gunicorn-asgi")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5, help="segundos por URL")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", type=Path, help="archivo donde guardar el JSON")
+    for option, default in zip(SEED_OPTIONS, (1000, 2000, 200, 50, 500, 20)):
+        parser.add_argument(f"--{option}", type=int, default=default)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, SQLITE_PATH=str(Path(directory) / "load.sqlite3"))
+        os.environ.update(env)
+        seed(**{option: getattr(args, option) for option in SEED_OPTIONS})
+        seed_extras()
+        paths = discover_paths()
+
+        results = {}
+        skipped = {}
+        process, port = start_server(args.server, env, args.workers)
+        try:
+            records = _id_records()
+            csrf = _csrf_headers(port, paths["clients_form"])
+            writes = _writes(csrf)
+            deletes = _deletes(csrf)
+            for name, path in paths.items():
+                if path is None:
+                    skipped[name] = "sin registros para completar la URL" if name in records else "falta en _id_records"
+                    continue
+                status = _request(port, "GET", path).status
+                if status == 200:
+                    results[name] = _measure(port, args, path)
+                elif name not in writes and name not in deletes:
+                    skipped[name] = f"GET responde {status} y no tiene cuerpo de escritura"
+            for name, (method, build) in writes.items():
+                if paths.get(name) is not None:
+                    path = paths[name]
+                    results[f"{name} {method}"] = _measure(port, args, path, lambda n, b=build, p=path: b(p, n))
+            skipped["import_records POST"] = "necesita subir un archivo"
+            for name, build in deletes.items():
+                results[f"{name} POST"] = _measure(port, args, paths[name], build(paths[name]))
+        finally:
+            stop_server(process)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "server": args.server,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "seed": {option: getattr(args, option) for option in SEED_OPTIONS},
+        "results": results,
+        "skipped": skipped,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
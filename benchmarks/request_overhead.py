@@ -0,0 +1,123 @@
+"""
+Mide el costo por peticion de la barra de navegacion y de la carga de plantillas.
+
+Compara la version anterior de la barra (un context processor que copiaba
+cada enlace en cada peticion y una plantilla que los recorria) con la actual
+(variantes precalculadas y HTML renderizado una vez por variante, ver
+app/navigation.py), y la carga de plantillas sin y con el loader cached.
+Imprime un JSON con microsegundos por operacion.
+
+Uso:
+    python -m benchmarks.request_overhead --number 2000
+"""
+import argparse
+import json
+import os
+import timeit
+
+
+def legacy_navbar(request, links):
+    """
+    Version anterior del context processor, como referencia.
+    """
+    def add_active(link):
+        copy = link.copy()
+
+        if copy["href"] == "/":
+            copy["active"] = request.path == "/"
+        else:
+            copy["active"] = request.path.startswith(copy.get("href", ""))
+
+        return copy
+
+    return {"links": map(add_active, links)}
+
+
+def _engine(cached):
+    from django.conf import settings
+    from django.template import Engine
+    from django.template.backends.django import get_installed_libraries
+
+    loaders = [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]
+    if cached:
+        loaders = [("django.template.loaders.cached.Loader", loaders)]
+    options = {
+        key: value
+        for key, value in settings.TEMPLATES[0]["OPTIONS"].items()
+        if key != "loaders"
+    }
+    return Engine(
+        dirs=settings.TEMPLATES[0]["DIRS"], loaders=loaders, libraries=get_installed_libraries(), **options,
+    )
+
+
+def _per_call(function, number):
+    seconds = min(timeit.repeat(function, number=number, repeat=5))
+    return round(seconds / number * 1_000_000, 2)
+
+
+def main(argv=None):
+    """
+    Ejecuta el benchmark e imprime el resultado en JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000, help="operaciones por medicion")
+    parser.add_argument("--template", default="clients/repository.html")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+
+    import django
+
+    django.setup()
+
+    from django.template import Context, RequestContext
+    from django.test import RequestFactory
+
+    from app.navigation import links
+
+    request = RequestFactory().get("/clientes/5/facturas/")
+    engine = _engine(cached=True)
+    # La barra se renderiza sola, como la incluia base.html antes y como la incluye ahora.
+    legacy = engine.from_string('{% include "partials/navbar.html" %}')
+    current = engine.from_string("{% load navigation %}{% navbar %}")
+
+    def legacy_render():
+        legacy.render(Context({**legacy_navbar(request, links()), "request": request}))
+
+    def current_render():
+        current.render(Context({"request": request}))
+
+    uncached, cached = _engine(cached=False), _engine(cached=True)
+    cached.get_template(args.template)
+
+    def render_page(engine):
+        template_context = {"clients": [], "page": None, "query": ""}
+
+        def run():
+            template = engine.get_template(args.template)
+            template.render(RequestContext(request, template_context))
+        return run
+
+    results = {
+        "navbar_us": {
+            "before": _per_call(legacy_render, args.number),
+            "after": _per_call(current_render, args.number),
+        },
+        "get_template_us": {
+            "before": _per_call(lambda: uncached.get_template(args.template), args.number // 10),
+            "after": _per_call(lambda: cached.get_template(args.template), args.number),
+        },
+        "get_and_render_page_us": {
+            "before": _per_call(render_page(uncached), args.number // 10),
+            "after": _per_call(render_page(cached), args.number // 10),
+        },
+    }
+    print(json.dumps({"template": args.template, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
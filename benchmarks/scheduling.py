@@ -0,0 +1,133 @@
+"""
+Mide la busqueda de horarios libres sobre una agenda de un año.
+
+Crea una base temporal con `--vets` veterinarios y un año de turnos que ocupan
+aproximadamente `--occupancy` de la grilla, y mide free_slots para un
+veterinario, para una especialidad y para todos los veterinarios. Imprime un
+JSON con la mediana y el maximo en milisegundos de cada caso.
+
+Uso:
+    python -m benchmarks.scheduling --vets 50 --occupancy 0.8
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+def populate(vets, occupancy, days, rng):
+    """
+    Crea los veterinarios, una mascota y los turnos de `days` dias desde hoy.
+
+    Returns:
+        La cantidad de turnos creados.
+    """
+    from django.conf import settings
+    from django.utils import timezone
+
+    from app.caching import bump_version
+    from app.models import Appointment, Pet, Vet
+
+    specialities = Vet.SPECIALITY_CHOICES.values
+    created = Vet.objects.bulk_create(
+        Vet(name=f"Vet {i}", email=f"vet{i}@vetsoft.com", phone=f"54221{i:07d}", speciality=specialities[i % len(specialities)])
+        for i in range(vets)
+    )
+    pet = Pet.objects.create(name="Firulais", breed="Mestizo", birthday="2020-01-01", weight=4)
+
+    step = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    slots_per_day = (settings.APPOINTMENT_CLOSING_HOUR - settings.APPOINTMENT_OPENING_HOUR) * 60 // settings.APPOINTMENT_SLOT_MINUTES
+    today = timezone.localdate()
+    batch = []
+    total = 0
+    for offset in range(days):
+        day = today + timedelta(days=offset)
+        if day.weekday() not in settings.APPOINTMENT_WORKING_DAYS:
+            continue
+        opening = timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=settings.APPOINTMENT_OPENING_HOUR))
+        for vet in created:
+            for slot in range(slots_per_day):
+                if rng.random() < occupancy:
+                    start = opening + slot * step
+                    batch.append(Appointment(vet=vet, pet=pet, start=start, end=start + step))
+        if len(batch) >= 10000:
+            Appointment.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    Appointment.objects.bulk_create(batch)
+    bump_version(Appointment)
+    return total + len(batch)
+
+
+def measure(function, repeat):
+    """
+    Ejecuta `function` `repeat` veces y devuelve la mediana y el maximo en ms.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(times), 2), "max_ms": round(max(times), 2)}
+
+
+def main(argv=None):
+    """
+    Ejecuta el benchmark e imprime el resultado en JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vets", type=int, default=50)
+    parser.add_argument("--occupancy", type=float, default=0.8)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--count", type=int, default=10, help="horarios libres buscados")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["SQLITE_PATH"] = str(Path(directory) / "scheduling.sqlite3")
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+
+        import django
+
+        django.setup()
+
+        from django.core.management import call_command
+
+        from app import scheduling
+        from app.models import Vet
+
+        call_command("migrate", verbosity=0)
+        appointments = populate(args.vets, args.occupancy, args.days, random.Random(1))
+        vet_ids = list(Vet.objects.values_list("pk", flat=True))
+
+        results = {
+            "one_vet": measure(lambda: scheduling.free_slots(vet_ids[:1], count=args.count), args.repeat),
+            "speciality": measure(
+                lambda: scheduling.free_slots_for_speciality("Clinica", count=args.count), args.repeat,
+            ),
+            "all_vets": measure(lambda: scheduling.free_slots(vet_ids, count=args.count), args.repeat),
+            "one_vet_60_minutes": measure(
+                lambda: scheduling.free_slots(vet_ids[:1], count=args.count, duration=timedelta(hours=1)),
+                args.repeat,
+            ),
+        }
+
+    print(json.dumps(
+        {
+            "vets": args.vets,
+            "appointments": appointments,
+            "occupancy": args.occupancy,
+            "count": args.count,
+            "results": results,
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Compara el rendimiento de `runserver` contra gunicorn (ASGI y WSGI) bajo carga.
+
+Crea una base SQLite temporal con datos de prueba, levanta cada servidor como un
+proceso aparte y lo carga con varios hilos concurrentes durante unos segundos.
+Imprime un JSON con peticiones por segundo y latencias por servidor.
+
+Uso:
+    python -m benchmarks.serving --concurrency 32 --duration 10
+"""
+import argparse
+import http.client
+import io
+import itertools
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PATHS = (
+    "/",
+    "/clientes/",
+    "/clientes/?q=mar",
+    "/pets/",
+    "/clientes/editar/1/",
+)
+
+SERVERS = {
+    "runserver": [sys.executable, "manage.py", "runserver", "--noreload", "127.0.0.1:{port}"],
+    "gunicorn-asgi": [sys.executable, "-m", "gunicorn", "-c", "vetsoft/gunicorn.conf.py"],
+    "gunicorn-wsgi": [sys.executable, "-m", "gunicorn", "-c", "vetsoft/gunicorn.conf.py"],
+}
+
+def seed(clients, **counts):
+    """
+    Migra la base indicada en SQLITE_PATH y la completa con `manage.py seed_data`.
+
+    Args:
+        clients: cantidad de clientes; las mascotas son el doble.
+        counts: cantidades de los demas modelos, con los nombres de las opciones
+            de seed_data (pets, medicines, providers, products, vets).
+    """
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+    django.setup()
+
+    from django.core.management import call_command
+
+    counts = {"clients": clients, "pets": clients * 2, **counts}
+    call_command("migrate", verbosity=0)
+    call_command(
+        "seed_data",
+        *(f"--{name}={count}" for name, count in counts.items()),
+        "--seed=1",
+        stdout=io.StringIO(),
+    )
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("El servidor termino antes de aceptar conexiones")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondio en el puerto {port}")
+
+
+def start_server(name, env, workers):
+    """
+    Levanta un servidor y espera a que acepte conexiones.
+
+    Returns:
+        El proceso y el puerto en el que escucha.
+    """
+    port = _free_port()
+    command = [part.format(port=port) for part in SERVERS[name]]
+    env = dict(
+        env,
+        PORT=str(port),
+        WEB_CONCURRENCY=str(workers),
+        SERVER_MODE="wsgi" if name == "gunicorn-wsgi" else "asgi",
+    )
+    process = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    _wait_until_ready(port, process)
+    return process, port
+
+
+def stop_server(process):
+    """
+    Detiene el servidor y todos sus workers.
+    """
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    index = min(int(len(values) * fraction), len(values) - 1)
+    return round(sorted(values)[index] * 1000, 2)
+
+
+def load(port, concurrency, duration, paths=PATHS, build_request=None):
+    """
+    Envia peticiones con `concurrency` hilos durante `duration` segundos.
+
+    Cada hilo mantiene su propia conexion y recorre `paths` en orden con GET;
+    las respuestas que no son 200 cuentan como errores. Con `build_request`,
+    la peticion numero n (contando las de todos los hilos) es
+    `build_request(n)`, una tupla (metodo, path, cuerpo, encabezados), y solo
+    las respuestas 4xx y 5xx cuentan como errores.
+
+    Returns:
+        Un diccionario con peticiones por segundo, errores y latencias en ms.
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    numbers = itertools.count()
+
+    def requests():
+        if build_request is None:
+            for path in itertools.cycle(paths):
+                yield "GET", path, None, {}
+        else:
+            for number in numbers:
+                yield build_request(number)
+
+    def failed(status):
+        return status != 200 if build_request is None else status >= 400
+
+    def worker():
+        local_latencies = []
+        local_errors = 0
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        for method, path, body, headers in requests():
+            if time.monotonic() >= deadline:
+                break
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                response.read()
+                if failed(response.status):
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local_latencies.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+
+
+def main(argv=None):
+    """
+    Ejecuta el benchmark sobre los servidores pedidos e imprime el resultado en JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--servers", nargs="+", choices=SERVERS, default=list(SERVERS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, SQLITE_PATH=str(Path(directory) / "bench.sqlite3"))
+        os.environ.update(env)
+        seed(args.clients)
+
+        results = {}
+        for name in args.servers:
+            process, port = start_server(name, env, args.workers)
+            try:
+                load(port, args.concurrency, 1)  # calentamiento
+                results[name] = load(port, args.concurrency, args.duration)
+            finally:
+                stop_server(process)
+
+    print(json.dumps(
+        {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "workers": args.workers,
+            "results": results,
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    main()
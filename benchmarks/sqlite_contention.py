@@ -0,0 +1,181 @@
+"""
+Mide la contencion de SQLite con la configuracion por defecto y con SQLITE_PRAGMAS.
+
+Varios procesos escriben clientes (una transaccion por "peticion") mientras
+otros leen paginas del repositorio sobre la misma base. El perfil "default"
+reproduce la configuracion anterior (journal de rollback, conexion nueva por
+peticion); el perfil "tuned" usa los PRAGMAs de settings y una conexion
+persistente por proceso. Imprime un JSON con operaciones por segundo, errores
+"database is locked" y latencias por perfil.
+
+Uso:
+    python -m benchmarks.sqlite_contention --writers 4 --readers 8 --duration 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+PROFILES = ("default", "tuned")
+
+READ_SQL = (
+    "SELECT id, name, phone, email, city FROM app_client "
+    "WHERE id > ? ORDER BY id LIMIT 50"
+)
+WRITE_SQL = "INSERT INTO app_client (name, phone, email, city) VALUES (?, ?, ?, ?)"
+
+
+def _connect(database, statements, timeout):
+    connection = sqlite3.connect(database, timeout=timeout, isolation_level=None)
+    for statement in statements:
+        connection.execute(statement)
+    return connection
+
+
+def _read(connection, number):
+    connection.execute(READ_SQL, (number % 1000,)).fetchall()
+
+
+def _write(connection, number):
+    connection.execute("BEGIN")
+    connection.execute(
+        WRITE_SQL, ("Contencion", 54221000000 + number, "contencion@vetsoft.com", "La Plata"),
+    )
+    connection.execute("COMMIT")
+
+
+def _worker(kind, database, statements, persistent, timeout, duration, results):
+    operation = _write if kind == "write" else _read
+    connection = _connect(database, statements, timeout) if persistent else None
+    latencies = []
+    locked = 0
+    number = os.getpid() * 1000
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        number += 1
+        start = time.perf_counter()
+        current = connection or _connect(database, statements, timeout)
+        try:
+            operation(current, number)
+            latencies.append(time.perf_counter() - start)
+        except sqlite3.OperationalError as error:
+            if "locked" not in str(error) and "busy" not in str(error):
+                raise
+            locked += 1
+            if current.in_transaction:
+                current.execute("ROLLBACK")
+        finally:
+            if connection is None:
+                current.close()
+
+    if connection is not None:
+        connection.close()
+    results.put((kind, latencies, locked))
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    index = min(int(len(values) * fraction), len(values) - 1)
+    return round(sorted(values)[index] * 1000, 2)
+
+
+def run_profile(database, statements, persistent, timeout, writers, readers, duration):
+    """
+    Ejecuta escritores y lectores concurrentes y resume sus resultados.
+    """
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(kind, database, statements, persistent, timeout, duration, results),
+        )
+        for kind in ["write"] * writers + ["read"] * readers
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = {}
+    for kind in ("write", "read"):
+        latencies = [value for k, values, _ in collected if k == kind for value in values]
+        summary[kind] = {
+            "operations": len(latencies),
+            "operations_per_second": round(len(latencies) / duration, 1),
+            "locked_errors": sum(locked for k, _, locked in collected if k == kind),
+            "p50_ms": _percentile(latencies, 0.50),
+            "p95_ms": _percentile(latencies, 0.95),
+            "p99_ms": _percentile(latencies, 0.99),
+        }
+    return summary
+
+
+def _copy_database(source, target, journal_mode):
+    with sqlite3.connect(source) as origin, sqlite3.connect(target) as copy:
+        origin.backup(copy)
+        copy.execute(f"PRAGMA journal_mode = {journal_mode}")
+    origin.close()
+    copy.close()
+
+
+def main(argv=None):
+    """
+    Ejecuta el benchmark con ambos perfiles e imprime el resultado en JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument(
+        "--timeout", type=float, default=5,
+        help="segundos de espera ante un lock en el perfil default (el de sqlite3)",
+    )
+    parser.add_argument("--clients", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = str(Path(directory) / "seed.sqlite3")
+        os.environ["SQLITE_PATH"] = source
+
+        from benchmarks.serving import seed
+
+        seed(args.clients)
+
+        from django.conf import settings
+        from django.db import connections
+
+        from app.database import pragma_statements
+
+        connections.close_all()
+
+        results = {}
+        for profile in PROFILES:
+            tuned = profile == "tuned"
+            database = str(Path(directory) / f"{profile}.sqlite3")
+            _copy_database(source, database, "wal" if tuned else "delete")
+            statements = pragma_statements(settings.SQLITE_PRAGMAS) if tuned else []
+            timeout = settings.DATABASES["default"]["OPTIONS"]["timeout"] if tuned else args.timeout
+            results[profile] = run_profile(
+                database, statements, tuned, timeout, args.writers, args.readers, args.duration,
+            )
+
+    print(json.dumps(
+        {
+            "writers": args.writers,
+            "readers": args.readers,
+            "duration": args.duration,
+            "results": results,
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Compara los validadores compilados (app/validators.py) con los validate_* anteriores.
+
+Genera filas con los generadores de seed_data, altera una parte de ellas con
+valores invalidos y valida todas con la version anterior (una llamada por
+fila) y con `validate_many`. Antes de medir comprueba que ambas devuelvan los
+mismos errores. Imprime un JSON con microsegundos por fila de cada modelo.
+
+Uso:
+    python -m benchmarks.validation --rows 10000 --invalid 0.2
+"""
+import argparse
+import json
+import os
+import random
+import timeit
+
+# Valores con los que se alteran las filas invalidas.
+BAD_VALUES = ("", "abc", "0", "-1", "11", "12ab", "Juan 2", "54", "221555", "x@gmail.com", "@vetsoft.com", "Quilmes", "Dentista")
+
+
+def legacy_validate_client(data, cities):
+    """
+    validate_client anterior, como referencia.
+    """
+    errors = {}
+
+    name = data.get("name", "")
+    phone = str(data.get("phone", ""))
+    email = data.get("email", "")
+    city = data.get("city", "")
+
+    if name == "":
+        errors["name"] = "Por favor ingrese un nombre"
+    elif not all(char.isalpha() or char.isspace() for char in name):
+        errors["name"] = "El nombre solo puede contener letras y espacios"
+
+    if phone == "":
+        errors["phone"] = "Por favor ingrese un teléfono"
+    elif not phone.isdigit():
+        errors["phone"] = "Por favor ingrese un telefono valido"
+    elif not phone.startswith('54'):
+        errors["phone"] = "El teléfono debe comenzar con 54"
+
+    if email == "":
+        errors["email"] = "Por favor ingrese un email"
+    elif email.count("@") == 0:
+        errors["email"] = "Por favor ingrese un email válido"
+    elif not email.endswith("@vetsoft.com"):
+        errors["email"] = "El email debe terminar en @vetsoft.com"
+    elif email == "@vetsoft.com":
+        errors["email"] = "El email no puede ser solo '@vetsoft.com'"
+
+    if city == "" or city is None:
+        errors["city"] = "Por favor ingrese una ciudad"
+    elif city not in dict(cities.choices):
+        errors["city"] = "Ciudad no válida"
+
+    return errors
+
+
+def legacy_validate_medicine(data):
+    """
+    validate_medicine anterior, como referencia.
+    """
+    errors = {}
+
+    name = data.get("name", "")
+    descripcion = data.get("descripcion", "")
+    dosis = data.get("dosis", "")
+
+    if name == "":
+        errors["name"] = "Por favor ingrese un nombre para el medicamento"
+
+    if descripcion == "":
+        errors["descripcion"] = "Por favor ingrese una descripcion"
+
+    if dosis == "":
+        errors["dosis"] = "Por favor ingrese una dosis"
+    else:
+        try:
+            dosis = int(dosis)
+            if dosis <= 0:
+                errors['dosis'] = "La dosis debe ser mayor a cero"
+            elif dosis > 10:
+                errors["dosis"] = "La dosis debe ser menor que 10"
+        except ValueError:
+            errors["dosis"] = "La cantidad de dosis no es correcta,debe ser una cantidad entera"
+    return errors
+
+
+def legacy_validate_product(data):
+    """
+    validate_product anterior, como referencia.
+    """
+    errors = {}
+
+    name = data.get("name", "")
+    type = data.get("type", "")
+    price = data.get("price", "")
+
+    if name == "":
+        errors["name"] = "Por favor ingrese un nombre para el producto"
+
+    if type == "":
+        errors["type"] = "Por favor ingrese el tipo del producto"
+
+    if price == "":
+        errors["price"] = "Por favor ingrese el precio del producto"
+    else:
+        try:
+            if float(price) <= 0:
+                errors["price"] = "Por favor ingrese un precio del producto mayor que cero"
+        except ValueError:
+            errors["price"] = "Por favor ingrese un precio valido para el producto"
+
+    return errors
+
+
+def legacy_validate_vet(data, specialities):
+    """
+    validate_Vet anterior, como referencia.
+    """
+    errors = {}
+
+    name = data.get("name", "")
+    email = data.get("email", "")
+    phone = data.get("phone", "")
+    speciality = data.get("speciality", "")
+    if name == "":
+        errors["name"] = "Por favor ingrese un nombre"
+
+    if email == "":
+        errors["email"] = "Por favor ingrese un email"
+    elif email.count("@") == 0:
+        errors["email"] = "Por favor ingrese un email valido"
+
+    if phone == "":
+        errors["phone"] = "Por favor ingrese un teléfono"
+
+    if speciality == "" or speciality is None:
+        errors["speciality"] = "Por favor seleccione una especialidad válida"
+    elif speciality not in [choice[0] for choice in specialities.choices]:
+        errors["speciality"] = "Especialidad no válida"
+
+    return errors
+
+
+def make_rows(generate, count, invalid, rng):
+    """
+    Genera `count` filas y altera un campo de una fraccion `invalid` de ellas.
+    """
+    rows = list(generate(count, rng))
+    for row in rows:
+        if rng.random() < invalid:
+            row[rng.choice(sorted(row))] = rng.choice(BAD_VALUES)
+    return rows
+
+
+def _per_row(function, rows):
+    seconds = min(timeit.repeat(function, number=1, repeat=5))
+    return round(seconds / len(rows) * 1_000_000, 3)
+
+
+def main(argv=None):
+    """
+    Ejecuta el benchmark e imprime el resultado en JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="filas por modelo")
+    parser.add_argument("--invalid", type=float, default=0.2, help="fraccion de filas alteradas")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+
+    import django
+
+    django.setup()
+
+    from app.imports import IMPORTERS
+    from app.models import City, Vet
+    from app.seeding import GENERATORS
+
+    legacy = {
+        "client": lambda row: legacy_validate_client(row, City),
+        "medicine": legacy_validate_medicine,
+        "product": legacy_validate_product,
+        "vet": lambda row: legacy_validate_vet(row, Vet.SPECIALITY_CHOICES),
+    }
+    rng = random.Random(args.seed)
+    results = {}
+    for model_name, before in legacy.items():
+        rows = make_rows(GENERATORS[model_name], args.rows, args.invalid, rng)
+        _, validator = IMPORTERS[model_name]
+
+        expected = [before(row) for row in rows]
+        if validator.validate_many(rows) != expected:
+            raise SystemExit(f"{model_name}: los errores no coinciden con la version anterior")
+
+        results[model_name] = {
+            "rejected": sum(1 for errors in expected if errors),
+            "before_us_per_row": _per_row(lambda: [before(row) for row in rows], rows),
+            "after_us_per_row": _per_row(lambda: validator.validate_many(rows), rows),
+        }
+    print(json.dumps({"rows": args.rows, "invalid": args.invalid, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
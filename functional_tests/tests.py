@@ -1,3 +1,4 @@
+import atexit
 import os
 from datetime import datetime
 
@@ -8,41 +9,55 @@ from playwright.sync_api import Browser, expect, sync_playwright, Error
 from app.models import Client, Medicine, Pet, Product, Provider, Vet, City
 
 os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
-playwright = sync_playwright().start()
 headless = os.environ.get("HEADLESS", 1) == 1
 slow_mo = os.environ.get("SLOW_MO", 0)
 
+_browser = None
+
+
+def get_browser() -> Browser:
+    """
+    Devuelve el navegador compartido por todas las clases de prueba del proceso.
+
+    Se lanza la primera vez que se pide, y no al importar el modulo, para que
+    con --parallel cada proceso de pruebas lance el suyo.
+    """
+    global _browser
+    if _browser is None:
+        playwright = sync_playwright().start()
+        try:
+            _browser = playwright.chromium.launch(headless=headless, slow_mo=int(slow_mo))
+        except Error:
+            # Si no se detiene, el siguiente start() choca con el loop que quedo abierto.
+            playwright.stop()
+            raise
+        atexit.register(playwright.stop)
+        atexit.register(_browser.close)
+    return _browser
+
 
 class PlaywrightTestCase(StaticLiveServerTestCase):
     @classmethod
     def setUpClass(cls):
         """
-        Configuración inicial de la clase de prueba, lanza el navegador
+        Configuración inicial de la clase de prueba, obtiene el navegador compartido
         """
         super().setUpClass()
-        cls.browser: Browser = playwright.chromium.launch(
-            headless=headless, slow_mo=int(slow_mo)
-        )
-
-    @classmethod
-    def tearDownClass(cls):
-        """
-        Finaliza y cierra el navegador al terminar todas las pruebas
-        """
-        super().tearDownClass()
-        cls.browser.close()
+        cls.browser = get_browser()
 
     def setUp(self):
         """
-        Configuración inicial para cada prueba, abre una nueva página
+        Configuración inicial para cada prueba, abre un contexto nuevo (sin cookies
+        ni almacenamiento de otras pruebas) y una página en él
         """
         super().setUp()
-        self.page = self.browser.new_page()
+        self.context = self.browser.new_context()
+        self.page = self.context.new_page()
 
     def tearDown(self):
-        """Finaliza y cierra la página al terminar cada prueba"""
+        """Finaliza y cierra el contexto y su página al terminar cada prueba"""
         super().tearDown()
-        self.page.close()
+        self.context.close()
 
 
 class HomeTestCase(PlaywrightTestCase):
@@ -98,15 +113,15 @@ class ClientsRepoTestCase(PlaywrightTestCase):
         self.page.goto(f"{self.live_server_url}{reverse('clients_repo')}")
 
         expect(self.page.get_by_text("No existen clientes")).not_to_be_visible()
-        expect(self.page.get_by_text("Juan Sebastián Veron")).to_be_visible()
-        expect(self.page.get_by_text("La Plata")).to_be_visible()
-        expect(self.page.get_by_text("54221555232")).to_be_visible()
-        expect(self.page.get_by_text("brujita75@vetsoft.com")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Juan Sebastián Veron")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("La Plata")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("54221555232")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("brujita75@vetsoft.com")).to_be_visible()
 
-        expect(self.page.get_by_text("Guido Carrillo")).to_be_visible()
-        expect(self.page.get_by_text("Ensenada")).to_be_visible()
-        expect(self.page.get_by_text("54221232555")).to_be_visible()
-        expect(self.page.get_by_text("goleador@vetsoft.com")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Guido Carrillo")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Ensenada")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("54221232555")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("goleador@vetsoft.com")).to_be_visible()
 
     def test_should_show_add_client_action(self):
         """Prueba que muestra la acción de agregar un nuevo cliente"""
@@ -164,7 +179,7 @@ class ClientsRepoTestCase(PlaywrightTestCase):
 
         self.page.goto(f"{self.live_server_url}{reverse('clients_repo')}")
 
-        expect(self.page.get_by_text("Juan Sebastián Veron")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Juan Sebastián Veron")).to_be_visible()
 
         def is_delete_response(response):
             return response.url.find(reverse("clients_delete"))
@@ -176,7 +191,7 @@ class ClientsRepoTestCase(PlaywrightTestCase):
         response = response_info.value
         self.assertTrue(response.status < 400)
 
-        expect(self.page.get_by_text("Juan Sebastián Veron")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Juan Sebastián Veron")).not_to_be_visible()
 
 
 class ClientCreateEditTestCase(PlaywrightTestCase):
@@ -193,10 +208,10 @@ class ClientCreateEditTestCase(PlaywrightTestCase):
 
         self.page.get_by_role("button", name="Guardar").click()
 
-        expect(self.page.get_by_text("Juan Sebastián Veron")).to_be_visible()
-        expect(self.page.get_by_text("54221555232")).to_be_visible()
-        expect(self.page.get_by_text("brujita75@vetsoft.com")).to_be_visible()
-        expect(self.page.get_by_text("La Plata")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Juan Sebastián Veron")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("54221555232")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("brujita75@vetsoft.com")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("La Plata")).to_be_visible()
 
     def test_should_view_errors_if_form_is_invalid(self):
         """Prueba que muestra errores si el formulario es inválido"""
@@ -240,15 +255,15 @@ class ClientCreateEditTestCase(PlaywrightTestCase):
 
         self.page.get_by_role("button", name="Guardar").click()
 
-        expect(self.page.get_by_text("Juan Sebastián Veron")).not_to_be_visible()
-        expect(self.page.get_by_text("La Plata")).not_to_be_visible()
-        expect(self.page.get_by_text("54221555232")).not_to_be_visible()
-        expect(self.page.get_by_text("brujita75@vetsoft.com")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Juan Sebastián Veron")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("La Plata")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("54221555232")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("brujita75@vetsoft.com")).not_to_be_visible()
 
-        expect(self.page.get_by_text("Guido Carrillo")).to_be_visible()
-        expect(self.page.get_by_text("Ensenada")).to_be_visible()
-        expect(self.page.get_by_text("54221232555")).to_be_visible()
-        expect(self.page.get_by_text("goleador@vetsoft.com")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Guido Carrillo")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Ensenada")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("54221232555")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("goleador@vetsoft.com")).to_be_visible()
 
         edit_action = self.page.get_by_role("link", name="Editar")
         expect(edit_action).to_have_attribute(
@@ -379,13 +394,13 @@ class ProvidersTestCase(PlaywrightTestCase):
 
         expect(self.page.get_by_text("No existen proveedores")).not_to_be_visible()
 
-        expect(self.page.get_by_text("Proveedor 1")).to_be_visible()
-        expect(self.page.get_by_text("Calle 7 # 1234")).to_be_visible()
-        expect(self.page.get_by_text("proveedor1@gmail.com")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Proveedor 1")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Calle 7 # 1234")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("proveedor1@gmail.com")).to_be_visible()
 
-        expect(self.page.get_by_text("Proveedor 2")).to_be_visible()
-        expect(self.page.get_by_text("Calle 54 # 456")).to_be_visible()
-        expect(self.page.get_by_text("proveedor2@gmail.com")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Proveedor 2")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Calle 54 # 456")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("proveedor2@gmail.com")).to_be_visible()
 
     def test_should_show_add_provider_action(self):
         """Prueba que la acción 'Agregar Proveedor' se muestre en la página."""
@@ -406,8 +421,8 @@ class ProvidersTestCase(PlaywrightTestCase):
 
         self.page.goto(f"{self.live_server_url}{reverse('provider_repo')}")
 
-        expect(self.page.get_by_text("Proveedor con Dirección")).to_be_visible()
-        expect(self.page.get_by_text("Avenida 44 # 987")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Proveedor con Dirección")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Avenida 44 # 987")).to_be_visible()
 
     def test_should_be_able_to_create_provider_with_address(self):
         """Prueba que se pueda crear un proveedor con una dirección."""
@@ -421,8 +436,8 @@ class ProvidersTestCase(PlaywrightTestCase):
 
         self.page.get_by_role("button", name="Guardar").click()
 
-        expect(self.page.get_by_text("Lucas")).to_be_visible()
-        expect(self.page.get_by_text("Calle 10 # 567")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Lucas")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Calle 10 # 567")).to_be_visible()
 
     def test_should_view_error_if_address_is_not_provided_when_creating_provider(self):
         """Prueba que se muestre un error si no se proporciona una dirección al crear un proveedor."""
@@ -456,13 +471,13 @@ class MedicinesTestCase(PlaywrightTestCase):
 
         expect(self.page.get_by_text("No existen medicamentos")).not_to_be_visible()
 
-        expect(self.page.get_by_text("Ibuprofeno")).to_be_visible()
-        expect(self.page.get_by_text("Dolores de cabeza")).to_be_visible()
-        expect(self.page.get_by_text("5")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Ibuprofeno")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Dolores de cabeza")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("5")).to_be_visible()
 
-        expect(self.page.get_by_text("Buscapina")).to_be_visible()
-        expect(self.page.get_by_text("Dolores de estomago")).to_be_visible()
-        expect(self.page.get_by_text("10")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Buscapina")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Dolores de estomago")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("10")).to_be_visible()
 
     def test_should_show_add_medicine_action(self):
         """Prueba que la acción 'Agregar Medicamento' se muestre en la página."""
@@ -538,13 +553,13 @@ class ProductTestCase(PlaywrightTestCase):
         self.page.goto(f"{self.live_server_url}{reverse('products_repo')}")
 
         expect(self.page.get_by_text("No existen productos")).not_to_be_visible() 
-        expect(self.page.get_by_text("Peine")).to_be_visible()
-        expect(self.page.get_by_text("Higiene")).to_be_visible()
-        expect(self.page.get_by_text("100.0")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Peine")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Higiene")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("100.0")).to_be_visible()
 
-        expect(self.page.get_by_text("Pelota")).to_be_visible()
-        expect(self.page.get_by_text("Juguete")).to_be_visible()
-        expect(self.page.get_by_text("150.0")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Pelota")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Juguete")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("150.0")).to_be_visible()
 
      def test_should_show_add_product_action(self):
         """Prueba que se muestre la acción 'Agregar Producto'."""
@@ -629,7 +644,7 @@ class ProductTestCase(PlaywrightTestCase):
         self.page.get_by_label("Tipo").fill("Juguete")
         self.page.get_by_label("Precio").fill("200.0")
         self.page.get_by_role("button", name="Guardar").click()
-        expect(self.page.get_by_text("200.0")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("200.0")).to_be_visible()
 
      def test_should_view_error_if_price_is_negative_on_edit(self):
         """Prueba que se muestren errores si el precio es negativo al editar un producto."""
@@ -724,7 +739,7 @@ class PetsRepoTestCase(PlaywrightTestCase):
 
         self.page.goto(f"{self.live_server_url}{reverse('pets_repo')}")
 
-        expect(self.page.get_by_text("Lola")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Lola")).to_be_visible()
 
         def is_delete_response(response):
             return response.url.find(reverse("pets_delete"))
@@ -736,7 +751,7 @@ class PetsRepoTestCase(PlaywrightTestCase):
         response = response_info.value
         self.assertTrue(response.status < 400)
 
-        expect(self.page.get_by_text("Lola")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Lola")).not_to_be_visible()
 
 class VetSpecialityTestCase(PlaywrightTestCase):
   
@@ -757,8 +772,8 @@ class VetSpecialityTestCase(PlaywrightTestCase):
 
         self.page.goto(f"{self.live_server_url}{reverse('vet_repo')}")
 
-        expect(self.page.get_by_text("Dr. House")).to_be_visible()
-        expect(self.page.get_by_text("Clinica")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Dr. House")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Clinica")).to_be_visible()
 
     def test_should_be_able_to_edit_a_vet(self):
         """"
@@ -780,15 +795,15 @@ class VetSpecialityTestCase(PlaywrightTestCase):
 
         self.page.get_by_role("button", name="Guardar").click()
 
-        expect(self.page.get_by_text("pepe")).not_to_be_visible()
-        expect(self.page.get_by_text("1545789678")).not_to_be_visible()
-        expect(self.page.get_by_text("pep10@gmail.com")).not_to_be_visible()
-        expect(self.page.get_by_text("Neurologia")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("pepe")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("1545789678")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("pep10@gmail.com")).not_to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Neurologia")).not_to_be_visible()
 
-        expect(self.page.get_by_text("messi")).to_be_visible()
-        expect(self.page.get_by_text("1534998955")).to_be_visible()
-        expect(self.page.get_by_text("mess10@gmail.com")).to_be_visible()
-        expect(self.page.get_by_text("Cardiologia")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("messi")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("1534998955")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("mess10@gmail.com")).to_be_visible()
+        expect(self.page.locator("table tbody").get_by_text("Cardiologia")).to_be_visible()
 
         edit_action = self.page.get_by_role("link", name="Editar")
         expect(edit_action).to_have_attribute(
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
 
 application = get_asgi_application()
+
+# Compila las plantillas antes de atender la primera peticion.
+from app.templating import warm_up_templates  # noqa: E402
+
+warm_up_templates()
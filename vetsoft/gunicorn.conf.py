@@ -0,0 +1,32 @@
+"""
+Configuracion de gunicorn para servir vetsoft en produccion.
+
+Se usa con `gunicorn -c vetsoft/gunicorn.conf.py` y se ajusta con variables de
+entorno:
+
+- SERVER_MODE: "asgi" (por defecto) sirve `vetsoft.asgi` con workers de uvicorn,
+  donde las vistas asincronicas atienden varias peticiones por worker; "wsgi"
+  sirve `vetsoft.wsgi` con workers de hilos.
+- WEB_CONCURRENCY: cantidad de procesos (por defecto, 2 por CPU + 1).
+- WEB_THREADS: hilos por worker en modo wsgi (por defecto 4).
+- PORT: puerto en el que se escucha (por defecto 8000).
+"""
+import multiprocessing
+import os
+
+mode = os.environ.get("SERVER_MODE", "asgi")
+
+if mode == "asgi":
+    wsgi_app = "vetsoft.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+elif mode == "wsgi":
+    wsgi_app = "vetsoft.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("WEB_THREADS", 4))
+else:
+    raise ValueError(f"SERVER_MODE debe ser 'asgi' o 'wsgi', no {mode!r}")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get("WEB_TIMEOUT", 30))
+accesslog = "-"
@@ -10,9 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
-#import os 
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "app.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,16 +64,26 @@ ROOT_URLCONF = "vetsoft.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates que ademas mide el tiempo de render (app/instrumentation.py).
+        "BACKEND": "app.instrumentation.TimedDjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Las plantillas se compilan una vez por proceso; app.templating las
+            # precarga al iniciar el servidor (vetsoft/wsgi.py y vetsoft/asgi.py).
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
-                "app.context_processors.navbar",
             ],
         },
     },
@@ -87,9 +98,66 @@ WSGI_APPLICATION = "vetsoft.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "vetsoftdb.sqlite3",
+        # SQLITE_PATH permite ubicar la base fuera del codigo, por ejemplo en un volumen.
+        "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "vetsoftdb.sqlite3"),
+        # Conexiones persistentes: se reutilizan entre peticiones del mismo hilo
+        # y se verifican antes de usarlas. En modo wsgi cada hilo de gunicorn
+        # tiene la suya. En modo asgi Django ejecuta el ORM de cada peticion en
+        # un hilo propio, y su conexion se cierra con el hilo: abrirla cuesta
+        # menos de 2 ms con los PRAGMA de abajo.
+        "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Segundos que se espera un lock antes de fallar con "database is locked".
+            "timeout": 20,
+        },
     },
 }
+
+# PRAGMAs que se aplican a cada conexion de SQLite (ver app/database.py).
+# WAL permite leer mientras otro proceso escribe y, con synchronous=NORMAL, solo
+# sincroniza el disco en los checkpoints. busy_timeout esta en milisegundos,
+# mmap_size en bytes y un cache_size negativo se expresa en KiB.
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 20000,
+    "mmap_size": 268435456,
+    "cache_size": -65536,
+    "temp_store": "memory",
+}
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# La cache la comparten todos los workers de gunicorn: "default" guarda las
+# paginas de los repositorios y "stats" sus contadores de aciertos y fallos, que
+# van aparte para que el descarte de paginas viejas no los borre. Con REDIS_URL
+# se usa Redis (los contadores se incrementan de forma atomica); si no, archivos
+# en CACHE_DIR, donde dos workers que cuentan a la vez pueden perder un incremento.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "KEY_PREFIX": alias,
+        }
+        for alias in ("default", "stats")
+    }
+else:
+    CACHE_DIR = Path(os.environ.get("CACHE_DIR", BASE_DIR / "cache"))
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR / "pages",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        },
+        "stats": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR / "stats",
+        },
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -130,3 +198,77 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Repository pages
+# Los listados se paginan por keyset; `?page_size=` permite cambiar el tamaño
+# de pagina hasta REPOSITORY_MAX_PAGE_SIZE.
+
+REPOSITORY_PAGE_SIZE = 50
+
+REPOSITORY_MAX_PAGE_SIZE = 500
+
+# Segundos que se guarda en cache cada pagina de un repositorio. Las paginas se
+# invalidan antes por version de modelo ante cualquier escritura.
+
+REPOSITORY_CACHE_TIMEOUT = 300
+
+# Elementos que se aceptan por lista (altas y modificaciones) en un lote de la API JSON.
+
+API_BATCH_MAX_SIZE = 1000
+
+# Opciones que muestran los selectores de registros de los formularios (dueño,
+# cliente, veterinario, mascota). Las demas se buscan desde el selector con la
+# API JSON (?q=), de modo que la pagina no crece con la tabla.
+
+PICKER_MAX_OPTIONS = 50
+
+# Identificador de la version desplegada. Forma parte de los ETag, de modo que
+# al desplegar plantillas nuevas los navegadores vuelven a descargar las paginas.
+
+RELEASE = os.environ.get("RELEASE", "")
+
+# Appointments
+# Horario de atencion (horas locales y dias de la semana, 0 es lunes), grilla de
+# turnos y duracion maxima de un turno en minutos. La duracion maxima acota la
+# busqueda de turnos superpuestos (ver app/scheduling.py).
+
+APPOINTMENT_OPENING_HOUR = 9
+
+APPOINTMENT_CLOSING_HOUR = 18
+
+APPOINTMENT_WORKING_DAYS = (0, 1, 2, 3, 4, 5)
+
+APPOINTMENT_SLOT_MINUTES = 30
+
+APPOINTMENT_MAX_MINUTES = 240
+
+# Dosing
+# Dosis calculadas que se guardan en memoria, por proceso, por medicamento y
+# franja de peso (ver app/dosing.py). Al llenarse se descartan las menos usadas.
+
+DOSE_CACHE_SIZE = 4096
+
+# Instrumentation
+# Cada peticion informa sus consultas y tiempos en el header Server-Timing y en el
+# logger "app.instrumentation". Las que exceden alguno de estos presupuestos se
+# registran con nivel WARNING.
+
+REQUEST_QUERY_BUDGET = int(os.environ.get("REQUEST_QUERY_BUDGET", 10))
+
+REQUEST_TIME_BUDGET_MS = int(os.environ.get("REQUEST_TIME_BUDGET_MS", 500))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "app.instrumentation": {
+            "handlers": ["console"],
+            # INFO registra todas las peticiones; WARNING solo las que exceden el presupuesto.
+            "level": os.environ.get("INSTRUMENTATION_LOG_LEVEL", "WARNING"),
+        },
+    },
+}
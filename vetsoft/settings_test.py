@@ -0,0 +1,69 @@
+"""
+Configuracion para correr las pruebas.
+
+Parte de vetsoft/settings.py y cambia solo lo que encarece las pruebas: la
+base es SQLite en memoria, las tablas se crean directamente desde los modelos
+en lugar de aplicar las migraciones, las contraseñas se hashean con MD5 y las
+pruebas corren en paralelo con el runner de app/testing.py. La cache es en
+memoria, propia de cada proceso.
+
+Uso:
+    python manage.py test app functional_tests --settings=vetsoft.settings_test
+"""
+from .settings import *  # noqa: F403
+from .settings import DATABASES, LOGGING
+
+
+class DisableMigrations:
+    """
+    Valor de MIGRATION_MODULES que indica que ninguna app tiene migraciones.
+
+    Django crea entonces las tablas de la base de pruebas desde los modelos
+    (como `migrate --run-syncdb`). Los indices de texto completo, que se crean
+    en una migracion, se instalan igual con la señal post_migrate (app/apps.py).
+    """
+
+    def __contains__(self, app_label):
+        """
+        Indica que todas las apps tienen un modulo de migraciones configurado.
+        """
+        return True
+
+    def __getitem__(self, app_label):
+        """
+        Devuelve None: la app no tiene migraciones.
+        """
+        return None
+
+
+DATABASES = {
+    "default": {
+        **DATABASES["default"],
+        # Con --parallel cada proceso de pruebas recibe su propia copia en memoria.
+        "NAME": ":memory:",
+    },
+}
+
+MIGRATION_MODULES = DisableMigrations()
+
+# Cada proceso de pruebas usa su propia cache en memoria: con --parallel, una
+# cache en archivos compartida haria que las pruebas de un proceso vaciaran la
+# de otro.
+CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": alias}
+    for alias in ("default", "stats")
+}
+
+# El hasher por defecto (PBKDF2) es lento a proposito; en las pruebas no hace falta.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+TEST_RUNNER = "app.testing.TimedTestRunner"
+
+# Cantidad de pruebas mas lentas que informa el runner al terminar (0 para ninguna).
+TEST_SLOWEST = 10
+
+# Las pruebas que verifican los registros de instrumentacion los capturan con assertLogs.
+LOGGING = {
+    **LOGGING,
+    "loggers": {"app.instrumentation": {"handlers": ["console"], "level": "CRITICAL"}},
+}
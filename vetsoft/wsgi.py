@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
 
 application = get_wsgi_application()
+
+# Compila las plantillas antes de atender la primera peticion.
+from app.templating import warm_up_templates  # noqa: E402
+
+warm_up_templates()